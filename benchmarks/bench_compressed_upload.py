@@ -0,0 +1,84 @@
+"""Compara o ``POST /validations`` de uma remessa bruta com o da mesma remessa compactada.
+
+Para cada formato mostra o tamanho enviado, o tempo de ponta a ponta no
+``TestClient`` (sem rede) e o tempo estimado com a transferência em um enlace
+de ``--mbps`` megabits por segundo. Exige ``httpx``.
+
+Uso::
+
+    python benchmarks/bench_compressed_upload.py --validator dimp --rows 500000 --mbps 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import bz2
+import gzip
+import io
+import lzma
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from validator_saas.api.main import app  # noqa: E402
+from validator_saas.bench import GeneratorOptions, RemessaGenerator  # noqa: E402
+from validator_saas.services.cache import get_result_cache  # noqa: E402
+from validator_saas.validators import VALIDATORS  # noqa: E402
+
+
+def _zip(data: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("remessa.csv", data)
+    return buffer.getvalue()
+
+
+FORMATS = {
+    "raw": lambda data: data,
+    "gzip": lambda data: gzip.compress(data, 6),
+    "bz2": bz2.compress,
+    "xz": lambda data: lzma.compress(data, preset=1),
+    "zip": _zip,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--validator", default="dimp", choices=sorted(VALIDATORS))
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--mbps", type=float, default=100.0, help="banda do enlace simulado")
+    args = parser.parse_args()
+
+    generator = RemessaGenerator(VALIDATORS[args.validator], GeneratorOptions(rows=args.rows))
+    data = "".join(generator.lines()).encode()
+    with TestClient(app) as client:
+        organization = client.post(
+            "/organizations",
+            json={"name": "Benchmark", "role": "adquirente", "tax_id": "12.345.678/0001-90"},
+        ).json()
+        for name, compress in FORMATS.items():
+            payload = compress(data)
+            get_result_cache().clear()
+            started = time.perf_counter()
+            response = client.post(
+                "/validations",
+                data={"organization_id": str(organization["id"]), "regulator": args.validator},
+                files={"file": (f"remessa.{name}", payload)},
+            )
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
+            transfer = len(payload) * 8 / (args.mbps * 1_000_000)
+            print(
+                f"{name:5} {len(payload):>12,} bytes  taxa {len(data) / len(payload):5.1f}:1  "
+                f"local {elapsed:6.2f} s  com rede {elapsed + transfer:6.2f} s  "
+                f"inconsistências {response.json()['validation']['issue_count']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compara a revalidação completa com a incremental de um reenvio DIMP corrigido.
+
+Uso::
+
+    python benchmarks/bench_incremental.py --rows 5000000 --fixes 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.models import ValidationRun  # noqa: E402
+from validator_saas.validators import VALIDATORS  # noqa: E402
+from validator_saas.validators.incremental import BLOCK_LINES, validate_incremental  # noqa: E402
+from validator_saas.validators.mapped import map_file  # noqa: E402
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=1, regulatory_file_id=1, validator_key="dimp", started_at=datetime.utcnow())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--fixes", type=int, default=30)
+    parser.add_argument("--block-lines", type=int, default=BLOCK_LINES)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    rows = [
+        f"1,12345678000190,TED,{'abc' if rng.random() < 0.001 else f'{rng.uniform(0, 1e6):.2f}'},"
+        f"{index % 100},20240131\n"
+        for index in range(args.rows)
+    ]
+    validator = VALIDATORS["dimp"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "dimp.csv"
+        path.write_text("".join(rows), encoding="ascii")
+        with map_file(path) as buffer:
+            started = time.perf_counter()
+            first = validate_incremental(validator, buffer, _run(), block_lines=args.block_lines)
+            initial = time.perf_counter() - started
+
+        for index in rng.sample(range(args.rows), args.fixes):
+            rows[index] = f"1,12345678000190,TED,{rng.uniform(0, 1e6):.2f},1,20240131\n"
+        path.write_text("".join(rows), encoding="ascii")
+
+        started = time.perf_counter()
+        full = validator.validate(path, _run())
+        complete = time.perf_counter() - started
+        with map_file(path) as buffer:
+            started = time.perf_counter()
+            second = validate_incremental(
+                validator, buffer, _run(), previous=first.manifest, block_lines=args.block_lines
+            )
+            incremental = time.perf_counter() - started
+
+    assert len(second.result.issues) == len(full.issues)
+    print(f"primeiro envio (blocos)  {initial:6.2f}s  {len(first.manifest.blocks)} blocos")
+    print(f"reenvio completo         {complete:6.2f}s  {len(full.issues)} inconsistências")
+    print(
+        f"reenvio incremental      {incremental:6.2f}s  {second.validated_blocks} blocos validados, "
+        f"{second.reused_blocks} reaproveitados ({complete / incremental:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
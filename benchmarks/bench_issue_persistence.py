@@ -0,0 +1,85 @@
+"""Mede tempo e memória da persistência de inconsistências em arquivos com muitos erros.
+
+Compara a persistência anterior (``add_issue`` por inconsistência seguido de
+releitura) com ``add_issues_bulk``, que adota os objetos do validador, nos
+armazenamentos por objetos e colunar.
+
+Uso::
+
+    python benchmarks/bench_issue_persistence.py --rows 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.storage import InMemoryDatabase  # noqa: E402
+from validator_saas.validators import VALIDATORS  # noqa: E402
+
+
+def persist_one_by_one(db: InMemoryDatabase, run_id: int, issues: list) -> list:
+    for issue in issues:
+        db.add_issue(
+            run_id=run_id,
+            line_number=issue.line_number,
+            column_name=issue.column_name,
+            severity=issue.severity,
+            message=issue.message,
+        )
+    return db.list_issues_for_run(run_id)
+
+
+def persist_bulk(db: InMemoryDatabase, run_id: int, issues: list) -> list:
+    return db.add_issues_bulk(run_id, issues)
+
+
+def measure(strategy, issues_factory, issue_store: str = "objects") -> tuple[float, int]:
+    """Retorna o tempo (sem rastreamento) e o pico de memória alocada pela persistência."""
+
+    db = InMemoryDatabase(issue_store=issue_store)
+    run = db.create_run(regulatory_file_id=1, validator_key="dimp")
+    issues = issues_factory(run)
+    started = time.perf_counter()
+    stored = strategy(db, run.id, issues)
+    elapsed = time.perf_counter() - started
+    assert len(stored) == len(issues)
+
+    db = InMemoryDatabase(issue_store=issue_store)
+    run = db.create_run(regulatory_file_id=1, validator_key="dimp")
+    issues = issues_factory(run)
+    tracemalloc.start()
+    strategy(db, run.id, issues)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000, help="linhas inválidas no arquivo DIMP")
+    args = parser.parse_args()
+
+    content = "1,12345678000190,TED,abc,10,20240131\n" * args.rows
+    validator = VALIDATORS["dimp"]
+
+    def issues_factory(run):
+        return validator.validate(content, run).issues
+
+    scenarios = (
+        ("add_issue + releitura", persist_one_by_one, "objects"),
+        ("add_issues_bulk", persist_bulk, "objects"),
+        ("add_issues_bulk colunar", persist_bulk, "columnar"),
+    )
+    for label, strategy, issue_store in scenarios:
+        elapsed, peak = measure(strategy, issues_factory, issue_store)
+        print(f"{label:<24} {elapsed:8.3f}s   pico {peak / 2**20:8.1f} MiB   ({args.rows} inconsistências)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Mede o custo do registro de layouts com muitos layouts declarativos instalados.
+
+Instala ``--regulators`` x ``--versions`` cópias do layout DIMP em um diretório
+temporário e mede a montagem do índice, a primeira consulta de cada versão
+(leitura do JSON e compilação) e as consultas seguintes, atendidas pelo LRU.
+A memória alocada (``tracemalloc``) mostra que o índice não carrega os layouts.
+
+Uso::
+
+    python benchmarks/bench_layout_registry.py --regulators 200 --versions 5 --cache-size 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.validators import VALIDATORS, LayoutRegistry  # noqa: E402
+from validator_saas.validators.registry import layout_to_dict  # noqa: E402
+
+
+def install(root: Path, regulators: int, versions: int) -> list[tuple[str, str]]:
+    template = layout_to_dict(VALIDATORS["dimp"])
+    installed = []
+    for regulator in range(regulators):
+        key = f"regulador_{regulator:04d}"
+        (root / key).mkdir()
+        for version in range(1, versions + 1):
+            data = dict(template, version=f"{version}.0", regulator=key.upper())
+            # Cada versão tem um campo de tamanho diferente, para não repetir o mesmo layout compilado.
+            data["fields"] = [dict(field) for field in template["fields"]]
+            data["fields"][2]["max_length"] = version + regulator % 7
+            (root / key / f"{version}.0.json").write_text(json.dumps(data), encoding="utf-8")
+            installed.append((key, f"{version}.0"))
+    return installed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--regulators", type=int, default=200)
+    parser.add_argument("--versions", type=int, default=5)
+    parser.add_argument("--cache-size", type=int, default=64)
+    parser.add_argument("--lookups", type=int, default=20000, help="consultas aleatórias após o aquecimento")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="layouts-") as root:
+        installed = install(Path(root), args.regulators, args.versions)
+        registry = LayoutRegistry(paths=(root,), cache_size=args.cache_size)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        keys = len(registry)
+        indexed = time.perf_counter() - started
+        index_bytes = tracemalloc.get_traced_memory()[0]
+        print(f"índice: {keys} validadores, {len(installed)} layouts em {indexed * 1000:.1f} ms "
+              f"({index_bytes / 1024:.0f} KiB)")
+
+        hot = installed[: args.cache_size]
+        started = time.perf_counter()
+        for key, version in hot:
+            registry.resolve(key, version)
+        first = (time.perf_counter() - started) / len(hot)
+        print(f"primeira consulta: {first * 1000:.2f} ms por layout "
+              f"({tracemalloc.get_traced_memory()[0] / 1024:.0f} KiB com {len(hot)} carregados)")
+
+        started = time.perf_counter()
+        for _ in range(args.lookups):
+            registry.resolve(*random.choice(hot))
+        cached = (time.perf_counter() - started) / args.lookups
+        print(f"consulta em cache: {cached * 1e6:.2f} µs")
+
+        for key, version in installed:
+            registry.resolve(key, version)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"todos consultados uma vez: {current / 1024:.0f} KiB retidos (pico {peak / 1024:.0f} KiB), "
+              f"{registry.stats()}")
+
+
+if __name__ == "__main__":
+    main()
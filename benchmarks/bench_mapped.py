@@ -0,0 +1,68 @@
+"""Compara a validação de um arquivo local via ``mmap`` com a leitura em blocos de texto.
+
+Uso::
+
+    python benchmarks/bench_mapped.py --rows 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.models import ValidationRun  # noqa: E402
+from validator_saas.validators import VALIDATORS  # noqa: E402
+
+LINES = (
+    "1,12345678000190,SRV01,120,5000.75,agencia,20240131\n",
+    "1,12345678000190,SRV02,7,12.5,,20240131\n",
+    "1,12345678000190,SRV03,x,99.90,internet,20240131\n",
+)
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=1, regulatory_file_id=1, validator_key="cadoc_6334", started_at=datetime.utcnow())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    validator = VALIDATORS["cadoc_6334"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "cadoc6334.csv"
+        with open(path, "w", encoding="utf-8") as stream:
+            for index in range(args.rows):
+                stream.write(LINES[index % len(LINES)])
+        print(f"{args.rows:,} linhas, {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        def text_blocks():
+            with open(path, "rb") as stream:
+                return validator.validate(stream, _run())
+
+        strategies = {"texto": text_blocks, "mmap": lambda: validator.validate(path, _run())}
+        for name, strategy in strategies.items():
+            started = time.perf_counter()
+            result = strategy()
+            elapsed = time.perf_counter() - started
+            tracemalloc.start()
+            strategy()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(
+                f"{name:<6} {elapsed:8.2f}s   {args.rows / elapsed:>12,.0f} linhas/s   "
+                f"{len(result.issues):,} inconsistências   pico {peak / 2**20:.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
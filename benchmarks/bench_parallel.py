@@ -0,0 +1,67 @@
+"""Mede a escalabilidade da validação paralela de um único arquivo CADOC 6334.
+
+Uso::
+
+    python benchmarks/bench_parallel.py --rows 2000000 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.models import ValidationRun  # noqa: E402
+from validator_saas.validators import VALIDATORS  # noqa: E402
+from validator_saas.validators.parallel import validate_parallel  # noqa: E402
+
+LINES = (
+    "1,12345678000190,SRV01,120,5000.75,agencia,20240131\n",
+    "1,12345678000190,SRV02,7,12.5,,20240131\n",
+    "1,12345678000190,SRV03,x,99.90,internet,20240131\n",
+)
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=1, regulatory_file_id=1, validator_key="cadoc_6334", started_at=datetime.utcnow())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    validator = VALIDATORS["cadoc_6334"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "cadoc6334.csv"
+        with open(path, "w", encoding="utf-8") as stream:
+            for index in range(args.rows):
+                stream.write(LINES[index % len(LINES)])
+        size = os.path.getsize(path)
+        print(f"{args.rows:,} linhas, {size / 2**20:.1f} MiB, {os.cpu_count()} CPUs")
+
+        started = time.perf_counter()
+        serial = validator.validate(path, _run())
+        baseline = time.perf_counter() - started
+        print(f"{'serial':<10} {baseline:8.2f}s   {args.rows / baseline:>12,.0f} linhas/s")
+
+        for workers in args.workers:
+            started = time.perf_counter()
+            result = validate_parallel(validator, path, _run(), workers=workers)
+            elapsed = time.perf_counter() - started
+            assert len(result.issues) == len(serial.issues)
+            print(
+                f"{workers:>2} workers {elapsed:8.2f}s   {args.rows / elapsed:>12,.0f} linhas/s   "
+                f"({baseline / elapsed:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compara a validação posicional (largura fixa) com a delimitada sobre os mesmos dados.
+
+Uso::
+
+    python benchmarks/bench_positional.py --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.models import ValidationRun  # noqa: E402
+from validator_saas.validators import LayoutValidator  # noqa: E402
+from validator_saas.validators.bacen import BACEN_LAYOUT  # noqa: E402
+from validator_saas.validators.layout import LayoutDefinition  # noqa: E402
+
+WIDTHS = (2, 14, 3, 12, 8, 6)
+
+
+def positional(layout: LayoutDefinition) -> LayoutDefinition:
+    fields, start = [], 0
+    for field, width in zip(layout.fields, WIDTHS, strict=True):
+        fields.append(replace(field, start=start, length=width))
+        start += width
+    return replace(layout, fields=tuple(fields), delimiter=None)
+
+
+class DelimitedBacen(LayoutValidator):
+    key = "bacen_csv"
+    regulator = "BACEN"
+    layout = BACEN_LAYOUT
+
+
+class PositionalBacen(LayoutValidator):
+    key = "bacen_posicional"
+    regulator = "BACEN"
+    layout = positional(BACEN_LAYOUT)
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=1, regulatory_file_id=1, validator_key="bacen", started_at=datetime.utcnow())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    rows = []
+    for index in range(args.rows):
+        amount = "abc" if rng.random() < args.error_rate else f"{rng.uniform(0, 1e6):.2f}"
+        rows.append(["1", "12345678000190", "CRD", amount, "20240131", str(index % 100_000)])
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = Path(directory) / "bacen.csv"
+        fixed_path = Path(directory) / "bacen.txt"
+        csv_path.write_text("".join(",".join(row) + "\n" for row in rows), encoding="ascii")
+        fixed_path.write_text(
+            "".join("".join(value.rjust(width, "0") for value, width in zip(row, WIDTHS)) + "\n" for row in rows),
+            encoding="ascii",
+        )
+
+        vectorized = PositionalBacen()
+        vectorized.engine = "numpy"
+        for label, validator, path in (
+            ("delimitado", DelimitedBacen(), csv_path),
+            ("posicional", PositionalBacen(), fixed_path),
+            ("pos. numpy", vectorized, fixed_path),
+        ):
+            started = time.perf_counter()
+            result = validator.validate(path, _run())
+            elapsed = time.perf_counter() - started
+            size = os.path.getsize(path) / 2**20
+            print(
+                f"{label:<11} {size:6.1f} MiB  {elapsed:6.2f}s  {args.rows / elapsed:>12,.0f} linhas/s  "
+                f"{len(result.issues)} inconsistências"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compara o custo de servir o catálogo de validadores serializado a cada leitura e já em cache.
+
+Mede só o trabalho do handler (montar os descritores, validar com Pydantic e
+codificar o JSON contra uma consulta ao cache de respostas) e, com ``--http``,
+também a requisição completa pelo ``TestClient``, com e sem ``If-None-Match``.
+
+Uso::
+
+    python benchmarks/bench_response_cache.py --reads 2000 --http
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.api.main import _CATALOG, app  # noqa: E402
+from validator_saas.services.cache import CachedResponse, get_response_cache  # noqa: E402
+from validator_saas.services.validation_service import ValidationService  # noqa: E402
+from validator_saas.storage import InMemoryDatabase  # noqa: E402
+
+
+def per_read(function, reads: int) -> float:
+    started = time.perf_counter()
+    for _ in range(reads):
+        function()
+    return (time.perf_counter() - started) / reads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--http", action="store_true", help="mede também a requisição completa")
+    args = parser.parse_args()
+
+    service = ValidationService(InMemoryDatabase())
+    cache = get_response_cache()
+
+    def serialize() -> bytes:
+        return _CATALOG.dump_json(_CATALOG.validate_python(service.list_validators()))
+
+    cache.put("bench", CachedResponse.encode(serialize()))
+    rebuilt = per_read(serialize, args.reads)
+    cached = per_read(lambda: cache.get("bench").body, args.reads)
+    print(f"handler: serializado a cada leitura {rebuilt * 1e6:9.1f} µs | em cache {cached * 1e6:7.2f} µs")
+
+    if args.http:
+        from fastapi.testclient import TestClient
+
+        client = TestClient(app)
+        etag = client.get("/validators").headers["etag"]
+        full = per_read(lambda: client.get("/validators"), args.reads)
+        revalidated = per_read(lambda: client.get("/validators", headers={"If-None-Match": etag}), args.reads)
+        print(f"HTTP: 200 {full * 1e6:9.1f} µs | 304 {revalidated * 1e6:9.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Mede a retenção do banco em memória: memória liberada, espaço em disco e custo das leituras.
+
+Grava ``--runs`` execuções concluídas com ``--issues`` inconsistências cada em
+um ``InMemoryDatabase`` sem limite e em outro com ``VALIDATOR_MEMORY_ISSUE_BYTES``
+equivalente a ``--resident`` execuções, e compara a memória alocada
+(``tracemalloc``), o tamanho do segmento em disco e o tempo de uma página e da
+exportação completa de uma execução em memória e de uma compactada.
+
+Uso::
+
+    python benchmarks/bench_retention.py --runs 20 --issues 50000 --resident 4 --issue-store columnar
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.issue_store import ISSUE_STORES  # noqa: E402
+from validator_saas.models import ValidationIssue  # noqa: E402
+from validator_saas.storage import InMemoryDatabase, RetentionPolicy  # noqa: E402
+
+
+def fill(db: InMemoryDatabase, runs: int, issues: int) -> list[int]:
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = db.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    run_ids = []
+    for _ in range(runs):
+        run = db.create_run(regulatory_file.id, "dimp")
+        db.add_issues_bulk(
+            run.id,
+            [
+                ValidationIssue(line_number=line, column_name="valor_total", message=f"Valor {run.id}.{line}.")
+                for line in range(1, issues + 1)
+            ],
+        )
+        run.status = "completed_with_issues"
+        run.finished_at = datetime.utcnow()
+        db.update_run(run)
+        run_ids.append(run.id)
+    return run_ids
+
+
+def measure(function, repeat: int = 5) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--issues", type=int, default=50000)
+    parser.add_argument("--resident", type=int, default=4, help="execuções que cabem no orçamento")
+    parser.add_argument("--issue-store", choices=sorted(ISSUE_STORES), default="columnar")
+    parser.add_argument("--spill-dir")
+    args = parser.parse_args()
+
+    probe = InMemoryDatabase(issue_store=args.issue_store)
+    run_bytes = probe.issue_bytes_for_run(fill(probe, 1, args.issues)[0])
+    del probe
+    policies = {
+        "sem limite": RetentionPolicy(),
+        "com orçamento": RetentionPolicy(max_issue_bytes=run_bytes * args.resident, spill_dir=args.spill_dir),
+    }
+    for label, policy in policies.items():
+        tracemalloc.start()
+        started = time.perf_counter()
+        db = InMemoryDatabase(issue_store=args.issue_store, retention=policy)
+        run_ids = fill(db, args.runs, args.issues)
+        elapsed = time.perf_counter() - started
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        stats = db.retention_stats()
+        print(f"{label}: gravação {elapsed:.2f} s, {current / 2**20:.1f} MiB alocados, "
+              f"{stats['spilled_runs']} execuções em disco ({stats['disk_bytes'] / 2**20:.1f} MiB)")
+        for where, run_id in (("primeira", run_ids[0]), ("última", run_ids[-1])):
+            middle = db.list_issues_for_run(run_id, offset=args.issues // 2, limit=1)[0].id
+            page = measure(lambda: db.list_issues_page(run_id, after_id=middle, limit=100))
+            export = measure(lambda: sum(1 for _ in db.iter_issue_rows(run_id)), repeat=2)
+            print(f"  {where} execução: página {page * 1000:.2f} ms | exportação {export * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
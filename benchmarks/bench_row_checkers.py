@@ -0,0 +1,114 @@
+"""Compara a checagem genérica por célula com os verificadores compilados.
+
+Uso::
+
+    python benchmarks/bench_row_checkers.py --rows 3000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.validators import VALIDATORS  # noqa: E402
+from validator_saas.validators.checkers import compile_layout, pattern_message  # noqa: E402
+from validator_saas.validators.layout import (  # noqa: E402
+    CNPJ_PATTERN,
+    CPF_PATTERN,
+    DATE_PATTERN,
+    FieldDefinition,
+    LayoutDefinition,
+)
+
+PATTERN_SAMPLES = {CNPJ_PATTERN: "12345678000190", CPF_PATTERN: "123.456.789-09", DATE_PATTERN: "20240131"}
+
+
+def legacy_check_row(values: list[str], layout: LayoutDefinition) -> list[tuple[str, str]]:
+    """Reprodução do laço original baseado em ``_parse_value``."""
+
+    def parse_value(value: str, field: FieldDefinition) -> str | None:
+        if field.max_length and len(value) > field.max_length:
+            return f"Tamanho máximo excedido ({len(value)}/{field.max_length})."
+        try:
+            field.type_(value)
+        except Exception as exc:  # noqa: BLE001
+            return f"Valor inválido ({exc})."
+        if field.pattern and not re.fullmatch(field.pattern, value):
+            return pattern_message(field)
+        return None
+
+    problems = []
+    for value, field in zip(values, layout.fields, strict=True):
+        if not value and field.required:
+            problems.append((field.name, "Campo obrigatório ausente."))
+            continue
+        if not value and not field.required:
+            continue
+        problem = parse_value(value, field)
+        if problem:
+            problems.append((field.name, problem))
+    return problems
+
+
+def synthetic_value(field: FieldDefinition, rng: random.Random, error_rate: float) -> str:
+    if rng.random() < error_rate:
+        return rng.choice(["", "x" * 40, "abc"])
+    if field.pattern in PATTERN_SAMPLES:
+        return PATTERN_SAMPLES[field.pattern]
+    if field.type_ is int:
+        return str(rng.randint(0, 99999))
+    if field.type_ is float:
+        return f"{rng.uniform(0, 1e6):.2f}"
+    return "A" * min(field.max_length or 8, 8)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=3_000_000, help="total de linhas (dividido entre layouts)")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    per_layout = max(1, args.rows // len(VALIDATORS))
+    totals = {"legacy": 0.0, "compiled": 0.0}
+    for key, validator in VALIDATORS.items():
+        layout = validator.layout
+        sample = [
+            [synthetic_value(field, rng, args.error_rate) for field in layout.fields] for _ in range(1000)
+        ]
+        rows = [sample[index % len(sample)] for index in range(per_layout)]
+        check_row = compile_layout(layout).check_row
+        assert all(check_row(row) == legacy_check_row(row, layout) for row in sample)
+
+        started = time.perf_counter()
+        for row in rows:
+            legacy_check_row(row, layout)
+        legacy = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for row in rows:
+            check_row(row)
+        compiled = time.perf_counter() - started
+
+        totals["legacy"] += legacy
+        totals["compiled"] += compiled
+        print(
+            f"{key:<12} legacy {per_layout / legacy:>12,.0f} linhas/s   "
+            f"compilado {per_layout / compiled:>12,.0f} linhas/s   ({legacy / compiled:.1f}x)"
+        )
+    total_rows = per_layout * len(VALIDATORS)
+    print(
+        f"{'total':<12} legacy {total_rows / totals['legacy']:>12,.0f} linhas/s   "
+        f"compilado {total_rows / totals['compiled']:>12,.0f} linhas/s   "
+        f"({totals['legacy'] / totals['compiled']:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Mede a checagem de chave única do CADOC 3040 em memória e com partições no disco.
+
+O pico de memória inclui o próprio conteúdo validado, mantido em memória.
+
+Uso::
+
+    python benchmarks/bench_rules.py --rows 1000000 --max-keys 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.config import get_settings  # noqa: E402
+from validator_saas.models import ValidationRun  # noqa: E402
+from validator_saas.validators import VALIDATORS  # noqa: E402
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=1, regulatory_file_id=1, validator_key="cadoc_3040", started_at=datetime.utcnow())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--duplicate-every", type=int, default=1000)
+    args = parser.parse_args()
+
+    lines = []
+    for index in range(args.rows):
+        key = index - 1 if index and index % args.duplicate_every == 0 else index
+        lines.append(f"1,{key // 10_000:014d},P{key % 10_000:04d},10.00,5.00,20240131\n")
+    data = "".join(lines).encode()
+
+    validator = VALIDATORS["cadoc_3040"]
+    settings = get_settings()
+    for label, max_keys in (("memória", args.rows + 1), ("disco", args.max_keys)):
+        settings.rule_max_keys = max_keys
+        started = time.perf_counter()
+        result = validator.validate(data, _run())
+        elapsed = time.perf_counter() - started
+        # Segunda passada só para medir o pico de memória alocada (tracemalloc deixa tudo mais lento).
+        tracemalloc.start()
+        validator.validate(data, _run())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{label:<8} limite {max_keys:>10,} chaves  {elapsed:6.2f}s  {args.rows / elapsed:>10,.0f} linhas/s  "
+            f"pico {peak / 2**20:7.1f} MiB  {len(result.issues)} duplicidades"
+        )
+
+if __name__ == "__main__":
+    main()
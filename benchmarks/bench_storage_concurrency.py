@@ -0,0 +1,70 @@
+"""Mede a vazão de ``create_run``/``add_issue``/``add_issues_bulk`` com várias threads escrevendo.
+
+Simula os handlers síncronos da API no threadpool: cada thread cria execuções
+e grava inconsistências no mesmo ``InMemoryDatabase``. Ao final confere que os
+ids são únicos.
+
+Uso::
+
+    python benchmarks/bench_storage_concurrency.py --threads 1 4 16 --runs 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.issue_store import ISSUE_STORES  # noqa: E402
+from validator_saas.models import ValidationIssue  # noqa: E402
+from validator_saas.storage import InMemoryDatabase  # noqa: E402
+
+
+def measure(issue_store: str, threads: int, runs: int, issues: int) -> tuple[float, int]:
+    db = InMemoryDatabase(issue_store=issue_store)
+    org = db.create_organization("Benchmark", "adquirente", "12.345.678/0001-90")
+    regulatory_file = db.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    barrier = threading.Barrier(threads + 1)
+
+    def writer(_: int) -> list[int]:
+        barrier.wait()
+        ids = []
+        for _ in range(runs):
+            run = db.create_run(regulatory_file.id, "dimp")
+            ids.append(db.add_issue(run.id, 1, None, "error", "Quantidade de colunas incorreta.").id)
+            bulk = [ValidationIssue(line_number=line, message="x") for line in range(issues)]
+            ids.extend(issue.id for issue in db.add_issues_bulk(run.id, bulk))
+        return ids
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(writer, index) for index in range(threads)]
+        barrier.wait()
+        started = time.perf_counter()
+        ids = [issue_id for future in futures for issue_id in future.result()]
+        elapsed = time.perf_counter() - started
+    if len(set(ids)) != len(ids):
+        raise AssertionError("ids de inconsistência repetidos")
+    return elapsed, threads * runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--runs", type=int, default=2000, help="execuções criadas por thread")
+    parser.add_argument("--issues", type=int, default=20, help="inconsistências em lote por execução")
+    args = parser.parse_args()
+
+    for issue_store in sorted(ISSUE_STORES):
+        for threads in args.threads:
+            elapsed, runs = measure(issue_store, threads, args.runs, args.issues)
+            rate = runs / elapsed
+            print(f"{issue_store:9} threads={threads:3} execuções/s={rate:12,.0f} ({elapsed:.3f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compara os motores ``python`` e ``numpy`` em layouts majoritariamente numéricos.
+
+Os tempos incluem as regras entre registros dos layouts (total do trailer no
+BACEN e chave única no CADOC 3040).
+
+Uso::
+
+    python benchmarks/bench_vectorized.py --rows 1000000 --error-rate 0.001
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from copy import copy
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from validator_saas.models import ValidationRun  # noqa: E402
+from validator_saas.validators import VALIDATORS  # noqa: E402
+
+ROWS = {
+    "cadoc_3040": (
+        "1,{3:014d},P{0:04d},{1:.2f},{2:.2f},20240131\n",
+        "1,12345678000190,P0001,x,1.0,20240131\n",
+    ),
+    "cadoc_3050": ("3,12345678000190,M{0:04d},{1:.2f},{0},{2:.4f}\n", "3,12345678000190,M0001,1.0,-7,\n"),
+    "bacen": ("1,12345678000190,CRD,{1:.2f},20240131,{0}\n", "1,12345678000190,CREDITO,1.0,20240131,1.5\n"),
+}
+
+
+def _run(key: str) -> ValidationRun:
+    return ValidationRun(id=1, regulatory_file_id=1, validator_key=key, started_at=datetime.utcnow())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as directory:
+        for key, (valid, invalid) in ROWS.items():
+            path = Path(directory) / f"{key}.csv"
+            with open(path, "w", encoding="ascii") as stream:
+                for index in range(args.rows):
+                    row = invalid if rng.random() < args.error_rate else valid
+                    values = (index % 10_000, rng.uniform(0, 1e6), rng.uniform(0, 2), index // 10_000)
+                    stream.write(row.format(*values))
+
+            timings = {}
+            for engine in ("python", "numpy"):
+                validator = copy(VALIDATORS[key])
+                validator.engine = engine
+                started = time.perf_counter()
+                result = validator.validate(path, _run(key))
+                timings[engine] = time.perf_counter() - started
+                issues = len(result.issues)
+            measured = " | ".join(
+                f"{engine} {elapsed:.2f}s ({args.rows / elapsed:,.0f} linhas/s)" for engine, elapsed in timings.items()
+            )
+            gain = timings["python"] / timings["numpy"]
+            print(f"{key}: {args.rows:,} linhas, {issues} inconsistências | {measured} | {gain:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
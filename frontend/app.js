@@ -93,14 +93,26 @@ function renderValidators(validators) {
         (field) =>
           `<li><strong>${field.name}</strong> — ${field.type} ${
             field.required ? "(obrigatório)" : "(opcional)"
-          }${field.max_length ? ` · máx ${field.max_length} caracteres` : ""}</li>`
+          }${field.max_length ? ` · máx ${field.max_length} caracteres` : ""}${
+            field.pattern ? " · formato conferido" : ""
+          }</li>`
       )
       .join("");
     card.innerHTML = `
       <h3>${validator.layout.name} · versão ${validator.layout.version}</h3>
       <p><strong>Regulador:</strong> ${validator.regulator}</p>
       <p><strong>Chave para API:</strong> <code>${validator.key}</code></p>
+      <p><strong>Formato:</strong> ${
+        validator.layout.delimiter === null
+          ? "posicional (largura fixa)"
+          : `delimitado por <code>${validator.layout.delimiter}</code>`
+      }</p>
       <ul class="validator-fields">${fieldItems}</ul>
+      ${
+        validator.layout.rules && validator.layout.rules.length
+          ? `<p><strong>Regras entre registros:</strong> ${validator.layout.rules.join("; ")}</p>`
+          : ""
+      }
     `;
     elements.validatorsContainer.append(card);
 
@@ -192,6 +204,12 @@ elements.validationForm.addEventListener("submit", async (event) => {
         `;
         elements.validationIssues.append(row);
       }
+      if (response.next_cursor !== null && response.next_cursor !== undefined) {
+        const exportUrl = `${API_BASE}/validations/${validation.id}/issues/export?format=csv`;
+        const row = document.createElement("tr");
+        row.innerHTML = `<td colspan="4">Exibindo ${issues.length} de ${validation.issue_count} inconsistências. <a href="${exportUrl}">Exportar todas (CSV)</a></td>`;
+        elements.validationIssues.append(row);
+      }
     }
     setFeedback(elements.validationFeedback, "Validação concluída.", "success");
   } catch (error) {
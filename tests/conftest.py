@@ -4,3 +4,16 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from validator_saas.services.cache import get_response_cache, get_result_cache
+
+
+@pytest.fixture(autouse=True)
+def _empty_result_cache():
+    """Cada teste começa com os caches de resultados e de respostas vazios."""
+
+    get_result_cache().clear()
+    get_response_cache().clear()
+    yield
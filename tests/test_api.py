@@ -0,0 +1,362 @@
+import csv
+import gzip
+import io
+import json
+import time
+import zipfile
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from validator_saas.api.main import app  # noqa: E402
+from validator_saas.config import get_settings  # noqa: E402
+from validator_saas.services.cache import get_response_cache, run_response_key  # noqa: E402
+from validator_saas.services.validation_service import ValidationService  # noqa: E402
+from validator_saas.storage import InMemoryDatabase  # noqa: E402
+
+client = TestClient(app)
+
+
+def _create_organization() -> int:
+    response = client.post(
+        "/organizations",
+        json={"name": "Acquirer API", "role": "adquirente", "tax_id": "12.345.678/0001-90"},
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_multipart_upload_is_validated():
+    organization_id = _create_organization()
+    response = client.post(
+        "/validations",
+        data={"organization_id": str(organization_id), "regulator": "bacen"},
+        files={"file": ("bacen.csv", b"1,12345678000190,C01,abc,20240101,10\n")},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["validation"]["status"] == "completed_with_issues"
+    assert [issue["column_name"] for issue in body["issues"]] == ["valor_transacao"]
+    assert {"digest", "validate", "persist"} <= set(body["validation"]["timings"])
+    assert "upload" not in body["validation"]["timings"]
+
+
+def test_unknown_layout_version_is_rejected_before_registering():
+    organization_id = _create_organization()
+    response = client.post(
+        "/validations",
+        data={"organization_id": str(organization_id), "regulator": "bacen", "layout_version": "9.9"},
+        files={"file": ("bacen.csv", b"1,12345678000190,C01,100,20240101,10\n")},
+    )
+    assert response.status_code == 404
+    assert "9.9" in response.json()["detail"]
+    assert client.get("/validators").json()[0]["versions"] == ["1.0"]
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    organization_id = _create_organization()
+    client.post(
+        "/validations",
+        data={"organization_id": str(organization_id), "regulator": "bacen"},
+        files={"file": ("bacen.csv", b"1,12345678000190,C01,abc,20240101,10\n")},
+    )
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert "# TYPE validator_stage_seconds histogram" in text
+    assert 'validator_stage_seconds_count{stage="serialize"}' in text
+    assert 'validator_rows_validated_total{validator="bacen"}' in text
+    assert 'validator_cache_hits_total{cache="results"}' in text
+    assert "validator_job_queue_depth 0" in text
+
+
+def test_gzip_upload_is_validated_like_the_raw_file(monkeypatch):
+    organization_id = _create_organization()
+    content = b"1,12345678000190,C01,abc,20240101,10\n" * 3
+    data = {"organization_id": str(organization_id), "regulator": "bacen"}
+    raw = client.post("/validations", data=data, files={"file": ("bacen.csv", content)}).json()
+    compressed = client.post(
+        "/validations", data=data, files={"file": ("bacen.csv.gz", gzip.compress(content))}
+    ).json()
+    assert compressed["validation"]["status"] == raw["validation"]["status"] == "completed_with_issues"
+    assert [issue["line_number"] for issue in compressed["issues"]] == [1, 2, 3]
+
+    monkeypatch.setattr(get_settings(), "max_decompressed_bytes", 10)
+    bomb = {"file": ("bomba.csv.gz", gzip.compress(content))}
+    response = client.post("/validations", data=data, files=bomb)
+    assert response.status_code == 413
+    response = client.post("/validations", data=data, files={"file": ("x.gz", gzip.compress(content)[:-8])})
+    assert response.status_code == 400
+
+
+def test_resubmission_references_a_previous_file_of_the_organization():
+    organization_id = _create_organization()
+    data = {"organization_id": str(organization_id), "regulator": "bacen", "previous_file_id": "999999"}
+    response = client.post("/validations", data=data, files={"file": ("bacen.csv", b"1\n")})
+    assert response.status_code == 404
+
+    first = client.post(
+        "/validations",
+        data={"organization_id": str(organization_id), "regulator": "bacen"},
+        files={"file": ("bacen.csv", b"1,12345678000190,C01,abc,20240101,10\n")},
+    ).json()
+    data["previous_file_id"] = str(first["validation"]["regulatory_file_id"])
+    files = {"file": ("bacen.csv", b"1,12345678000190,C01,1,20240101,10\n")}
+    response = client.post("/validations", data=data, files=files)
+    assert response.status_code == 200
+    assert response.json()["validation"]["status"] == "completed"
+
+
+def test_raw_body_upload_is_validated_while_streaming():
+    organization_id = _create_organization()
+
+    def body():
+        for index in range(1000):
+            yield f"1,12345678000190,P{index:04d},100000.50,50000.25,20231231\n".encode()
+
+    response = client.post(
+        "/validations/stream",
+        params={"organization_id": organization_id, "regulator": "cadoc_3040"},
+        content=body(),
+    )
+    assert response.status_code == 200
+    assert response.json()["validation"]["status"] == "completed"
+
+
+def test_raw_body_upload_honors_policy_limits():
+    organization_id = _create_organization()
+    body = b"1,12345678000190,C01,abc,20240101,10\n" * 50
+    params = {"organization_id": organization_id, "regulator": "bacen"}
+    response = client.post("/validations/stream", params={**params, "max_errors": 5}, content=body)
+    assert response.status_code == 200
+    assert response.json()["validation"]["status"] == "aborted"
+    assert response.json()["validation"]["issue_count"] == 5
+
+    response = client.post("/validations/stream", params={**params, "max_issues_per_column": 2}, content=body)
+    messages = [issue["message"] for issue in response.json()["issues"]]
+    assert len(messages) == 3 and messages[-1].startswith("… e mais 48")
+
+    response = client.post("/validations/stream", params={**params, "max_errors": -1}, content=body)
+    assert response.status_code == 422
+
+
+def test_stream_upload_stops_feeding_a_validation_that_ended(monkeypatch):
+    organization_id = _create_organization()
+
+    def run_validation(self, regulatory_file, content, timer=None):
+        next(iter(content))
+        raise ValueError("interrompida")
+
+    monkeypatch.setattr(ValidationService, "run_validation", run_validation)
+    body = (b"1,12345678000190,P0001,100000.50,50000.25,20231231\n" for _ in range(1000))
+    with pytest.raises(ValueError, match="interrompida"):
+        client.post(
+            "/validations/stream",
+            params={"organization_id": organization_id, "regulator": "cadoc_3040"},
+            content=body,
+        )
+    assert next(body, None) is None
+
+
+def test_lifespan_prepares_and_releases_the_database(monkeypatch):
+    import validator_saas.api.main as main
+
+    calls = []
+    monkeypatch.setattr(main, "init_db", lambda: calls.append("init_db"))
+    monkeypatch.setattr(main, "shutdown_job_queue", lambda wait: calls.append(f"shutdown_job_queue({wait})"))
+    monkeypatch.setattr(main, "close_db", lambda: calls.append("close_db"))
+    with TestClient(app) as lifespan_client:
+        assert calls == ["init_db"]
+        assert lifespan_client.get("/validators").status_code == 200
+    assert calls == ["init_db", "shutdown_job_queue(False)", "close_db"]
+
+
+def test_lifespan_expires_runs_without_new_writes(monkeypatch):
+    import validator_saas.api.main as main
+    from validator_saas import storage
+    from validator_saas.models import ValidationIssue
+    from validator_saas.storage import RetentionPolicy
+
+    db = InMemoryDatabase(retention=RetentionPolicy(ttl_seconds=0.05, mode="evict"))
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    run = db.create_run(db.create_file(org.id, "dimp", "1.0", "dimp.csv").id, "dimp")
+    db.add_issues_bulk(run.id, [ValidationIssue(line_number=1, column_name="valor_total", message="Valor.")])
+    run.status = "completed_with_issues"
+    run.finished_at = datetime.utcnow()
+    db.update_run(run)
+    monkeypatch.setattr(storage, "_db", db)
+    monkeypatch.setattr(get_settings(), "run_ttl_seconds", 0.05)
+    monkeypatch.setattr(main, "shutdown_job_queue", lambda wait: None)
+    with TestClient(app):
+        deadline = time.monotonic() + 5
+        while db.get_run(run.id) is not None and time.monotonic() < deadline:
+            time.sleep(0.02)
+    assert db.get_run(run.id) is None
+    assert db.count_issues_for_run(run.id) == 0
+
+
+def test_catalog_and_finished_runs_answer_conditional_gets():
+    catalog = client.get("/validators")
+    etag = catalog.headers["etag"]
+    assert catalog.json() == json.loads(json.dumps(ValidationService(InMemoryDatabase()).list_validators()))
+    assert client.get("/validators", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/validators", headers={"If-None-Match": f'"outra", W/{etag}'}).status_code == 304
+    assert client.get("/validators", headers={"If-None-Match": '"outra"'}).status_code == 200
+
+    organization_id = _create_organization()
+    response = client.post(
+        "/validations",
+        data={"organization_id": str(organization_id), "regulator": "dimp"},
+        files={"file": ("dimp.csv", b"1,12345678000190,TED,10.0,1,20240131\n")},
+    )
+    run_id = response.json()["validation"]["id"]
+    first = client.get(f"/validations/{run_id}")
+    assert first.json()["status"] == "completed"
+    assert get_response_cache().get(run_response_key(run_id)).body == first.content
+    not_modified = client.get(f"/validations/{run_id}", headers={"If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+
+
+def test_background_validation_returns_202_and_can_be_polled():
+    organization_id = _create_organization()
+    response = client.post(
+        "/validations",
+        data={"organization_id": str(organization_id), "regulator": "dimp", "background": "true"},
+        files={"file": ("dimp.csv", b"1,12345678000190,TED,10.0,1,20240131\n")},
+    )
+    assert response.status_code == 202
+    run_id = response.json()["run_id"]
+
+    for _ in range(300):
+        status = client.get(f"/validations/{run_id}").json()
+        if status["status"] not in {"pending", "running"}:
+            break
+        time.sleep(0.05)
+    assert status["status"] == "completed"
+    assert status["progress"] == 1.0
+
+
+def test_unknown_validation_status_is_404():
+    assert client.get("/validations/999999").status_code == 404
+
+
+def test_batch_upload_returns_summary_per_file():
+    organization_id = _create_organization()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as bundle:
+        bundle.writestr("6334.csv", b"1,12345678000190,SRV01,x,5000.75,,20240131\n")
+    response = client.post(
+        "/validations/batch",
+        data={"organization_id": str(organization_id), "regulators": ["dimp", "6334.csv=cadoc_6334"]},
+        files=[
+            ("files", ("jan.csv", b"1,12345678000190,TED,100.50,3,20240131\n")),
+            ("files", ("fev.csv", b"1,12345678000190,TED,abc,3,20240131\n")),
+            ("archive", ("lote.zip", archive.getvalue(), "application/zip")),
+        ],
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["file_count"] == 3 and body["issue_count"] == 2
+    assert [(item["filename"], item["status"]) for item in body["items"]] == [
+        ("jan.csv", "completed"),
+        ("fev.csv", "completed_with_issues"),
+        ("6334.csv", "completed_with_issues"),
+    ]
+    assert "issues" not in body["items"][0]
+
+
+def test_batch_upload_rejects_invalid_archive():
+    organization_id = _create_organization()
+    response = client.post(
+        "/validations/batch",
+        data={"organization_id": str(organization_id), "regulators": "dimp"},
+        files={"archive": ("lote.zip", b"nao e zip")},
+    )
+    assert response.status_code == 422
+
+
+def test_batch_upload_is_refused_when_the_job_queue_is_full(monkeypatch):
+    import validator_saas.api.main as main
+    from validator_saas.services.jobs import ValidationJobQueue
+
+    organization_id = _create_organization()
+    jobs = ValidationJobQueue(max_workers=1, max_pending=1)
+    monkeypatch.setattr(main, "get_job_queue", lambda: jobs)
+    with jobs.reserve(1):
+        response = client.post(
+            "/validations/batch",
+            data={"organization_id": str(organization_id), "regulators": "dimp"},
+            files={"files": ("dimp.csv", b"1,12345678000190,TED,10.0,1,20240131\n")},
+        )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    assert jobs.depth == 0
+
+
+def _validate_many_issues(rows: int) -> dict:
+    organization_id = _create_organization()
+    response = client.post(
+        "/validations",
+        data={"organization_id": str(organization_id), "regulator": "bacen"},
+        files={"file": ("bacen.csv", b"1,12345678000190,C01,abc,20240101,x\n" * rows)},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_inline_issues_are_limited_to_first_page():
+    body = _validate_many_issues(150)
+    assert body["validation"]["issue_count"] == 300
+    assert "issues" not in body["validation"]
+    assert len(body["issues"]) == 100
+    assert body["next_cursor"] == body["issues"][-1]["id"]
+
+
+def test_issue_listing_uses_cursor_and_filters():
+    body = _validate_many_issues(150)
+    run_id = body["validation"]["id"]
+    seen, after = [], body["next_cursor"]
+    while after is not None:
+        page = client.get(f"/validations/{run_id}/issues", params={"after": after, "limit": 80}).json()
+        seen += page["items"]
+        after = page["next_cursor"]
+    assert len(body["issues"]) + len(seen) == 300
+
+    page = client.get(
+        f"/validations/{run_id}/issues",
+        params={"column_name": "valor_transacao", "line_from": 10, "line_to": 12},
+    ).json()
+    assert [item["line_number"] for item in page["items"]] == [10, 11, 12]
+    assert page["next_cursor"] is None
+    assert client.get("/validations/999999/issues").status_code == 404
+
+
+def test_issue_export_streams_ndjson_and_csv():
+    run_id = _validate_many_issues(3)["validation"]["id"]
+    response = client.get(f"/validations/{run_id}/issues/export", params={"column_name": "quantidade_transacoes"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["line_number"] for line in lines] == [1, 2, 3]
+
+    response = client.get(f"/validations/{run_id}/issues/export", params={"format": "csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "line_number", "column_name", "severity", "message"]
+    assert len(rows) == 7
+
+
+def test_ndjson_export_memo_stays_bounded_with_distinct_messages():
+    from validator_saas.api.export import EXPORT_TEXT_CACHE, _json_text, iter_ndjson
+
+    _json_text.cache_clear()
+    rows = ((n, n, "valor_total", "error", f"Valor inválido ({n}).") for n in range(1, 20001))
+    lines = b"".join(iter_ndjson(rows)).decode("utf-8").splitlines()
+    assert len(lines) == 20000
+    assert json.loads(lines[-1])["message"] == "Valor inválido (20000)."
+    assert _json_text.cache_info().currsize == 2 <= EXPORT_TEXT_CACHE
@@ -0,0 +1,100 @@
+import io
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from validator_saas.services.batch import BatchItem, assign_regulators, iter_zip_items
+from validator_saas.services.compression import DecompressionLimitError, DecompressionLimits
+from validator_saas.services.validation_service import ValidationService
+from validator_saas.storage import InMemoryDatabase
+
+DIMP_OK = b"1,12345678000190,TED,100.50,3,20240131\n"
+DIMP_BAD = b"1,12345678000190,TED,abc,3,20240131\n"
+CADOC_OK = b"1,12345678000190,SRV01,120,5000.75,,20240131\n"
+
+
+def _items(*entries):
+    return [BatchItem(filename=name, regulator=regulator, read=lambda data=data: data) for name, regulator, data in entries]
+
+
+def test_assign_regulators():
+    assert assign_regulators(["a", "b"], ["dimp"]) == ["dimp", "dimp"]
+    assert assign_regulators(["a", "b"], ["dimp", "cadoc_6334"]) == ["dimp", "cadoc_6334"]
+    assert assign_regulators(["x/a.csv", "b"], ["a.csv=cadoc_6334", "dimp"]) == ["cadoc_6334", "dimp"]
+    assert assign_regulators(["a", "b"], ["a=dimp"]) == ["dimp", None]
+    with pytest.raises(ValueError):
+        assign_regulators(["a", "b", "c"], ["dimp", "cadoc_6334"])
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_batch_summarizes_each_file(concurrent):
+    service = ValidationService(InMemoryDatabase())
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    items = _items(
+        ("ok.csv", "dimp", DIMP_OK),
+        ("bad.csv", "dimp", DIMP_BAD * 3),
+        ("6334.csv", "cadoc_6334", CADOC_OK),
+        ("x.csv", "desconhecido", DIMP_OK),
+        ("y.csv", None, DIMP_OK),
+    )
+    if concurrent:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            outcomes = service.run_batch(org.id, items, executor=executor, max_in_flight=2)
+    else:
+        outcomes = service.run_batch(org.id, items)
+
+    assert [outcome.status for outcome in outcomes] == [
+        "completed",
+        "completed_with_issues",
+        "completed",
+        "rejected",
+        "rejected",
+    ]
+    assert [outcome.issue_count for outcome in outcomes] == [0, 3, 0, 0, 0]
+    bad = outcomes[1]
+    assert [issue.line_number for issue in service.db.list_issues_for_run(bad.run.id)] == [1, 2, 3]
+    assert outcomes[3].error == "Validador não encontrado para desconhecido."
+    assert outcomes[4].run is None
+
+
+def test_zip_entries_are_read_lazily():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("lote/", "")
+        archive.writestr("lote/dimp.csv", DIMP_OK)
+        archive.writestr("lote/6334.csv", CADOC_OK)
+    items = iter_zip_items(buffer, ["dimp", "6334.csv=cadoc_6334"])
+    first = next(items)
+    assert (first.filename, first.regulator, first.read()) == ("lote/dimp.csv", "dimp", DIMP_OK)
+    assert next(items).regulator == "cadoc_6334"
+
+    with pytest.raises(ValueError):
+        iter_zip_items(io.BytesIO(b"nao e zip"), ["dimp"])
+
+
+def test_zip_entries_respect_decompression_limits(monkeypatch):
+    monkeypatch.setattr("validator_saas.services.compression.RATIO_GRACE_BYTES", 0)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("dimp.csv", DIMP_OK)
+        archive.writestr("grande.csv", DIMP_OK * 1000)
+        archive.writestr("bomba.csv", b"\0" * 2_000_000)
+
+    # A entrada que declara mais que o limite é recusada sem ser descompactada.
+    items = list(iter_zip_items(buffer, ["dimp"], DecompressionLimits(max_bytes=len(DIMP_OK) * 10)))
+    assert items[0].read() == DIMP_OK
+    with pytest.raises(DecompressionLimitError, match="grande.csv declara"):
+        items[1].read()
+
+    ratio = list(iter_zip_items(buffer, ["dimp"], DecompressionLimits(max_ratio=100)))
+    with pytest.raises(DecompressionLimitError, match="Taxa de compressão"):
+        ratio[2].read()
+
+    service = ValidationService(InMemoryDatabase())
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    monkeypatch.setattr(DecompressionLimits, "from_settings", classmethod(lambda cls: cls(max_ratio=100)))
+    outcomes = service.run_batch(org.id, iter_zip_items(buffer, ["dimp"]))
+    assert (outcomes[0].status, outcomes[2].status) == ("completed", "failed")
+    assert "Taxa de compressão" in outcomes[2].error
+    assert service.db.get_run(outcomes[2].run.id).status == "failed"
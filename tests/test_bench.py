@@ -0,0 +1,74 @@
+import io
+import json
+from dataclasses import replace
+
+import pytest
+
+from validator_saas.bench import STAGES, GeneratorOptions, RemessaGenerator, parse_error_mix, run_benchmark
+from validator_saas.bench.__main__ import main
+from validator_saas.models import ValidationRun
+from validator_saas.validators import VALIDATORS, LayoutValidator
+from validator_saas.validators.bacen import BACEN_LAYOUT
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=9, regulatory_file_id=1, validator_key="bench", started_at=None)
+
+
+def _validate(validator, options):
+    return validator.validate("".join(RemessaGenerator(validator, options).lines()), _run())
+
+
+@pytest.mark.parametrize("key", sorted(VALIDATORS))
+def test_generated_rows_are_valid_without_errors(key):
+    options = GeneratorOptions(rows=500, error_rate=0, line_length=90)
+    lines = list(RemessaGenerator(VALIDATORS[key], options).lines())
+    assert len(lines) >= 500
+    assert _validate(VALIDATORS[key], options).issues == []
+    assert {len(line) for line in lines[:500]} == {91}
+
+
+@pytest.mark.parametrize("kind", ["type", "required", "length", "pattern", "columns", "rule"])
+def test_each_error_kind_produces_issues(kind):
+    options = GeneratorOptions(rows=200, error_rate=0.5, error_mix={kind: 1})
+    for key in ("dirf", "cadoc_3040"):
+        issues = _validate(VALIDATORS[key], options).issues
+        assert 50 < len(issues) <= 200, (key, len(issues))
+    assert list(RemessaGenerator(VALIDATORS["dirf"], options).lines()) == list(
+        RemessaGenerator(VALIDATORS["dirf"], options).lines()
+    )
+
+
+def test_error_mix_parsing_and_positional_layouts():
+    assert parse_error_mix("type=4, required") == {"type": 4.0, "required": 1.0}
+    with pytest.raises(ValueError, match="bogus"):
+        GeneratorOptions(error_mix={"bogus": 1})
+
+    fields, start = [], 0
+    for field, width in zip(BACEN_LAYOUT.fields, (2, 14, 3, 12, 8, 6)):
+        fields.append(replace(field, start=start, length=width))
+        start += width
+
+    class Positional(LayoutValidator):
+        key = "bench_posicional"
+        regulator = "BACEN"
+        layout = replace(BACEN_LAYOUT, fields=tuple(fields), delimiter=None)
+
+    assert _validate(Positional(), GeneratorOptions(rows=300, error_rate=0)).issues == []
+    columns = _validate(Positional(), GeneratorOptions(rows=300, error_rate=0.1, error_mix={"columns": 1})).issues
+    assert columns and all(issue.column_name is None for issue in columns)
+
+
+def test_benchmark_report_is_json(tmp_path):
+    report = run_benchmark(["dimp"], GeneratorOptions(rows=300, error_rate=0.1), http=False, isolate=False)
+    (result,) = json.loads(json.dumps(report))["results"]
+    assert set(result["stages"]) == set(STAGES)
+    assert result["issues"] == result["service"]["issues"] > 0
+    assert result["service"]["rows_per_second"] > 0
+    assert result["http"] is None
+
+    path = tmp_path / "dimp.csv"
+    out = io.StringIO()
+    assert main(["generate", "dimp", str(path), "--rows", "10", "--error-rate", "0"], out=out) == 0
+    assert len(path.read_text().splitlines()) == 10
+    assert out.getvalue().startswith(f"{path}: 10 linhas")
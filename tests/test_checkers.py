@@ -0,0 +1,64 @@
+import re
+
+from validator_saas.validators import VALIDATORS
+from validator_saas.validators.checkers import compile_layout, pattern_message
+
+
+def _reference_check_row(values, layout):
+    problems = []
+    for value, field in zip(values, layout.fields, strict=True):
+        if not value:
+            if field.required:
+                problems.append((field.name, "Campo obrigatório ausente."))
+            continue
+        if field.max_length and len(value) > field.max_length:
+            problems.append((field.name, f"Tamanho máximo excedido ({len(value)}/{field.max_length})."))
+            continue
+        try:
+            field.type_(value)
+        except Exception as exc:  # noqa: BLE001
+            problems.append((field.name, f"Valor inválido ({exc})."))
+            continue
+        if field.pattern and not re.fullmatch(field.pattern, value):
+            problems.append((field.name, pattern_message(field)))
+    return problems
+
+
+TRICKY_VALUES = ["", "0", "+5", "-12", "007", "1_000", "²", "١٢", "1.5", ".5", "5.", "1e5", "nan", "-", ".", "x" * 30]
+PATTERN_VALUES = [
+    "12345678000190",
+    "12.345.678/0001-90",
+    "12.345.678/000190",
+    "1234567800019",
+    "١٢٣٤٥٦٧٨٠٠٠١٩٠",
+    "123.456.789-09",
+    "12345678909",
+    "20240131",
+    "20241301",
+    "20240230",
+    "2024013",
+]
+
+
+def test_compiled_checkers_match_reference_semantics():
+    for validator in VALIDATORS.values():
+        layout = validator.layout
+        check_row = compile_layout(layout).check_row
+        for value in TRICKY_VALUES + PATTERN_VALUES:
+            row = [value] * len(layout.fields)
+            assert check_row(row) == _reference_check_row(row, layout), (validator.key, value)
+
+
+def test_layouts_are_compiled_once():
+    for validator in VALIDATORS.values():
+        assert compile_layout(validator.layout) is compile_layout(validator.layout)
+
+
+def test_ascii_checkers_match_text_checkers():
+    for validator in VALIDATORS.values():
+        compiled = compile_layout(validator.layout)
+        for value in TRICKY_VALUES + PATTERN_VALUES:
+            if not value.isascii():
+                continue
+            row = [value] * compiled.width
+            assert compiled.check_ascii_row([cell.encode() for cell in row]) == compiled.check_row(row)
@@ -0,0 +1,97 @@
+import bz2
+import gzip
+import io
+import lzma
+import zipfile
+
+import pytest
+
+from validator_saas.services import compression
+from validator_saas.services.compression import (
+    DecompressingStream,
+    DecompressionError,
+    DecompressionLimitError,
+    DecompressionLimits,
+    detect_compression,
+    open_decompressed,
+)
+from validator_saas.services.validation_service import ValidationService
+from validator_saas.storage import InMemoryDatabase
+
+CONTENT = b"1,12345678000190,TED,abc,1,20240131\n" + b"1,12345678000190,TED,10.0,1,20240131\n" * 500
+
+
+def _zip(members: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+COMPRESSORS = {
+    "gzip": gzip.compress,
+    "bz2": bz2.compress,
+    "xz": lzma.compress,
+    "zip": lambda data: _zip({"dimp.csv": data}),
+}
+
+
+@pytest.mark.parametrize("kind", sorted(COMPRESSORS))
+def test_compressed_content_is_detected_and_streamed(kind):
+    payload = COMPRESSORS[kind](CONTENT)
+    assert detect_compression(payload[:8]) == kind
+    stream = open_decompressed(io.BytesIO(payload))
+    assert isinstance(stream, DecompressingStream)
+    chunks = list(iter(lambda: stream.read(1000), b""))
+    assert b"".join(chunks) == CONTENT
+    assert max(map(len, chunks)) <= 1000
+    assert stream.compressed_bytes >= len(payload) // 2
+
+
+def test_raw_content_is_returned_untouched():
+    raw = io.BytesIO(CONTENT)
+    raw.seek(3)
+    assert detect_compression(CONTENT) is None
+    assert open_decompressed(raw) is raw
+    assert raw.tell() == 3
+
+
+def test_limits_stop_decompression_bombs(monkeypatch):
+    bomb = gzip.compress(b"\0" * 2_000_000)
+    stream = DecompressingStream(io.BytesIO(bomb), "gzip", DecompressionLimits(max_bytes=1_000_000))
+    with pytest.raises(DecompressionLimitError, match="1000000 bytes"):
+        while stream.read(64 * 1024):
+            pass
+
+    monkeypatch.setattr(compression, "RATIO_GRACE_BYTES", 64 * 1024)
+    stream = DecompressingStream(io.BytesIO(bomb), "gzip", DecompressionLimits(max_ratio=50))
+    with pytest.raises(DecompressionLimitError, match="50:1"):
+        while stream.read(64 * 1024):
+            pass
+    limits = DecompressionLimits(max_ratio=50)
+    assert DecompressingStream(io.BytesIO(gzip.compress(CONTENT)), "gzip", limits).read() == CONTENT
+
+
+def test_corrupted_or_ambiguous_archives_are_rejected():
+    truncated = gzip.compress(CONTENT)[:-20]
+    stream = open_decompressed(io.BytesIO(truncated))
+    with pytest.raises(DecompressionError, match="gzip"):
+        while stream.read(1000):
+            pass
+    with pytest.raises(DecompressionError, match="exatamente um arquivo"):
+        open_decompressed(io.BytesIO(_zip({"a.csv": CONTENT, "b.csv": CONTENT})))
+
+
+def test_service_marks_the_run_failed_when_decompression_fails():
+    service = ValidationService(InMemoryDatabase())
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    gzipped = service.register_file(org.id, "dimp", "1.0", "dimp.csv.gz")
+    result = service.run_validation(gzipped, open_decompressed(io.BytesIO(gzip.compress(CONTENT))))
+    assert [(issue.line_number, issue.column_name) for issue in result.issues] == [(1, "valor_total")]
+
+    truncated = service.register_file(org.id, "dimp", "1.0", "dimp.csv.gz")
+    with pytest.raises(DecompressionError):
+        service.run_validation(truncated, open_decompressed(io.BytesIO(gzip.compress(CONTENT)[:-20])))
+    run = service.db.list_runs_for_file(truncated.id)[0]
+    assert run.status == "failed" and run.summary.startswith("Falha na descompressão")
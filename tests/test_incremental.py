@@ -0,0 +1,170 @@
+import io
+import random
+
+import pytest
+
+from validator_saas.database import InMemoryDatabase
+from validator_saas.models import ValidationRun
+from validator_saas.services.cache import ValidationResultCache
+from validator_saas.services.validation_service import ValidationService
+from validator_saas.validators import VALIDATORS, ValidationPolicy
+from validator_saas.validators.incremental import iter_stream_blocks, split_line_blocks, validate_incremental
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=5, regulatory_file_id=1, validator_key="dimp", started_at=None)
+
+
+def _issues(result):
+    return [(i.line_number, i.column_name, i.message) for i in result.issues]
+
+
+def _dimp(rows: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    values = ["1500.00", "abc", "", "1e3"]
+    return [
+        f"1,12345678000190,TED,{rng.choice(values) if rng.random() < 0.05 else '10.00'},{index % 7},20240131\n"
+        for index in range(rows)
+    ]
+
+
+def test_blocks_end_after_a_fixed_number_of_lines():
+    data = b"a\nbb\nc\r\nd\n\ne"
+    assert split_line_blocks(data, 2, chunk_size=3) == [(0, 5), (5, 10), (10, 12)]
+    assert split_line_blocks(data, 10) == [(0, 12)]
+    assert split_line_blocks(b"", 2) == []
+
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_stream_blocks_match_buffer_blocks(chunk_size):
+    data = b"a\nbb\nc\r\nd\n\ne\n\n\nfgh"
+    chunks = [data[start : start + chunk_size] for start in range(0, len(data), chunk_size)]
+    for block_lines in (1, 2, 5, 100):
+        expected = [data[start:stop] for start, stop in split_line_blocks(data, block_lines)]
+        assert list(iter_stream_blocks(chunks, block_lines)) == expected
+    assert list(iter_stream_blocks([], 2)) == []
+
+@pytest.mark.parametrize("policy", [ValidationPolicy(), ValidationPolicy(max_issues_per_column=5)])
+def test_resubmission_reuses_unchanged_blocks(policy):
+    validator = VALIDATORS["dimp"]
+    lines = _dimp(2000, 1)
+    first = validate_incremental(validator, "".join(lines).encode(), _run(), policy, block_lines=100)
+    assert (first.reused_blocks, first.validated_blocks) == (0, 20)
+
+    lines[150] = "1,12345678000190,TED,x,1,20240131\n"
+    lines[1999] = "1,12345678000190,TED,10.00,1,20240131\n"
+    text = "".join(lines)
+    second = validate_incremental(validator, text.encode(), _run(), policy, first.manifest, block_lines=100)
+    assert (second.reused_blocks, second.validated_blocks) == (18, 2)
+    expected = validator.validate(text, _run(), policy)
+    assert _issues(second.result) == _issues(expected)
+    assert second.result.run.summary == expected.run.summary
+
+
+def test_inserted_lines_renumber_carried_over_issues():
+    validator = VALIDATORS["dimp"]
+    lines = _dimp(1000, 2)
+    first = validate_incremental(validator, "".join(lines).encode(), _run(), block_lines=100)
+    lines[300:300] = ["1,12345678000190,TED,10.00,1,20240131\n"] * 100
+    text = "".join(lines)
+    second = validate_incremental(validator, text.encode(), _run(), previous=first.manifest, block_lines=100)
+    assert second.reused_blocks == 10
+    assert _issues(second.result) == _issues(validator.validate(text, _run()))
+
+    policy = ValidationPolicy(max_errors=3)
+    other = validate_incremental(validator, text.encode(), _run(), policy, first.manifest, block_lines=100)
+    assert other.reused_blocks == 0
+    assert other.result.run.status == "aborted"
+
+
+def test_aggregate_rules_see_reused_blocks():
+    validator = VALIDATORS["cadoc_3040"]
+    lines = [f"1,12345678000190,P{index:04d},1.00,1.0,20240131\n" for index in range(500)]
+    first = validate_incremental(validator, "".join(lines).encode(), _run(), block_lines=50)
+    assert _issues(first.result) == []
+
+    lines[420] = lines[10]
+    text = "".join(lines)
+    second = validate_incremental(validator, text.encode(), _run(), previous=first.manifest, block_lines=50)
+    assert second.validated_blocks == 1
+    message = "Chave duplicada (cnpj_instituicao, codigo_produto): já informada na linha 11."
+    assert _issues(second.result) == [(421, "cnpj_instituicao+codigo_produto", message)]
+
+
+def test_service_revalidates_resubmissions_incrementally(tmp_path, monkeypatch):
+    db = InMemoryDatabase()
+    service = ValidationService(db, cache=ValidationResultCache(), manifests=ValidationResultCache())
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    lines = _dimp(20_000, 3)
+    path = tmp_path / "dimp.csv"
+    path.write_text("".join(lines))
+    original = service.register_file(org.id, "dimp", "1.0", "dimp.csv")
+    service.validate_path(original, path)
+
+    lines[12_345] = "1,12345678000190,TED,abc,1,20240131\n"
+    path.write_text("".join(lines))
+    validator = VALIDATORS["dimp"]
+    expected = _issues(validator.validate(path, _run()))
+    validated = []
+    collect_buffer = validator.collect_buffer
+
+    def counting(*args):
+        validated.append(args)
+        return collect_buffer(*args)
+
+    monkeypatch.setattr(validator, "collect_buffer", counting)
+    resubmission = service.register_file(org.id, "dimp", "1.0", "dimp.csv", previous_file_id=original.id)
+    result = service.validate_path(resubmission, path)
+    assert len(validated) == 1
+    assert _issues(result) == expected
+    assert service.manifests.stats()["hits"] == 1
+
+
+def test_streamed_resubmissions_reuse_blocks_without_a_buffer(monkeypatch):
+    db = InMemoryDatabase()
+    service = ValidationService(db, cache=ValidationResultCache(), manifests=ValidationResultCache())
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    lines = _dimp(20_000, 4)
+    original = service.register_file(org.id, "dimp", "1.0", "dimp.csv")
+    service.run_validation(original, iter([line.encode() for line in lines]))
+
+    lines[7_777] = "1,12345678000190,TED,abc,1,20240131\n"
+    text = "".join(lines)
+    validator = VALIDATORS["dimp"]
+    validated = []
+    collect_buffer = validator.collect_buffer
+
+    def counting(*args):
+        validated.append(args)
+        return collect_buffer(*args)
+
+    monkeypatch.setattr(validator, "collect_buffer", counting)
+    resubmission = service.register_file(org.id, "dimp", "1.0", "dimp.csv", previous_file_id=original.id)
+    result = service.run_validation(resubmission, io.BytesIO(text.encode()))
+    assert len(validated) == 1
+    assert _issues(result) == _issues(VALIDATORS["dimp"].validate(text, _run()))
+    assert service.manifests.stats()["hits"] == 1
+    assert service.manifests.get(str(resubmission.id)) is not None
+
+
+def test_suppressed_notes_follow_serial_order_under_column_cap():
+    validator = VALIDATORS["dimp"]
+    ok, bad_value, bad_modality = (
+        "1,12345678000190,TED,10.00,1,20240131\n",
+        "1,12345678000190,TED,abc,1,20240131\n",
+        "1,12345678000190,MODALIDADE,10.00,1,20240131\n",
+    )
+    # Bloco 1: modalidade chega ao limite. Bloco 2: valor_total passa do limite
+    # antes de a modalidade voltar a errar, então o aviso de valor_total vem primeiro.
+    lines = [bad_modality] * 3 + [ok] * 7 + [bad_value] * 4 + [bad_modality] + [ok] * 5
+    data = "".join(lines).encode()
+    policy = ValidationPolicy(max_issues_per_column=3)
+
+    serial = validator.validate(data, _run(), policy)
+    incremental = validate_incremental(validator, data, _run(), policy, block_lines=10).result
+
+    notes = [issue.column_name for issue in serial.issues if issue.severity == "info"]
+    assert notes == ["valor_total", "modalidade"]
+    assert _issues(incremental) == _issues(serial)
+    assert incremental.run.summary == serial.run.summary
@@ -0,0 +1,151 @@
+import lzma
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from validator_saas.services.cache import ValidationResultCache
+from validator_saas.services.jobs import QueueFullError, ValidationJobQueue
+from validator_saas.services.validation_service import ValidationService
+from validator_saas.storage import InMemoryDatabase
+
+
+@pytest.fixture
+def jobs():
+    queue = ValidationJobQueue(max_workers=1, max_pending=1)
+    yield queue
+    queue.shutdown()
+
+
+def test_enqueued_validation_is_persisted_when_done(jobs, tmp_path):
+    db = InMemoryDatabase()
+    service = ValidationService(db)
+    org = service.create_organization("Issuer", "emissor", "98.765.432/0001-10")
+    regulatory_file = service.register_file(org.id, "dirf", "1.0", "dirf.csv")
+    path = tmp_path / "dirf.csv"
+    path.write_text("1,12345678000190,,98765432000198,1200.50,abc,2023\n" * 100)
+
+    finished = threading.Event()
+    run = service.enqueue_validation(regulatory_file, path, jobs)
+    assert run.status == "pending"
+    jobs._jobs[run.id].future.add_done_callback(lambda _: finished.set())
+    assert finished.wait(timeout=30)
+
+    stored, progress = service.get_run_status(run.id, jobs)
+    assert stored.status == "completed_with_issues"
+    assert progress == 1.0
+    assert db.count_issues_for_run(run.id) == 100
+    assert regulatory_file.status == "completed_with_issues"
+
+
+def test_compressed_upload_is_decompressed_by_the_job(jobs, tmp_path):
+    db = InMemoryDatabase()
+    service = ValidationService(db)
+    org = service.create_organization("Issuer", "emissor", "98.765.432/0001-10")
+    regulatory_file = service.register_file(org.id, "dirf", "1.0", "dirf.csv.xz")
+    path = tmp_path / "dirf.csv.xz"
+    path.write_bytes(lzma.compress(b"1,12345678000190,,98765432000198,1200.50,abc,2023\n" * 100))
+
+    finished = threading.Event()
+    run = service.enqueue_validation(regulatory_file, path, jobs)
+    jobs._jobs[run.id].future.add_done_callback(lambda _: finished.set())
+    assert finished.wait(timeout=30)
+
+    stored, progress = service.get_run_status(run.id, jobs)
+    assert (stored.status, progress) == ("completed_with_issues", 1.0)
+    assert db.count_issues_for_run(run.id) == 100
+
+
+
+
+def test_background_resubmission_reuses_and_stores_block_manifests(jobs, tmp_path):
+    db = InMemoryDatabase()
+    service = ValidationService(db, cache=ValidationResultCache(), manifests=ValidationResultCache())
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    lines = ["1,12345678000190,TED,10.00,1,20240131\n"] * 20_000
+    path = tmp_path / "dimp.csv"
+
+    def enqueue(regulatory_file):
+        finished = threading.Event()
+        path.write_text("".join(lines))
+        run = service.enqueue_validation(regulatory_file, path, jobs)
+        jobs._jobs[run.id].future.add_done_callback(lambda _: finished.set())
+        assert finished.wait(timeout=30)
+        return run
+
+    original = service.register_file(org.id, "dimp", "1.0", "dimp.csv")
+    enqueue(original)
+    assert service.manifests.get(str(original.id)) is not None
+
+    lines[9_000] = "1,12345678000190,TED,abc,1,20240131\n"
+    resubmission = service.register_file(org.id, "dimp", "1.0", "dimp.csv", previous_file_id=original.id)
+    hits = service.manifests.stats()["hits"]
+    run = enqueue(resubmission)
+    assert service.manifests.stats()["hits"] == hits + 1
+    assert [issue.line_number for issue in db.list_issues_for_run(run.id)] == [9_001]
+    assert service.manifests.get(str(resubmission.id)) is not None
+def test_full_queue_rejects_run(jobs, tmp_path):
+    db = InMemoryDatabase()
+    service = ValidationService(db)
+    org = service.create_organization("Issuer", "emissor", "98.765.432/0001-10")
+    path = tmp_path / "dimp.csv"
+    path.write_text("1,12345678000190,TED,10.0,1,20240131\n" * 200_000)
+
+    first = service.enqueue_validation(service.register_file(org.id, "dimp", "1.0", "a.csv"), path, jobs)
+    with pytest.raises(QueueFullError):
+        service.enqueue_validation(service.register_file(org.id, "dimp", "1.0", "b.csv"), path, jobs)
+
+    rejected = db.list_runs_for_file(2)[0]
+    assert rejected.status == "rejected"
+    assert service.get_run_status(first.id, jobs)[0].status in {"pending", "running", "completed"}
+
+
+
+
+def test_reserved_slots_count_against_the_queue_limit(tmp_path):
+    jobs = ValidationJobQueue(max_workers=1, max_pending=3)
+    db = InMemoryDatabase()
+    service = ValidationService(db)
+    org = service.create_organization("Issuer", "emissor", "98.765.432/0001-10")
+    path = tmp_path / "dimp.csv"
+    path.write_text("1,12345678000190,TED,10.0,1,20240131\n")
+    with jobs.reserve(8) as slots:
+        assert (slots, jobs.depth) == (3, 3)
+        with pytest.raises(QueueFullError):
+            jobs.reserve(1).__enter__()
+        with pytest.raises(QueueFullError):
+            service.enqueue_validation(service.register_file(org.id, "dimp", "1.0", "a.csv"), path, jobs)
+    assert jobs.depth == 0
+    with jobs.reserve(1) as slots:
+        assert slots == 1
+def test_broken_pool_is_replaced_on_next_submit(jobs, tmp_path):
+    # Um processo filho que morre deixa o pool inteiro quebrado.
+    with pytest.raises(BrokenProcessPool):
+        jobs.executor.submit(os._exit, 1).result(timeout=30)
+    service = ValidationService(InMemoryDatabase())
+    org = service.create_organization("Issuer", "emissor", "98.765.432/0001-10")
+    path = tmp_path / "dimp.csv"
+    path.write_text("1,12345678000190,TED,10.0,1,20240131\n")
+
+    finished = threading.Event()
+    run = service.enqueue_validation(service.register_file(org.id, "dimp", "1.0", "a.csv"), path, jobs)
+    jobs._jobs[run.id].future.add_done_callback(lambda _: finished.set())
+    assert finished.wait(timeout=30)
+    assert service.get_run_status(run.id, jobs)[0].status == "completed"
+
+
+def test_submit_failure_fails_run(jobs, tmp_path, monkeypatch):
+    def broken_submit(*args, **kwargs):
+        raise OSError("sem processos disponíveis")
+
+    monkeypatch.setattr(jobs, "submit", broken_submit)
+    service = ValidationService(InMemoryDatabase())
+    org = service.create_organization("Issuer", "emissor", "98.765.432/0001-10")
+    path = tmp_path / "dimp.csv"
+    path.write_text("1,12345678000190,TED,10.0,1,20240131\n")
+
+    with pytest.raises(OSError):
+        service.enqueue_validation(service.register_file(org.id, "dimp", "1.0", "a.csv"), path, jobs)
+    run = service.db.list_runs_for_file(1)[0]
+    assert run.status == "failed" and "sem processos disponíveis" in run.summary
@@ -0,0 +1,82 @@
+import io
+import json
+
+import pytest
+
+from validator_saas.cli import main
+from validator_saas.models import ValidationRun
+from validator_saas.validators import VALIDATORS
+from validator_saas.validators.layout import iter_lines
+from validator_saas.validators.mapped import MappedRecords
+
+SAMPLES = [
+    b"",
+    b"1,12345678000190,SRV01,120,5000.75,,20240131",
+    b"1,12345678000190,SRV01,x,5000.75,,20240131\r\n\r\n\n 1 , 2 ,\t3\t\n",
+    b"1,2\r3,4\n5\x1f,6\x0b7\n",
+    "1,12345678000190,SRV01,120,5000.75,agência,20240131\n1,²,SRV01,١٢,5000.75,,2024 1,2\n".encode(),
+    b"1,12345678000190,SRV01,120,5000.75,,20240131\r",
+    b"\n\n1,12345678000190,SRV01,120,5000.75,,abc\n\n",
+]
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=3, regulatory_file_id=1, validator_key="cadoc_6334", started_at=None)
+
+
+def _decoded(records):
+    return [(number, [v.decode() if isinstance(v, bytes) else v for v in values]) for number, values in records]
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1 << 20])
+@pytest.mark.parametrize("data", SAMPLES)
+def test_mapped_records_match_text_records(data, block_size):
+    records = MappedRecords(data, block_size=block_size)
+    assert _decoded(records) == list(iter_lines(data))
+    assert records.line_count == len(data.decode().splitlines())
+
+
+@pytest.mark.parametrize("data", SAMPLES)
+def test_validate_path_matches_text_validation(tmp_path, data):
+    path = tmp_path / "remessa.csv"
+    path.write_bytes(data)
+    validator = VALIDATORS["cadoc_6334"]
+    mapped = validator.validate(path, _run())
+    text = validator.validate(data.decode(), _run())
+    assert [(i.line_number, i.column_name, i.message) for i in mapped.issues] == [
+        (i.line_number, i.column_name, i.message) for i in text.issues
+    ]
+
+
+def test_cli_reports_issues_and_exit_code(tmp_path):
+    path = tmp_path / "dirf.csv"
+    path.write_text("1,12345678000190,,98765432000198,1200.50,150.0,2023\n1,12345678000190,,,abc,1,2023\n")
+    out = io.StringIO()
+    assert main([str(path), "--regulator", "dirf", "--format", "json"], out=out) == 1
+    payload = json.loads(out.getvalue())
+    assert payload["status"] == "completed_with_issues"
+    assert {issue["column_name"] for issue in payload["issues"]} == {"valor_rendimento"}
+
+    path.write_text("1,12345678000190,,98765432000198,1200.50,150.0,2023\n")
+    out = io.StringIO()
+    assert main([str(path), "--regulator", "dirf"], out=out) == 0
+    assert out.getvalue().strip() == "Arquivo validado sem inconsistências."
+
+
+def test_cli_rejects_unknown_layout_version(tmp_path, capsys):
+    path = tmp_path / "dirf.csv"
+    path.write_text("1,12345678000190,,98765432000198,1200.50,150.0,2023\n")
+    with pytest.raises(SystemExit) as exited:
+        main([str(path), "--regulator", "dirf", "--layout-version", "9.9"], out=io.StringIO())
+    assert exited.value.code == 2
+    assert "Versão de layout 9.9 não encontrada para dirf" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("delimiter", [";", "\t", "¦"])
+def test_mapped_records_split_on_layout_delimiter(delimiter):
+    data = f"1{delimiter} a,b {delimiter}3\n\n4{delimiter}é\n".encode()
+    records = MappedRecords(data, block_size=4, delimiter=delimiter)
+    assert _decoded(records) == list(iter_lines(data, delimiter=delimiter)) == [
+        (1, ["1", "a,b", "3"]),
+        (3, ["4", "é"]),
+    ]
@@ -0,0 +1,71 @@
+from validator_saas.database import InMemoryDatabase
+from validator_saas.metrics import (
+    BYTES_INGESTED,
+    ISSUES_FOUND,
+    ROWS_VALIDATED,
+    RUNS_FINISHED,
+    MetricsRegistry,
+    StageTimer,
+)
+from validator_saas.services.cache import ValidationResultCache
+from validator_saas.services.validation_service import ValidationService
+
+
+def test_registry_renders_prometheus_text_format():
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_total", "Demonstração.", ("validator",))
+    counter.inc("bacen")
+    counter.inc("bacen", amount=2)
+    counter.inc('a"b')
+    histogram = registry.histogram("demo_seconds", "Durações.", ("stage",))
+    histogram.observe(0.003, "check")
+    histogram.observe(42.0, "check")
+    registry.callback("demo_depth", "Profundidade.", "gauge", lambda: 7)
+
+    assert registry.counter("demo_total", "Outro texto.") is counter
+    lines = registry.render().splitlines()
+    assert lines[:3] == ["# HELP demo_depth Profundidade.", "# TYPE demo_depth gauge", "demo_depth 7"]
+    assert 'demo_total{validator="bacen"} 3' in lines
+    assert 'demo_total{validator="a\\"b"} 1' in lines
+    assert 'demo_seconds_bucket{stage="check",le="0.005"} 1' in lines
+    assert 'demo_seconds_bucket{stage="check",le="30"} 1' in lines
+    assert 'demo_seconds_bucket{stage="check",le="+Inf"} 2' in lines
+    assert 'demo_seconds_sum{stage="check"} 42.003' in lines
+    assert 'demo_seconds_count{stage="check"} 2' in lines
+
+
+def test_stage_timer_accumulates_repeated_stages():
+    timer = StageTimer()
+    with timer.stage("metrics-test"):
+        pass
+    timer.add("metrics-test", 0.5)
+    assert timer.timings["metrics-test"] >= 0.5
+
+
+def test_service_records_rows_issues_bytes_and_run_timings():
+    service = ValidationService(InMemoryDatabase(), cache=ValidationResultCache())
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    content = "1,12345678000190,C01,abc,20240101,10\n1,12345678000190,C01,1,20240101,10\n"
+    before = (
+        ROWS_VALIDATED.value("bacen"),
+        ISSUES_FOUND.value("bacen"),
+        BYTES_INGESTED.value("bacen"),
+        RUNS_FINISHED.value("bacen", "completed_with_issues"),
+    )
+
+    first = service.run_validation(service.register_file(org.id, "bacen", "1.0", "a.csv"), content)
+    cached = service.run_validation(service.register_file(org.id, "bacen", "1.0", "b.csv"), content)
+
+    assert (first.line_count, first.issue_total) == (2, 1)
+    assert cached.run.cached_from_run_id == first.run.id
+    assert ROWS_VALIDATED.value("bacen") - before[0] == 2
+    assert ISSUES_FOUND.value("bacen") - before[1] == 1
+    assert BYTES_INGESTED.value("bacen") - before[2] == 2 * len(content)
+    assert RUNS_FINISHED.value("bacen", "completed_with_issues") - before[3] == 2
+    assert set(service.db.get_run(first.run.id).timings) == {"digest", "validate", "persist"}
+    assert "validate" not in cached.run.timings
+
+    accented = content.replace("C01", "Ç01") * 5000
+    ingested = BYTES_INGESTED.value("bacen")
+    service.run_validation(service.register_file(org.id, "bacen", "1.0", "c.csv"), accented)
+    assert BYTES_INGESTED.value("bacen") - ingested == len(accented.encode("utf-8"))
@@ -0,0 +1,52 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from validator_saas.models import ValidationRun
+from validator_saas.validators import VALIDATORS
+from validator_saas.validators.parallel import split_line_aligned_ranges, validate_parallel
+
+CONTENT = (
+    "1,12345678000190,SRV01,120,5000.75,agência,20240131\r\n"
+    "\n"
+    "1,12345678000190,SRV01,x,5000.75,,20240131\n"
+    "1,12345678000190\n"
+    "1,12345678000190,SRV01,120,5000.75,,\n"
+) * 50
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=7, regulatory_file_id=1, validator_key="cadoc_6334", started_at=None)
+
+
+def test_ranges_end_on_line_boundaries():
+    data = CONTENT.encode("utf-8")
+    ranges = split_line_aligned_ranges(data, 8)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(data[stop - 1 : stop] == b"\n" for _, stop in ranges[:-1])
+    assert all(previous[1] == current[0] for previous, current in zip(ranges, ranges[1:]))
+
+
+@pytest.mark.parametrize("as_path", [False, True])
+def test_parallel_validation_matches_serial(tmp_path, as_path):
+    validator = VALIDATORS["cadoc_6334"]
+    data = CONTENT.encode("utf-8")
+    source = data
+    if as_path:
+        source = tmp_path / "cadoc6334.csv"
+        source.write_bytes(data)
+
+    serial = validator.validate(data, _run())
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = validate_parallel(validator, source, _run(), workers=2, executor=executor, min_range_bytes=64)
+
+    assert parallel.run.summary == serial.run.summary
+    assert parallel.issues == serial.issues
+
+
+def test_submit_failure_surfaces_the_pool_error():
+    executor = ProcessPoolExecutor(max_workers=1)
+    executor.shutdown()
+    data = CONTENT.encode("utf-8")
+    with pytest.raises(RuntimeError, match="shutdown"):
+        validate_parallel(VALIDATORS["cadoc_6334"], data, _run(), workers=2, executor=executor, min_range_bytes=64)
@@ -0,0 +1,66 @@
+import pytest
+
+from validator_saas.models import ValidationRun
+from validator_saas.validators import VALIDATORS, ValidationPolicy
+from validator_saas.validators.parallel import validate_parallel
+
+VALID = "1,12345678000190,SRV01,120,5000.75,,20240131\n"
+BAD_QUANTITY = "1,12345678000190,SRV01,x,5000.75,,20240131\n"
+BAD_BOTH = "1,12345678000190,SRV01,x,y,,20240131\n"
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=5, regulatory_file_id=1, validator_key="cadoc_6334", started_at=None)
+
+
+def test_column_cap_keeps_first_issues_and_reports_totals():
+    content = VALID + BAD_BOTH * 10
+    result = VALIDATORS["cadoc_6334"].validate(content, _run(), ValidationPolicy(max_issues_per_column=3))
+    errors = [issue for issue in result.issues if issue.severity == "error"]
+    notes = [issue for issue in result.issues if issue.severity == "info"]
+    assert [issue.line_number for issue in errors if issue.column_name == "valor_total"] == [2, 3, 4]
+    assert sorted(note.message for note in notes) == [
+        "… e mais 7 inconsistências em quantidade_operacoes.",
+        "… e mais 7 inconsistências em valor_total.",
+    ]
+    assert result.run.status == "completed_with_issues"
+    assert result.run.summary == "Foram encontradas 20 inconsistências. 6 listadas individualmente."
+
+
+def test_fail_fast_stops_after_max_errors():
+    result = VALIDATORS["cadoc_6334"].validate(BAD_QUANTITY * 1000, _run(), ValidationPolicy(max_errors=5))
+    assert [issue.line_number for issue in result.issues] == [1, 2, 3, 4, 5]
+    assert result.run.status == "aborted"
+    assert "Limite de 5 inconsistências atingido." in result.run.summary
+
+
+def test_structural_precheck_rejects_wrong_delimiter():
+    content = VALID.replace(",", ";") * 100_000
+    result = VALIDATORS["cadoc_6334"].validate(content, _run(), ValidationPolicy(precheck_lines=20))
+    assert len(result.issues) == 1
+    assert result.issues[0].message == (
+        "Estrutura incompatível com o layout: as primeiras 20 linhas têm 1 coluna(s), esperado 7."
+    )
+    assert result.run.status == "aborted"
+
+
+def test_precheck_lets_files_with_some_valid_lines_through():
+    content = "1;2\n" + VALID + BAD_QUANTITY
+    result = VALIDATORS["cadoc_6334"].validate(content, _run(), ValidationPolicy(precheck_lines=20))
+    assert result.run.status == "completed_with_issues"
+    assert len(result.issues) == 2
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [ValidationPolicy(max_issues_per_column=4), ValidationPolicy(max_errors=7), ValidationPolicy(precheck_lines=3)],
+)
+def test_parallel_policies_match_serial(policy):
+    data = ((VALID + BAD_BOTH + "1,2\n") * 40).encode()
+    validator = VALIDATORS["cadoc_6334"]
+    serial = validator.validate(data, _run(), policy)
+    parallel = validate_parallel(validator, data, _run(), workers=2, min_range_bytes=256, policy=policy)
+    assert [(i.line_number, i.column_name, i.message) for i in parallel.issues] == [
+        (i.line_number, i.column_name, i.message) for i in serial.issues
+    ]
+    assert parallel.run.summary == serial.run.summary
@@ -0,0 +1,115 @@
+import random
+from dataclasses import replace
+
+import pytest
+
+from validator_saas.models import ValidationRun
+from validator_saas.validators import LayoutValidator, ValidationPolicy
+from validator_saas.validators.bacen import BACEN_LAYOUT
+from validator_saas.validators.checkers import compile_layout
+from validator_saas.validators.layout import FieldDefinition, LayoutDefinition
+from validator_saas.validators.parallel import validate_range
+
+WIDTHS = (2, 18, 3, 12, 8, 6)
+
+
+def _positional(layout: LayoutDefinition) -> LayoutDefinition:
+    fields, start = [], 0
+    for field, width in zip(layout.fields, WIDTHS, strict=True):
+        fields.append(replace(field, start=start, length=width))
+        start += width
+    return LayoutDefinition(f"{layout.name} posicional", layout.version, tuple(fields), delimiter=None)
+
+
+class DelimitedBacen(LayoutValidator):
+    key = "bacen_csv"
+    regulator = "BACEN"
+    layout = BACEN_LAYOUT
+
+
+class PositionalBacen(LayoutValidator):
+    key = "bacen_posicional"
+    regulator = "BACEN"
+    layout = _positional(BACEN_LAYOUT)
+
+
+ROWS = [
+    ["1", "12345678000190", "CRD", "150.75", "20240131", "3"],
+    ["x", "12.345.678/0001-90", "", "1e3", "20241301", "007"],
+    ["10", "", "AB", "-.5", "", ""],
+    ["1", "1234567800019", "CRD", "abc", "2024013", "1.5"],
+]
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=4, regulatory_file_id=1, validator_key="bacen_posicional", started_at=None)
+
+
+def _issues(result):
+    return [(i.line_number, i.column_name, i.message) for i in result.issues]
+
+
+def _fixed(rows) -> str:
+    return "".join("".join(value.ljust(width) for value, width in zip(row, WIDTHS)) + "\n" for row in rows)
+
+
+def test_positional_layout_requires_offsets():
+    with pytest.raises(ValueError, match="cnpj"):
+        fields = (FieldDefinition("tipo", int, start=0, length=1), FieldDefinition("cnpj", str))
+        LayoutDefinition("X", "1.0", fields, delimiter=None)
+    assert PositionalBacen.layout.record_length == sum(WIDTHS)
+    assert compile_layout(PositionalBacen.layout).width == sum(WIDTHS)
+
+
+def test_positional_fields_are_checked_like_delimited_columns():
+    csv = "".join(",".join(row) + "\n" for row in ROWS)
+    expected = _issues(DelimitedBacen().validate(csv, _run()))
+    assert expected
+    assert _issues(PositionalBacen().validate(_fixed(ROWS), _run())) == expected
+
+
+def test_positional_record_length_is_checked(tmp_path):
+    text = _fixed(ROWS[:1]) + "1234\n\n" + _fixed(ROWS[:1]).rstrip("\n") + "   \n" + "é" * sum(WIDTHS) + "\n"
+    issues = _issues(PositionalBacen().validate(text, _run()))
+    mismatch = "Tamanho de registro incorreto: esperado 49 posições, recebido {}."
+    assert issues[:2] == [(2, None, mismatch.format(4)), (4, None, mismatch.format(52))]
+    assert {line for line, _, _ in issues[2:]} == {5}
+
+    path = tmp_path / "remessa.txt"
+    path.write_bytes(text.encode())
+    validator = PositionalBacen()
+    assert _issues(validator.validate(path, _run())) == issues
+    assert _issues(validator.validate(text.encode(), _run())) == issues
+    range_result = validate_range(validator, str(path))
+    assert [(line, column, message) for line, column, _, message in range_result.issues] == issues
+
+
+def test_positional_precheck_counts_positions():
+    result = PositionalBacen().validate("1,2,3\n" * 5, _run(), ValidationPolicy(precheck_lines=3))
+    assert result.run.status == "aborted"
+    assert "as primeiras 3 linhas têm 5 posição(ões), esperado 49." in result.run.summary
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_vectorized_engine_matches_python_on_positional_layouts(seed):
+    pytest.importorskip("numpy")
+    rng = random.Random(seed)
+    values = [row[column] for row in ROWS for column in range(len(WIDTHS))] + ["  7", " 1.5 ", "\t", "é"]
+    lines = []
+    for _ in range(500):
+        row = [rng.choice(values)[:width] for width in WIDTHS]
+        line = "".join(
+            value.rjust(width) if rng.random() < 0.5 else value.ljust(width) for value, width in zip(row, WIDTHS)
+        )
+        lines.append(line if rng.random() > 0.05 else rng.choice(["", " " * sum(WIDTHS), line[:-1], line + "0"]))
+    text = "".join(line + rng.choice(["\n", "\r\n"]) for line in lines)
+
+    python, vectorized = PositionalBacen(), PositionalBacen()
+    vectorized.engine = "numpy"
+    assert vectorized.vectorized
+    expected = _issues(python.validate(text, _run()))
+    assert expected
+    assert _issues(vectorized.validate(text, _run())) == expected
+    assert _issues(vectorized.validate(text.replace("é", "e").encode(), _run())) == _issues(
+        python.validate(text.replace("é", "e"), _run())
+    )
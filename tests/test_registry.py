@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from validator_saas.services import validation_service
+from validator_saas.services.validation_service import ValidationService
+from validator_saas.storage import InMemoryDatabase
+from validator_saas.validators import VALIDATORS, LayoutNotFoundError, LayoutRegistry
+from validator_saas.validators.registry import layout_to_dict, load_layout_file
+
+DIMP_ROW = "1,12345678000190,TEDX,100.50,3,20240131\n"
+
+
+def _install(root, key, version, data):
+    path = root / key / f"{version}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def _dimp_v2():
+    # Versão hipotética do DIMP com modalidade de até 3 caracteres.
+    data = layout_to_dict(VALIDATORS["dimp"])
+    data["version"] = "2.0"
+    next(field for field in data["fields"] if field["name"] == "modalidade")["max_length"] = 3
+    return data
+
+
+@pytest.mark.parametrize("key", sorted(VALIDATORS))
+def test_builtin_layouts_round_trip_through_declarative_files(tmp_path, key):
+    builtin = VALIDATORS[key]
+    path = _install(tmp_path, key, builtin.layout.version, layout_to_dict(builtin))
+    declared = load_layout_file(path)
+    assert declared.layout == builtin.layout
+    assert (declared.key, declared.regulator) == (builtin.key, builtin.regulator)
+    assert declared.engine == builtin.engine
+
+
+def test_registry_indexes_names_and_loads_versions_on_demand(tmp_path):
+    _install(tmp_path, "dimp", "2.0", _dimp_v2())
+    (tmp_path / "novo").mkdir()
+    (tmp_path / "novo" / "1.10.json").write_text("{não é json", encoding="utf-8")
+    (tmp_path / "novo" / "1.9.json").write_text("{}", encoding="utf-8")
+    registry = LayoutRegistry(paths=(tmp_path,), cache_size=2)
+
+    assert "novo" in registry and registry.versions("novo") == ["1.9", "1.10"]
+    assert registry.versions("dimp") == ["1.0", "2.0"]
+    assert registry.stats()["loads"] == 0
+    assert registry["dimp"].layout.version == "2.0"
+    assert registry.resolve("dimp", "1.0").layout is VALIDATORS["dimp"].layout
+    with pytest.raises(ValueError, match="1.10.json"):
+        registry.resolve("novo")
+    with pytest.raises(LayoutNotFoundError, match="disponíveis: 1.0, 2.0"):
+        registry.resolve("dimp", "3.0")
+    with pytest.raises(LayoutNotFoundError, match="Validador não encontrado"):
+        registry.resolve("desconhecido")
+
+    registry.resolve("dirf")
+    assert registry.stats() == {"hits": 0, "loads": 3, "evictions": 1, "entries": 2}
+    registry.resolve("dirf")
+    assert registry.stats()["hits"] == 1
+
+
+def test_service_routes_layout_version(tmp_path, monkeypatch):
+    _install(tmp_path, "dimp", "2.0", _dimp_v2())
+    monkeypatch.setattr(validation_service, "VALIDATORS", LayoutRegistry(paths=(tmp_path,)))
+    service = ValidationService(InMemoryDatabase())
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+
+    v1 = service.run_validation(service.register_file(org.id, "dimp", "1.0", "v1.csv"), DIMP_ROW)
+    v2 = service.run_validation(service.register_file(org.id, "dimp", "2.0", "v2.csv"), DIMP_ROW)
+    assert v1.issues == []
+    assert [issue.column_name for issue in v2.issues] == ["modalidade"]
+    with pytest.raises(LayoutNotFoundError):
+        service.run_validation(service.register_file(org.id, "dimp", "3.0", "v3.csv"), DIMP_ROW)
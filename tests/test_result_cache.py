@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from validator_saas.database import InMemoryDatabase
+from validator_saas.models import ValidationIssue
+from validator_saas.services.cache import (
+    CachedOutcome,
+    CachedResponse,
+    ValidationResultCache,
+    content_digest,
+    get_response_cache,
+    run_response_key,
+)
+from validator_saas.services.validation_service import ValidationService
+from validator_saas.storage import RetentionPolicy
+
+BACEN_CONTENT = "1,12345678000190,C01,abc,20240101,10\n2,12345678000190,C01,10.5,20240101,10\n"
+
+
+def _service(cache: ValidationResultCache) -> ValidationService:
+    return ValidationService(InMemoryDatabase(), cache=cache)
+
+
+def test_identical_content_reuses_previous_result():
+    cache = ValidationResultCache()
+    service = _service(cache)
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    first_file = service.register_file(org.id, "bacen", "1.0", "a.csv")
+    first = service.run_validation(first_file, BACEN_CONTENT)
+
+    second_file = service.register_file(org.id, "bacen", "1.0", "b.csv")
+    second = service.run_validation(second_file, BACEN_CONTENT.encode("utf-8"))
+
+    assert second.run.cached_from_run_id == first.run.id
+    assert second.run.status == first.run.status
+    assert [(i.line_number, i.column_name, i.message) for i in second.issues] == [
+        (i.line_number, i.column_name, i.message) for i in first.issues
+    ]
+    assert all(issue.validation_run_id == second.run.id for issue in second.issues)
+    assert service.db.count_issues_for_run(second.run.id) == len(first.issues)
+    assert cache.stats()["hits"] == 1
+
+
+def test_one_shot_stream_is_hashed_while_validating():
+    cache = ValidationResultCache()
+    service = _service(cache)
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = service.register_file(org.id, "bacen", "1.0", "a.csv")
+    chunks = [BACEN_CONTENT[:10].encode(), BACEN_CONTENT[10:].encode()]
+    service.run_validation(regulatory_file, iter(chunks))
+
+    again = service.run_validation(service.register_file(org.id, "bacen", "1.0", "b.csv"), BACEN_CONTENT)
+    assert again.run.cached_from_run_id is not None
+
+
+def test_different_validator_does_not_share_entry():
+    cache = ValidationResultCache()
+    service = _service(cache)
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    service.run_validation(service.register_file(org.id, "bacen", "1.0", "a.csv"), BACEN_CONTENT)
+    result = service.run_validation(service.register_file(org.id, "dimp", "1.0", "b.csv"), BACEN_CONTENT)
+    assert result.run.cached_from_run_id is None
+
+
+def test_lru_evicts_by_entries_and_issue_bytes():
+    issue = ValidationIssue(line_number=1, column_name="campo", severity="error", message="x" * 100)
+    outcome = CachedOutcome.from_issues(1, "completed_with_issues", None, [issue])
+
+    cache = ValidationResultCache(max_entries=2)
+    cache.put("a", outcome)
+    cache.put("b", outcome)
+    assert cache.get("a") is outcome  # "a" passa a ser o mais recente
+    cache.put("c", outcome)
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    cache = ValidationResultCache(max_issue_bytes=outcome.size * 2)
+    for key in "abc":
+        cache.put(key, outcome)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["issue_bytes"] <= outcome.size * 2
+
+
+def test_stored_run_discards_its_serialized_response():
+    service = _service(ValidationResultCache())
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = service.register_file(org.id, "bacen", "1.0", "a.csv")
+    run = service.db.create_run(regulatory_file.id, "bacen")
+    response = CachedResponse.encode(b'{"status": "completed"}')
+    assert response.etag == CachedResponse.encode(b'{"status": "completed"}').etag
+    get_response_cache().put(run_response_key(run.id), response)
+
+    service._fail_run(regulatory_file, run, "failed", "Falha na validação.")
+    assert get_response_cache().get(run_response_key(run.id)) is None
+    assert get_response_cache().stats()["issue_bytes"] == 0
+
+
+def test_evicted_run_discards_its_serialized_response():
+    db = InMemoryDatabase(retention=RetentionPolicy(ttl_seconds=60, mode="evict"))
+    service = ValidationService(db, cache=ValidationResultCache())
+    org = service.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = service.register_file(org.id, "bacen", "1.0", "a.csv")
+    run = db.create_run(regulatory_file.id, "bacen")
+    service._fail_run(regulatory_file, run, "failed", "Falha na validação.")
+    get_response_cache().put(run_response_key(run.id), CachedResponse.encode(b'{"status": "failed"}'))
+
+    db.enforce_retention(now=run.finished_at + timedelta(minutes=2))
+
+    assert db.get_run(run.id) is None
+    assert get_response_cache().get(run_response_key(run.id)) is None
+
+
+def test_content_digest_matches_across_sources(tmp_path):
+    path = tmp_path / "remessa.csv"
+    path.write_bytes(BACEN_CONTENT.encode())
+    with open(path, "rb") as stream:
+        stream.read(5)
+        assert content_digest(stream) == content_digest(BACEN_CONTENT[5:])
+        assert stream.tell() == 5
+    assert content_digest(path) == content_digest(BACEN_CONTENT) == content_digest(BACEN_CONTENT.encode())
+    assert content_digest(iter([b"abc"])) is None
@@ -0,0 +1,129 @@
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+
+import pytest
+
+from validator_saas.config import get_settings
+from validator_saas.models import ValidationRun
+from validator_saas.validators import VALIDATORS, LayoutValidator, ValidationPolicy
+from validator_saas.validators.layout import FieldDefinition, LayoutDefinition
+from validator_saas.validators.parallel import validate_parallel, validate_range
+from validator_saas.validators.rules import FieldComparison, UniqueKey
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=3, regulatory_file_id=1, validator_key="rules", started_at=None)
+
+
+def _issues(result):
+    return [(i.line_number, i.column_name, i.message) for i in result.issues]
+
+
+def _engines(key):
+    engines = []
+    for engine in ("python", "numpy"):
+        validator = copy(VALIDATORS[key])
+        validator.engine = engine
+        engines.append(validator)
+    return engines
+
+
+def _cadoc_3040(rows: int, seed: int) -> str:
+    rng = random.Random(seed)
+    cnpjs = ["12345678000190", "11222333000181", "12.345.678/0001-90", ""]
+    return "".join(
+        f"1,{rng.choice(cnpjs)},P{rng.randrange(40):04d},{rng.uniform(0, 1e4):.2f},1.0,20240131\n"
+        for _ in range(rows)
+    )
+
+
+def test_rules_must_reference_layout_fields():
+    fields = (FieldDefinition("a", int), FieldDefinition("b", int))
+    with pytest.raises(ValueError, match="c"):
+        LayoutDefinition("X", "1.0", fields, rules=(FieldComparison("a", "<=", "c"),))
+    with pytest.raises(ValueError):
+        FieldComparison("a", "=<", "b")
+
+
+def test_field_comparison_reports_after_cell_issues():
+    text = (
+        "1,12345678000190,12345678901,,1000.00,150.00,2023\n"
+        "1,12345678000190,12345678901,,1000.00,1500.00,2023\n"
+        "1,12345678000190,12345678901,,abc,1500.00,2023\n"
+        "1,12345678000190,1234567890,,100,100.01,2023\n"
+    )
+    python, vectorized = _engines("dirf")
+    issues = _issues(python.validate(text, _run()))
+    assert issues == [
+        (2, "imposto_retido", "imposto_retido (1500.00) deve ser menor ou igual a valor_rendimento (1000.00)."),
+        (3, "valor_rendimento", "Valor inválido (could not convert string to float: 'abc')."),
+        (4, "cpf_beneficiario", "Formato inválido (esperado CPF com 11 dígitos, com ou sem máscara)."),
+        (4, "imposto_retido", "imposto_retido (100.01) deve ser menor ou igual a valor_rendimento (100)."),
+    ]
+    assert _issues(vectorized.validate(text, _run())) == issues
+
+
+@pytest.mark.parametrize("engine", [0, 1])
+def test_trailer_total_matches_sum_of_detail_records(tmp_path, engine):
+    validator = _engines("bacen")[engine]
+    details = "".join(f"1,12345678000190,CRD,{value},20240131,1\n" for value in ("0.10", "0.20", "1e2"))
+    assert _issues(validator.validate(details + "9,12345678000190,TOT,100.30,20240131,3\n", _run())) == []
+
+    text = details + "9,12345678000190,TOT,100.3,20240131,3\n9,12345678000190,TOT,100.31,20240131,3\n"
+    message = "Soma de valor_transacao nos registros (100.30) difere do total do trailer (100.31)."
+    expected = [(5, "valor_transacao", message)]
+    assert _issues(validator.validate(text, _run())) == expected
+    path = tmp_path / "bacen.csv"
+    path.write_text(text)
+    assert _issues(validator.validate(path, _run())) == expected
+
+
+@pytest.mark.parametrize("max_keys", [1_000_000, 3])
+def test_unique_key_spills_to_disk_with_the_same_result(monkeypatch, tmp_path, max_keys):
+    monkeypatch.setattr(get_settings(), "rule_max_keys", max_keys)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    text = _cadoc_3040(600, 1)
+    python, vectorized = _engines("cadoc_3040")
+    issues = _issues(python.validate(text, _run()))
+    duplicates = [issue for issue in issues if issue[1] == "cnpj_instituicao+codigo_produto"]
+    assert duplicates[0][2].startswith("Chave duplicada (cnpj_instituicao, codigo_produto): já informada na linha ")
+    assert [line for line, _, _ in duplicates] == sorted(line for line, _, _ in duplicates)
+
+    assert _issues(vectorized.validate(text, _run())) == issues
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = validate_parallel(
+            python, text.encode(), _run(), workers=2, executor=executor, min_range_bytes=512
+        )
+    assert _issues(parallel) == issues
+    assert not list(tmp_path.iterdir())
+
+
+def test_range_results_carry_rule_state_until_merged():
+    text = _cadoc_3040(200, 2)
+    result = validate_range(VALIDATORS["cadoc_3040"], text.encode())
+    assert result.rules is not None
+    assert all(column != "cnpj_instituicao+codigo_produto" for _, column, _, _ in result.issues)
+
+
+def test_rules_are_skipped_when_validation_is_interrupted():
+    text = "1,12345678000190,P0001,1.0,1.0,20240131\n" * 3 + "1,x,P0002,1.0,1.0,20240131\n"
+    result = VALIDATORS["cadoc_3040"].validate(text, _run(), ValidationPolicy(max_errors=1))
+    assert result.run.status == "aborted"
+    assert [(line, column) for line, column, _ in _issues(result)] == [(4, "cnpj_instituicao")]
+    assert len(_issues(VALIDATORS["cadoc_3040"].validate(text, _run()))) == 3
+
+
+def test_unique_key_on_positional_layout():
+    fields = (FieldDefinition("codigo", str, start=0, length=3), FieldDefinition("valor", int, start=3, length=4))
+
+    class Positional(LayoutValidator):
+        key = "posicional"
+        regulator = "X"
+        layout = LayoutDefinition("P", "1.0", fields, delimiter=None, rules=(UniqueKey(("codigo",)),))
+
+    text = "AB    1\nCD    2\n AB   3\n"
+    assert _issues(Positional().validate(text, _run())) == [
+        (3, "codigo", "Chave duplicada (codigo): já informada na linha 1.")
+    ]
@@ -0,0 +1,363 @@
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from validator_saas.issue_store import COLUMNAR_ROW_BYTES, ISSUE_STORES, IssueFilter, IssueSegment
+from validator_saas.metrics import RELEASED_BYTES, RELEASED_RUNS
+from validator_saas.models import ValidationIssue
+from validator_saas.sqlite_storage import PoolTimeoutError
+from validator_saas.storage import InMemoryDatabase, RetentionPolicy, SQLiteDatabase, create_database
+
+
+@pytest.fixture(params=[*sorted(ISSUE_STORES), "sqlite"])
+def db(request, tmp_path):
+    if request.param == "sqlite":
+        database = SQLiteDatabase(tmp_path / "validator.db")
+        yield database
+        database.close()
+    else:
+        yield InMemoryDatabase(issue_store=request.param)
+
+
+def test_secondary_indexes_and_pagination(db):
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    other_org = db.create_organization("Issuer", "emissor", "98.765.432/0001-10")
+    first_file = db.create_file(org.id, "bacen", "1.0", "a.csv")
+    db.create_file(other_org.id, "dimp", "1.0", "b.csv")
+    first_run = db.create_run(first_file.id, "bacen")
+    second_run = db.create_run(first_file.id, "bacen")
+    for line_number in range(1, 6):
+        db.add_issue(first_run.id, line_number, "valor_transacao", "error", "Valor inválido.")
+    db.add_issue(second_run.id, 1, None, "error", "Quantidade de colunas incorreta.")
+
+    assert [item.id for item in db.list_files_for_organization(org.id)] == [first_file.id]
+    assert [run.id for run in db.list_runs_for_file(first_file.id)] == [first_run.id, second_run.id]
+    assert db.count_issues_for_run(first_run.id) == 5
+    assert [issue.line_number for issue in db.list_issues_for_run(first_run.id, offset=1, limit=2)] == [2, 3]
+    assert [issue.message for issue in db.list_issues_for_run(second_run.id)] == [
+        "Quantidade de colunas incorreta."
+    ]
+    assert db.list_issues_for_run(999) == []
+
+
+def test_bulk_insert_assigns_contiguous_ids(db):
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = db.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    run = db.create_run(regulatory_file_id=regulatory_file.id, validator_key="dimp")
+    db.add_issue(run.id, 1, None, "error", "Quantidade de colunas incorreta.")
+    issues = [ValidationIssue(line_number=line, column_name="valor_total", message="x") for line in (2, 3)]
+
+    stored = db.add_issues_bulk(run.id, issues)
+
+    assert stored is issues
+    assert [issue.id for issue in stored] == [2, 3]
+    assert all(issue.validation_run_id == run.id for issue in stored)
+    assert db.list_issues_for_run(run.id)[1:] == issues
+    assert db.count_issues_for_run(run.id) == 3
+    assert db.list_issues_for_run(run.id, offset=2)[0].line_number == 3
+    assert db.add_issue(run.id, 4, None, "error", "y").id == 4
+
+
+def test_cursor_pagination_with_filters(db):
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = db.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    other_run = db.create_run(regulatory_file.id, "dimp")
+    run = db.create_run(regulatory_file.id, "dimp")
+    db.add_issue(other_run.id, 1, "valor_total", "error", "outra execução")
+    db.add_issues_bulk(
+        run.id,
+        [
+            ValidationIssue(line_number=line, column_name=column, severity="error", message=f"{column}:{line}")
+            for line in range(1, 11)
+            for column in ("valor_total", "modalidade")
+        ]
+        + [ValidationIssue(column_name="valor_total", severity="info", message="… e mais 3")],
+    )
+
+    pages, after_id = [], 0
+    while page := db.list_issues_page(run.id, after_id=after_id, limit=4):
+        pages.append([issue.message for issue in page])
+        after_id = page[-1].id
+    assert len(pages) == 6 and pages[0] == ["valor_total:1", "modalidade:1", "valor_total:2", "modalidade:2"]
+
+    only_total = IssueFilter(severity="error", column_name="valor_total", line_from=3, line_to=5)
+    first = db.list_issues_page(run.id, limit=2, issue_filter=only_total)
+    assert [issue.message for issue in first] == ["valor_total:3", "valor_total:4"]
+    rest = db.list_issues_page(run.id, after_id=first[-1].id, limit=10, issue_filter=only_total)
+    assert [issue.message for issue in rest] == ["valor_total:5"]
+    assert db.list_issues_page(run.id, issue_filter=IssueFilter(column_name="inexistente")) == []
+
+    rows = list(db.iter_issue_rows(run.id, IssueFilter(severity="info")))
+    assert [row[1:] for row in rows] == [(None, "valor_total", "info", "… e mais 3")]
+    assert len(list(db.iter_issue_rows(run.id))) == 21
+
+
+def test_sqlite_backend_persists_across_instances(tmp_path):
+    url = f"sqlite:///{tmp_path / 'validator.db'}"
+    first = create_database(url)
+    org = first.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = first.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    resubmission = first.create_file(org.id, "dimp", "1.0", "dimp.csv", previous_file_id=regulatory_file.id)
+    run = first.create_run(regulatory_file.id, "dimp")
+    run.status = "completed_with_issues"
+    run.timings = {"validate": 0.25, "persist": 0.01}
+    first.update_run(run)
+    first.add_issues_bulk(run.id, [ValidationIssue(line_number=1, column_name="valor_total", message="x")])
+    first.close()
+
+    second = create_database(url)
+    assert second.get_organization(org.id).name == "Acquirer"
+    assert second.get_run(run.id).status == "completed_with_issues"
+    assert second.get_run(run.id).timings == {"validate": 0.25, "persist": 0.01}
+    assert second.get_file(resubmission.id).previous_file_id == regulatory_file.id
+    assert [issue.column_name for issue in second.list_issues_for_run(run.id)] == ["valor_total"]
+    second.close()
+
+
+@pytest.fixture
+def frequent_thread_switches():
+    # Trocas de thread a cada microssegundo expõem corridas que o intervalo padrão esconde.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.mark.usefixtures("frequent_thread_switches")
+def test_concurrent_writers_get_unique_ids_and_ordered_indexes(db):
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = db.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    shared_run = db.create_run(regulatory_file.id, "dimp")
+    threads, rounds = 8, 40
+    barrier = threading.Barrier(threads)
+
+    def writer(worker: int) -> list[tuple[int, list[int]]]:
+        barrier.wait()
+        created = []
+        for index in range(rounds):
+            run = db.create_run(regulatory_file.id, "dimp")
+            issues = [db.add_issue(run.id, line, "valor_total", "error", f"{worker}:{index}") for line in (1, 2)]
+            issues += db.add_issues_bulk(run.id, [ValidationIssue(line_number=3, message="x") for _ in range(3)])
+            shared = [ValidationIssue(line_number=worker, message=message) for message in ("y", "z")]
+            db.add_issues_bulk(shared_run.id, shared)
+            created.append((run.id, [issue.id for issue in issues]))
+        return created
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        created = [item for result in executor.map(writer, range(threads)) for item in result]
+
+    run_ids = [run_id for run_id, _ in created]
+    issue_ids = [issue_id for _, ids in created for issue_id in ids]
+    assert len(set(run_ids)) == len(run_ids) == threads * rounds
+    assert len(set(issue_ids)) == len(issue_ids) == threads * rounds * 5
+    assert len(db.list_runs_for_file(regulatory_file.id)) == threads * rounds + 1
+    for run_id, ids in created:
+        assert [issue.id for issue in db.list_issues_for_run(run_id)] == sorted(ids)
+    shared = [issue.id for issue in db.list_issues_for_run(shared_run.id)]
+    assert shared == sorted(shared) and len(set(shared)) == threads * rounds * 2
+    assert not set(shared) & set(issue_ids)
+
+
+def _finished_run(db, regulatory_file, issues, finished_at=None):
+    run = db.create_run(regulatory_file.id, "dimp")
+    db.add_issues_bulk(
+        run.id,
+        [
+            ValidationIssue(line_number=line, column_name="valor_total", message=f"v{run.id}:{line}")
+            for line in range(1, issues + 1)
+        ],
+    )
+    run.status = "completed_with_issues"
+    run.finished_at = finished_at or datetime.utcnow()
+    db.update_run(run)
+    return run
+
+
+@pytest.mark.parametrize("issue_store", sorted(ISSUE_STORES))
+def test_memory_budget_spills_oldest_runs_to_disk(tmp_path, issue_store):
+    reference = InMemoryDatabase(issue_store=issue_store)
+    org = reference.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = reference.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    expected = _finished_run(reference, regulatory_file, 300)
+    run_bytes = reference.issue_bytes_for_run(expected.id)
+    assert run_bytes > 0
+
+    policy = RetentionPolicy(max_issue_bytes=int(run_bytes * 1.5), spill_dir=str(tmp_path))
+    db = InMemoryDatabase(issue_store=issue_store, retention=policy)
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = db.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    before = (RELEASED_RUNS.value("spill", "budget"), RELEASED_BYTES.value("spill"))
+    first = _finished_run(db, regulatory_file, 300)
+    first_bytes = db.issue_bytes_for_run(first.id)
+    running = db.create_run(regulatory_file.id, "dimp")
+    db.add_issue(running.id, 1, None, "error", "em andamento")
+    second = _finished_run(db, regulatory_file, 300)
+
+    assert db.issue_bytes_for_run(first.id) == 0
+    assert 0 < db.issue_bytes_for_run(second.id) <= run_bytes
+    stats = db.retention_stats()
+    assert stats["spilled_runs"] == 1 and stats["resident_runs"] == 1 and stats["disk_bytes"] > 0
+    assert RELEASED_RUNS.value("spill", "budget") - before[0] == 1
+    assert RELEASED_BYTES.value("spill") - before[1] == first_bytes
+
+    # O resultado compactado é lido pelas mesmas consultas, com os mesmos ids e páginas.
+    assert db.count_issues_for_run(first.id) == 300
+    assert db.list_issues_for_run(first.id, offset=10, limit=5) == reference.list_issues_for_run(
+        expected.id, offset=10, limit=5
+    )
+    only = IssueFilter(line_from=100, line_to=120)
+    page = db.list_issues_page(first.id, after_id=105, limit=3, issue_filter=only)
+    assert page == reference.list_issues_page(expected.id, after_id=105, limit=3, issue_filter=only)
+    assert list(db.iter_issue_rows(first.id)) == list(reference.iter_issue_rows(expected.id))
+    assert db.count_issues_for_run(running.id) == 1
+
+    # Uma nova atualização da execução compactada não a grava de novo.
+    db.update_run(db.get_run(first.id))
+    assert db.count_issues_for_run(first.id) == 300
+
+
+@pytest.mark.parametrize("issue_store", sorted(ISSUE_STORES))
+def test_ttl_evicts_runs_entirely(issue_store):
+    db = InMemoryDatabase(issue_store=issue_store, retention=RetentionPolicy(ttl_seconds=60, mode="evict"))
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = db.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    before = RELEASED_RUNS.value("evict", "ttl")
+    old = _finished_run(db, regulatory_file, 5, finished_at=datetime.utcnow() - timedelta(hours=1))
+    recent = _finished_run(db, regulatory_file, 5)
+
+    assert db.get_run(old.id) is None
+    assert db.list_issues_for_run(old.id) == []
+    assert [run.id for run in db.list_runs_for_file(regulatory_file.id)] == [recent.id]
+    assert db.get_file(regulatory_file.id) is not None
+    assert RELEASED_RUNS.value("evict", "ttl") - before == 1
+
+    db.enforce_retention(now=datetime.utcnow() + timedelta(minutes=2))
+    assert db.get_run(recent.id) is None
+    # Uma atualização atrasada não traz de volta a execução removida.
+    db.update_run(recent)
+    assert db.get_run(recent.id) is None and db.list_runs_for_file(regulatory_file.id) == []
+    assert db.retention_stats()["memory_bytes"] == 0
+
+
+def test_columnar_store_accounts_dictionary_texts():
+    db = InMemoryDatabase(issue_store="columnar")
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = db.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    # Mensagens com o valor da célula são quase todas distintas: os textos dominam a memória.
+    unique = _finished_run(db, regulatory_file, 100)
+    repeated = db.create_run(regulatory_file.id, "dimp")
+    same_text = [ValidationIssue(line_number=line, column_name="valor_total", message="v1:1") for line in range(100)]
+    db.add_issues_bulk(repeated.id, same_text)
+
+    assert db.issue_bytes_for_run(unique.id) > 100 * (COLUMNAR_ROW_BYTES + len("v1:100"))
+    assert db.issue_bytes_for_run(repeated.id) == 100 * COLUMNAR_ROW_BYTES
+    total, unique_bytes = db.issue_store.memory_bytes, db.issue_bytes_for_run(unique.id)
+    db.issue_store.drop_run(unique.id)
+    assert db.issue_store.memory_bytes == total - unique_bytes
+
+
+def test_columnar_store_compacts_dropped_runs_keeping_ids():
+    db = InMemoryDatabase(issue_store="columnar")
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = db.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    runs = [_finished_run(db, regulatory_file, 10) for _ in range(3)]
+    kept = db.list_issues_for_run(runs[2].id)
+
+    db.issue_store.drop_run(runs[0].id)
+    db.issue_store.drop_run(runs[1].id)
+
+    assert len(db.issue_store) == 10
+    assert db.list_issues_for_run(runs[2].id) == kept
+    assert db.add_issue(runs[2].id, 11, None, "error", "nova").id == kept[-1].id + 1
+
+
+def test_issue_segment_pages_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr("validator_saas.issue_store.SEGMENT_CHUNK_ROWS", 4)
+    segment = IssueSegment(tmp_path)
+    rows = [(issue_id, issue_id, None, "error", f"m{issue_id}") for issue_id in range(10, 21)]
+    segment.write(7, rows)
+
+    assert 7 in segment and segment.count_for_run(7) == 11
+    assert [issue.id for issue in segment.list_for_run(7, offset=3, limit=6)] == list(range(13, 19))
+    assert [issue.id for issue in segment.list_page(7, after_id=14, limit=3)] == [15, 16, 17]
+    assert list(segment.iter_rows(7, after_id=19)) == rows[-1:]
+    segment.discard(7)
+    assert segment.list_for_run(7) == []
+    segment.close()
+
+
+def test_failed_commit_rolls_back_before_returning_connection(tmp_path):
+    db = SQLiteDatabase(tmp_path / "validator.db", pool_size=1)
+    with pytest.raises(sqlite3.IntegrityError):
+        with db._pool.transaction() as connection:
+            # Chaves estrangeiras adiadas só são verificadas no COMMIT, que então falha.
+            connection.execute("PRAGMA defer_foreign_keys=ON")
+            connection.execute(
+                "INSERT INTO regulatory_files (organization_id, regulator, layout_version, "
+                "original_filename, uploaded_at, status) VALUES (999, 'dimp', '1.0', 'a.csv', '2024-01-01', 'uploaded')"
+            )
+
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    assert db.get_organization(org.id).name == "Acquirer"
+    db.close()
+
+
+def test_export_does_not_hold_a_pool_connection(tmp_path, monkeypatch):
+    monkeypatch.setattr("validator_saas.sqlite_storage.EXPORT_FETCH_SIZE", 2)
+    db = SQLiteDatabase(tmp_path / "validator.db", pool_size=1, pool_timeout=0.05)
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    run = db.create_run(db.create_file(org.id, "dimp", "1.0", "a.csv").id, "dimp")
+    db.add_issues_bulk(run.id, [ValidationIssue(line_number=line, message="x") for line in range(1, 6)])
+
+    rows = db.iter_issue_rows(run.id)
+    first = next(rows)
+    # Com a exportação pausada, a única conexão do pool continua disponível.
+    assert db.count_issues_for_run(run.id) == 5
+    assert [first[0], *(row[0] for row in rows)] == [1, 2, 3, 4, 5]
+
+    with db._pool.connection():
+        with pytest.raises(PoolTimeoutError, match="Nenhuma conexão SQLite livre"):
+            db.count_issues_for_run(run.id)
+    db.close()
+
+
+def test_issue_segment_reclaims_discarded_space(tmp_path, monkeypatch):
+    monkeypatch.setattr("validator_saas.issue_store.SEGMENT_CHUNK_ROWS", 4)
+    monkeypatch.setattr("validator_saas.issue_store.SEGMENT_COMPACT_MIN_BYTES", 0)
+    segment = IssueSegment(tmp_path)
+    for run_id in range(1, 4):
+        segment.write(run_id, [(run_id * 100 + line, line, None, "error", "x" * line) for line in range(10)])
+    kept = list(segment.iter_rows(3))
+    reader = segment.iter_rows(2)
+    first = next(reader)
+
+    segment.discard(1)
+    segment.discard(2)
+
+    assert list(segment) == [3] and segment.disk_bytes == segment.live_bytes == segment.run_bytes(3)
+    assert list(segment.iter_rows(3)) == kept
+    # Quem já percorria a execução descartada termina no arquivo anterior.
+    assert [first, *reader] == [(200 + line, line, None, "error", "x" * line) for line in range(10)]
+    segment.close()
+    assert len(segment) == 0
+
+
+def test_spill_budget_evicts_oldest_spilled_runs(tmp_path):
+    policy = RetentionPolicy(max_issue_bytes=0, spill_dir=str(tmp_path), max_spill_bytes=1)
+    db = InMemoryDatabase(retention=policy)
+    org = db.create_organization("Acquirer", "adquirente", "12.345.678/0001-90")
+    regulatory_file = db.create_file(org.id, "dimp", "1.0", "dimp.csv")
+    before = RELEASED_RUNS.value("evict", "disk")
+    first = _finished_run(db, regulatory_file, 50)
+    second = _finished_run(db, regulatory_file, 50)
+
+    # Cada execução é compactada e, com o arquivo acima do limite, removida em seguida.
+    assert db.get_run(first.id) is None and db.get_run(second.id) is None
+    assert RELEASED_RUNS.value("evict", "disk") - before == 2
+    assert db.retention_stats()["spilled_runs"] == 0
+    db.close()
+    assert db.segment is None
@@ -59,3 +59,21 @@ def test_cadoc_6334_validation_accepts_optional_channel():
         result = service.run_validation(regulatory_file, raw_content)
         assert result.run.status == "completed"
         assert not result.issues
+
+
+def test_validation_accepts_byte_chunks_split_mid_character_and_line():
+    with get_session() as db:
+        service = ValidationService(db)
+        org = service.create_organization("Processor Six", "adquirente", "12.121.212/0001-21")
+        regulatory_file = service.register_file(org.id, "cadoc_6334", "1.0", "cadoc6334.csv")
+        content = (
+            "1,12345678000190,SRV01,120,5000.75,agência,20240131\r\n\r\n"
+            "1,12345678000190,SRV02,x,1.0,,20240131\r\n"
+        )
+        raw = content.encode("utf-8")
+        chunks = [raw[start : start + 3] for start in range(0, len(raw), 3)]
+        result = service.run_validation(regulatory_file, iter(chunks))
+        assert result.run.status == "completed_with_issues"
+        assert [(issue.line_number, issue.column_name) for issue in result.issues] == [
+            (3, "quantidade_operacoes")
+        ]
@@ -17,3 +17,15 @@ def test_list_validators_exposes_layout_metadata():
         assert "name" in layout and "version" in layout
         assert isinstance(layout["fields"], list)
         assert all("name" in field and "type" in field for field in layout["fields"])
+
+
+def test_catalog_exposes_delimiter_and_patterns():
+    with get_session() as db:
+        catalog = {item["key"]: item for item in ValidationService(db).list_validators()}
+    bacen = catalog["bacen"]["layout"]
+    assert bacen["delimiter"] == ","
+    patterns = {field["name"]: field["pattern"] for field in bacen["fields"]}
+    assert patterns["data_transacao"] and patterns["cnpj_instituicao"]
+    assert patterns["valor_transacao"] is None
+    assert bacen["rules"] == ["soma de valor_transacao igual ao trailer (codigo_registro=9)"]
+    assert catalog["dirf"]["layout"]["rules"] == ["imposto_retido menor ou igual a valor_rendimento"]
@@ -0,0 +1,179 @@
+import io
+import random
+import subprocess
+import sys
+from copy import copy
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from validator_saas.models import ValidationRun
+from validator_saas.validators import VALIDATORS, IssueCollector, ValidationPolicy
+from validator_saas.validators.mapped import iter_line_blocks
+from validator_saas.validators.parallel import validate_range
+
+np = pytest.importorskip("numpy")
+
+from validator_saas.validators.vectorized import collect_blocks, iter_byte_blocks  # noqa: E402
+
+TRICKY_VALUES = ["", "0", "+5", "-12", "007", "1_000", "²", "١٢", "1.5", ".5", "5.", "1e5", "nan", "-", ".", "x" * 30]
+EXTRA_VALUES = ["+", "1.2.3", "-.5", "+.", "12345678000190", "SRV01", "20240131", " 7 ", "\t8", "1,5"]
+SEPARATORS = ["\n", "\r\n"]
+
+
+def _run() -> ValidationRun:
+    return ValidationRun(id=9, regulatory_file_id=1, validator_key="bacen", started_at=None)
+
+
+def _engines(key):
+    python, vectorized = copy(VALIDATORS[key]), copy(VALIDATORS[key])
+    python.engine, vectorized.engine = "python", "numpy"
+    return python, vectorized
+
+
+def _sample(width: int, rows: int, seed: int) -> str:
+    rng = random.Random(seed)
+    values = TRICKY_VALUES + EXTRA_VALUES + ["1", "2.50", "ABC"] * 8
+    lines = []
+    for _ in range(rows):
+        shape = rng.random()
+        if shape < 0.05:
+            lines.append(rng.choice(["", "   ", "\t"]))
+            continue
+        count = width if shape > 0.15 else rng.choice([1, width - 1, width + 1])
+        lines.append(",".join(rng.choice(values) for _ in range(count)))
+    text = "".join(line + rng.choice(SEPARATORS) for line in lines)
+    return text if seed % 2 else text.rstrip("\r\n")
+
+
+def _snapshot(result):
+    issues = [(i.line_number, i.column_name, i.severity, i.message) for i in result.issues]
+    return result.run.status, result.run.summary, issues
+
+
+@pytest.mark.parametrize("key", sorted(VALIDATORS))
+@pytest.mark.parametrize("seed", range(4))
+def test_vectorized_engine_matches_python_engine(key, seed):
+    python, vectorized = _engines(key)
+    text = _sample(len(python.layout.fields), 400, seed)
+    expected = _snapshot(python.validate(text, _run()))
+    assert expected[2]
+    chunks = [text[i : i + 97] for i in range(0, len(text), 97)]
+    for source in (text, text.encode(), io.BytesIO(text.encode()), iter(chunks)):
+        assert _snapshot(vectorized.validate(source, _run())) == expected
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [
+        ValidationPolicy(max_errors=7),
+        ValidationPolicy(max_issues_per_column=2),
+        ValidationPolicy(max_errors=40, max_issues_per_column=3),
+        ValidationPolicy(precheck_lines=5),
+    ],
+)
+def test_vectorized_engine_applies_policies_like_python_engine(policy):
+    python, vectorized = _engines("cadoc_3040")
+    text = _sample(len(python.layout.fields), 300, 11)
+    expected = _snapshot(python.validate(text, _run(), policy))
+    assert _snapshot(vectorized.validate(text, _run(), policy)) == expected
+
+    wrong_delimiter = text.replace(",", ";")
+    aborted = vectorized.validate(wrong_delimiter, _run(), policy)
+    assert _snapshot(aborted) == _snapshot(python.validate(wrong_delimiter, _run(), policy))
+
+
+@pytest.mark.parametrize("block_size", [1, 13, 4096])
+def test_vectorized_blocks_keep_line_numbers_across_boundaries(block_size):
+    python, vectorized = _engines("bacen")
+    text = _sample(len(python.layout.fields), 200, 3) + "\n1,²,x,agência,2024,1\n1,2\r3,4,5,6\n"
+    data = text.encode()
+    collector = IssueCollector()
+    line_count = collect_blocks(vectorized, iter_line_blocks(data, block_size=block_size), collector)
+    assert line_count == len(text.splitlines())
+    assert collector.rows() == _snapshot(python.validate(text, _run()))[2]
+
+
+def test_iter_byte_blocks_ends_blocks_on_line_breaks():
+    chunks = [b"1,2", b"\n3,", b"4\n5", b"", "6\n7".encode()]
+    blocks = list(iter_byte_blocks(iter(chunks), block_size=4))
+    assert b"".join(blocks) == b"1,2\n3,4\n56\n7"
+    assert all(block.endswith(b"\n") for block in blocks[:-1])
+
+
+def test_vectorized_paths_and_ranges_match(tmp_path):
+    python, vectorized = _engines("cadoc_3050")
+    text = _sample(len(python.layout.fields), 500, 5)
+    path = tmp_path / "3050.csv"
+    path.write_bytes(text.encode())
+    expected = _snapshot(python.validate(text, _run()))
+    assert _snapshot(vectorized.validate(path, _run())) == expected
+
+    from_path = validate_range(vectorized, str(path), 0, len(text.encode()))
+    from_bytes = validate_range(vectorized, text.encode())
+    assert from_path == from_bytes == validate_range(python, text.encode())
+
+
+def test_engine_can_be_overridden_per_validator(monkeypatch):
+    from validator_saas.config import get_settings
+
+    validator = copy(VALIDATORS["dimp"])
+    assert not validator.vectorized
+    monkeypatch.setattr(get_settings(), "validator_engines", "dimp=numpy, bacen=python")
+    assert validator.vectorized
+    assert not VALIDATORS["bacen"].vectorized
+    monkeypatch.setattr(get_settings(), "validator_engines", "dimp=fortran")
+    with pytest.raises(ValueError):
+        validator.vectorized
+
+
+def test_vectorized_patterns_match_python_engine_on_mostly_valid_files():
+    python, vectorized = _engines("bacen")
+    rng = random.Random(4)
+    cnpjs = ["12345678000190", "12.345.678/0001-90", "1234567800019", "12.345.678/000190", "ABCDEFGHIJKLMN"]
+    dates = ["20240131", "20241301", "20240230", "2024013", "20240131 "]
+    lines = [
+        f"1,{rng.choice(cnpjs) if rng.random() < 0.2 else cnpjs[0]},CRD,{rng.uniform(0, 1e4):.2f},"
+        f"{rng.choice(dates) if rng.random() < 0.2 else dates[0]},{index}"
+        for index in range(3000)
+    ]
+    text = "\n".join(lines)
+    expected = _snapshot(python.validate(text, _run()))
+    assert {issue[1] for issue in expected[2]} == {"cnpj_instituicao", "data_transacao"}
+    assert _snapshot(vectorized.validate(text, _run())) == expected
+
+
+@pytest.mark.parametrize("delimiter", [";", "|", "\t", " "])
+def test_vectorized_engine_honors_layout_delimiter(delimiter):
+    from validator_saas.validators import LayoutValidator
+    from validator_saas.validators.bacen import BACEN_LAYOUT
+
+    class DelimitedValidator(LayoutValidator):
+        key = "bacen_delimited"
+        regulator = "BACEN"
+        layout = replace(BACEN_LAYOUT, delimiter=delimiter)
+
+    python, vectorized = DelimitedValidator(), DelimitedValidator()
+    vectorized.engine = "numpy"
+    text = _sample(len(BACEN_LAYOUT.fields), 300, 7).replace(",", delimiter)
+    text += "\n" + delimiter.join(["1", "12345678000190", "CRD", "1.5", "20240131", "2"])
+    expected = _snapshot(python.validate(text, _run()))
+    assert _snapshot(vectorized.validate(text, _run())) == expected
+    assert _snapshot(python.validate(text.encode(), _run())) == expected
+
+
+def test_numpy_is_imported_on_first_vectorized_use():
+    code = (
+        "import sys\n"
+        "from copy import copy\n"
+        "from validator_saas.validators import VALIDATORS, IssueCollector\n"
+        "from validator_saas.validators.vectorized import collect_blocks\n"
+        "assert 'numpy' not in sys.modules\n"
+        "validator = copy(VALIDATORS['dimp'])\n"
+        "validator.engine = 'numpy'\n"
+        "assert validator.vectorized and 'numpy' not in sys.modules\n"
+        "collect_blocks(validator, [b'1,12345678000190,TED,10.0,1,20240131\\n'], IssueCollector())\n"
+        "assert 'numpy' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).resolve().parents[1])
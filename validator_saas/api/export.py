@@ -0,0 +1,75 @@
+"""Serialização das inconsistências em fluxo (NDJSON e CSV) direto do armazenamento."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from itertools import islice
+
+from ..issue_store import IssueExportRow
+
+EXPORT_BATCH_ROWS = 1000
+"""Linhas serializadas por bloco enviado ao cliente."""
+
+EXPORT_TEXT_CACHE = 256
+"""Literais JSON de coluna e severidade guardados entre exportações."""
+
+EXPORT_COLUMNS = ("id", "line_number", "column_name", "severity", "message")
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _batches(rows: Iterable[IssueExportRow]) -> Iterator[list[IssueExportRow]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, EXPORT_BATCH_ROWS)):
+        yield batch
+
+
+@lru_cache(maxsize=EXPORT_TEXT_CACHE)
+def _json_text(value: str | None) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def iter_ndjson(rows: Iterable[IssueExportRow]) -> Iterator[bytes]:
+    """Uma inconsistência por linha JSON, sem passar por modelos Pydantic.
+
+    Coluna e severidade se repetem muito entre inconsistências e têm o literal
+    JSON memorizado (em um LRU limitado); mensagens trazem linhas e valores,
+    quase sempre únicos, e são codificadas uma a uma.
+    """
+
+    dumps = json.dumps
+    for batch in _batches(rows):
+        yield "".join(
+            f'{{"id": {issue_id}, "line_number": {"null" if line is None else line}, '
+            f'"column_name": {_json_text(column)}, "severity": {_json_text(severity)}, '
+            f'"message": {dumps(message, ensure_ascii=False)}}}\n'
+            for issue_id, line, column, severity, message in batch
+        ).encode("utf-8")
+
+
+def iter_csv(rows: Iterable[IssueExportRow]) -> Iterator[bytes]:
+    """CSV com cabeçalho, serializado em blocos de ``EXPORT_BATCH_ROWS`` linhas."""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in _batches(rows):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+EXPORTERS = {"ndjson": iter_ndjson, "csv": iter_csv}
+
+
+__all__ = ["EXPORTERS", "EXPORT_COLUMNS", "EXPORT_MEDIA_TYPES", "iter_csv", "iter_ndjson"]
@@ -2,29 +2,89 @@
 
 from __future__ import annotations
 
+import asyncio
+import itertools
+import os
+import shutil
+import tempfile
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, replace
 from pathlib import Path
+from typing import Literal
 
-from fastapi import Depends, FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import Depends, FastAPI, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import TypeAdapter
 
 from ..config import get_settings
-from ..database import InMemoryDatabase, get_session, init_db
-from ..models import Organization
+from ..database import Database, close_db, enforce_retention, get_session, init_db
+from ..issue_store import IssueFilter
+from ..metrics import METRICS, StageTimer
+from ..models import Organization, RegulatoryFile
+from ..services.batch import BatchItem, BatchOutcome, assign_regulators, iter_zip_items
+from ..services.cache import CachedResponse, get_response_cache, get_result_cache, run_response_key
+from ..services.compression import DecompressionError, DecompressionLimitError, open_decompressed
+from ..services.jobs import QueueFullError, get_job_queue, shutdown_job_queue
 from ..services.validation_service import ValidationService
+from ..sqlite_storage import PoolTimeoutError
+from ..validators import VALIDATORS, LayoutNotFoundError, ValidationResult
+from ..validators.policy import ValidationPolicy
+from .export import EXPORT_MEDIA_TYPES, EXPORTERS
 from .schemas import (
+    BatchValidationItemRead,
+    BatchValidationResponse,
+    IssuePageRead,
     OrganizationCreate,
     OrganizationRead,
+    ResultCacheStatsRead,
+    ValidationIssueRead,
+    ValidationJobRead,
     ValidationRequest,
     ValidationResponse,
+    ValidationRunRead,
     ValidatorRead,
 )
 
+
+RETENTION_SWEEP_SECONDS = 60.0
+"""Intervalo máximo entre varreduras do TTL de retenção com a aplicação ociosa."""
+
+
+async def _sweep_retention(interval: float) -> None:
+    # Sem novas execuções concluídas, o TTL só seria aplicado na próxima gravação.
+    while True:
+        await asyncio.sleep(interval)
+        await run_in_threadpool(enforce_retention)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Cria as tabelas e varre o TTL de retenção periodicamente; na parada, libera a fila e o banco."""
+
+    init_db()
+    ttl = get_settings().run_ttl_seconds
+    sweeper = asyncio.create_task(_sweep_retention(min(ttl, RETENTION_SWEEP_SECONDS))) if ttl else None
+    try:
+        yield
+    finally:
+        if sweeper is not None:
+            sweeper.cancel()
+        shutdown_job_queue(wait=False)
+        close_db()
+
+
 settings = get_settings()
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 BASE_DIR = Path(__file__).resolve().parent.parent
 FRONTEND_DIR = BASE_DIR.parent / "frontend"
+STREAM_QUEUE_SIZE = 16
+INLINE_ISSUE_LIMIT = 100
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
 
 app.add_middleware(
     CORSMiddleware,
@@ -38,9 +98,25 @@ if FRONTEND_DIR.exists():
     app.mount("/app", StaticFiles(directory=FRONTEND_DIR, html=True), name="frontend")
 
 
-@app.on_event("startup")
-def on_startup() -> None:
-    init_db()
+def get_db() -> Iterator[Database]:
+    """Dependência FastAPI que expõe a sessão de armazenamento."""
+
+    with get_session() as db:
+        yield db
+
+
+@app.exception_handler(PoolTimeoutError)
+def on_pool_timeout(request: Request, exc: PoolTimeoutError) -> JSONResponse:
+    """Banco sem conexões livres: o cliente tenta de novo em vez de a requisição ficar presa."""
+
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """Métricas de operação no formato de texto do Prometheus."""
+
+    return PlainTextResponse(METRICS.render(), media_type=METRICS_MEDIA_TYPE)
 
 
 @app.get("/", include_in_schema=False)
@@ -53,50 +129,401 @@ def root() -> RedirectResponse:
 @app.post("/organizations", response_model=OrganizationRead, status_code=201)
 def create_organization(
     payload: OrganizationCreate,
-    db: InMemoryDatabase = Depends(get_session),
+    db: Database = Depends(get_db),
 ) -> Organization:
     service = ValidationService(db)
     return service.create_organization(payload.name, payload.role, payload.tax_id)
 
 
 @app.get("/organizations", response_model=list[OrganizationRead])
-def list_organizations(db: InMemoryDatabase = Depends(get_session)) -> list[Organization]:
+def list_organizations(db: Database = Depends(get_db)) -> list[Organization]:
     service = ValidationService(db)
     return service.list_organizations()
 
 
+_CATALOG = TypeAdapter(list[ValidatorRead])
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # ``If-None-Match`` usa a comparação fraca: W/"x" equivale a "x".
+    if not if_none_match:
+        return False
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return any(tag in ("*", etag) for tag in tags)
+
+
+def _conditional_json(request: Request, cached: CachedResponse) -> Response:
+    """Devolve o corpo já serializado com sua ``ETag``, ou ``304`` se o cliente já o tem."""
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
 @app.get("/validators", response_model=list[ValidatorRead])
-def list_validators(db: InMemoryDatabase = Depends(get_session)) -> list[dict]:
-    service = ValidationService(db)
-    return service.list_validators()
+def list_validators(request: Request, db: Database = Depends(get_db)) -> Response:
+    """Catálogo serializado uma vez por conjunto de layouts instalados (``VALIDATORS.generation``)."""
+
+    cache = get_response_cache()
+    key = f"validators:{VALIDATORS.generation}"
+    cached = cache.get(key)
+    if cached is None:
+        catalog = _CATALOG.validate_python(ValidationService(db).list_validators())
+        cached = CachedResponse.encode(_CATALOG.dump_json(catalog))
+        cache.put(key, cached)
+    return _conditional_json(request, cached)
 
 
-@app.post("/validations", response_model=ValidationResponse)
+def _validation_response(result: ValidationResult) -> ValidationResponse:
+    """Resumo da execução com só a primeira página das inconsistências; o resto segue por cursor."""
+
+    issues = result.issues
+    page = issues[:INLINE_ISSUE_LIMIT]
+    validation = ValidationRunRead.model_validate({**asdict(result.run), "issue_count": len(issues)})
+    return ValidationResponse(
+        validation=validation,
+        issues=[ValidationIssueRead.model_validate(issue) for issue in page],
+        next_cursor=page[-1].id if len(issues) > INLINE_ISSUE_LIMIT else None,
+    )
+
+
+def _job_response(service: ValidationService, run_id: int) -> ValidationJobRead:
+    state = service.get_run_status(run_id, get_job_queue())
+    if state is None:
+        raise HTTPException(status_code=404, detail="Validação não encontrada.")
+    run, progress = state
+    return ValidationJobRead(
+        run_id=run.id,
+        status=run.status,
+        progress=progress,
+        started_at=run.started_at,
+        finished_at=run.finished_at,
+        summary=run.summary,
+        issue_count=service.db.count_issues_for_run(run.id),
+    )
+
+
+@app.post(
+    "/validations",
+    response_model=ValidationResponse,
+    responses={202: {"model": ValidationJobRead, "description": "Validação enfileirada (background=true)."}},
+)
 def validate_file(
     organization_id: int = Form(...),
     regulator: str = Form(...),
     layout_version: str = Form("1.0"),
+    background: bool = Form(False),
+    max_errors: int | None = Form(None, ge=0),
+    max_issues_per_column: int | None = Form(None, ge=0),
+    precheck_lines: int | None = Form(None, ge=0),
+    previous_file_id: int | None = Form(None, gt=0),
     file: UploadFile = File(...),
-    db: InMemoryDatabase = Depends(get_session),
-) -> ValidationResponse:
+    db: Database = Depends(get_db),
+) -> ValidationResponse | JSONResponse:
     payload = ValidationRequest(
         organization_id=organization_id,
         regulator=regulator,
         layout_version=layout_version,
     )
-    raw_content = file.file.read().decode("utf-8")
-    service = ValidationService(db)
+    service = ValidationService(db, policy=_policy(max_errors, max_issues_per_column, precheck_lines))
     organization = db.get_organization(payload.organization_id)
     if not organization:
         raise HTTPException(status_code=404, detail="Organização não encontrada.")
+    _require_layout(payload)
+    if previous_file_id is not None:
+        previous = db.get_file(previous_file_id)
+        if previous is None or previous.organization_id != payload.organization_id:
+            raise HTTPException(status_code=404, detail="Arquivo anterior não encontrado.")
     regulatory_file = service.register_file(
         organization_id=payload.organization_id,
         regulator=payload.regulator,
         layout_version=payload.layout_version,
         filename=file.filename,
+        previous_file_id=previous_file_id,
     )
-    result = service.run_validation(regulatory_file, raw_content)
-    return ValidationResponse(validation=result.run, issues=result.issues)
+    timer = StageTimer()
+    if background:
+        # Envios compactados são gravados como chegaram e descompactados no processo do trabalho.
+        return _enqueue_upload(service, regulatory_file, file, timer)
+    with _decompression_errors():
+        # O envio (descompactado em fluxo se for gzip/bz2/xz/zip) segue direto para o validador,
+        # sem cópia em disco: os blocos da revalidação incremental são recortados durante a leitura.
+        result = service.run_validation(regulatory_file, open_decompressed(file.file), timer=timer)
+    with timer.stage("serialize"):
+        return _validation_response(result)
+
+
+def _require_layout(payload: ValidationRequest) -> None:
+    """Recusa com ``404`` validador ou versão de layout não instalados, antes de registrar o arquivo."""
+
+    try:
+        VALIDATORS.resolve(payload.regulator, payload.layout_version)
+    except LayoutNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@contextmanager
+def _decompression_errors() -> Iterator[None]:
+    """Converte falhas de descompressão em ``413`` (limites excedidos) ou ``400`` (arquivo inválido)."""
+
+    try:
+        yield
+    except DecompressionLimitError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except DecompressionError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _spool(file: UploadFile, timer: StageTimer) -> str:
+    """Grava o envio em um arquivo temporário (etapa ``upload``) e devolve o caminho."""
+
+    with timer.stage("upload"):
+        with tempfile.NamedTemporaryFile(prefix="remessa-", suffix=".upload", delete=False) as spool:
+            shutil.copyfileobj(file.file, spool)
+    return spool.name
+
+
+def _policy(
+    max_errors: int | None,
+    max_issues_per_column: int | None,
+    precheck_lines: int | None,
+) -> ValidationPolicy:
+    """Política padrão das configurações com os limites informados na requisição (``0`` desativa)."""
+
+    overrides = {
+        "max_errors": max_errors,
+        "max_issues_per_column": max_issues_per_column,
+        "precheck_lines": precheck_lines,
+    }
+    return replace(
+        ValidationPolicy.from_settings(),
+        **{name: value or None for name, value in overrides.items() if value is not None},
+    )
+
+
+def _enqueue_upload(
+    service: ValidationService,
+    regulatory_file: RegulatoryFile,
+    file: UploadFile,
+    timer: StageTimer,
+) -> JSONResponse:
+    path = _spool(file, timer)
+    try:
+        run = service.enqueue_validation(
+            regulatory_file, path, get_job_queue(), delete_after=True, timer=timer
+        )
+    except QueueFullError as exc:
+        os.unlink(path)
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"}) from exc
+    except BaseException:
+        os.unlink(path)
+        raise
+    return JSONResponse(status_code=202, content=jsonable_encoder(_job_response(service, run.id)))
+
+
+@app.post("/validations/batch", response_model=BatchValidationResponse)
+def validate_batch(
+    organization_id: int = Form(...),
+    regulators: list[str] = Form(...),
+    layout_version: str = Form("1.0"),
+    max_errors: int | None = Form(None, ge=0),
+    max_issues_per_column: int | None = Form(None, ge=0),
+    precheck_lines: int | None = Form(None, ge=0),
+    files: list[UploadFile] = File(default=[]),
+    archive: UploadFile | None = File(None),
+    db: Database = Depends(get_db),
+) -> BatchValidationResponse:
+    """Valida vários arquivos de uma organização em uma única requisição.
+
+    Os arquivos chegam como várias partes ``files`` e/ou um ``archive`` zip, lido
+    entrada a entrada. ``regulators`` traz um regulador para todos, um por arquivo
+    (na ordem) ou pares ``arquivo=regulador``. A validação é distribuída no pool
+    de processos da fila, com slots reservados na própria fila (``503`` se estiver
+    cheia), e a resposta traz apenas o resumo de cada arquivo.
+    """
+
+    if not files and archive is None:
+        raise HTTPException(status_code=422, detail="Envie ao menos um arquivo em files ou archive.")
+    if not db.get_organization(organization_id):
+        raise HTTPException(status_code=404, detail="Organização não encontrada.")
+    try:
+        assigned = assign_regulators([file.filename or "" for file in files], regulators)
+        items: list[BatchItem] | Iterator[BatchItem] = [
+            BatchItem(filename=file.filename or "", regulator=regulator, read=file.file.read)
+            for file, regulator in zip(files, assigned)
+        ]
+        if archive is not None:
+            items = itertools.chain(items, iter_zip_items(archive.file, regulators))
+        jobs = get_job_queue()
+        service = ValidationService(db, policy=_policy(max_errors, max_issues_per_column, precheck_lines))
+        with jobs.reserve(jobs.max_workers * 2) as slots:
+            outcomes = service.run_batch(
+                organization_id,
+                items,
+                layout_version=layout_version,
+                executor=jobs.executor,
+                max_in_flight=slots,
+            )
+    except QueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"}) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return BatchValidationResponse(
+        organization_id=organization_id,
+        file_count=len(outcomes),
+        issue_count=sum(outcome.issue_count for outcome in outcomes),
+        items=[_batch_item_response(outcome) for outcome in outcomes],
+    )
+
+
+def _batch_item_response(outcome: BatchOutcome) -> BatchValidationItemRead:
+    return BatchValidationItemRead(
+        filename=outcome.filename,
+        regulator=outcome.regulator,
+        run_id=outcome.run.id if outcome.run is not None else None,
+        status=outcome.status,
+        issue_count=outcome.issue_count,
+        summary=outcome.run.summary if outcome.run is not None else None,
+        error=outcome.error,
+    )
+
+
+@app.get("/validations/cache/stats", response_model=ResultCacheStatsRead)
+def get_result_cache_stats() -> ResultCacheStatsRead:
+    return ResultCacheStatsRead(**get_result_cache().stats())
+
+
+@app.get("/validations/{run_id}", response_model=ValidationJobRead)
+def get_validation_status(run_id: int, request: Request, db: Database = Depends(get_db)) -> Response:
+    """Situação da execução; a de execuções concluídas é serializada uma única vez."""
+
+    cache = get_response_cache()
+    key = run_response_key(run_id)
+    cached = cache.get(key)
+    if cached is None:
+        job = _job_response(ValidationService(db), run_id)
+        cached = CachedResponse.encode(job.model_dump_json().encode())
+        if job.finished_at is not None and job.status not in ("pending", "running"):
+            # Concluída, a execução não muda mais; o serviço descarta a entrada se ela for regravada.
+            cache.put(key, cached)
+    return _conditional_json(request, cached)
+
+
+def _issue_filter(
+    severity: str | None = None,
+    column_name: str | None = None,
+    line_from: int | None = Query(None, ge=1),
+    line_to: int | None = Query(None, ge=1),
+) -> IssueFilter:
+    return IssueFilter(severity=severity, column_name=column_name, line_from=line_from, line_to=line_to)
+
+
+def _require_run(db: Database, run_id: int) -> None:
+    if db.get_run(run_id) is None:
+        raise HTTPException(status_code=404, detail="Validação não encontrada.")
+
+
+@app.get("/validations/{run_id}/issues", response_model=IssuePageRead)
+def list_validation_issues(
+    run_id: int,
+    after: int = Query(0, ge=0, description="Cursor: id da última inconsistência já recebida."),
+    limit: int = Query(100, ge=1, le=1000),
+    issue_filter: IssueFilter = Depends(_issue_filter),
+    db: Database = Depends(get_db),
+) -> IssuePageRead:
+    _require_run(db, run_id)
+    # Um item a mais indica se existe próxima página sem precisar contar.
+    issues = db.list_issues_page(run_id, after_id=after, limit=limit + 1, issue_filter=issue_filter)
+    page = issues[:limit]
+    return IssuePageRead(
+        run_id=run_id,
+        items=[ValidationIssueRead.model_validate(issue) for issue in page],
+        next_cursor=page[-1].id if len(issues) > limit else None,
+    )
+
+
+@app.get("/validations/{run_id}/issues/export")
+def export_validation_issues(
+    run_id: int,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    issue_filter: IssueFilter = Depends(_issue_filter),
+    db: Database = Depends(get_db),
+) -> StreamingResponse:
+    """Exporta todas as inconsistências (filtradas) em fluxo, direto do armazenamento."""
+
+    _require_run(db, run_id)
+    return StreamingResponse(
+        EXPORTERS[format](db.iter_issue_rows(run_id, issue_filter)),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="validacao-{run_id}-inconsistencias.{format}"'},
+    )
+
+
+@app.post("/validations/stream", response_model=ValidationResponse)
+async def validate_stream(
+    request: Request,
+    organization_id: int,
+    regulator: str,
+    layout_version: str = "1.0",
+    filename: str = "upload.csv",
+    max_errors: int | None = Query(None, ge=0),
+    max_issues_per_column: int | None = Query(None, ge=0),
+    precheck_lines: int | None = Query(None, ge=0),
+    db: Database = Depends(get_db),
+) -> ValidationResponse:
+    """Valida o corpo bruto da requisição à medida que ele chega.
+
+    A validação roda no threadpool consumindo uma fila limitada de blocos, logo
+    começa antes do término do upload e aplica contrapressão ao cliente. Os
+    limites da política vêm da query string, como os campos de ``/validations``.
+    """
+
+    payload = ValidationRequest(
+        organization_id=organization_id,
+        regulator=regulator,
+        layout_version=layout_version,
+    )
+    service = ValidationService(db, policy=_policy(max_errors, max_issues_per_column, precheck_lines))
+    if not db.get_organization(payload.organization_id):
+        raise HTTPException(status_code=404, detail="Organização não encontrada.")
+    _require_layout(payload)
+    regulatory_file = service.register_file(
+        organization_id=payload.organization_id,
+        regulator=payload.regulator,
+        layout_version=payload.layout_version,
+        filename=filename,
+    )
+
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+
+    def body() -> Iterator[bytes]:
+        while (chunk := asyncio.run_coroutine_threadsafe(chunks.get(), loop).result()) is not None:
+            yield chunk
+
+    timer = StageTimer()
+    validation = asyncio.ensure_future(
+        run_in_threadpool(service.run_validation, regulatory_file, body(), timer=timer)
+    )
+
+    async def offer(item: bytes | None) -> None:
+        # Espera espaço na fila ou o fim da validação (que pode parar de consumir antes do fim do corpo).
+        if validation.done():
+            return
+        put = asyncio.ensure_future(chunks.put(item))
+        await asyncio.wait((put, validation), return_when=asyncio.FIRST_COMPLETED)
+        put.cancel()
+
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await offer(chunk)
+    finally:
+        await offer(None)
+    result = await validation
+    with timer.stage("serialize"):
+        return _validation_response(result)
 
 
 __all__ = ["app"]
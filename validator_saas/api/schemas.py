@@ -33,6 +33,7 @@ class ValidationRequest(BaseModel):
 
 
 class ValidationIssueRead(BaseModel):
+    id: Optional[int] = None
     line_number: Optional[int] = None
     column_name: Optional[str] = None
     severity: str
@@ -43,19 +44,71 @@ class ValidationIssueRead(BaseModel):
 
 class ValidationRunRead(BaseModel):
     id: int
+    regulatory_file_id: Optional[int] = Field(
+        default=None, description="Arquivo validado; informe-o em previous_file_id ao reenviar a correção."
+    )
     validator_key: str
     started_at: datetime
     finished_at: Optional[datetime]
     status: str
     summary: Optional[str]
-    issues: list[ValidationIssueRead]
+    cached_from_run_id: Optional[int] = None
+    timings: Optional[dict[str, float]] = Field(
+        default=None, description="Segundos gastos em cada etapa da execução (VALIDATOR_RUN_TIMINGS)."
+    )
+    issue_count: int = 0
 
     model_config = {"from_attributes": True}
 
 
 class ValidationResponse(BaseModel):
     validation: ValidationRunRead
-    issues: list[ValidationIssueRead]
+    issues: list[ValidationIssueRead] = Field(description="Primeira página das inconsistências.")
+    next_cursor: Optional[int] = Field(
+        default=None,
+        description="Cursor para continuar em GET /validations/{run_id}/issues?after=...; nulo se não houver mais.",
+    )
+
+
+class IssuePageRead(BaseModel):
+    run_id: int
+    items: list[ValidationIssueRead]
+    next_cursor: Optional[int] = None
+
+
+class ValidationJobRead(BaseModel):
+    run_id: int
+    status: str = Field(description="pending | running | completed | completed_with_issues | aborted | failed | rejected")
+    progress: float = Field(ge=0, le=1)
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    summary: Optional[str] = None
+    issue_count: int = 0
+
+
+class BatchValidationItemRead(BaseModel):
+    filename: str
+    regulator: Optional[str] = None
+    run_id: Optional[int] = None
+    status: str = Field(description="completed | completed_with_issues | aborted | failed | rejected")
+    issue_count: int = 0
+    summary: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchValidationResponse(BaseModel):
+    organization_id: int
+    file_count: int
+    issue_count: int
+    items: list[BatchValidationItemRead]
+
+
+class ResultCacheStatsRead(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    issue_bytes: int
 
 
 class LayoutFieldRead(BaseModel):
@@ -63,17 +116,23 @@ class LayoutFieldRead(BaseModel):
     type: str
     required: bool
     max_length: Optional[int] = None
+    pattern: Optional[str] = None
+    start: Optional[int] = None
+    length: Optional[int] = None
 
 
 class LayoutRead(BaseModel):
     name: str
     version: str
+    delimiter: Optional[str] = ","
     fields: list[LayoutFieldRead]
+    rules: list[str] = []
 
 
 class ValidatorRead(BaseModel):
     key: str
     regulator: str
+    versions: list[str] = []
     layout: LayoutRead
 
 
@@ -84,6 +143,11 @@ __all__ = [
     "ValidationIssueRead",
     "ValidationRunRead",
     "ValidationResponse",
+    "IssuePageRead",
+    "ValidationJobRead",
+    "BatchValidationItemRead",
+    "BatchValidationResponse",
+    "ResultCacheStatsRead",
     "LayoutFieldRead",
     "LayoutRead",
     "ValidatorRead",
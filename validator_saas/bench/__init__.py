@@ -0,0 +1,20 @@
+"""Gerador de remessas sintéticas e medição de desempenho dos validadores.
+
+Uso::
+
+    python -m validator_saas.bench run --rows 200000 --output resultado.json
+    python -m validator_saas.bench generate dimp remessa.csv --rows 1000000 --error-rate 0.02
+"""
+
+from .generator import DEFAULT_ERROR_MIX, ERROR_KINDS, GeneratorOptions, RemessaGenerator, parse_error_mix
+from .runner import STAGES, run_benchmark
+
+__all__ = [
+    "DEFAULT_ERROR_MIX",
+    "ERROR_KINDS",
+    "GeneratorOptions",
+    "RemessaGenerator",
+    "STAGES",
+    "parse_error_mix",
+    "run_benchmark",
+]
@@ -0,0 +1,92 @@
+"""Linha de comando do benchmark: ``python -m validator_saas.bench --help``."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TextIO
+
+from ..validators import VALIDATORS
+from .generator import ERROR_KINDS, GeneratorOptions, RemessaGenerator, parse_error_mix
+from .runner import run_benchmark
+
+
+def _add_generator_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--rows", type=int, default=100_000, help="Linhas por remessa (padrão: 100000).")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Fração de linhas com erro (padrão: 0.01).")
+    parser.add_argument(
+        "--error-mix",
+        type=parse_error_mix,
+        default=None,
+        help=f"Pesos dos tipos de erro, ex.: type=4,required=1 (tipos: {', '.join(ERROR_KINDS)}).",
+    )
+    parser.add_argument("--line-length", type=int, default=None, help="Completa as linhas até este tamanho.")
+    parser.add_argument("--seed", type=int, default=7, help="Semente do gerador (padrão: 7).")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m validator_saas.bench",
+        description="Gera remessas sintéticas e mede o desempenho dos validadores.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Mede os validadores e emite o relatório em JSON.")
+    run.add_argument(
+        "--validators",
+        nargs="+",
+        choices=sorted(VALIDATORS),
+        default=None,
+        help="Validadores a medir (padrão: todos).",
+    )
+    _add_generator_arguments(run)
+    run.add_argument("--no-http", action="store_true", help="Não mede o endpoint HTTP.")
+    run.add_argument(
+        "--no-isolate",
+        action="store_true",
+        help="Mede no próprio processo (mais rápido, mas o pico de RSS passa a ser o do processo inteiro).",
+    )
+    run.add_argument("--output", type=Path, default=None, help="Grava o JSON no arquivo em vez da saída padrão.")
+
+    generate = commands.add_parser("generate", help="Grava uma remessa sintética.")
+    generate.add_argument("validator", choices=sorted(VALIDATORS), help="Layout da remessa.")
+    generate.add_argument("path", type=Path, help="Arquivo de saída.")
+    _add_generator_arguments(generate)
+    return parser
+
+
+def _options(args: argparse.Namespace) -> GeneratorOptions:
+    options = {"rows": args.rows, "error_rate": args.error_rate, "line_length": args.line_length, "seed": args.seed}
+    if args.error_mix is not None:
+        options["error_mix"] = args.error_mix
+    return GeneratorOptions(**options)
+
+
+def main(argv: Sequence[str] | None = None, out: TextIO | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    out = out or sys.stdout
+    try:
+        options = _options(args)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.command == "generate":
+        size = RemessaGenerator(VALIDATORS[args.validator], options).write(args.path)
+        out.write(f"{args.path}: {options.rows} linhas, {size} bytes\n")
+        return 0
+
+    report = run_benchmark(args.validators, options, http=not args.no_http, isolate=not args.no_isolate)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output is not None:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        out.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - execução direta
+    raise SystemExit(main())
@@ -0,0 +1,240 @@
+"""Gerador de remessas sintéticas a partir dos layouts declarados.
+
+Cada valor é derivado da ``FieldDefinition`` (tipo, tamanho máximo, padrão e
+posição) e das regras entre registros do layout, de modo que linhas válidas não
+geram inconsistências. Uma fração ``error_rate`` das linhas recebe um erro de um
+dos tipos de ``ERROR_KINDS``, sorteado com os pesos de ``error_mix``.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from ..validators import LayoutValidator
+from ..validators.layout import CNPJ_PATTERN, CPF_PATTERN, DATE_PATTERN, FieldDefinition
+from ..validators.rules import FieldComparison, TrailerTotal, UniqueKey
+
+ERROR_KINDS = ("type", "required", "length", "pattern", "columns", "rule")
+"""Tipos de erro: valor não numérico, campo obrigatório vazio, tamanho excedido,
+formato inválido, quantidade de colunas (ou posições) errada e violação de regra
+entre registros."""
+
+DEFAULT_ERROR_MIX: Mapping[str, float] = {
+    "type": 4,
+    "required": 2,
+    "length": 1,
+    "pattern": 2,
+    "columns": 1,
+    "rule": 1,
+}
+
+PATTERN_SAMPLES = {
+    CNPJ_PATTERN: ("12345678000190", "12.345.678/0001-90"),
+    CPF_PATTERN: ("12345678901", "123.456.789-01"),
+    DATE_PATTERN: ("20240131", "20231201"),
+}
+"""Valores válidos para os padrões dos layouts; padrões novos precisam de uma entrada aqui."""
+
+_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+_BELOW = ("<", "<=", "!=")
+_ABOVE = (">", ">=")
+
+
+@dataclass(frozen=True)
+class GeneratorOptions:
+    """Parâmetros da remessa sintética.
+
+    ``line_length`` completa as linhas válidas com zeros à esquerda nos campos
+    numéricos até o tamanho pedido (ignorado em layouts posicionais).
+    """
+
+    rows: int = 100_000
+    error_rate: float = 0.01
+    error_mix: Mapping[str, float] = field(default_factory=lambda: dict(DEFAULT_ERROR_MIX))
+    line_length: int | None = None
+    seed: int = 7
+
+    def __post_init__(self) -> None:
+        unknown = sorted(set(self.error_mix) - set(ERROR_KINDS))
+        if unknown:
+            raise ValueError(f"Tipos de erro desconhecidos: {', '.join(unknown)}.")
+
+
+def parse_error_mix(text: str) -> dict[str, float]:
+    """Converte ``"type=4,required=1"`` no dicionário de pesos de ``GeneratorOptions.error_mix``."""
+
+    mix: dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        kind, _, weight = item.partition("=")
+        mix[kind.strip()] = float(weight) if weight else 1.0
+    return mix
+
+
+def _base36(number: int, width: int) -> str:
+    text = ""
+    while number:
+        number, digit = divmod(number, 36)
+        text = _DIGITS[digit] + text
+    return text.rjust(width, "0")[-width:]
+
+
+class RemessaGenerator:
+    """Linhas sintéticas de um validador, reprodutíveis pela semente de ``options``."""
+
+    def __init__(self, validator: LayoutValidator, options: GeneratorOptions | None = None) -> None:
+        self.validator = validator
+        self.options = options or GeneratorOptions()
+        layout = validator.layout
+        self.layout = layout
+        self.fields = layout.fields
+        self._index = {definition.name: position for position, definition in enumerate(self.fields)}
+        self._numeric = [
+            position for position, definition in enumerate(self.fields) if definition.type_ in (int, float)
+        ]
+        self._padded = [position for position in self._numeric if self.fields[position].max_length is None]
+        self._trailer = next((rule for rule in layout.rules if isinstance(rule, TrailerTotal)), None)
+        self._comparisons = [rule for rule in layout.rules if isinstance(rule, FieldComparison)]
+        self._keys = [rule for rule in layout.rules if isinstance(rule, UniqueKey)]
+        candidates = {
+            "type": self._numeric,
+            "required": [position for position, definition in enumerate(self.fields) if definition.required],
+            "length": [
+                position
+                for position, definition in enumerate(self.fields)
+                if definition.max_length is not None and not layout.positional
+            ],
+            "pattern": [position for position, definition in enumerate(self.fields) if definition.pattern],
+            "columns": list(range(len(self.fields))),
+            "rule": list(range(len(self.fields))) if self._comparisons or self._keys else [],
+        }
+        self._candidates = candidates
+        mix = self.options.error_mix
+        weights = {kind: weight for kind, weight in mix.items() if weight > 0 and candidates[kind]}
+        self._kinds = list(weights)
+        self._weights = list(weights.values())
+
+    # Valores --------------------------------------------------------------
+    def _width(self, definition: FieldDefinition) -> int | None:
+        return definition.length if self.layout.positional else definition.max_length
+
+    def _value(self, definition: FieldDefinition, index: int, rng: random.Random) -> str:
+        width = self._width(definition)
+        if definition.pattern:
+            samples = PATTERN_SAMPLES.get(definition.pattern)
+            if samples is None:
+                raise ValueError(f"Sem valor de exemplo para o padrão do campo {definition.name}.")
+            return next((sample for sample in samples if width is None or len(sample) <= width), samples[0])
+        if definition.type_ is int:
+            return str(rng.randrange(10 ** min(width or 6, 6)))
+        if definition.type_ is float:
+            digits = min((width or 12) - 3, 7)
+            return f"{rng.randrange(10 ** max(digits, 1)) / 100:.2f}"
+        return _base36(index, min(width or 8, 8))
+
+    def _valid_row(self, index: int, rng: random.Random) -> list[str]:
+        row = [self._value(definition, index, rng) for definition in self.fields]
+        trailer = self._trailer
+        if trailer is not None:
+            row[self._index[trailer.record_field]] = "2" if trailer.trailer_code == "1" else "1"
+        for rule in self._comparisons:
+            # ``left`` é derivado de ``right`` de modo a atender ao operador da regra.
+            left, right = self._index[rule.left], self._index[rule.right]
+            value = Decimal(row[right])
+            if rule.operator in _BELOW:
+                value = value / 2 if value >= 1 else value - 1
+            elif rule.operator in _ABOVE:
+                value = value * 2 + 1
+            row[left] = f"{value:.2f}"
+        return row
+
+    def _break(self, row: list[str], kind: str, rng: random.Random, previous: list[str] | None) -> list[str]:
+        position = rng.choice(self._candidates[kind])
+        definition = self.fields[position]
+        if kind == "type":
+            row[position] = "abc"
+        elif kind == "required":
+            row[position] = ""
+        elif kind == "length":
+            row[position] = "9" * (definition.max_length + 1)
+        elif kind == "pattern":
+            row[position] = "X" * min(self._width(definition) or 3, 3)
+        elif kind == "columns":
+            row = row[:-1] if len(row) > 1 else row + ["extra"]
+        elif self._comparisons:
+            rule = rng.choice(self._comparisons)
+            left, right = self._index[rule.left], self._index[rule.right]
+            value = Decimal(row[right])
+            if rule.operator in _ABOVE:
+                value -= 1
+            elif rule.operator != "!=":
+                value += 1
+            row[left] = f"{value:.2f}"
+        elif previous is not None:
+            for name in rng.choice(self._keys).fields:
+                row[self._index[name]] = previous[self._index[name]]
+        return row
+
+    # Linhas ---------------------------------------------------------------
+    def _format(self, row: list[str]) -> str:
+        if self.layout.positional:
+            line = [" "] * (self.layout.record_length or 0)
+            for definition, value in zip(self.fields, row):
+                cell = value[: definition.length].rjust(definition.length or 0)
+                line[definition.start : definition.end] = cell
+            text = "".join(line)
+            return text if len(row) == len(self.fields) else text[:-1]
+        line = self.layout.delimiter.join(row)
+        missing = (self.options.line_length or 0) - len(line)
+        if missing > 0 and self._padded and len(row) == len(self.fields):
+            for offset, position in enumerate(self._padded):
+                share = missing // len(self._padded) + (offset < missing % len(self._padded))
+                row[position] = "0" * share + row[position]
+            line = self.layout.delimiter.join(row)
+        return line
+
+    def lines(self) -> Iterator[str]:
+        """Linhas da remessa (com ``\\n``), incluindo o trailer exigido pelas regras do layout."""
+
+        options = self.options
+        rng = random.Random(options.seed)
+        trailer = self._trailer
+        total = Decimal(0)
+        previous: list[str] | None = None
+        for index in range(options.rows):
+            row = self._valid_row(index, rng)
+            if self._kinds and rng.random() < options.error_rate:
+                kind = rng.choices(self._kinds, self._weights)[0]
+                row = self._break(row, kind, rng, previous)
+            if trailer is not None and len(row) == len(self.fields):
+                try:
+                    total += Decimal(row[self._index[trailer.field]] or "0")
+                except InvalidOperation:
+                    pass
+            previous = row
+            yield self._format(row) + "\n"
+        if trailer is not None:
+            row = self._valid_row(options.rows, rng)
+            row[self._index[trailer.record_field]] = trailer.trailer_code
+            row[self._index[trailer.field]] = str(total)
+            yield self._format(row) + "\n"
+
+    def write(self, path: str | os.PathLike) -> int:
+        """Grava a remessa em ``path`` e devolve o tamanho em bytes."""
+
+        with open(path, "w", encoding="utf-8", newline="") as stream:
+            stream.writelines(self.lines())
+        return os.path.getsize(path)
+
+
+__all__ = [
+    "DEFAULT_ERROR_MIX",
+    "ERROR_KINDS",
+    "GeneratorOptions",
+    "PATTERN_SAMPLES",
+    "RemessaGenerator",
+    "parse_error_mix",
+]
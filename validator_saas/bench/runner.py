@@ -0,0 +1,223 @@
+"""Medição de vazão, pico de memória e tempo por etapa sobre remessas sintéticas.
+
+Cada validador é medido em três frentes sobre o mesmo arquivo gerado:
+
+- ``stages``: decodificação, divisão em colunas, verificação, persistência das
+  inconsistências e serialização da resposta, cada uma cronometrada à parte.
+  Decodificar, dividir e verificar acontecem na mesma passada durante a
+  validação, então são medidos por passadas cumulativas (só decodificar, depois
+  decodificar e dividir, depois validar) e cada etapa é a diferença entre elas;
+- ``service``: ``ValidationService.run_validation`` de ponta a ponta;
+- ``http``: ``POST /validations`` pelo ``TestClient`` do FastAPI (exige ``httpx``).
+
+Com ``isolate`` cada medição roda em um processo novo, de modo que o pico de RSS
+(``peak_rss_bytes``) é o da própria medição.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from ..config import get_settings
+from ..database import InMemoryDatabase
+from ..services.cache import ValidationResultCache
+from ..services.validation_service import ValidationService
+from ..validators import VALIDATORS
+from ..validators.layout import iter_lines, iter_text_chunks
+from .generator import GeneratorOptions, RemessaGenerator
+
+STAGES = ("decode", "split", "check", "persistence", "serialization")
+
+SCHEMA_VERSION = 1
+"""Versão do formato JSON emitido; muda quando campos existentes mudam de sentido."""
+
+
+def peak_rss_bytes() -> int | None:
+    """Pico de memória residente do processo, ou ``None`` onde ``resource`` não existe."""
+
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _timed(function: Callable[[], Any]) -> tuple[float, Any]:
+    started = time.perf_counter()
+    value = function()
+    return time.perf_counter() - started, value
+
+
+def _drain(items: Iterable[Any]) -> None:
+    for _ in items:
+        pass
+
+
+def measure_stages(key: str, path: str) -> dict[str, Any]:
+    """Tempo (s) de cada etapa de ``STAGES`` validando ``path`` com o validador ``key``."""
+
+    from ..api.export import iter_ndjson
+    from ..api.main import _validation_response
+    from ..models import ValidationRun
+
+    validator = VALIDATORS[key]
+    delimiter = validator.layout.delimiter
+
+    def read(function: Callable[[Any], Any]) -> Callable[[], Any]:
+        def run() -> Any:
+            with open(path, "rb") as stream:
+                return function(stream)
+
+        return run
+
+    decoded, _ = _timed(read(lambda stream: _drain(iter_text_chunks(stream))))
+    split, _ = _timed(read(lambda stream: _drain(iter_lines(stream, delimiter=delimiter))))
+    run = ValidationRun(id=1, regulatory_file_id=1, validator_key=key, started_at=datetime.utcnow())
+    checked, result = _timed(read(lambda stream: validator.validate(stream, run)))
+
+    db = InMemoryDatabase(get_settings().issue_store)
+    stored_run = db.create_run(regulatory_file_id=1, validator_key=key)
+    persisted, result.issues = _timed(lambda: db.add_issues_bulk(stored_run.id, result.issues))
+
+    def serialize() -> None:
+        _validation_response(result).model_dump_json()
+        _drain(iter_ndjson(db.iter_issue_rows(stored_run.id)))
+
+    serialized, _ = _timed(serialize)
+    return {
+        "decode": decoded,
+        "split": max(split - decoded, 0.0),
+        "check": max(checked - split, 0.0),
+        "persistence": persisted,
+        "serialization": serialized,
+        "issues": len(result.issues),
+    }
+
+
+def measure_service(key: str, path: str) -> dict[str, Any]:
+    """``ValidationService.run_validation`` sobre ``path``, com cache de resultados desativado."""
+
+    db = InMemoryDatabase(get_settings().issue_store)
+    service = ValidationService(db, cache=ValidationResultCache(max_entries=0))
+    organization = service.create_organization("Benchmark", "adquirente", "12.345.678/0001-90")
+    regulatory_file = service.register_file(organization.id, key, "1.0", os.path.basename(path))
+    seconds, result = _timed(lambda: service.run_validation(regulatory_file, Path(path)))
+    return {"seconds": seconds, "issues": len(result.issues), "peak_rss_bytes": peak_rss_bytes()}
+
+
+def measure_http(key: str, path: str) -> dict[str, Any] | None:
+    """``POST /validations`` síncrono com o arquivo em multipart; ``None`` sem ``httpx``."""
+
+    try:
+        from fastapi.testclient import TestClient
+    except (ImportError, RuntimeError):
+        return None
+    from ..api.main import app
+    from ..services.cache import get_result_cache
+
+    get_result_cache().clear()
+    with TestClient(app) as client:
+        organization = client.post(
+            "/organizations",
+            json={"name": "Benchmark", "role": "adquirente", "tax_id": "12.345.678/0001-90"},
+        ).json()
+
+        def post() -> Any:
+            with open(path, "rb") as stream:
+                return client.post(
+                    "/validations",
+                    data={"organization_id": str(organization["id"]), "regulator": key},
+                    files={"file": (os.path.basename(path), stream)},
+                )
+
+        seconds, response = _timed(post)
+    response.raise_for_status()
+    issues = response.json()["validation"]["issue_count"]
+    return {"seconds": seconds, "issues": issues, "peak_rss_bytes": peak_rss_bytes()}
+
+
+def _measure(function: Callable[[str, str], Any], key: str, path: str, isolate: bool) -> Any:
+    if not isolate:
+        return function(key, path)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(function, key, path).result()
+
+
+def _throughput(measurement: dict[str, Any] | None, rows: int) -> dict[str, Any] | None:
+    if measurement is not None:
+        measurement["rows_per_second"] = rows / measurement["seconds"] if measurement["seconds"] else None
+    return measurement
+
+
+def run_benchmark(
+    keys: Iterable[str] | None = None,
+    options: GeneratorOptions | None = None,
+    http: bool = True,
+    isolate: bool = True,
+    directory: str | os.PathLike | None = None,
+) -> dict[str, Any]:
+    """Gera uma remessa por validador de ``keys`` (todos, por padrão) e mede cada um.
+
+    Devolve o relatório serializável em JSON: ambiente, opções do gerador e, por
+    validador, tamanho da remessa, etapas, serviço e HTTP.
+    """
+
+    options = options or GeneratorOptions()
+    keys = list(keys or VALIDATORS)
+    unknown = sorted(set(keys) - set(VALIDATORS))
+    if unknown:
+        raise ValueError(f"Validadores desconhecidos: {', '.join(unknown)}.")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="validador-bench-", dir=directory) as workdir:
+        for key in keys:
+            path = os.path.join(workdir, f"{key}.csv")
+            size = RemessaGenerator(VALIDATORS[key], options).write(path)
+            rows = options.rows
+            stages = _measure(measure_stages, key, path, isolate)
+            results.append(
+                {
+                    "validator": key,
+                    "engine": "numpy" if VALIDATORS[key].vectorized else "python",
+                    "rows": rows,
+                    "bytes": size,
+                    "issues": stages.pop("issues"),
+                    "stages": stages,
+                    "service": _throughput(_measure(measure_service, key, path, isolate), rows),
+                    "http": _throughput(_measure(measure_http, key, path, isolate) if http else None, rows),
+                }
+            )
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "isolated": isolate,
+        "options": {**asdict(options), "error_mix": dict(options.error_mix)},
+        "results": results,
+    }
+
+
+__all__ = [
+    "SCHEMA_VERSION",
+    "STAGES",
+    "measure_http",
+    "measure_service",
+    "measure_stages",
+    "peak_rss_bytes",
+    "run_benchmark",
+]
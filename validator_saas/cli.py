@@ -0,0 +1,107 @@
+"""Linha de comando para validar remessas já presentes no disco local.
+
+Uso::
+
+    python -m validator_saas.cli remessa.csv --regulator bacen
+    python -m validator_saas.cli remessa.csv --regulator dirf --organization-id 3 --format json
+
+O arquivo é mapeado em memória (``mmap``). Sem ``--organization-id`` a execução
+usa um banco em memória descartável; com ele, a execução é registrada no banco
+configurado em ``VALIDATOR_DATABASE_URL``. O código de saída é ``0`` quando não
+há inconsistências, ``1`` quando há e ``2`` em erros de uso.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections.abc import Sequence
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterator, TextIO
+
+from .database import Database, InMemoryDatabase, get_session, init_db
+from .services.validation_service import ValidationService
+from .validators import VALIDATORS, LayoutNotFoundError, ValidationResult
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m validator_saas.cli",
+        description="Valida um arquivo regulatório local.",
+    )
+    parser.add_argument("path", type=Path, help="Caminho do arquivo a validar.")
+    parser.add_argument("--regulator", required=True, choices=sorted(VALIDATORS), help="Validador a aplicar.")
+    parser.add_argument("--layout-version", default="1.0", help="Versão do layout (padrão: 1.0).")
+    parser.add_argument(
+        "--organization-id",
+        type=int,
+        help="Registra a execução para esta organização no banco configurado.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processos para dividir arquivos grandes (ver VALIDATOR_PARALLEL_THRESHOLD_BYTES).",
+    )
+    parser.add_argument("--format", choices=("text", "json"), default="text", help="Formato da saída.")
+    return parser
+
+
+@contextmanager
+def _database(organization_id: int | None) -> Iterator[tuple[Database, int]]:
+    if organization_id is None:
+        db = InMemoryDatabase()
+        organization = db.create_organization(name="Linha de comando", role="cli", tax_id="")
+        yield db, organization.id
+        return
+    init_db()
+    with get_session() as db:
+        yield db, organization_id
+
+
+def _write_text(result: ValidationResult, out: TextIO) -> None:
+    for issue in result.issues:
+        location = f"linha {issue.line_number}" if issue.line_number is not None else "arquivo"
+        column = f" [{issue.column_name}]" if issue.column_name else ""
+        out.write(f"{location}{column}: {issue.message}\n")
+    out.write(f"{result.run.summary}\n")
+
+
+def _write_json(result: ValidationResult, out: TextIO) -> None:
+    payload = {**asdict(result.run), "issues": [asdict(issue) for issue in result.issues]}
+    json.dump(payload, out, ensure_ascii=False, default=str)
+    out.write("\n")
+
+
+def main(argv: Sequence[str] | None = None, out: TextIO | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    out = out or sys.stdout
+    if not args.path.is_file():
+        parser.error(f"arquivo não encontrado: {args.path}")
+    try:
+        VALIDATORS.resolve(args.regulator, args.layout_version)
+    except LayoutNotFoundError as exc:
+        parser.error(str(exc))
+
+    with _database(args.organization_id) as (db, organization_id):
+        if db.get_organization(organization_id) is None:
+            parser.error(f"organização não encontrada: {organization_id}")
+        service = ValidationService(db)
+        regulatory_file = service.register_file(
+            organization_id=organization_id,
+            regulator=args.regulator,
+            layout_version=args.layout_version,
+            filename=args.path.name,
+        )
+        result = service.validate_path(regulatory_file, args.path, parallel_workers=args.workers)
+
+    (_write_json if args.format == "json" else _write_text)(result, out)
+    return 1 if result.issues else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - execução direta
+    raise SystemExit(main())
@@ -12,8 +12,35 @@ class Settings:
     """Representa parâmetros configuráveis do aplicativo."""
 
     database_url: str = os.getenv("VALIDATOR_DATABASE_URL", "memory://local")
+    database_pool_size: int = int(os.getenv("VALIDATOR_DATABASE_POOL_SIZE", "4"))
+    database_pool_timeout: float = float(os.getenv("VALIDATOR_DATABASE_POOL_TIMEOUT", "30"))
     app_name: str = os.getenv("VALIDATOR_APP_NAME", "Regulatory Validator SaaS")
     api_prefix: str = os.getenv("VALIDATOR_API_PREFIX", "/api")
+    result_cache_entries: int = int(os.getenv("VALIDATOR_RESULT_CACHE_ENTRIES", "256"))
+    result_cache_issue_bytes: int = int(os.getenv("VALIDATOR_RESULT_CACHE_ISSUE_BYTES", str(64 * 1024 * 1024)))
+    response_cache_entries: int = int(os.getenv("VALIDATOR_RESPONSE_CACHE_ENTRIES", "1024"))
+    response_cache_bytes: int = int(os.getenv("VALIDATOR_RESPONSE_CACHE_BYTES", str(16 * 1024 * 1024)))
+    issue_store: str = os.getenv("VALIDATOR_ISSUE_STORE", "objects")
+    memory_issue_bytes: int | None = int(os.getenv("VALIDATOR_MEMORY_ISSUE_BYTES", "0")) or None
+    run_ttl_seconds: float | None = float(os.getenv("VALIDATOR_RUN_TTL_SECONDS", "0")) or None
+    retention_mode: str = os.getenv("VALIDATOR_RETENTION_MODE", "spill")
+    spill_dir: str | None = os.getenv("VALIDATOR_SPILL_DIR") or None
+    spill_max_bytes: int | None = int(os.getenv("VALIDATOR_SPILL_MAX_BYTES", "0")) or None
+    job_workers: int | None = int(os.getenv("VALIDATOR_JOB_WORKERS", "0")) or None
+    job_queue_size: int = int(os.getenv("VALIDATOR_JOB_QUEUE_SIZE", "32"))
+    max_errors: int | None = int(os.getenv("VALIDATOR_MAX_ERRORS", "0")) or None
+    max_issues_per_column: int | None = int(os.getenv("VALIDATOR_MAX_ISSUES_PER_COLUMN", "0")) or None
+    precheck_lines: int | None = int(os.getenv("VALIDATOR_PRECHECK_LINES", "0")) or None
+    parallel_threshold_bytes: int = int(os.getenv("VALIDATOR_PARALLEL_THRESHOLD_BYTES", str(64 * 1024 * 1024)))
+    validator_engines: str = os.getenv("VALIDATOR_ENGINES", "")
+    rule_max_keys: int = int(os.getenv("VALIDATOR_RULE_MAX_KEYS", "1000000"))
+    incremental_block_lines: int = int(os.getenv("VALIDATOR_INCREMENTAL_BLOCK_LINES", "4096"))
+    incremental_manifests: int = int(os.getenv("VALIDATOR_INCREMENTAL_MANIFESTS", "64"))
+    max_decompressed_bytes: int | None = int(os.getenv("VALIDATOR_MAX_DECOMPRESSED_BYTES", str(2**33))) or None
+    max_compression_ratio: float | None = float(os.getenv("VALIDATOR_MAX_COMPRESSION_RATIO", "100")) or None
+    layouts_path: str = os.getenv("VALIDATOR_LAYOUTS_PATH", "")
+    layout_cache_size: int = int(os.getenv("VALIDATOR_LAYOUT_CACHE_SIZE", "64"))
+    run_timings: bool = os.getenv("VALIDATOR_RUN_TIMINGS", "1") not in ("0", "false", "False")
 
 
 @lru_cache
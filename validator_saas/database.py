@@ -2,6 +2,24 @@
 
 from __future__ import annotations
 
-from .storage import InMemoryDatabase, get_session, init_db
+from .storage import (
+    Database,
+    InMemoryDatabase,
+    SQLiteDatabase,
+    close_db,
+    create_database,
+    enforce_retention,
+    get_session,
+    init_db,
+)
 
-__all__ = ["InMemoryDatabase", "get_session", "init_db"]
+__all__ = [
+    "Database",
+    "InMemoryDatabase",
+    "SQLiteDatabase",
+    "close_db",
+    "create_database",
+    "enforce_retention",
+    "get_session",
+    "init_db",
+]
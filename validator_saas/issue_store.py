@@ -0,0 +1,679 @@
+"""Estruturas de armazenamento de inconsistências usadas pelo banco em memória.
+
+Os armazenamentos aceitam escritas de várias threads (os handlers síncronos da
+API rodam no threadpool). Leituras não usam trava: uma inconsistência só entra
+no índice por execução depois de completa, e os índices só crescem por
+``append``/``extend`` ou são substituídos por uma cópia, de modo que um leitor
+sempre percorre uma lista ordenada de ids válidos.
+
+``IssueSegment`` guarda no disco as inconsistências de execuções retiradas da
+memória pela política de retenção do banco em memória (``RetentionPolicy``).
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import zlib
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import chain, islice
+from typing import BinaryIO, Dict, NamedTuple, Protocol
+
+from .models import ValidationIssue
+
+IssueExportRow = tuple[int, int | None, str | None, str, str]
+"""Inconsistência para exportação: (id, linha, coluna, severidade, mensagem)."""
+
+
+@dataclass(frozen=True)
+class IssueFilter:
+    """Filtros da listagem de inconsistências; ``None`` não filtra."""
+
+    severity: str | None = None
+    column_name: str | None = None
+    line_from: int | None = None
+    line_to: int | None = None
+
+    def matches_line(self, line_number: int | None) -> bool:
+        if self.line_from is None and self.line_to is None:
+            return True
+        if line_number is None:
+            return False
+        if self.line_from is not None and line_number < self.line_from:
+            return False
+        return self.line_to is None or line_number <= self.line_to
+
+
+NO_FILTER = IssueFilter()
+
+LOCK_STRIPES = 16
+"""Travas que protegem os índices por execução do ``ObjectIssueStore`` (execução ``id % LOCK_STRIPES``)."""
+
+OBJECT_ISSUE_BYTES = 250
+"""Custo estimado de uma inconsistência no ``ObjectIssueStore`` (objeto, entrada no dicionário e
+no índice), além do texto da mensagem."""
+
+COLUMNAR_ROW_BYTES = 25
+"""Custo de uma inconsistência nas colunas do ``ColumnarIssueStore`` (textos ficam nos dicionários)."""
+
+DICTIONARY_ENTRY_BYTES = 64
+"""Custo de um valor novo nos dicionários do ``ColumnarIssueStore`` (entrada, código e posição na
+lista), além do próprio texto (``sys.getsizeof``)."""
+
+SEGMENT_CHUNK_ROWS = 4096
+"""Inconsistências por bloco do ``IssueSegment``; cada leitura descompacta um bloco inteiro."""
+
+SEGMENT_COMPACT_MIN_BYTES = 16 * 1024 * 1024
+"""Bytes descartados no arquivo do ``IssueSegment`` antes de a compactação valer a cópia."""
+
+
+class IssueStore(Protocol):
+    """Contrato comum entre os armazenamentos de inconsistências."""
+
+    def add(
+        self,
+        run_id: int,
+        line_number: int | None,
+        column_name: str | None,
+        severity: str,
+        message: str,
+    ) -> ValidationIssue:  # pragma: no cover - interface
+        ...
+
+    def add_bulk(
+        self, run_id: int, issues: list[ValidationIssue]
+    ) -> list[ValidationIssue]:  # pragma: no cover - interface
+        ...
+
+    def list_for_run(
+        self, run_id: int, offset: int = 0, limit: int | None = None
+    ) -> list[ValidationIssue]:  # pragma: no cover - interface
+        ...
+
+    def count_for_run(self, run_id: int) -> int:  # pragma: no cover - interface
+        ...
+
+    def iter_rows(
+        self, run_id: int, issue_filter: IssueFilter = NO_FILTER, after_id: int = 0
+    ) -> Iterator[IssueExportRow]:  # pragma: no cover - interface
+        ...
+
+    def list_page(
+        self, run_id: int, after_id: int = 0, limit: int = 100, issue_filter: IssueFilter = NO_FILTER
+    ) -> list[ValidationIssue]:  # pragma: no cover - interface
+        ...
+
+    def run_bytes(self, run_id: int) -> int:  # pragma: no cover - interface
+        """Bytes estimados das inconsistências da execução em memória."""
+        ...
+
+    @property
+    def memory_bytes(self) -> int:  # pragma: no cover - interface
+        """Soma de ``run_bytes`` de todas as execuções guardadas."""
+        ...
+
+    def drop_run(self, run_id: int) -> None:  # pragma: no cover - interface
+        """Remove da memória as inconsistências da execução."""
+        ...
+
+
+def paginate(ids: list[int], offset: int, limit: int | None) -> list[int]:
+    """Recorta uma página do índice sem percorrer as demais entradas."""
+
+    if offset == 0 and limit is None:
+        return ids
+    return ids[offset:] if limit is None else ids[offset : offset + limit]
+
+
+class ObjectIssueStore:
+    """Guarda cada inconsistência como um objeto ``ValidationIssue``.
+
+    A reserva de ids é a única seção comum a todas as escritas; o índice de cada
+    execução é publicado sob uma de ``stripes`` travas, escolhida pelo id da
+    execução, de modo que execuções diferentes quase nunca disputam a mesma.
+    Os bytes estimados de cada execução (``OBJECT_ISSUE_BYTES`` mais a
+    mensagem) são somados na publicação.
+    """
+
+    def __init__(self, stripes: int = LOCK_STRIPES) -> None:
+        self._next_issue_id = 1
+        self.issues: Dict[int, ValidationIssue] = {}
+        self._issue_ids_by_run: Dict[int, list[int]] = {}
+        self._bytes_by_run: Dict[int, int] = {}
+        self._memory_bytes = 0
+        self._id_lock = threading.Lock()
+        self._run_locks = tuple(threading.Lock() for _ in range(max(stripes, 1)))
+
+    def _reserve(self, count: int, size: int = 0) -> range:
+        with self._id_lock:
+            first_id = self._next_issue_id
+            self._next_issue_id = first_id + count
+            self._memory_bytes += size
+        return range(first_id, first_id + count)
+
+    def _publish(self, run_id: int, issue_ids: range, size: int) -> None:
+        """Inclui ``issue_ids`` (já gravados em ``issues``) no índice da execução, mantendo-o ordenado."""
+
+        if not issue_ids:
+            return
+        with self._run_locks[run_id % len(self._run_locks)]:
+            self._bytes_by_run[run_id] = self._bytes_by_run.get(run_id, 0) + size
+            published = self._issue_ids_by_run.get(run_id)
+            if published is None:
+                self._issue_ids_by_run[run_id] = list(issue_ids)
+            elif published[-1] < issue_ids.start:
+                published.extend(issue_ids)
+            else:
+                # Outra escrita da mesma execução reservou ids depois desta e publicou
+                # antes: a lista é trocada por uma cópia ordenada, sem reordenar a que
+                # leitores em curso estejam percorrendo.
+                self._issue_ids_by_run[run_id] = sorted(chain(published, issue_ids))
+
+    def add(
+        self,
+        run_id: int,
+        line_number: int | None,
+        column_name: str | None,
+        severity: str,
+        message: str,
+    ) -> ValidationIssue:
+        size = OBJECT_ISSUE_BYTES + len(message)
+        issue_ids = self._reserve(1, size)
+        issue = ValidationIssue(
+            id=issue_ids.start,
+            validation_run_id=run_id,
+            line_number=line_number,
+            column_name=column_name,
+            severity=severity,
+            message=message,
+        )
+        self.issues[issue.id] = issue
+        self._publish(run_id, issue_ids, size)
+        return issue
+
+    def add_bulk(self, run_id: int, issues: list[ValidationIssue]) -> list[ValidationIssue]:
+        size = OBJECT_ISSUE_BYTES * len(issues) + sum(len(issue.message) for issue in issues)
+        issue_ids = self._reserve(len(issues), size)
+        for issue_id, issue in zip(issue_ids, issues):
+            issue.id = issue_id
+            issue.validation_run_id = run_id
+        self.issues.update(zip(issue_ids, issues))
+        self._publish(run_id, issue_ids, size)
+        return issues
+
+    def run_bytes(self, run_id: int) -> int:
+        return self._bytes_by_run.get(run_id, 0)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def drop_run(self, run_id: int) -> None:
+        with self._run_locks[run_id % len(self._run_locks)]:
+            issue_ids = self._issue_ids_by_run.pop(run_id, ())
+            size = self._bytes_by_run.pop(run_id, 0)
+        for issue_id in issue_ids:
+            del self.issues[issue_id]
+        with self._id_lock:
+            self._memory_bytes -= size
+
+    def list_for_run(self, run_id: int, offset: int = 0, limit: int | None = None) -> list[ValidationIssue]:
+        issue_ids = paginate(self._issue_ids_by_run.get(run_id, []), offset, limit)
+        return [self.issues[issue_id] for issue_id in issue_ids]
+
+    def count_for_run(self, run_id: int) -> int:
+        return len(self._issue_ids_by_run.get(run_id, ()))
+
+    def _iter_issues(
+        self, run_id: int, issue_filter: IssueFilter, after_id: int
+    ) -> Iterator[ValidationIssue]:
+        issue_ids = self._issue_ids_by_run.get(run_id, [])
+        severity, column_name = issue_filter.severity, issue_filter.column_name
+        for index in range(bisect_right(issue_ids, after_id), len(issue_ids)):
+            issue = self.issues[issue_ids[index]]
+            if severity is not None and issue.severity != severity:
+                continue
+            if column_name is not None and issue.column_name != column_name:
+                continue
+            if issue_filter.matches_line(issue.line_number):
+                yield issue
+
+    def iter_rows(
+        self, run_id: int, issue_filter: IssueFilter = NO_FILTER, after_id: int = 0
+    ) -> Iterator[IssueExportRow]:
+        for issue in self._iter_issues(run_id, issue_filter, after_id):
+            yield issue.id, issue.line_number, issue.column_name, issue.severity, issue.message
+
+    def list_page(
+        self, run_id: int, after_id: int = 0, limit: int = 100, issue_filter: IssueFilter = NO_FILTER
+    ) -> list[ValidationIssue]:
+        return list(islice(self._iter_issues(run_id, issue_filter, after_id), limit))
+
+
+class _Dictionary:
+    """Codificação por dicionário de valores textuais repetitivos."""
+
+    def __init__(self) -> None:
+        self.codes: Dict[str | None, int] = {}
+        self.values: list[str | None] = []
+        self.payload_bytes = 0
+
+    def encode(self, value: str | None) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self.payload_bytes += sys.getsizeof(value) + DICTIONARY_ENTRY_BYTES
+        return code
+
+
+class _Columns:
+    """Colunas paralelas de uma geração do ``ColumnarIssueStore``.
+
+    Só crescem; a compactação monta uma nova geração com as linhas vivas e a
+    troca de uma vez, de modo que leitores em curso terminam na anterior. Os
+    bytes dos valores novos nos dicionários são atribuídos à execução que os
+    gravou primeiro (``text_bytes_by_run``).
+    """
+
+    def __init__(self) -> None:
+        self.ids = array("i")
+        self.run_ids = array("i")
+        self.line_numbers = array("i")  # 0 representa "sem linha"
+        self.columns = array("i")
+        self.severities = array("b")
+        self.messages = array("i")
+        self.column_values = _Dictionary()
+        self.severity_values = _Dictionary()
+        self.message_values = _Dictionary()
+        self.rows_by_run: Dict[int, array] = {}
+        self.text_bytes_by_run: Dict[int, int] = {}
+        self.live_text_bytes = 0
+
+    def append(
+        self, run_id: int, ids: Iterable[int], issues: Iterable[tuple[int | None, str | None, str, str]]
+    ) -> range:
+        encode_column = self.column_values.encode
+        encode_severity = self.severity_values.encode
+        encode_message = self.message_values.encode
+        first_row = len(self.run_ids)
+        dictionaries = (self.column_values, self.severity_values, self.message_values)
+        text_bytes = sum(dictionary.payload_bytes for dictionary in dictionaries)
+        for line_number, column_name, severity, message in issues:
+            self.line_numbers.append(line_number or 0)
+            self.columns.append(encode_column(column_name))
+            self.severities.append(encode_severity(severity))
+            self.messages.append(encode_message(message))
+        rows = range(first_row, len(self.line_numbers))
+        self.ids.extend(ids)
+        self.run_ids.extend(array("i", [run_id]) * len(rows))
+        self.rows_by_run.setdefault(run_id, array("i")).extend(rows)
+        text_bytes = sum(dictionary.payload_bytes for dictionary in dictionaries) - text_bytes
+        self.text_bytes_by_run[run_id] = self.text_bytes_by_run.get(run_id, 0) + text_bytes
+        self.live_text_bytes += text_bytes
+        return rows
+
+    def row(self, row: int) -> tuple[int | None, str | None, str, str]:
+        return (
+            self.line_numbers[row] or None,
+            self.column_values.values[self.columns[row]],
+            self.severity_values.values[self.severities[row]],
+            self.message_values.values[self.messages[row]],
+        )
+
+    def materialize(self, row: int) -> ValidationIssue:
+        line_number, column_name, severity, message = self.row(row)
+        return ValidationIssue(
+            id=self.ids[row],
+            validation_run_id=self.run_ids[row],
+            line_number=line_number,
+            column_name=column_name,
+            severity=severity,
+            message=message,
+        )
+
+
+class ColumnarIssueStore:
+    """Guarda inconsistências em colunas paralelas de ``array``.
+
+    Ids, números de linha e ids de execução ficam em ``array('i')``; nome da
+    coluna, severidade e mensagem são codificados por dicionário, de forma que
+    milhões de "Campo obrigatório ausente." custam poucos bytes cada. Objetos
+    ``ValidationIssue`` só são materializados ao paginar. As colunas paralelas
+    precisam crescer juntas: as escritas são serializadas por uma única trava,
+    e as linhas só entram no índice da execução depois de gravadas em todas as
+    colunas. ``drop_run`` só tira a execução do índice; quando as linhas mortas
+    passam das vivas, as colunas são reconstruídas (``_Columns``).
+    """
+
+    def __init__(self) -> None:
+        self._data = _Columns()
+        self._next_issue_id = 1
+        self._dead_rows = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data.ids) - self._dead_rows
+
+    def _append_rows(
+        self, run_id: int, count: int, issues: Iterable[tuple[int | None, str | None, str, str]]
+    ) -> range:
+        """Grava ``count`` linhas na geração atual e devolve os ids atribuídos."""
+
+        with self._lock:
+            issue_ids = range(self._next_issue_id, self._next_issue_id + count)
+            self._next_issue_id = issue_ids.stop
+            self._data.append(run_id, issue_ids, issues)
+        return issue_ids
+
+    def add(
+        self,
+        run_id: int,
+        line_number: int | None,
+        column_name: str | None,
+        severity: str,
+        message: str,
+    ) -> ValidationIssue:
+        issue_id = self._append_rows(run_id, 1, [(line_number, column_name, severity, message)])[0]
+        return ValidationIssue(
+            id=issue_id,
+            validation_run_id=run_id,
+            line_number=line_number or None,
+            column_name=column_name,
+            severity=severity,
+            message=message,
+        )
+
+    def add_bulk(self, run_id: int, issues: list[ValidationIssue]) -> list[ValidationIssue]:
+        issue_ids = self._append_rows(
+            run_id,
+            len(issues),
+            ((issue.line_number, issue.column_name, issue.severity, issue.message) for issue in issues),
+        )
+        for issue_id, issue in zip(issue_ids, issues):
+            issue.id = issue_id
+            issue.validation_run_id = run_id
+        return issues
+
+    def list_for_run(self, run_id: int, offset: int = 0, limit: int | None = None) -> list[ValidationIssue]:
+        data = self._data
+        rows = data.rows_by_run.get(run_id)
+        if rows is None:
+            return []
+        stop = len(rows) if limit is None else offset + limit
+        return [data.materialize(row) for row in rows[offset:stop]]
+
+    def count_for_run(self, run_id: int) -> int:
+        rows = self._data.rows_by_run.get(run_id)
+        return 0 if rows is None else len(rows)
+
+    def _iter_matching_rows(
+        self, data: _Columns, run_id: int, issue_filter: IssueFilter, after_id: int
+    ) -> Iterator[int]:
+        """Posições que passam pelos filtros, comparando códigos do dicionário em vez de textos."""
+
+        rows = data.rows_by_run.get(run_id)
+        if rows is None:
+            return
+        severity_code = column_code = None
+        if issue_filter.severity is not None:
+            severity_code = data.severity_values.codes.get(issue_filter.severity)
+            if severity_code is None:
+                return
+        if issue_filter.column_name is not None:
+            column_code = data.column_values.codes.get(issue_filter.column_name)
+            if column_code is None:
+                return
+        severities, columns, line_numbers = data.severities, data.columns, data.line_numbers
+        # Os ids crescem com a posição dentro da execução: busca binária pelo primeiro id > after_id.
+        for index in range(bisect_right(rows, after_id, key=data.ids.__getitem__), len(rows)):
+            row = rows[index]
+            if severity_code is not None and severities[row] != severity_code:
+                continue
+            if column_code is not None and columns[row] != column_code:
+                continue
+            if issue_filter.matches_line(line_numbers[row] or None):
+                yield row
+
+    def iter_rows(
+        self, run_id: int, issue_filter: IssueFilter = NO_FILTER, after_id: int = 0
+    ) -> Iterator[IssueExportRow]:
+        data = self._data
+        ids = data.ids
+        for row in self._iter_matching_rows(data, run_id, issue_filter, after_id):
+            yield (ids[row], *data.row(row))
+
+    def list_page(
+        self, run_id: int, after_id: int = 0, limit: int = 100, issue_filter: IssueFilter = NO_FILTER
+    ) -> list[ValidationIssue]:
+        data = self._data
+        rows = islice(self._iter_matching_rows(data, run_id, issue_filter, after_id), limit)
+        return [data.materialize(row) for row in rows]
+
+    def run_bytes(self, run_id: int) -> int:
+        text_bytes = self._data.text_bytes_by_run.get(run_id, 0)
+        return self.count_for_run(run_id) * COLUMNAR_ROW_BYTES + text_bytes
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes das execuções vivas; os textos de execuções removidas só saem na compactação."""
+
+        return len(self) * COLUMNAR_ROW_BYTES + self._data.live_text_bytes
+
+    def drop_run(self, run_id: int) -> None:
+        with self._lock:
+            data = self._data
+            rows = data.rows_by_run.pop(run_id, None)
+            if rows is None:
+                return
+            data.live_text_bytes -= data.text_bytes_by_run.pop(run_id, 0)
+            self._dead_rows += len(rows)
+            if self._dead_rows > len(self):
+                self._compact()
+
+    def _compact(self) -> None:
+        """Reconstrói as colunas só com as linhas vivas, mantendo os ids (chamado sob ``_lock``)."""
+
+        old, new = self._data, _Columns()
+        for run_id, rows in old.rows_by_run.items():
+            new.append(run_id, (old.ids[row] for row in rows), (old.row(row) for row in rows))
+        self._data = new
+        self._dead_rows = 0
+
+
+class _SegmentChunk(NamedTuple):
+    first_id: int
+    file: BinaryIO
+    offset: int
+    length: int
+    rows: int
+
+
+class IssueSegment:
+    """Inconsistências de execuções compactadas em um arquivo temporário local.
+
+    Cada execução é gravada em blocos de até ``SEGMENT_CHUNK_ROWS`` linhas
+    (tuplas ``IssueExportRow`` serializadas e comprimidas com zlib) e em memória
+    fica só o diretório de blocos: primeiro id, arquivo, posição, tamanho e
+    linhas de cada um. Leituras descompactam só os blocos percorridos.
+
+    ``discard`` libera o espaço de uma execução: quando os bytes descartados
+    passam dos vivos (e de ``SEGMENT_COMPACT_MIN_BYTES``), os blocos vivos são
+    copiados, sem recompressão, para um arquivo novo. O arquivo anterior, já sem
+    nome no disco, é fechado quando o último leitor que ainda o percorre termina.
+    """
+
+    def __init__(self, directory: str | os.PathLike | None = None) -> None:
+        self._directory = directory
+        self._file = self._open()
+        self._chunks: Dict[int, list[_SegmentChunk]] = {}
+        self._lock = threading.Lock()
+        self.disk_bytes = 0
+        self.live_bytes = 0
+
+    def _open(self) -> BinaryIO:
+        return tempfile.TemporaryFile(prefix="inconsistencias-", suffix=".segment", dir=self._directory)
+
+    def __contains__(self, run_id: object) -> bool:
+        return run_id in self._chunks
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def __iter__(self) -> Iterator[int]:
+        """Execuções gravadas, da mais antiga para a mais nova."""
+
+        return iter(list(self._chunks))
+
+    def write(self, run_id: int, rows: Iterable[IssueExportRow]) -> int:
+        """Grava as linhas (em ordem de id) da execução e devolve os bytes ocupados no disco."""
+
+        chunks: list[_SegmentChunk] = []
+        written = 0
+        rows = iter(rows)
+        while batch := list(islice(rows, SEGMENT_CHUNK_ROWS)):
+            data = zlib.compress(pickle.dumps(batch, pickle.HIGHEST_PROTOCOL), 1)
+            with self._lock:
+                offset = self._file.seek(0, os.SEEK_END)
+                self._file.write(data)
+                self.disk_bytes += len(data)
+                chunks.append(_SegmentChunk(batch[0][0], self._file, offset, len(data), len(batch)))
+            written += len(data)
+        with self._lock:
+            # Publicado por último: leitores só encontram a execução com todos os blocos gravados.
+            self._chunks[run_id] = chunks
+            self.live_bytes += written
+        return written
+
+    def run_bytes(self, run_id: int) -> int:
+        return sum(chunk.length for chunk in self._chunks.get(run_id, ()))
+
+    def discard(self, run_id: int) -> None:
+        with self._lock:
+            chunks = self._chunks.pop(run_id, None)
+            if chunks is None:
+                return
+            self.live_bytes -= sum(chunk.length for chunk in chunks)
+            dead_bytes = self.disk_bytes - self.live_bytes
+            if dead_bytes >= SEGMENT_COMPACT_MIN_BYTES and dead_bytes > self.live_bytes:
+                self._compact()
+
+    def _compact(self) -> None:
+        """Copia os blocos vivos para um arquivo novo (chamado sob ``_lock``)."""
+
+        target = self._open()
+        chunks_by_run: Dict[int, list[_SegmentChunk]] = {}
+        for run_id, chunks in self._chunks.items():
+            moved = []
+            for chunk in chunks:
+                chunk.file.seek(chunk.offset)
+                moved.append(chunk._replace(file=target, offset=target.tell()))
+                target.write(chunk.file.read(chunk.length))
+            chunks_by_run[run_id] = moved
+        # Sem ``close`` no arquivo anterior: leitores em curso ainda têm os blocos antigos.
+        self._chunks = chunks_by_run
+        self._file = target
+        self.disk_bytes = self.live_bytes
+
+    def _load(self, chunk: _SegmentChunk) -> list[IssueExportRow]:
+        with self._lock:
+            chunk.file.seek(chunk.offset)
+            data = chunk.file.read(chunk.length)
+        return pickle.loads(zlib.decompress(data))
+
+    def count_for_run(self, run_id: int) -> int:
+        return sum(chunk.rows for chunk in self._chunks.get(run_id, ()))
+
+    def iter_rows(
+        self, run_id: int, issue_filter: IssueFilter = NO_FILTER, after_id: int = 0
+    ) -> Iterator[IssueExportRow]:
+        chunks = self._chunks.get(run_id, [])
+        # Primeiro bloco que pode conter ids maiores que ``after_id``.
+        start = max(bisect_right(chunks, after_id, key=lambda chunk: chunk.first_id) - 1, 0)
+        severity, column_name = issue_filter.severity, issue_filter.column_name
+        for chunk in chunks[start:]:
+            for row in self._load(chunk):
+                if row[0] <= after_id:
+                    continue
+                if severity is not None and row[3] != severity:
+                    continue
+                if column_name is not None and row[2] != column_name:
+                    continue
+                if issue_filter.matches_line(row[1]):
+                    yield row
+
+    def list_page(
+        self, run_id: int, after_id: int = 0, limit: int = 100, issue_filter: IssueFilter = NO_FILTER
+    ) -> list[ValidationIssue]:
+        rows = islice(self.iter_rows(run_id, issue_filter, after_id), limit)
+        return [_issue(run_id, row) for row in rows]
+
+    def list_for_run(self, run_id: int, offset: int = 0, limit: int | None = None) -> list[ValidationIssue]:
+        # Todos os blocos têm SEGMENT_CHUNK_ROWS linhas, menos o último: a posição indica o bloco.
+        chunks = self._chunks.get(run_id, [])[offset // SEGMENT_CHUNK_ROWS :]
+        skip = offset % SEGMENT_CHUNK_ROWS
+        rows = islice(chain.from_iterable(self._load(chunk) for chunk in chunks), skip, None)
+        if limit is not None:
+            rows = islice(rows, limit)
+        return [_issue(run_id, row) for row in rows]
+
+    def close(self) -> None:
+        """Descarta todas as execuções e fecha o arquivo (removido do disco pelo sistema)."""
+
+        with self._lock:
+            self._chunks = {}
+            self._file.close()
+            self.disk_bytes = self.live_bytes = 0
+
+
+def _issue(run_id: int, row: IssueExportRow) -> ValidationIssue:
+    issue_id, line_number, column_name, severity, message = row
+    return ValidationIssue(
+        id=issue_id,
+        validation_run_id=run_id,
+        line_number=line_number,
+        column_name=column_name,
+        severity=severity,
+        message=message,
+    )
+
+
+ISSUE_STORES = {
+    "objects": ObjectIssueStore,
+    "columnar": ColumnarIssueStore,
+}
+
+
+def create_issue_store(kind: str = "objects") -> IssueStore:
+    """Instancia o armazenamento de inconsistências configurado."""
+
+    try:
+        return ISSUE_STORES[kind]()
+    except KeyError:
+        raise ValueError(f"Armazenamento de inconsistências desconhecido: {kind}.") from None
+
+
+__all__ = [
+    "COLUMNAR_ROW_BYTES",
+    "ColumnarIssueStore",
+    "DICTIONARY_ENTRY_BYTES",
+    "ISSUE_STORES",
+    "IssueExportRow",
+    "IssueFilter",
+    "IssueSegment",
+    "IssueStore",
+    "LOCK_STRIPES",
+    "NO_FILTER",
+    "OBJECT_ISSUE_BYTES",
+    "ObjectIssueStore",
+    "SEGMENT_CHUNK_ROWS",
+    "SEGMENT_COMPACT_MIN_BYTES",
+    "create_issue_store",
+    "paginate",
+]
@@ -0,0 +1,268 @@
+"""Métricas de operação no formato de texto do Prometheus (``GET /metrics``).
+
+As métricas são atualizadas por execução e por etapa, nunca por linha: o custo
+no caminho quente é uma trava e uma soma a cada etapa concluída. Valores que já
+existem em outros componentes (cache de resultados, fila de validações) entram
+como métricas calculadas na hora da leitura, por ``callback``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+"""Limites (em segundos) dos histogramas de duração."""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Valor que só cresce, por combinação de rótulos."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+
+class Histogram:
+    """Distribuição de durações em ``buckets`` cumulativos, com soma e contagem."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[LabelValues, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Contagem por bucket (o último é +Inf), seguida da soma.
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[slot] += 1
+            series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for labels, values in series:
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), values):
+                cumulative += count
+                bucket = _labels(self.labels, labels, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{bucket} {_number(cumulative)}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {_number(values[-1])}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {_number(cumulative)}"
+
+
+class CallbackMetric:
+    """Métrica lida de outro componente no momento da exportação.
+
+    ``callback`` devolve um número ou um dicionário ``{valores dos rótulos: número}``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        kind: str,
+        callback: Callable[[], float | Mapping[LabelValues, float]],
+        labels: tuple[str, ...] = (),
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labels = labels
+        self.callback = callback
+
+    def samples(self) -> Iterator[str]:
+        values = self.callback()
+        if not isinstance(values, Mapping):
+            values = {(): values}
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+
+Metric = Counter | Histogram | CallbackMetric
+
+
+class MetricsRegistry:
+    """Conjunto de métricas exportadas juntas; nomes repetidos devolvem a métrica já registrada."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))  # type: ignore[return-value]
+
+    def histogram(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Histogram:
+        return self._register(Histogram(name, help_text, labels))  # type: ignore[return-value]
+
+    def callback(
+        self,
+        name: str,
+        help_text: str,
+        kind: str,
+        callback: Callable[[], float | Mapping[LabelValues, float]],
+        labels: tuple[str, ...] = (),
+    ) -> CallbackMetric:
+        """Registra (ou substitui) uma métrica calculada na leitura; ``kind`` é ``gauge`` ou ``counter``."""
+
+        metric = CallbackMetric(name, help_text, kind, callback, labels)
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Todas as métricas no formato de exposição em texto do Prometheus (versão 0.0.4)."""
+
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+STAGE_SECONDS = METRICS.histogram(
+    "validator_stage_seconds",
+    "Duração de cada etapa do atendimento de uma validação.",
+    ("stage",),
+)
+BYTES_INGESTED = METRICS.counter(
+    "validator_bytes_ingested_total",
+    "Bytes de conteúdo recebidos para validação.",
+    ("validator",),
+)
+ROWS_VALIDATED = METRICS.counter(
+    "validator_rows_validated_total",
+    "Linhas percorridas pelos validadores.",
+    ("validator",),
+)
+ISSUES_FOUND = METRICS.counter(
+    "validator_issues_total",
+    "Inconsistências encontradas, inclusive as omitidas pelo limite por coluna.",
+    ("validator",),
+)
+RUNS_FINISHED = METRICS.counter(
+    "validator_runs_total",
+    "Execuções concluídas por validador e status.",
+    ("validator", "status"),
+)
+
+RELEASED_RUNS = METRICS.counter(
+    "validator_retention_runs_total",
+    "Execuções cujas inconsistências saíram da memória, por ação (spill/evict) e motivo (ttl/budget).",
+    ("action", "reason"),
+)
+RELEASED_BYTES = METRICS.counter(
+    "validator_retention_bytes_total",
+    "Bytes estimados de inconsistências liberados da memória pela política de retenção.",
+    ("action",),
+)
+
+
+class StageTimer:
+    """Cronometra as etapas de uma execução: alimenta ``STAGE_SECONDS`` e acumula ``timings``.
+
+    ``timings`` (segundos por etapa) pode ser guardado na própria execução
+    (``ValidationRun.timings``).
+    """
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        """Registra uma etapa medida fora do ``stage`` (ex.: espera e execução na fila)."""
+
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, name)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+
+__all__ = [
+    "BYTES_INGESTED",
+    "CallbackMetric",
+    "Counter",
+    "DEFAULT_BUCKETS",
+    "Histogram",
+    "ISSUES_FOUND",
+    "METRICS",
+    "MetricsRegistry",
+    "RELEASED_BYTES",
+    "RELEASED_RUNS",
+    "ROWS_VALIDATED",
+    "RUNS_FINISHED",
+    "STAGE_SECONDS",
+    "StageTimer",
+]
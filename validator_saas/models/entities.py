@@ -25,6 +25,7 @@ class RegulatoryFile:
     original_filename: str
     uploaded_at: datetime = field(default_factory=datetime.utcnow)
     status: str = "received"
+    previous_file_id: Optional[int] = None
 
 
 @dataclass(slots=True)
@@ -36,6 +37,8 @@ class ValidationRun:
     finished_at: Optional[datetime] = None
     status: str = "pending"
     summary: Optional[str] = None
+    cached_from_run_id: Optional[int] = None
+    timings: Optional[dict[str, float]] = None
 
 
 @dataclass(slots=True)
@@ -0,0 +1,103 @@
+"""Montagem de lotes de validação a partir de vários arquivos ou de um arquivo zip."""
+
+from __future__ import annotations
+
+import posixpath
+import zipfile
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import partial
+from typing import BinaryIO
+
+from ..models import ValidationRun
+from .compression import DecompressingStream, DecompressionLimits
+
+MEMBER_READ_SIZE = 1024 * 1024
+
+
+@dataclass
+class BatchItem:
+    """Um arquivo do lote; ``read`` só é chamado quando o arquivo entra na fila do pool."""
+
+    filename: str
+    regulator: str | None
+    read: Callable[[], bytes]
+
+
+@dataclass
+class BatchOutcome:
+    """Resumo compacto da validação de um arquivo do lote."""
+
+    filename: str
+    regulator: str | None
+    run: ValidationRun | None = None
+    issue_count: int = 0
+    error: str | None = None
+
+    @property
+    def status(self) -> str:
+        return self.run.status if self.run is not None else "rejected"
+
+
+def assign_regulators(filenames: Sequence[str], regulators: Sequence[str]) -> list[str | None]:
+    """Associa um regulador a cada arquivo do lote.
+
+    Cada valor de ``regulators`` é um regulador (``dimp``) ou um par
+    ``arquivo=regulador``. Um único regulador sem nome de arquivo vale para todos
+    os arquivos não nomeados; sem pares, vários reguladores são associados pela
+    ordem dos arquivos e a quantidade precisa coincidir. Arquivos sem regulador
+    ficam com ``None``.
+    """
+
+    named = dict(value.split("=", 1) for value in regulators if "=" in value)
+    positional = [value for value in regulators if "=" not in value]
+    if not named and len(positional) > 1:
+        if len(positional) != len(filenames):
+            raise ValueError(
+                f"Informe um regulador por arquivo: {len(filenames)} arquivos, {len(positional)} reguladores."
+            )
+        return list(positional)
+    default = positional[0] if len(positional) == 1 else None
+    return [named.get(name, named.get(posixpath.basename(name), default)) for name in filenames]
+
+
+def _read_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, limits: DecompressionLimits) -> bytes:
+    member = DecompressingStream.zip_member(archive, info, limits)
+    try:
+        # Em blocos: os limites são verificados antes de a entrada inteira estar em memória.
+        return b"".join(iter(partial(member.read, MEMBER_READ_SIZE), b""))
+    finally:
+        member.close()
+
+
+def iter_zip_items(
+    stream: BinaryIO, regulators: Sequence[str], limits: DecompressionLimits | None = None
+) -> Iterator[BatchItem]:
+    """Percorre as entradas de um zip, descompactando cada uma apenas quando consumida.
+
+    O diretório central é lido (e os reguladores associados) já na chamada, de
+    modo que um zip inválido é recusado antes de qualquer validação. ``stream``
+    precisa ser posicionável; diretórios são ignorados. Cada entrada é
+    descompactada sob ``limits`` (por padrão, os de ``/validations``), e
+    ``read`` levanta ``DecompressionError`` para entradas corrompidas ou acima
+    dos limites.
+    """
+
+    limits = limits or DecompressionLimits.from_settings()
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile as exc:
+        raise ValueError("Arquivo zip inválido.") from exc
+    entries = [info for info in archive.infolist() if not info.is_dir()]
+    assigned = assign_regulators([info.filename for info in entries], regulators)
+    return (
+        BatchItem(
+            filename=info.filename,
+            regulator=regulator,
+            read=partial(_read_member, archive, info, limits),
+        )
+        for info, regulator in zip(entries, assigned)
+    )
+
+
+__all__ = ["BatchItem", "BatchOutcome", "MEMBER_READ_SIZE", "assign_regulators", "iter_zip_items"]
@@ -0,0 +1,281 @@
+"""Cache LRU de resultados de validação indexado pelo hash do conteúdo."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from ..config import get_settings
+from ..metrics import METRICS
+from ..models import ValidationIssue
+from ..validators.layout import DEFAULT_CHUNK_SIZE, ContentSource
+from ..validators.mapped import map_file
+
+IssueRow = tuple[int | None, str | None, str, str]
+
+_ISSUE_OVERHEAD_BYTES = 64
+"""Estimativa do custo fixo de uma tupla de inconsistência guardada no cache."""
+
+
+@dataclass(frozen=True)
+class CachedOutcome:
+    """Resultado de uma validação anterior, independente da execução de origem."""
+
+    source_run_id: int
+    status: str
+    summary: str | None
+    issues: tuple[IssueRow, ...]
+    size: int
+
+    @classmethod
+    def from_issues(
+        cls,
+        source_run_id: int,
+        status: str,
+        summary: str | None,
+        issues: Iterable[ValidationIssue],
+    ) -> "CachedOutcome":
+        rows = tuple((issue.line_number, issue.column_name, issue.severity, issue.message) for issue in issues)
+        size = sum(_ISSUE_OVERHEAD_BYTES + len(row[3]) + len(row[1] or "") for row in rows)
+        return cls(source_run_id=source_run_id, status=status, summary=summary, issues=rows, size=size)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Corpo JSON já codificado de uma resposta que não muda mais, com sua ETag forte."""
+
+    body: bytes
+    etag: str
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    @classmethod
+    def encode(cls, body: bytes) -> "CachedResponse":
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+class ValidationResultCache:
+    """LRU limitado pela quantidade de entradas e pelo total estimado de bytes das inconsistências.
+
+    Também guarda os manifestos de blocos da revalidação incremental e as
+    respostas já serializadas da API: basta que a entrada informe seu tamanho
+    estimado em ``size``.
+    """
+
+    def __init__(self, max_entries: int = 256, max_issue_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_issue_bytes = max_issue_bytes
+        self._entries: OrderedDict[str, CachedOutcome] = OrderedDict()
+        self._issue_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> CachedOutcome | None:
+        with self._lock:
+            outcome = self._entries.get(key)
+            if outcome is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return outcome
+
+    def put(self, key: str, outcome: CachedOutcome) -> None:
+        if outcome.size > self.max_issue_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._issue_bytes -= previous.size
+            self._entries[key] = outcome
+            self._issue_bytes += outcome.size
+            while len(self._entries) > self.max_entries or self._issue_bytes > self.max_issue_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._issue_bytes -= evicted.size
+                self.evictions += 1
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._issue_bytes -= previous.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._issue_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "issue_bytes": self._issue_bytes,
+        }
+
+
+def cache_key(validator_key: str, layout_version: str, digest: str, policy_tag: str = "") -> str:
+    return f"{validator_key}:{layout_version}:{policy_tag}:{digest}"
+
+
+def content_digest(raw_content: ContentSource, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str | None:
+    """SHA-256 do conteúdo lido em blocos, ou ``None`` para fluxos que só podem ser lidos uma vez.
+
+    Caminhos são mapeados em memória; arquivos posicionáveis são relidos a partir
+    da posição atual, que é restaurada ao final. Texto é codificado em UTF-8 bloco
+    a bloco, gerando o mesmo hash dos bytes originais.
+    """
+
+    digest = hashlib.sha256()
+    if isinstance(raw_content, str):
+        for start in range(0, len(raw_content), chunk_size):
+            digest.update(raw_content[start : start + chunk_size].encode("utf-8"))
+    elif isinstance(raw_content, (bytes, bytearray, memoryview)):
+        digest.update(raw_content)
+    elif isinstance(raw_content, os.PathLike):
+        with map_file(raw_content) as buffer:
+            digest.update(buffer)
+    elif hasattr(raw_content, "read") and _seekable(raw_content):
+        position = raw_content.tell()
+        while chunk := raw_content.read(chunk_size):
+            digest.update(chunk if isinstance(chunk, bytes) else chunk.encode("utf-8"))
+        raw_content.seek(position)
+    else:
+        return None
+    return digest.hexdigest()
+
+
+def _seekable(stream: Any) -> bool:
+    try:
+        return bool(stream.seekable())
+    except (AttributeError, ValueError):
+        return False
+
+
+class HashingStream:
+    """Iterável de blocos que calcula o SHA-256 enquanto o validador consome o fluxo.
+
+    ``size`` acumula os bytes já consumidos.
+    """
+
+    def __init__(self, raw_content: ContentSource, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self._raw_content = raw_content
+        self._chunk_size = chunk_size
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    def __iter__(self) -> Iterator[bytes | str]:
+        for chunk in self._chunks():
+            if chunk:
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                self._digest.update(data)
+                self.size += len(data)
+                yield chunk
+
+    def _chunks(self) -> Iterable[Any]:
+        if not hasattr(self._raw_content, "read"):
+            return self._raw_content
+        return iter(lambda: self._raw_content.read(self._chunk_size) or None, None)
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+_cache: ValidationResultCache | None = None
+_manifests: ValidationResultCache | None = None
+_responses: ValidationResultCache | None = None
+
+
+def get_result_cache() -> ValidationResultCache:
+    """Cache compartilhado pelo processo, criado sob demanda."""
+
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = ValidationResultCache(
+            max_entries=settings.result_cache_entries,
+            max_issue_bytes=settings.result_cache_issue_bytes,
+        )
+    return _cache
+
+
+def get_manifest_cache() -> ValidationResultCache:
+    """Manifestos de blocos por arquivo regulatório, compartilhados pelo processo."""
+
+    global _manifests
+    if _manifests is None:
+        settings = get_settings()
+        _manifests = ValidationResultCache(
+            max_entries=settings.incremental_manifests,
+            max_issue_bytes=settings.result_cache_issue_bytes,
+        )
+    return _manifests
+
+
+def get_response_cache() -> ValidationResultCache:
+    """Respostas JSON prontas do catálogo e de execuções concluídas, compartilhadas pelo processo."""
+
+    global _responses
+    if _responses is None:
+        settings = get_settings()
+        _responses = ValidationResultCache(
+            max_entries=settings.response_cache_entries,
+            max_issue_bytes=settings.response_cache_bytes,
+        )
+    return _responses
+
+
+def run_response_key(run_id: int) -> str:
+    return f"run:{run_id}"
+
+
+def discard_run_response(run_id: int) -> None:
+    """Esquece a resposta pronta da execução (regravada ou removida do banco)."""
+
+    get_response_cache().discard(run_response_key(run_id))
+
+
+def _cache_stat(name: str) -> Callable[[], dict[tuple[str, ...], float]]:
+    def read() -> dict[tuple[str, ...], float]:
+        return {
+            ("results",): get_result_cache().stats()[name],
+            ("manifests",): get_manifest_cache().stats()[name],
+            ("responses",): get_response_cache().stats()[name],
+        }
+
+    return read
+
+
+for _stat, _kind, _help in (
+    ("hits", "counter", "Consultas atendidas pelo cache."),
+    ("misses", "counter", "Consultas não encontradas no cache."),
+    ("evictions", "counter", "Entradas descartadas pelos limites do cache."),
+    ("entries", "gauge", "Entradas guardadas no cache."),
+):
+    _suffix = "_total" if _kind == "counter" else ""
+    METRICS.callback(f"validator_cache_{_stat}{_suffix}", _help, _kind, _cache_stat(_stat), ("cache",))
+
+
+__all__ = [
+    "CachedOutcome",
+    "CachedResponse",
+    "HashingStream",
+    "ValidationResultCache",
+    "cache_key",
+    "content_digest",
+    "discard_run_response",
+    "get_manifest_cache",
+    "get_response_cache",
+    "get_result_cache",
+    "run_response_key",
+]
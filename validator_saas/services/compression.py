@@ -0,0 +1,221 @@
+"""Descompressão em fluxo de remessas enviadas em gzip, bz2, xz ou zip.
+
+O formato é reconhecido pelos primeiros bytes (``detect_compression``) e o
+conteúdo é entregue ao validador por ``DecompressingStream``, bloco a bloco,
+sem que o arquivo descompactado exista inteiro em memória ou em disco. Contra
+bombas de descompressão, ``DecompressionLimits`` limita o total descompactado e
+a taxa de compressão observada.
+"""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from ..config import get_settings
+
+MAGIC_NUMBERS = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"PK\x03\x04", "zip"),
+    (b"PK\x05\x06", "zip"),
+)
+"""Assinaturas reconhecidas no início do conteúdo (``PK\\x05\\x06`` é o zip vazio)."""
+
+HEAD_BYTES = max(len(magic) for magic, _ in MAGIC_NUMBERS)
+
+RATIO_GRACE_BYTES = 16 * 1024 * 1024
+"""Bytes descompactados antes de a taxa de compressão ser verificada; arquivos pequenos
+e muito repetitivos passam sem falso positivo."""
+
+_DECODE_ERRORS = (OSError, EOFError, zlib.error, lzma.LZMAError, zipfile.BadZipFile)
+
+
+class DecompressionError(ValueError):
+    """Conteúdo compactado inválido, truncado ou em estrutura não suportada."""
+
+
+class DecompressionLimitError(DecompressionError):
+    """O conteúdo descompactado ultrapassou os limites de ``DecompressionLimits``."""
+
+
+@dataclass(frozen=True)
+class DecompressionLimits:
+    """Limites da descompressão: bytes descompactados e taxa (descompactado/compactado)."""
+
+    max_bytes: int | None = None
+    max_ratio: float | None = None
+
+    @classmethod
+    def from_settings(cls) -> "DecompressionLimits":
+        settings = get_settings()
+        return cls(max_bytes=settings.max_decompressed_bytes, max_ratio=settings.max_compression_ratio)
+
+
+def detect_compression(head: bytes) -> str | None:
+    """Formato de compressão indicado pelos primeiros bytes, ou ``None`` para conteúdo bruto."""
+
+    return next((kind for magic, kind in MAGIC_NUMBERS if head.startswith(magic)), None)
+
+
+class _CountingReader:
+    """Repassa leituras do fluxo compactado contando os bytes consumidos."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self._stream = stream
+        self.position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self.position += len(data)
+        return data
+
+    def seekable(self) -> bool:
+        return self._stream.seekable()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._stream.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._stream.tell()
+
+
+class _DeclaredSize:
+    """Tamanho compactado conhecido de antemão (entrada de um zip já aberto)."""
+
+    def __init__(self, size: int) -> None:
+        self.position = size
+
+
+def _open_zip_member(source: _CountingReader) -> BinaryIO:
+    archive = zipfile.ZipFile(source)
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    if len(members) != 1:
+        raise DecompressionError(
+            f"O zip deve conter exatamente um arquivo (encontrados {len(members)}); "
+            "para vários arquivos use /validations/batch."
+        )
+    return archive.open(members[0])
+
+
+class DecompressingStream:
+    """Arquivo binário somente leitura com o conteúdo descompactado de ``stream``.
+
+    ``read`` levanta ``DecompressionLimitError`` assim que um limite é
+    ultrapassado e ``DecompressionError`` para dados corrompidos; zips precisam
+    de um fluxo com ``seek`` e de exatamente um arquivo.
+    """
+
+    def __init__(self, stream: BinaryIO, kind: str, limits: DecompressionLimits | None = None) -> None:
+        self.kind = kind
+        self.limits = limits or DecompressionLimits()
+        self.produced = 0
+        self._source = _CountingReader(stream)
+        try:
+            if kind == "gzip":
+                self._stream: BinaryIO = gzip.GzipFile(fileobj=self._source, mode="rb")
+            elif kind == "bz2":
+                self._stream = bz2.BZ2File(self._source)
+            elif kind == "xz":
+                self._stream = lzma.LZMAFile(self._source)
+            elif kind == "zip":
+                self._stream = _open_zip_member(self._source)
+            else:
+                raise DecompressionError(f"Formato de compressão não suportado: {kind}.")
+        except _DECODE_ERRORS as exc:
+            raise DecompressionError(f"Arquivo {kind} inválido: {exc}") from exc
+
+    @classmethod
+    def zip_member(
+        cls, archive: zipfile.ZipFile, info: zipfile.ZipInfo, limits: DecompressionLimits | None = None
+    ) -> "DecompressingStream":
+        """Entrada ``info`` de um zip já aberto, lida sob os mesmos limites.
+
+        Entradas que declaram mais de ``limits.max_bytes`` são recusadas antes de
+        qualquer leitura; a taxa de compressão usa o tamanho compactado da entrada.
+        """
+
+        limits = limits or DecompressionLimits()
+        if limits.max_bytes is not None and info.file_size > limits.max_bytes:
+            raise DecompressionLimitError(
+                f"{info.filename} declara {info.file_size} bytes descompactados, "
+                f"acima do limite de {limits.max_bytes} bytes."
+            )
+        stream = cls.__new__(cls)
+        stream.kind = "zip"
+        stream.limits = limits
+        stream.produced = 0
+        stream._source = _DeclaredSize(info.compress_size)  # type: ignore[assignment]
+        try:
+            stream._stream = archive.open(info)
+        except _DECODE_ERRORS as exc:
+            raise DecompressionError(f"Entrada {info.filename} do zip inválida: {exc}") from exc
+        return stream
+
+    @property
+    def compressed_bytes(self) -> int:
+        return self._source.position
+
+    def read(self, size: int = -1) -> bytes:
+        try:
+            data = self._stream.read(size)
+        except _DECODE_ERRORS as exc:
+            raise DecompressionError(f"Arquivo {self.kind} inválido ou truncado: {exc}") from exc
+        self.produced += len(data)
+        self._check_limits()
+        return data
+
+    def _check_limits(self) -> None:
+        limits = self.limits
+        if limits.max_bytes is not None and self.produced > limits.max_bytes:
+            raise DecompressionLimitError(
+                f"O conteúdo descompactado ultrapassa o limite de {limits.max_bytes} bytes."
+            )
+        if (
+            limits.max_ratio is not None
+            and self.produced > RATIO_GRACE_BYTES
+            and self.produced > limits.max_ratio * max(self.compressed_bytes, 1)
+        ):
+            raise DecompressionLimitError(
+                f"Taxa de compressão acima de {limits.max_ratio:g}:1; "
+                "o envio parece uma bomba de descompressão."
+            )
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+def open_decompressed(stream: BinaryIO, limits: DecompressionLimits | None = None) -> BinaryIO:
+    """``stream`` descompactado se os primeiros bytes indicarem compressão; senão o próprio ``stream``.
+
+    Os bytes usados na detecção são devolvidos com ``seek``, portanto ``stream``
+    precisa ser posicionável (uploads do FastAPI e arquivos em disco são).
+    """
+
+    start = stream.tell()
+    kind = detect_compression(stream.read(HEAD_BYTES))
+    stream.seek(start)
+    if kind is None:
+        return stream
+    return DecompressingStream(stream, kind, limits or DecompressionLimits.from_settings())
+
+
+__all__ = [
+    "DecompressingStream",
+    "DecompressionError",
+    "DecompressionLimitError",
+    "DecompressionLimits",
+    "MAGIC_NUMBERS",
+    "RATIO_GRACE_BYTES",
+    "detect_compression",
+    "open_decompressed",
+]
@@ -0,0 +1,253 @@
+"""Fila limitada de validações executadas em um pool de processos."""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing.sharedctypes import RawArray
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from ..config import get_settings
+from ..metrics import METRICS
+from ..models import ValidationRun
+from ..validators import VALIDATORS, ValidationResult
+from ..validators.incremental import BlockManifest, IncrementalResult, validate_incremental
+from ..validators.policy import UNLIMITED, ValidationPolicy
+from .compression import open_decompressed
+
+_progress: Any = None
+
+
+class QueueFullError(RuntimeError):
+    """A fila de validações atingiu a capacidade configurada."""
+
+
+class _ProgressReader:
+    """Arquivo binário que publica a fração lida na memória compartilhada.
+
+    A fração é a posição no arquivo salvo: em envios compactados, a parte já
+    consumida pelo descompressor.
+    """
+
+    def __init__(self, stream: BinaryIO, total: int, slot: int) -> None:
+        self._stream = stream
+        self._total = max(total, 1)
+        self._slot = slot
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        _progress[self._slot] = min(self._stream.tell() / self._total, 1.0)
+        return chunk
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._stream.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._stream.tell()
+
+
+def _init_worker(progress: Any) -> None:
+    global _progress
+    _progress = progress
+
+
+def validate_file_job(
+    validator_key: str,
+    path: str,
+    run: ValidationRun,
+    slot: int,
+    policy: ValidationPolicy = UNLIMITED,
+    layout_version: str | None = None,
+    block_lines: int = 0,
+    previous: BlockManifest | None = None,
+) -> ValidationResult | IncrementalResult:
+    """Executada no processo filho: valida o arquivo salvo em ``path``, descompactando-o se preciso.
+
+    O validador é resolvido pelo registro do próprio processo filho, que carrega
+    o layout da versão pedida na primeira vez que ela aparece. Com
+    ``block_lines`` a validação é feita por blocos, reaproveitando os de
+    ``previous``, e devolve também o manifesto para o processo pai guardar.
+    """
+
+    validator = VALIDATORS.resolve(validator_key, layout_version)
+    with open(path, "rb") as stream:
+        content = open_decompressed(_ProgressReader(stream, os.path.getsize(path), slot))
+        if block_lines > 0:
+            return validate_incremental(validator, content, run, policy, previous, block_lines)
+        return validator.validate(content, run, policy)
+
+
+@dataclass
+class ValidationJob:
+    run_id: int
+    slot: int
+    future: Future
+
+
+class ValidationJobQueue:
+    """Fila de validações com capacidade limitada sobre um ``ProcessPoolExecutor``.
+
+    ``max_pending`` limita os trabalhos aceitos e ainda não concluídos; acima
+    disso ``submit`` levanta ``QueueFullError`` (contrapressão para a API). Cada
+    trabalho ocupa um slot em um vetor compartilhado onde o processo filho
+    publica seu progresso; ``reserve`` separa slots para quem submete direto ao
+    pool (os lotes), sob o mesmo limite.
+    """
+
+    def __init__(self, max_workers: int | None = None, max_pending: int = 32) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._free_slots = list(range(max_pending - 1, -1, -1))
+        self._jobs: dict[int, ValidationJob] = {}
+        self._reserved = 0
+        self._progress = RawArray("d", max_pending)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self._progress,),
+            )
+        return self._executor
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Pool de processos da fila, compartilhado com a validação de lotes."""
+
+        return self._get_executor()
+
+    @property
+    def depth(self) -> int:
+        """Quantidade de trabalhos aceitos e ainda não concluídos (inclui os slots reservados)."""
+
+        return len(self._jobs) + self._reserved
+
+    @contextmanager
+    def reserve(self, count: int) -> Iterator[int]:
+        """Reserva até ``count`` slots livres enquanto durar o bloco e informa quantos obteve.
+
+        Sem slot livre levanta ``QueueFullError``, como ``submit``.
+        """
+
+        with self._lock:
+            if not self._free_slots:
+                raise QueueFullError("Fila de validação cheia.")
+            taken = [self._free_slots.pop() for _ in range(min(max(count, 1), len(self._free_slots)))]
+            self._reserved += len(taken)
+        try:
+            yield len(taken)
+        finally:
+            with self._lock:
+                self._reserved -= len(taken)
+                self._free_slots.extend(taken)
+
+    def submit(
+        self,
+        validator_key: str,
+        path: str | Path,
+        run: ValidationRun,
+        on_done: Callable[[Future], None],
+        policy: ValidationPolicy = UNLIMITED,
+        layout_version: str | None = None,
+        block_lines: int = 0,
+        previous: BlockManifest | None = None,
+    ) -> ValidationJob:
+        with self._lock:
+            if not self._free_slots:
+                raise QueueFullError("Fila de validação cheia.")
+            slot = self._free_slots.pop()
+            self._progress[slot] = 0.0
+            args = (validator_key, str(path), run, slot, policy, layout_version, block_lines, previous)
+            try:
+                try:
+                    future = self._get_executor().submit(validate_file_job, *args)
+                except BrokenProcessPool:
+                    # Um processo filho morreu e inutilizou o pool: um novo assume os próximos trabalhos.
+                    self._discard_executor()
+                    future = self._get_executor().submit(validate_file_job, *args)
+            except BaseException:
+                self._free_slots.append(slot)
+                raise
+            job = self._jobs[run.id] = ValidationJob(run_id=run.id, slot=slot, future=future)
+
+        def release(done: Future) -> None:
+            try:
+                on_done(done)
+            finally:
+                with self._lock:
+                    self._jobs.pop(run.id, None)
+                    self._free_slots.append(slot)
+
+        future.add_done_callback(release)
+        return job
+
+    def status(self, run_id: int) -> tuple[str, float] | None:
+        """Estado (``pending``/``running``) e progresso de um trabalho em andamento."""
+
+        job = self._jobs.get(run_id)
+        if job is None:
+            return None
+        progress = self._progress[job.slot]
+        return ("running" if job.future.running() or progress > 0 else "pending"), progress
+
+    def _discard_executor(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_queue: ValidationJobQueue | None = None
+
+
+def get_job_queue() -> ValidationJobQueue:
+    """Fila compartilhada pelo processo, criada sob demanda."""
+
+    global _queue
+    if _queue is None:
+        settings = get_settings()
+        _queue = ValidationJobQueue(max_workers=settings.job_workers, max_pending=settings.job_queue_size)
+    return _queue
+
+
+def shutdown_job_queue(wait: bool = True) -> None:
+    """Encerra o pool de processos da fila compartilhada, se houver."""
+
+    global _queue
+    if _queue is not None:
+        _queue.shutdown(wait=wait)
+        _queue = None
+
+
+METRICS.callback(
+    "validator_job_queue_depth",
+    "Validações aceitas pela fila e ainda não concluídas.",
+    "gauge",
+    lambda: _queue.depth if _queue is not None else 0,
+)
+
+
+__all__ = [
+    "QueueFullError",
+    "ValidationJob",
+    "ValidationJobQueue",
+    "get_job_queue",
+    "shutdown_job_queue",
+    "validate_file_job",
+]
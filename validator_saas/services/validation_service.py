@@ -2,18 +2,60 @@
 
 from __future__ import annotations
 
-from typing import Any
+import os
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from dataclasses import replace
+from functools import partial
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
 
-from ..models import Organization, RegulatoryFile
-from ..storage import InMemoryDatabase
-from ..validators import VALIDATORS, ValidationResult
+from ..config import get_settings
+from ..metrics import BYTES_INGESTED, ISSUES_FOUND, ROWS_VALIDATED, RUNS_FINISHED, StageTimer
+from ..models import Organization, RegulatoryFile, ValidationIssue, ValidationRun
+from ..storage import Database, InMemoryDatabase
+from ..validators import VALIDATORS, LayoutNotFoundError, LayoutValidator, ValidationResult
+from ..validators.incremental import BlockManifest, IncrementalResult, validate_incremental
+from ..validators.layout import DEFAULT_CHUNK_SIZE, ContentSource
+from ..validators.mapped import map_file
+from ..validators.parallel import RangeResult, validate_parallel, validate_range
+from ..validators.policy import IssueCollector, ValidationPolicy
+from .batch import BatchItem, BatchOutcome
+from .cache import (
+    CachedOutcome,
+    HashingStream,
+    ValidationResultCache,
+    cache_key,
+    content_digest,
+    discard_run_response,
+    get_manifest_cache,
+    get_result_cache,
+)
+from .compression import DecompressionError
+from .jobs import QueueFullError, ValidationJobQueue
 
 
 class ValidationService:
     """Serviço principal para registro e validação de arquivos regulatórios."""
 
-    def __init__(self, db: InMemoryDatabase) -> None:
+    def __init__(
+        self,
+        db: Database,
+        cache: ValidationResultCache | None = None,
+        policy: ValidationPolicy | None = None,
+        manifests: ValidationResultCache | None = None,
+    ) -> None:
         self.db = db
+        self.cache = cache if cache is not None else get_result_cache()
+        self.manifests = manifests if manifests is not None else get_manifest_cache()
+        self.policy = policy if policy is not None else ValidationPolicy.from_settings()
+        if isinstance(db, InMemoryDatabase):
+            # Execuções removidas pela retenção não podem continuar servidas pelo cache de respostas.
+            db.eviction_listeners.add(discard_run_response)
 
     # Organização -----------------------------------------------------
     def create_organization(self, name: str, role: str, tax_id: str) -> Organization:
@@ -29,40 +71,373 @@ class ValidationService:
         regulator: str,
         layout_version: str,
         filename: str,
+        previous_file_id: int | None = None,
     ) -> RegulatoryFile:
+        """Registra o arquivo; ``previous_file_id`` indica o envio que ele corrige (reenvio)."""
+
         return self.db.create_file(
             organization_id=organization_id,
             regulator=regulator,
             layout_version=layout_version,
             filename=filename,
+            previous_file_id=previous_file_id,
         )
 
     # Validação -------------------------------------------------------
-    def run_validation(self, regulatory_file: RegulatoryFile, raw_content: str) -> ValidationResult:
-        validator = VALIDATORS.get(regulatory_file.regulator)
-        if not validator:
-            raise ValueError(f"Validador não encontrado para {regulatory_file.regulator}.")
+    def _get_validator(self, regulatory_file: RegulatoryFile) -> LayoutValidator:
+        """Validador do regulador na versão de layout do arquivo (``LayoutNotFoundError`` se ausente)."""
+
+        return VALIDATORS.resolve(regulatory_file.regulator, regulatory_file.layout_version)
+
+    def _store_result(
+        self,
+        regulatory_file: RegulatoryFile,
+        result: ValidationResult,
+        timer: StageTimer | None = None,
+        size: int | None = None,
+    ) -> ValidationResult:
+        """Persiste o resultado e registra as métricas da execução.
+
+        Ponto único por onde passam as validações síncronas, em lote e da fila
+        (cujo trabalho roda em outro processo): as contagens de linhas e
+        inconsistências chegam no próprio ``ValidationResult``. ``size`` são os
+        bytes recebidos e ``timer`` as etapas já cronometradas, guardadas em
+        ``run.timings`` quando ``run_timings`` está ativo.
+        """
+
+        timer = timer or StageTimer()
+        run = result.run
+        with timer.stage("persist"):
+            result.issues = self.db.add_issues_bulk(run.id, result.issues)
+        if get_settings().run_timings:
+            run.timings = dict(timer.timings)
+        regulatory_file.status = run.status
+        self.db.update_file(regulatory_file)
+        self.db.update_run(run)
+        discard_run_response(run.id)
+        _record_metrics(result, size)
+        return result
+
+    # Cache de resultados ---------------------------------------------
+    def _cached_result(self, validator: LayoutValidator, run: ValidationRun, digest: str) -> ValidationResult | None:
+        """Reaproveita o resultado de um conteúdo idêntico já validado, sem reprocessá-lo."""
+
+        outcome = self.cache.get(self._cache_key(validator, digest))
+        if outcome is None:
+            return None
+        issues = [
+            ValidationIssue(
+                validation_run_id=run.id,
+                line_number=line_number,
+                column_name=column_name,
+                severity=severity,
+                message=message,
+            )
+            for line_number, column_name, severity, message in outcome.issues
+        ]
+        run.finished_at = datetime.utcnow()
+        run.status = outcome.status
+        run.summary = outcome.summary
+        run.cached_from_run_id = outcome.source_run_id
+        return ValidationResult(run=run, issues=issues)
 
+    def _cache_key(self, validator: LayoutValidator, digest: str) -> str:
+        return cache_key(validator.key, validator.layout.version, digest, self.policy.cache_tag)
+
+    def _remember(self, validator: LayoutValidator, digest: str, result: ValidationResult) -> None:
+        run = result.run
+        self.cache.put(
+            self._cache_key(validator, digest),
+            CachedOutcome.from_issues(run.id, run.status, run.summary, result.issues),
+        )
+
+    def run_validation(
+        self,
+        regulatory_file: RegulatoryFile,
+        raw_content: ContentSource,
+        parallel_workers: int | None = None,
+        parallel_threshold: int | None = None,
+        timer: StageTimer | None = None,
+    ) -> ValidationResult:
+        """Valida o conteúdo e persiste o resultado.
+
+        Com ``parallel_workers`` > 1, conteúdos em bytes ou caminhos com pelo menos
+        ``parallel_threshold`` bytes são divididos em faixas validadas em paralelo.
+        Os demais conteúdos, inclusive fluxos lidos uma única vez, são validados por
+        blocos (``validate_incremental``) e o manifesto fica guardado para o arquivo:
+        no reenvio corrigido (``previous_file_id``) só os blocos alterados são
+        validados novamente, mesmo que a validação paralela fosse usada.
+
+        As etapas ``digest``, ``validate`` e ``persist`` são cronometradas em
+        ``timer`` (que pode já trazer etapas anteriores, como o recebimento).
+        """
+
+        timer = timer or StageTimer()
+        validator = self._get_validator(regulatory_file)
         run = self.db.create_run(regulatory_file_id=regulatory_file.id, validator_key=validator.key)
-        result = validator.validate(raw_content, run)
-
-        for issue in result.issues:
-            self.db.add_issue(
-                run_id=run.id,
-                line_number=issue.line_number,
-                column_name=issue.column_name,
-                severity=issue.severity,
-                message=issue.message,
+
+        # Conteúdos relidos sem custo têm o hash calculado antes, permitindo consultar
+        # o cache; fluxos de leitura única são hasheados durante a validação.
+        with timer.stage("digest"):
+            digest = content_digest(raw_content)
+            cached = self._cached_result(validator, run, digest) if digest is not None else None
+        if cached is not None:
+            return self._store_result(regulatory_file, cached, timer, _content_size(raw_content, exact=True))
+        hashing: HashingStream | None = None
+        if digest is None:
+            raw_content = hashing = HashingStream(raw_content)
+
+        if parallel_threshold is None:
+            parallel_threshold = get_settings().parallel_threshold_bytes
+        size = _content_size(raw_content)
+        parallel = (
+            parallel_workers is not None and parallel_workers > 1 and size is not None and size >= parallel_threshold
+        )
+        block_lines = get_settings().incremental_block_lines
+        previous = self._previous_manifest(regulatory_file)
+        try:
+            with timer.stage("validate"):
+                if block_lines > 0 and (previous is not None or not parallel):
+                    with _content_buffer(raw_content) as buffer:
+                        outcome = validate_incremental(validator, buffer, run, self.policy, previous, block_lines)
+                    self.manifests.put(str(regulatory_file.id), outcome.manifest)
+                    result = outcome.result
+                elif parallel:
+                    result = validate_parallel(
+                        validator, raw_content, run, workers=parallel_workers, policy=self.policy
+                    )
+                else:
+                    result = validator.validate(raw_content, run, self.policy)
+        except DecompressionError as exc:
+            # Envio compactado corrompido ou acima dos limites: a execução não fica "running".
+            self._fail_run(regulatory_file, run, "failed", f"Falha na descompressão: {exc}")
+            raise
+        self._remember(validator, digest or hashing.hexdigest(), result)
+        size = hashing.size if hashing is not None else _content_size(raw_content, exact=True)
+        return self._store_result(regulatory_file, result, timer, size)
+
+    def _previous_manifest(self, regulatory_file: RegulatoryFile) -> BlockManifest | None:
+        """Manifesto de blocos do envio que ``regulatory_file`` corrige, se ainda guardado."""
+
+        if regulatory_file.previous_file_id is None:
+            return None
+        return self.manifests.get(str(regulatory_file.previous_file_id))
+
+    def validate_path(
+        self,
+        regulatory_file: RegulatoryFile,
+        path: str | os.PathLike,
+        parallel_workers: int | None = None,
+    ) -> ValidationResult:
+        """Valida um arquivo já presente no disco local (ex.: volume compartilhado).
+
+        O arquivo é mapeado com ``mmap`` e percorrido como ``bytes``: apenas as
+        células que passam pela conversão de tipo ou entram em uma mensagem são
+        decodificadas, e o conteúdo nunca é copiado inteiro para o heap.
+        """
+
+        return self.run_validation(regulatory_file, Path(path), parallel_workers=parallel_workers)
+
+    # Lotes ------------------------------------------------------------
+    def run_batch(
+        self,
+        organization_id: int,
+        items: Iterable[BatchItem],
+        layout_version: str = "1.0",
+        executor: Executor | None = None,
+        max_in_flight: int = 8,
+    ) -> list[BatchOutcome]:
+        """Valida vários arquivos de uma organização, devolvendo um resumo por arquivo.
+
+        Com ``executor`` os arquivos são validados concorrentemente, com no máximo
+        ``max_in_flight`` arquivos lidos e ainda não concluídos; sem ele, em série.
+        Resultados em cache são reaproveitados, e arquivos com regulador ausente
+        ou desconhecido são recusados sem interromper o restante do lote.
+        """
+
+        outcomes: list[BatchOutcome] = []
+        in_flight: deque[tuple[BatchOutcome, LayoutValidator, str, RegulatoryFile, Callable]] = deque()
+        for item in items:
+            outcome = BatchOutcome(filename=item.filename, regulator=item.regulator)
+            outcomes.append(outcome)
+            if not item.regulator:
+                outcome.error = "Regulador não informado para o arquivo."
+                continue
+            try:
+                validator = VALIDATORS.resolve(item.regulator, layout_version)
+            except LayoutNotFoundError as exc:
+                outcome.error = str(exc)
+                continue
+            regulatory_file = self.register_file(organization_id, item.regulator, layout_version, item.filename)
+            run = outcome.run = self.db.create_run(regulatory_file_id=regulatory_file.id, validator_key=validator.key)
+            try:
+                content = item.read()
+            except DecompressionError as exc:
+                outcome.error = str(exc)
+                self._fail_run(regulatory_file, run, "failed", f"Falha na leitura do arquivo: {exc}")
+                continue
+            BYTES_INGESTED.inc(validator.key, amount=len(content))
+            digest = content_digest(content)
+            cached = self._cached_result(validator, run, digest)
+            if cached is not None:
+                outcome.issue_count = len(self._store_result(regulatory_file, cached).issues)
+                continue
+            if executor is None:
+                collect = partial(validate_range, validator, content, policy=self.policy)
+                self._complete_batch_item(outcome, validator, digest, regulatory_file, collect)
+                continue
+            future = executor.submit(validate_range, validator, content, policy=self.policy)
+            in_flight.append((outcome, validator, digest, regulatory_file, future.result))
+            while len(in_flight) >= max(max_in_flight, 1):
+                self._complete_batch_item(*in_flight.popleft())
+        while in_flight:
+            self._complete_batch_item(*in_flight.popleft())
+        return outcomes
+
+    def _complete_batch_item(
+        self,
+        outcome: BatchOutcome,
+        validator: LayoutValidator,
+        digest: str,
+        regulatory_file: RegulatoryFile,
+        collect: Callable[[], RangeResult],
+    ) -> None:
+        run = outcome.run
+        try:
+            range_result = collect()
+        except Exception as exc:  # noqa: BLE001 - a falha é registrada na execução
+            outcome.error = str(exc)
+            self._fail_run(regulatory_file, run, "failed", f"Falha na validação: {exc}")
+            return
+        collector = IssueCollector(run.id, self.policy)
+        collector.merge(
+            range_result.issues,
+            range_result.suppressed,
+            range_result.abort_reason,
+            rules=range_result.rules,
+            line_count=range_result.line_count,
+            suppressed_at=range_result.suppressed_at,
+        )
+        result = validator.finish_collected(run, collector)
+        self._remember(validator, digest, result)
+        outcome.issue_count = len(self._store_result(regulatory_file, result).issues)
+
+    # Validação assíncrona ---------------------------------------------
+    def enqueue_validation(
+        self,
+        regulatory_file: RegulatoryFile,
+        path: str | Path,
+        jobs: ValidationJobQueue,
+        delete_after: bool = False,
+        timer: StageTimer | None = None,
+    ) -> ValidationRun:
+        """Agenda a validação do arquivo em ``path`` e retorna a execução pendente.
+
+        Com ``delete_after`` o arquivo é removido ao término do trabalho. Se a fila
+        estiver cheia, a execução é registrada como ``rejected`` e
+        ``QueueFullError`` é propagada; outras falhas ao agendar registram a
+        execução como ``failed`` e também são propagadas. A validação roda em outro processo: a
+        etapa ``job`` cobre a espera na fila e a validação. Como em ``run_validation``, o
+        trabalho valida por blocos a partir do manifesto do envio anterior e o novo manifesto
+        fica guardado para o arquivo.
+        """
+
+        timer = timer or StageTimer()
+        validator = self._get_validator(regulatory_file)
+        run = self.db.create_run(regulatory_file_id=regulatory_file.id, validator_key=validator.key)
+        size = os.path.getsize(path)
+        with timer.stage("digest"):
+            digest = content_digest(Path(path))
+            cached = self._cached_result(validator, run, digest)
+        if cached is not None:
+            self._store_result(regulatory_file, cached, timer, size)
+            if delete_after:
+                os.unlink(path)
+            return cached.run
+        run.status = "pending"
+        self.db.update_run(run)
+        submitted = time.perf_counter()
+
+        def on_done(future: Future) -> None:
+            timer.add("job", time.perf_counter() - submitted)
+            try:
+                self._complete_job(validator, digest, regulatory_file, run, future, timer, size)
+            finally:
+                if delete_after:
+                    os.unlink(path)
+
+        try:
+            jobs.submit(
+                validator.key,
+                path,
+                run,
+                on_done,
+                policy=self.policy,
+                layout_version=validator.layout.version,
+                block_lines=get_settings().incremental_block_lines,
+                previous=self._previous_manifest(regulatory_file),
             )
-        regulatory_file.status = result.run.status
+        except QueueFullError:
+            self._fail_run(regulatory_file, run, "rejected", "Fila de validação cheia; tente novamente.")
+            raise
+        except Exception as exc:
+            # Sem trabalho agendado a execução ficaria ``pending`` para sempre.
+            self._fail_run(regulatory_file, run, "failed", f"Falha ao agendar a validação: {exc}")
+            raise
+        return run
+
+    def _complete_job(
+        self,
+        validator: LayoutValidator,
+        digest: str,
+        regulatory_file: RegulatoryFile,
+        run: ValidationRun,
+        future: Future,
+        timer: StageTimer | None = None,
+        size: int | None = None,
+    ) -> None:
+        try:
+            result = future.result()
+        except Exception as exc:  # noqa: BLE001 - a falha é registrada na execução
+            self._fail_run(regulatory_file, run, "failed", f"Falha na validação: {exc}")
+        else:
+            if isinstance(result, IncrementalResult):
+                self.manifests.put(str(regulatory_file.id), result.manifest)
+                result = result.result
+            self._remember(validator, digest, result)
+            self._store_result(regulatory_file, result, timer, size)
+
+    def _fail_run(self, regulatory_file: RegulatoryFile, run: ValidationRun, status: str, summary: str) -> None:
+        run.status = status
+        run.summary = summary
+        run.finished_at = datetime.utcnow()
+        regulatory_file.status = status
         self.db.update_file(regulatory_file)
-        self.db.update_run(result.run)
-        result.issues = self.db.list_issues_for_run(run.id)
-        return result
+        self.db.update_run(run)
+        discard_run_response(run.id)
+        RUNS_FINISHED.inc(run.validator_key, status)
+
+    def get_run_status(
+        self,
+        run_id: int,
+        jobs: ValidationJobQueue | None = None,
+    ) -> tuple[ValidationRun, float] | None:
+        """Retorna a execução e seu progresso (0 a 1), consultando a fila se ainda ativa."""
+
+        # A fila é consultada antes do banco: um trabalho só sai da fila depois
+        # que seu resultado foi persistido.
+        state = jobs.status(run_id) if jobs is not None else None
+        run = self.db.get_run(run_id)
+        if run is None:
+            return None
+        if state is not None:
+            status, progress = state
+            return replace(run, status=status), progress
+        return run, 1.0 if run.finished_at else 0.0
 
     # Catálogo de validadores ----------------------------------------
     def list_validators(self) -> list[dict[str, Any]]:
-        """Exibe metadados dos validadores registrados."""
+        """Exibe metadados dos validadores registrados, com o layout da versão mais recente."""
 
         descriptors: list[dict[str, Any]] = []
         for validator in VALIDATORS.values():
@@ -71,22 +446,72 @@ class ValidationService:
                 {
                     "key": validator.key,
                     "regulator": validator.regulator,
+                    "versions": VALIDATORS.versions(validator.key),
                     "layout": {
                         "name": layout.name,
                         "version": layout.version,
+                        "delimiter": layout.delimiter,
                         "fields": [
                             {
                                 "name": field.name,
                                 "type": getattr(field.type_, "__name__", str(field.type_)),
                                 "required": field.required,
                                 "max_length": field.max_length,
+                                "pattern": field.pattern,
+                                "start": field.start,
+                                "length": field.length,
                             }
                             for field in layout.fields
                         ],
+                        "rules": [rule.description for rule in layout.rules],
                     },
                 }
             )
         return descriptors
 
 
+@contextmanager
+def _content_buffer(raw_content: Any) -> Iterator[Any]:
+    """Conteúdo relido sem custo como buffer de bytes (caminhos são mapeados); fluxos seguem intactos."""
+
+    if isinstance(raw_content, os.PathLike):
+        with map_file(raw_content) as buffer:
+            yield buffer
+    else:
+        yield raw_content.encode("utf-8") if isinstance(raw_content, str) else raw_content
+
+
+def _content_size(raw_content: ContentSource, exact: bool = False) -> int | None:
+    """Tamanho em bytes de conteúdos elegíveis à validação paralela.
+
+    Com ``exact`` o texto também é medido, para as métricas: o tamanho em UTF-8
+    é somado bloco a bloco, sem uma segunda cópia integral do conteúdo.
+    """
+
+    if isinstance(raw_content, (bytes, bytearray)):
+        return len(raw_content)
+    if isinstance(raw_content, os.PathLike):
+        return os.path.getsize(raw_content)
+    if exact and isinstance(raw_content, str):
+        if raw_content.isascii():
+            return len(raw_content)
+        return sum(
+            len(raw_content[start : start + DEFAULT_CHUNK_SIZE].encode("utf-8"))
+            for start in range(0, len(raw_content), DEFAULT_CHUNK_SIZE)
+        )
+    return None
+
+
+def _record_metrics(result: ValidationResult, size: int | None = None) -> None:
+    """Contadores de uma execução concluída; resultados do cache não contam linhas nem inconsistências."""
+
+    run = result.run
+    RUNS_FINISHED.inc(run.validator_key, run.status)
+    if size is not None:
+        BYTES_INGESTED.inc(run.validator_key, amount=size)
+    if run.cached_from_run_id is None:
+        ROWS_VALIDATED.inc(run.validator_key, amount=result.line_count)
+        ISSUES_FOUND.inc(run.validator_key, amount=result.issue_total)
+
+
 __all__ = ["ValidationService"]
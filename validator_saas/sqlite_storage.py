@@ -0,0 +1,475 @@
+"""Armazenamento persistente em SQLite compatível com ``InMemoryDatabase``."""
+
+from __future__ import annotations
+
+import json
+import queue
+import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from .issue_store import NO_FILTER, IssueExportRow, IssueFilter
+from .models import Organization, RegulatoryFile, ValidationIssue, ValidationRun
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS organizations (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    role TEXT NOT NULL,
+    tax_id TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS regulatory_files (
+    id INTEGER PRIMARY KEY,
+    organization_id INTEGER NOT NULL REFERENCES organizations(id),
+    regulator TEXT NOT NULL,
+    layout_version TEXT NOT NULL,
+    original_filename TEXT NOT NULL,
+    uploaded_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    previous_file_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_regulatory_files_organization ON regulatory_files (organization_id, id);
+CREATE TABLE IF NOT EXISTS validation_runs (
+    id INTEGER PRIMARY KEY,
+    regulatory_file_id INTEGER NOT NULL REFERENCES regulatory_files(id),
+    validator_key TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL,
+    summary TEXT,
+    cached_from_run_id INTEGER,
+    timings TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_validation_runs_file ON validation_runs (regulatory_file_id, id);
+CREATE TABLE IF NOT EXISTS validation_issues (
+    id INTEGER PRIMARY KEY,
+    validation_run_id INTEGER NOT NULL,
+    line_number INTEGER,
+    column_name TEXT,
+    severity TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_validation_issues_run ON validation_issues (validation_run_id, id);
+"""
+
+# Colunas adicionadas após a criação do esquema: (tabela, coluna, definição).
+MIGRATIONS = (
+    ("validation_runs", "cached_from_run_id", "INTEGER"),
+    ("regulatory_files", "previous_file_id", "INTEGER"),
+    ("validation_runs", "timings", "TEXT"),
+)
+
+_INSERT_ISSUE = (
+    "INSERT INTO validation_issues (id, validation_run_id, line_number, column_name, severity, message) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SELECT_ISSUE_COLUMNS = (
+    "SELECT id, validation_run_id, line_number, column_name, severity, message FROM validation_issues"
+)
+_SELECT_ISSUES = f"{_SELECT_ISSUE_COLUMNS} WHERE validation_run_id = ? ORDER BY id LIMIT ? OFFSET ?"
+
+EXPORT_FETCH_SIZE = 1000
+_SELECT_RUNS = (
+    "SELECT id, regulatory_file_id, validator_key, started_at, finished_at, status, summary, "
+    "cached_from_run_id, timings FROM validation_runs"
+)
+_SELECT_FILES = (
+    "SELECT id, organization_id, regulator, layout_version, original_filename, uploaded_at, status, "
+    "previous_file_id FROM regulatory_files"
+)
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _organization(row: tuple) -> Organization:
+    return Organization(id=row[0], name=row[1], role=row[2], tax_id=row[3], created_at=_parse_datetime(row[4]))
+
+
+def _file(row: tuple) -> RegulatoryFile:
+    return RegulatoryFile(
+        id=row[0],
+        organization_id=row[1],
+        regulator=row[2],
+        layout_version=row[3],
+        original_filename=row[4],
+        uploaded_at=_parse_datetime(row[5]),
+        status=row[6],
+        previous_file_id=row[7],
+    )
+
+
+def _run(row: tuple) -> ValidationRun:
+    return ValidationRun(
+        id=row[0],
+        regulatory_file_id=row[1],
+        validator_key=row[2],
+        started_at=_parse_datetime(row[3]),
+        finished_at=_parse_datetime(row[4]),
+        status=row[5],
+        summary=row[6],
+        cached_from_run_id=row[7],
+        timings=json.loads(row[8]) if row[8] else None,
+    )
+
+
+def _issue(row: tuple) -> ValidationIssue:
+    return ValidationIssue(
+        id=row[0],
+        validation_run_id=row[1],
+        line_number=row[2],
+        column_name=row[3],
+        severity=row[4],
+        message=row[5],
+    )
+
+
+def _issue_conditions(run_id: int, after_id: int, issue_filter: IssueFilter) -> tuple[str, tuple]:
+    """Cláusula ``WHERE`` da listagem por cursor; o índice (validation_run_id, id) cobre a ordenação."""
+
+    conditions = ["validation_run_id = ?", "id > ?"]
+    params: list[object] = [run_id, after_id]
+    for condition, value in (
+        ("severity = ?", issue_filter.severity),
+        ("column_name = ?", issue_filter.column_name),
+        ("line_number >= ?", issue_filter.line_from),
+        ("line_number <= ?", issue_filter.line_to),
+    ):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    return " AND ".join(conditions), tuple(params)
+
+
+def _limit(limit: int | None) -> int:
+    # Em SQLite, ``LIMIT -1`` significa "sem limite".
+    return -1 if limit is None else limit
+
+
+class PoolTimeoutError(TimeoutError):
+    """Nenhuma conexão do pool ficou livre dentro do tempo de espera."""
+
+
+class _ConnectionPool:
+    """Pool de conexões do processo atual; cada worker do uvicorn mantém o seu.
+
+    Quem espera por uma conexão desiste após ``timeout`` segundos com
+    ``PoolTimeoutError``, em vez de bloquear indefinidamente.
+    """
+
+    def __init__(self, path: str, size: int, timeout: float = 30) -> None:
+        self._path = path
+        self._size = size
+        self._timeout = timeout
+        self._connections: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        for _ in range(size):
+            self._connections.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self._path,
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            connection = self._connections.get(timeout=self._timeout)
+        except queue.Empty:
+            raise PoolTimeoutError(
+                f"Nenhuma conexão SQLite livre após {self._timeout:g} s (pool de {self._size})."
+            ) from None
+        try:
+            yield connection
+        finally:
+            self._connections.put(connection)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transação de escrita; ``BEGIN IMMEDIATE`` serializa escritores entre processos."""
+
+        with self.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+                connection.execute("COMMIT")
+            except BaseException:
+                # Também após um COMMIT que falhou: a conexão volta ao pool sem transação aberta.
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+
+class SQLiteDatabase:
+    """Persistência em SQLite (modo WAL) com a mesma interface de ``InMemoryDatabase``.
+
+    Vários processos podem compartilhar o mesmo arquivo; as consultas usam SQL
+    constante, aproveitando o cache de *prepared statements* de cada conexão.
+    """
+
+    def __init__(self, path: str | Path, pool_size: int = 4, pool_timeout: float = 30) -> None:
+        self.path = str(path)
+        self._pool = _ConnectionPool(self.path, pool_size, pool_timeout)
+        self.init_schema()
+
+    def init_schema(self) -> None:
+        with self._pool.connection() as connection:
+            connection.executescript(SCHEMA)
+            for table, column, definition in MIGRATIONS:
+                columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+                if column not in columns:
+                    connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def close(self) -> None:
+        self._pool.close()
+
+    # Organizações --------------------------------------------------
+    def create_organization(self, name: str, role: str, tax_id: str) -> Organization:
+        created_at = datetime.utcnow()
+        with self._pool.transaction() as connection:
+            cursor = connection.execute(
+                "INSERT INTO organizations (name, role, tax_id, created_at) VALUES (?, ?, ?, ?)",
+                (name, role, tax_id, created_at.isoformat()),
+            )
+        return Organization(id=cursor.lastrowid, name=name, role=role, tax_id=tax_id, created_at=created_at)
+
+    def list_organizations(self) -> list[Organization]:
+        with self._pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT id, name, role, tax_id, created_at FROM organizations ORDER BY created_at, id"
+            ).fetchall()
+        return [_organization(row) for row in rows]
+
+    def get_organization(self, organization_id: int) -> Organization | None:
+        with self._pool.connection() as connection:
+            row = connection.execute(
+                "SELECT id, name, role, tax_id, created_at FROM organizations WHERE id = ?",
+                (organization_id,),
+            ).fetchone()
+        return _organization(row) if row else None
+
+    # Arquivos -------------------------------------------------------
+    def create_file(
+        self,
+        organization_id: int,
+        regulator: str,
+        layout_version: str,
+        filename: str,
+        previous_file_id: int | None = None,
+    ) -> RegulatoryFile:
+        regulatory_file = RegulatoryFile(
+            id=0,
+            organization_id=organization_id,
+            regulator=regulator,
+            layout_version=layout_version,
+            original_filename=filename,
+            previous_file_id=previous_file_id,
+        )
+        with self._pool.transaction() as connection:
+            cursor = connection.execute(
+                "INSERT INTO regulatory_files "
+                "(organization_id, regulator, layout_version, original_filename, uploaded_at, status, "
+                "previous_file_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    organization_id,
+                    regulator,
+                    layout_version,
+                    filename,
+                    regulatory_file.uploaded_at.isoformat(),
+                    regulatory_file.status,
+                    previous_file_id,
+                ),
+            )
+        regulatory_file.id = cursor.lastrowid
+        return regulatory_file
+
+    def get_file(self, file_id: int) -> RegulatoryFile | None:
+        with self._pool.connection() as connection:
+            row = connection.execute(f"{_SELECT_FILES} WHERE id = ?", (file_id,)).fetchone()
+        return _file(row) if row else None
+
+    def list_files_for_organization(
+        self,
+        organization_id: int,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[RegulatoryFile]:
+        with self._pool.connection() as connection:
+            rows = connection.execute(
+                f"{_SELECT_FILES} WHERE organization_id = ? ORDER BY id LIMIT ? OFFSET ?",
+                (organization_id, _limit(limit), offset),
+            ).fetchall()
+        return [_file(row) for row in rows]
+
+    def update_file(self, regulatory_file: RegulatoryFile) -> None:
+        with self._pool.transaction() as connection:
+            connection.execute(
+                "UPDATE regulatory_files SET regulator = ?, layout_version = ?, original_filename = ?, status = ? "
+                "WHERE id = ?",
+                (
+                    regulatory_file.regulator,
+                    regulatory_file.layout_version,
+                    regulatory_file.original_filename,
+                    regulatory_file.status,
+                    regulatory_file.id,
+                ),
+            )
+
+    # Execuções ------------------------------------------------------
+    def create_run(self, regulatory_file_id: int, validator_key: str) -> ValidationRun:
+        run = ValidationRun(
+            id=0,
+            regulatory_file_id=regulatory_file_id,
+            validator_key=validator_key,
+            started_at=datetime.utcnow(),
+            status="running",
+        )
+        with self._pool.transaction() as connection:
+            cursor = connection.execute(
+                "INSERT INTO validation_runs (regulatory_file_id, validator_key, started_at, status) "
+                "VALUES (?, ?, ?, ?)",
+                (regulatory_file_id, validator_key, run.started_at.isoformat(), run.status),
+            )
+        run.id = cursor.lastrowid
+        return run
+
+    def get_run(self, run_id: int) -> ValidationRun | None:
+        with self._pool.connection() as connection:
+            row = connection.execute(f"{_SELECT_RUNS} WHERE id = ?", (run_id,)).fetchone()
+        return _run(row) if row else None
+
+    def list_runs_for_file(
+        self,
+        regulatory_file_id: int,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[ValidationRun]:
+        with self._pool.connection() as connection:
+            rows = connection.execute(
+                f"{_SELECT_RUNS} WHERE regulatory_file_id = ? ORDER BY id LIMIT ? OFFSET ?",
+                (regulatory_file_id, _limit(limit), offset),
+            ).fetchall()
+        return [_run(row) for row in rows]
+
+    def update_run(self, run: ValidationRun) -> None:
+        with self._pool.transaction() as connection:
+            connection.execute(
+                "UPDATE validation_runs SET finished_at = ?, status = ?, summary = ?, "
+                "cached_from_run_id = ?, timings = ? WHERE id = ?",
+                (
+                    run.finished_at.isoformat() if run.finished_at else None,
+                    run.status,
+                    run.summary,
+                    run.cached_from_run_id,
+                    json.dumps(run.timings) if run.timings is not None else None,
+                    run.id,
+                ),
+            )
+
+    def list_issues_for_run(
+        self,
+        run_id: int,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[ValidationIssue]:
+        with self._pool.connection() as connection:
+            rows = connection.execute(_SELECT_ISSUES, (run_id, _limit(limit), offset)).fetchall()
+        return [_issue(row) for row in rows]
+
+    def count_issues_for_run(self, run_id: int) -> int:
+        with self._pool.connection() as connection:
+            (total,) = connection.execute(
+                "SELECT COUNT(*) FROM validation_issues WHERE validation_run_id = ?", (run_id,)
+            ).fetchone()
+        return total
+
+    def list_issues_page(
+        self,
+        run_id: int,
+        after_id: int = 0,
+        limit: int = 100,
+        issue_filter: IssueFilter = NO_FILTER,
+    ) -> list[ValidationIssue]:
+        where, params = _issue_conditions(run_id, after_id, issue_filter)
+        with self._pool.connection() as connection:
+            rows = connection.execute(
+                f"{_SELECT_ISSUE_COLUMNS} WHERE {where} ORDER BY id LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [_issue(row) for row in rows]
+
+    def iter_issue_rows(self, run_id: int, issue_filter: IssueFilter = NO_FILTER) -> Iterator[IssueExportRow]:
+        """Percorre as inconsistências em lotes de ``EXPORT_FETCH_SIZE`` paginados por id.
+
+        Cada lote usa uma conexão do pool só durante a consulta: clientes lentos
+        de uma exportação não seguram conexões enquanto consomem as linhas.
+        """
+
+        after_id = 0
+        while True:
+            where, params = _issue_conditions(run_id, after_id, issue_filter)
+            with self._pool.connection() as connection:
+                rows = connection.execute(
+                    "SELECT id, line_number, column_name, severity, message FROM validation_issues "
+                    f"WHERE {where} ORDER BY id LIMIT ?",
+                    (*params, EXPORT_FETCH_SIZE),
+                ).fetchall()
+            yield from rows
+            if len(rows) < EXPORT_FETCH_SIZE:
+                return
+            after_id = rows[-1][0]
+
+    def add_issue(
+        self,
+        run_id: int,
+        line_number: int | None,
+        column_name: str | None,
+        severity: str,
+        message: str,
+    ) -> ValidationIssue:
+        issue = ValidationIssue(
+            line_number=line_number,
+            column_name=column_name,
+            severity=severity,
+            message=message,
+        )
+        return self.add_issues_bulk(run_id, [issue])[0]
+
+    def add_issues_bulk(self, run_id: int, issues: Iterable[ValidationIssue]) -> list[ValidationIssue]:
+        """Insere as inconsistências com ``executemany`` em uma única transação.
+
+        Os ids são reservados em bloco dentro da transação (``BEGIN IMMEDIATE``
+        garante exclusividade entre processos) e atribuídos aos objetos recebidos.
+        """
+
+        adopted = issues if isinstance(issues, list) else list(issues)
+        with self._pool.transaction() as connection:
+            (last_id,) = connection.execute("SELECT COALESCE(MAX(id), 0) FROM validation_issues").fetchone()
+            for issue_id, issue in enumerate(adopted, start=last_id + 1):
+                issue.id = issue_id
+                issue.validation_run_id = run_id
+            connection.executemany(
+                _INSERT_ISSUE,
+                (
+                    (issue.id, run_id, issue.line_number, issue.column_name, issue.severity, issue.message)
+                    for issue in adopted
+                ),
+            )
+        return adopted
+
+
+__all__ = ["PoolTimeoutError", "SQLiteDatabase"]
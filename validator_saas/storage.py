@@ -2,36 +2,125 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterator
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
 from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from datetime import datetime
 from itertools import count
-from typing import Dict
+from typing import Dict, Union
 
+from .config import get_settings
+from .issue_store import (
+    NO_FILTER,
+    IssueExportRow,
+    IssueFilter,
+    IssueSegment,
+    IssueStore,
+    create_issue_store,
+    paginate,
+)
+from .metrics import METRICS, RELEASED_BYTES, RELEASED_RUNS
 from .models import Organization, RegulatoryFile, ValidationIssue, ValidationRun
+from .sqlite_storage import SQLiteDatabase
+
+RETENTION_MODES = ("spill", "evict")
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Quando as inconsistências de execuções concluídas saem da memória do ``InMemoryDatabase``.
+
+    Saem as execuções concluídas há mais de ``ttl_seconds`` e, da mais antiga
+    para a mais nova, as necessárias para que as inconsistências em memória
+    (``IssueStore.memory_bytes``) voltem a caber em ``max_issue_bytes``. Com
+    ``mode="spill"`` as inconsistências são compactadas em um ``IssueSegment``
+    em ``spill_dir`` e continuam legíveis pelas mesmas consultas; com
+    ``mode="evict"`` a execução é removida por inteiro. ``None`` desativa cada
+    limite; execuções em andamento nunca saem. Quando o segmento passa de
+    ``max_spill_bytes``, as execuções compactadas mais antigas são removidas
+    por inteiro.
+    """
+
+    max_issue_bytes: int | None = None
+    ttl_seconds: float | None = None
+    mode: str = "spill"
+    spill_dir: str | None = None
+    max_spill_bytes: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.mode not in RETENTION_MODES:
+            raise ValueError(f"Modo de retenção desconhecido: {self.mode}.")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_issue_bytes is not None or self.ttl_seconds is not None
+
+    @classmethod
+    def from_settings(cls) -> "RetentionPolicy":
+        settings = get_settings()
+        return cls(
+            max_issue_bytes=settings.memory_issue_bytes,
+            ttl_seconds=settings.run_ttl_seconds,
+            mode=settings.retention_mode,
+            spill_dir=settings.spill_dir,
+            max_spill_bytes=settings.spill_max_bytes,
+        )
 
 
 class InMemoryDatabase:
-    """Simula persistência de dados para fins de prototipagem."""
+    """Simula persistência de dados para fins de prototipagem.
+
+    A instância é compartilhada pelas threads do servidor. Cada tabela tem sua
+    trava de escrita (sequência de ids, registro e índice secundário mudam
+    juntos); as leituras não travam. Como no SQLite, arquivos e execuções são
+    guardados como cópias: alterar o objeto recebido só tem efeito após
+    ``update_file``/``update_run``, e um leitor nunca vê uma execução com status
+    novo e resumo antigo.
 
-    def __init__(self) -> None:
+    ``retention`` limita a memória ocupada pelas inconsistências de execuções
+    concluídas (ver ``RetentionPolicy``); a política é aplicada a cada execução
+    concluída em ``update_run`` ou por ``enforce_retention``.
+    """
+
+    def __init__(
+        self,
+        issue_store: str | IssueStore = "objects",
+        retention: RetentionPolicy | None = None,
+    ) -> None:
         self._organization_seq = count(1)
         self._file_seq = count(1)
         self._run_seq = count(1)
-        self._issue_seq = count(1)
+        self._organizations_lock = threading.Lock()
+        self._files_lock = threading.Lock()
+        self._runs_lock = threading.Lock()
         self.organizations: Dict[int, Organization] = {}
         self.files: Dict[int, RegulatoryFile] = {}
         self.validation_runs: Dict[int, ValidationRun] = {}
-        self.issues: Dict[int, ValidationIssue] = {}
+        self.issue_store: IssueStore = (
+            create_issue_store(issue_store) if isinstance(issue_store, str) else issue_store
+        )
+        # Índices secundários mantidos pelas operações de escrita.
+        self._file_ids_by_organization: Dict[int, list[int]] = {}
+        self._run_ids_by_file: Dict[int, list[int]] = {}
+        self.retention = retention or RetentionPolicy()
+        self.segment: IssueSegment | None = None
+        # Execuções concluídas com inconsistências ainda em memória, na ordem de conclusão.
+        self._resident: OrderedDict[int, datetime] = OrderedDict()
+        self._retention_lock = threading.Lock()
+        # Chamados com o id de cada execução removida (ex.: para invalidar caches das camadas acima).
+        self.eviction_listeners: set[Callable[[int], None]] = set()
 
     # Organizações --------------------------------------------------
     def create_organization(self, name: str, role: str, tax_id: str) -> Organization:
-        organization = Organization(id=next(self._organization_seq), name=name, role=role, tax_id=tax_id)
-        self.organizations[organization.id] = organization
+        with self._organizations_lock:
+            organization = Organization(id=next(self._organization_seq), name=name, role=role, tax_id=tax_id)
+            self.organizations[organization.id] = organization
         return organization
 
     def list_organizations(self) -> list[Organization]:
-        return sorted(self.organizations.values(), key=lambda org: org.created_at)
+        return sorted(list(self.organizations.values()), key=lambda org: org.created_at)
 
     def get_organization(self, organization_id: int) -> Organization | None:
         return self.organizations.get(organization_id)
@@ -43,37 +132,207 @@ class InMemoryDatabase:
         regulator: str,
         layout_version: str,
         filename: str,
+        previous_file_id: int | None = None,
     ) -> RegulatoryFile:
-        regulatory_file = RegulatoryFile(
-            id=next(self._file_seq),
-            organization_id=organization_id,
-            regulator=regulator,
-            layout_version=layout_version,
-            original_filename=filename,
-        )
-        self.files[regulatory_file.id] = regulatory_file
+        with self._files_lock:
+            regulatory_file = RegulatoryFile(
+                id=next(self._file_seq),
+                organization_id=organization_id,
+                regulator=regulator,
+                layout_version=layout_version,
+                original_filename=filename,
+                previous_file_id=previous_file_id,
+            )
+            self.files[regulatory_file.id] = replace(regulatory_file)
+            self._file_ids_by_organization.setdefault(organization_id, []).append(regulatory_file.id)
         return regulatory_file
 
+    def get_file(self, file_id: int) -> RegulatoryFile | None:
+        return self.files.get(file_id)
+
+    def list_files_for_organization(
+        self,
+        organization_id: int,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[RegulatoryFile]:
+        file_ids = paginate(self._file_ids_by_organization.get(organization_id, []), offset, limit)
+        return [self.files[file_id] for file_id in file_ids]
+
     def update_file(self, regulatory_file: RegulatoryFile) -> None:
-        self.files[regulatory_file.id] = regulatory_file
+        self.files[regulatory_file.id] = replace(regulatory_file)
 
     # Execuções ------------------------------------------------------
     def create_run(self, regulatory_file_id: int, validator_key: str) -> ValidationRun:
-        run = ValidationRun(
-            id=next(self._run_seq),
-            regulatory_file_id=regulatory_file_id,
-            validator_key=validator_key,
-            started_at=datetime.utcnow(),
-            status="running",
-        )
-        self.validation_runs[run.id] = run
+        with self._runs_lock:
+            run = ValidationRun(
+                id=next(self._run_seq),
+                regulatory_file_id=regulatory_file_id,
+                validator_key=validator_key,
+                started_at=datetime.utcnow(),
+                status="running",
+            )
+            self.validation_runs[run.id] = replace(run)
+            self._run_ids_by_file.setdefault(regulatory_file_id, []).append(run.id)
         return run
 
+    def get_run(self, run_id: int) -> ValidationRun | None:
+        return self.validation_runs.get(run_id)
+
+    def list_runs_for_file(
+        self,
+        regulatory_file_id: int,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[ValidationRun]:
+        run_ids = paginate(self._run_ids_by_file.get(regulatory_file_id, []), offset, limit)
+        # ``get``: uma execução removida pela retenção pode sumir durante a leitura.
+        runs = (self.validation_runs.get(run_id) for run_id in run_ids)
+        return [run for run in runs if run is not None]
+
     def update_run(self, run: ValidationRun) -> None:
-        self.validation_runs[run.id] = run
+        """Grava a nova versão da execução; execuções desconhecidas (ex.: já removidas) são ignoradas."""
+
+        with self._runs_lock:
+            if run.id not in self.validation_runs:
+                return
+            self.validation_runs[run.id] = replace(run)
+        if run.finished_at is not None and self.retention.enabled:
+            with self._retention_lock:
+                if run.id not in self._resident and not self._spilled(run.id):
+                    self._resident[run.id] = run.finished_at
+            self.enforce_retention()
+
+    # Retenção -------------------------------------------------------
+    def _spilled(self, run_id: int) -> bool:
+        segment = self.segment
+        return segment is not None and run_id in segment
+
+    def _issues(self, run_id: int) -> IssueStore | IssueSegment:
+        """Onde estão as inconsistências da execução: no segmento em disco ou na memória."""
+
+        return self.segment if self._spilled(run_id) else self.issue_store  # type: ignore[return-value]
+
+    def enforce_retention(self, now: datetime | None = None) -> None:
+        """Retira da memória as execuções concluídas que ``retention`` não permite mais manter."""
+
+        policy = self.retention
+        now = now or datetime.utcnow()
+        with self._retention_lock:
+            while self._resident:
+                run_id, finished_at = next(iter(self._resident.items()))
+                age = (now - finished_at).total_seconds()
+                memory_bytes = self.issue_store.memory_bytes
+                if policy.ttl_seconds is not None and age > policy.ttl_seconds:
+                    reason = "ttl"
+                elif policy.max_issue_bytes is not None and memory_bytes > policy.max_issue_bytes:
+                    reason = "budget"
+                else:
+                    break
+                del self._resident[run_id]
+                size = self.issue_store.run_bytes(run_id)
+                if policy.mode == "spill":
+                    self._spill(run_id)
+                else:
+                    self._evict(run_id)
+                RELEASED_RUNS.inc(policy.mode, reason)
+                RELEASED_BYTES.inc(policy.mode, amount=size)
+            segment = self.segment
+            while segment is not None and policy.max_spill_bytes is not None:
+                if segment.live_bytes <= policy.max_spill_bytes or not len(segment):
+                    break
+                self._evict(next(iter(segment)))
+                RELEASED_RUNS.inc("evict", "disk")
+
+    def _spill(self, run_id: int) -> None:
+        if self.segment is None:
+            self.segment = IssueSegment(self.retention.spill_dir)
+        # O segmento publica a execução antes de ela sair da memória: leitores passam
+        # para o disco sem encontrar a execução vazia.
+        self.segment.write(run_id, self.issue_store.iter_rows(run_id))
+        self.issue_store.drop_run(run_id)
+
+    def _evict(self, run_id: int) -> None:
+        with self._runs_lock:
+            run = self.validation_runs.pop(run_id, None)
+            if run is not None:
+                file_id = run.regulatory_file_id
+                # Cópia: leitores em curso continuam percorrendo a lista anterior.
+                run_ids = self._run_ids_by_file.get(file_id, [])
+                self._run_ids_by_file[file_id] = [other for other in run_ids if other != run_id]
+        self.issue_store.drop_run(run_id)
+        if self.segment is not None:
+            self.segment.discard(run_id)
+        for listener in tuple(self.eviction_listeners):
+            listener(run_id)
+
+    def issue_bytes_for_run(self, run_id: int) -> int:
+        """Bytes estimados das inconsistências da execução ainda em memória (``0`` se compactadas)."""
+
+        return self.issue_store.run_bytes(run_id)
 
-    def list_issues_for_run(self, run_id: int) -> list[ValidationIssue]:
-        return [issue for issue in self.issues.values() if issue.validation_run_id == run_id]
+    def close(self) -> None:
+        """Fecha o segmento em disco; as inconsistências compactadas deixam de existir."""
+
+        segment, self.segment = self.segment, None
+        if segment is not None:
+            segment.close()
+
+    def retention_stats(self) -> dict[str, int]:
+        segment = self.segment
+        return {
+            "memory_bytes": self.issue_store.memory_bytes,
+            "resident_runs": len(self._resident),
+            "spilled_runs": len(segment) if segment is not None else 0,
+            "disk_bytes": segment.disk_bytes if segment is not None else 0,
+        }
+
+    # Inconsistências -------------------------------------------------
+    def list_issues_for_run(
+        self,
+        run_id: int,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[ValidationIssue]:
+        try:
+            return self._issues(run_id).list_for_run(run_id, offset, limit)
+        except KeyError:
+            # A execução foi compactada durante a leitura; o segmento já tem todas as linhas.
+            return self._issues(run_id).list_for_run(run_id, offset, limit)
+
+    def count_issues_for_run(self, run_id: int) -> int:
+        return self._issues(run_id).count_for_run(run_id)
+
+    def list_issues_page(
+        self,
+        run_id: int,
+        after_id: int = 0,
+        limit: int = 100,
+        issue_filter: IssueFilter = NO_FILTER,
+    ) -> list[ValidationIssue]:
+        """Página de até ``limit`` inconsistências com id maior que ``after_id`` (paginação por cursor)."""
+
+        try:
+            return self._issues(run_id).list_page(run_id, after_id, limit, issue_filter)
+        except KeyError:
+            return self._issues(run_id).list_page(run_id, after_id, limit, issue_filter)
+
+    def iter_issue_rows(self, run_id: int, issue_filter: IssueFilter = NO_FILTER) -> Iterator[IssueExportRow]:
+        """Percorre as inconsistências como tuplas, sem materializar objetos, para exportação."""
+
+        if not self.retention.enabled:
+            return self.issue_store.iter_rows(run_id, issue_filter)
+        return self._iter_retained_rows(run_id, issue_filter)
+
+    def _iter_retained_rows(self, run_id: int, issue_filter: IssueFilter) -> Iterator[IssueExportRow]:
+        last_id = 0
+        try:
+            for row in self._issues(run_id).iter_rows(run_id, issue_filter):
+                last_id = row[0]
+                yield row
+        except KeyError:
+            # Compactada no meio da exportação: continua do disco a partir da última linha entregue.
+            yield from self._issues(run_id).iter_rows(run_id, issue_filter, last_id)
 
     def add_issue(
         self,
@@ -83,30 +342,93 @@ class InMemoryDatabase:
         severity: str,
         message: str,
     ) -> ValidationIssue:
-        issue = ValidationIssue(
-            id=next(self._issue_seq),
-            validation_run_id=run_id,
-            line_number=line_number,
-            column_name=column_name,
-            severity=severity,
-            message=message,
+        return self.issue_store.add(run_id, line_number, column_name, severity, message)
+
+    def add_issues_bulk(self, run_id: int, issues: Iterable[ValidationIssue]) -> list[ValidationIssue]:
+        """Adota as inconsistências geradas pelo validador, atribuindo ids em bloco.
+
+        Os objetos recebidos são devolvidos com ``id`` e ``validation_run_id``
+        preenchidos, sem nova alocação por inconsistência; o armazenamento por
+        objetos os guarda como estão e o colunar apenas codifica seus campos.
+        """
+
+        adopted = issues if isinstance(issues, list) else list(issues)
+        return self.issue_store.add_bulk(run_id, adopted)
+
+
+Database = Union[InMemoryDatabase, SQLiteDatabase]
+
+
+def create_database(url: str) -> Database:
+    """Instancia o backend indicado por ``url`` (``memory://...`` ou ``sqlite:///caminho``)."""
+
+    settings = get_settings()
+    if url.startswith("memory://"):
+        return InMemoryDatabase(issue_store=settings.issue_store, retention=RetentionPolicy.from_settings())
+    if url.startswith("sqlite:///"):
+        return SQLiteDatabase(
+            url.removeprefix("sqlite:///"),
+            pool_size=settings.database_pool_size,
+            pool_timeout=settings.database_pool_timeout,
         )
-        self.issues[issue.id] = issue
-        return issue
+    raise ValueError(f"URL de banco de dados não suportada: {url}.")
+
+
+_db = create_database(get_settings().database_url)
+
+
+def _issue_bytes() -> dict[tuple[str, ...], float]:
+    if not isinstance(_db, InMemoryDatabase):
+        return {}
+    stats = _db.retention_stats()
+    return {("memory",): stats["memory_bytes"], ("disk",): stats["disk_bytes"]}
+
+
+METRICS.callback(
+    "validator_issue_bytes",
+    "Bytes das inconsistências guardadas pelo banco em memória (estimados) e compactadas em disco.",
+    "gauge",
+    _issue_bytes,
+    ("location",),
+)
+
+
+def close_db() -> None:
+    """Libera os recursos do banco do processo (conexões SQLite, arquivo de retenção em disco)."""
+
+    _db.close()
+
+
+def enforce_retention() -> None:
+    """Aplica a retenção do banco em memória do processo sem esperar o fim de outra execução."""
 
+    if isinstance(_db, InMemoryDatabase):
+        _db.enforce_retention()
 
-_db = InMemoryDatabase()
 
+def init_db() -> None:
+    """Garante o esquema do backend persistente; nada a fazer em memória."""
 
-def init_db() -> None:  # pragma: no cover - nada a inicializar
-    """Mantido para compatibilidade com a API FastAPI."""
+    if isinstance(_db, SQLiteDatabase):
+        _db.init_schema()
 
 
 @contextmanager
-def get_session() -> Iterator[InMemoryDatabase]:
-    """Fornece a instância singleton do banco de dados."""
+def get_session() -> Iterator[Database]:
+    """Fornece a instância singleton do banco de dados do processo."""
 
     yield _db
 
 
-__all__ = ["InMemoryDatabase", "get_session", "init_db"]
+__all__ = [
+    "Database",
+    "InMemoryDatabase",
+    "RETENTION_MODES",
+    "RetentionPolicy",
+    "SQLiteDatabase",
+    "close_db",
+    "create_database",
+    "enforce_retention",
+    "get_session",
+    "init_db",
+]
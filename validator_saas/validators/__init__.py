@@ -1,29 +1,54 @@
-"""Coleção de validadores disponíveis."""
+"""Coleção de validadores disponíveis.
+
+``VALIDATORS`` é o registro de layouts (``validators.registry``): os módulos de
+cada layout embutido só são importados quando o validador é usado pela primeira
+vez, assim como os layouts declarativos de ``VALIDATOR_LAYOUTS_PATH``.
+"""
+
+from importlib import import_module
+from typing import Any
 
-from .bacen import BacenValidator
-from .cadoc import Cadoc3040Validator, Cadoc3050Validator, Cadoc6334Validator
-from .dimp import DimpValidator
-from .dirf import DirfValidator
 from .base import LayoutValidator, ValidationResult, Validator
+from .checkers import CompiledLayout, compile_layout
+from .policy import IssueCollector, ValidationPolicy
+from .registry import DeclaredValidator, LayoutNotFoundError, LayoutRegistry
+
+VALIDATORS = LayoutRegistry()
 
-VALIDATORS = {
-    BacenValidator.key: BacenValidator(),
-    Cadoc3040Validator.key: Cadoc3040Validator(),
-    Cadoc3050Validator.key: Cadoc3050Validator(),
-    Cadoc6334Validator.key: Cadoc6334Validator(),
-    DimpValidator.key: DimpValidator(),
-    DirfValidator.key: DirfValidator(),
+_BUILTIN_CLASSES = {
+    "BacenValidator": ".bacen",
+    "Cadoc3040Validator": ".cadoc",
+    "Cadoc3050Validator": ".cadoc",
+    "Cadoc6334Validator": ".cadoc",
+    "DimpValidator": ".dimp",
+    "DirfValidator": ".dirf",
 }
 
+
+def __getattr__(name: str) -> Any:
+    # Classes dos layouts embutidos, importadas só quando referenciadas.
+    module = _BUILTIN_CLASSES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module, __name__), name)
+
+
 __all__ = [
     "BacenValidator",
     "Cadoc3040Validator",
     "Cadoc3050Validator",
     "Cadoc6334Validator",
+    "CompiledLayout",
+    "DeclaredValidator",
     "DimpValidator",
     "DirfValidator",
+    "IssueCollector",
+    "LayoutNotFoundError",
+    "LayoutRegistry",
     "LayoutValidator",
+    "ValidationPolicy",
     "ValidationResult",
     "Validator",
     "VALIDATORS",
+    "compile_layout",
 ]
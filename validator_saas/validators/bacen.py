@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 from .base import LayoutValidator
-from .layout import FieldDefinition, LayoutDefinition
+from .layout import CNPJ_PATTERN, DATE_PATTERN, FieldDefinition, LayoutDefinition
+from .rules import TrailerTotal
 
 
 BACEN_LAYOUT = LayoutDefinition(
@@ -11,12 +12,13 @@ BACEN_LAYOUT = LayoutDefinition(
     version="1.0",
     fields=(
         FieldDefinition("codigo_registro", int),
-        FieldDefinition("cnpj_instituicao", str, max_length=18),
+        FieldDefinition("cnpj_instituicao", str, max_length=18, pattern=CNPJ_PATTERN),
         FieldDefinition("tipo_produto", str, max_length=3),
         FieldDefinition("valor_transacao", float),
-        FieldDefinition("data_transacao", str, max_length=8),
+        FieldDefinition("data_transacao", str, max_length=8, pattern=DATE_PATTERN),
         FieldDefinition("quantidade_transacoes", int),
     ),
+    rules=(TrailerTotal("valor_transacao", record_field="codigo_registro", trailer_code="9"),),
 )
 
 
@@ -26,6 +28,7 @@ class BacenValidator(LayoutValidator):
     key = "bacen"
     regulator = "BACEN"
     layout = BACEN_LAYOUT
+    engine = "numpy"
 
 
 __all__ = ["BacenValidator", "BACEN_LAYOUT"]
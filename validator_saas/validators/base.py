@@ -2,20 +2,35 @@
 
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Protocol
+from itertools import chain, islice
+from typing import Iterable, Iterator, Protocol, Sequence
 
 from ..models import ValidationIssue, ValidationRun
-from .layout import FieldDefinition, LayoutDefinition, iter_lines
+from .checkers import compile_layout
+from .layout import ContentSource, LayoutDefinition, iter_lines
+from .mapped import MappedRecords, iter_line_blocks, map_file
+from .policy import UNLIMITED, IssueCollector, ValidationPolicy
+from .rules import RuleSet
+from .vectorized import VECTOR_BLOCK_SIZE, collect_blocks, engine_for, iter_byte_blocks, supports_layout
+
+Record = tuple[int, "Sequence[str] | Sequence[bytes]"]
 
 
 @dataclass
 class ValidationResult:
-    """Representa o resultado de uma validação."""
+    """Representa o resultado de uma validação.
+
+    ``issue_total`` inclui as inconsistências omitidas pelos limites da política
+    e ``line_count`` são as linhas percorridas; ambos alimentam as métricas.
+    """
 
     run: ValidationRun
     issues: list[ValidationIssue]
+    issue_total: int = 0
+    line_count: int = 0
 
 
 class Validator(Protocol):
@@ -23,7 +38,13 @@ class Validator(Protocol):
 
     key: str
 
-    def validate(self, raw_content: str, run: ValidationRun) -> ValidationResult:  # pragma: no cover - interface
+    def validate(
+        self,
+        raw_content: ContentSource,
+        run: ValidationRun,
+        policy: ValidationPolicy = UNLIMITED,
+    ) -> ValidationResult:  # pragma: no cover - interface
+        """Valida o conteúdo de forma incremental (texto, bytes, arquivo binário ou blocos)."""
         ...
 
 
@@ -33,66 +54,231 @@ class LayoutValidator:
     key: str
     regulator: str
     layout: LayoutDefinition
+    engine: str = "python"
+    """Motor padrão do layout (``python`` ou ``numpy``); ``VALIDATOR_ENGINES`` pode sobrepô-lo."""
+
+    def __init_subclass__(cls, **kwargs: object) -> None:
+        super().__init_subclass__(**kwargs)
+        layout = cls.__dict__.get("layout")
+        if layout is not None:
+            # Compila o verificador de linhas na importação do validador concreto.
+            compile_layout(layout)
+
+    def validate(
+        self,
+        raw_content: ContentSource,
+        run: ValidationRun,
+        policy: ValidationPolicy = UNLIMITED,
+    ) -> ValidationResult:
+        if isinstance(raw_content, os.PathLike):
+            return self.validate_path(raw_content, run, policy)
+        collector = IssueCollector(run.id, policy)
+        if self.vectorized:
+            collect_blocks(self, iter_byte_blocks(raw_content), collector)
+        else:
+            self.collect(iter_lines(raw_content, delimiter=self.layout.delimiter), collector)
+        return self.finish_collected(run, collector)
+
+    def validate_path(
+        self,
+        path: str | os.PathLike,
+        run: ValidationRun,
+        policy: ValidationPolicy = UNLIMITED,
+    ) -> ValidationResult:
+        """Valida um arquivo local mapeado em memória, sem lê-lo para o heap."""
+
+        collector = IssueCollector(run.id, policy)
+        with map_file(path) as buffer:
+            self.collect_buffer(buffer, collector)
+        return self.finish_collected(run, collector)
+
+    @property
+    def vectorized(self) -> bool:
+        return engine_for(self.key, self.engine) == "numpy" and supports_layout(self.layout)
+
+    def collect_buffer(
+        self,
+        buffer: bytes,
+        collector: IssueCollector,
+        start: int = 0,
+        stop: int | None = None,
+    ) -> int:
+        """Valida ``buffer[start:stop]`` com o motor do layout; devolve as linhas consumidas."""
+
+        if self.vectorized:
+            return collect_blocks(self, iter_line_blocks(buffer, start, stop, VECTOR_BLOCK_SIZE), collector)
+        records = MappedRecords(buffer, start, stop, delimiter=self.layout.delimiter)
+        self.collect(records, collector)
+        return records.line_count
+
+    def check_records(
+        self,
+        records: Iterable[Record],
+        run_id: int = 0,
+    ) -> list[ValidationIssue]:
+        """Aplica as regras do layout a registros já divididos em colunas, sem limites."""
+
+        collector = IssueCollector(run_id)
+        self.collect(records, collector)
+        collector.finish_rules()
+        return collector.issues
+
+    def feed_rules(
+        self,
+        buffer: bytes,
+        rules: RuleSet,
+        start: int = 0,
+        stop: int | None = None,
+        line_offset: int = 0,
+    ) -> int:
+        """Alimenta só as regras agregadas com os registros de ``buffer[start:stop]``, sem verificá-los.
+
+        Usado para blocos cujas inconsistências já são conhecidas; os números de
+        linha são deslocados por ``line_offset``. Devolve as linhas consumidas.
+        """
+
+        expected = compile_layout(self.layout).width
+        project, accumulate = rules.project, rules.accumulate
+        records = MappedRecords(buffer, start, stop, delimiter=self.layout.delimiter)
+        for line_number, values in records:
+            if len(values) == expected:
+                accumulate(line_number + line_offset, project(values))
+        return records.line_count
 
-    def _parse_value(self, value: str, field: FieldDefinition) -> str | None:
-        """Garante o tipo e comprimento de uma coluna."""
+    def rules_for(self, collector: IssueCollector) -> RuleSet | None:
+        """Estado das regras entre registros da execução de ``collector``, criado no primeiro uso."""
 
-        if field.max_length and len(value) > field.max_length:
-            return f"Tamanho máximo excedido ({len(value)}/{field.max_length})."
-        try:
-            field.type_(value)
-        except Exception as exc:  # noqa: BLE001 - queremos mensagem raiz
-            return f"Valor inválido ({exc})."
+        if collector.rules is None and self.layout.rules:
+            collector.rules = RuleSet(self.layout)
+        return collector.rules
+
+    def precheck(self, records: Iterable[Record], collector: IssueCollector) -> Iterator[Record] | None:
+        """Pré-checagem estrutural das primeiras ``policy.precheck_lines`` linhas.
+
+        Se nenhuma delas tiver a quantidade de colunas do layout (ex.: delimitador
+        errado), registra uma única inconsistência, interrompe o coletor e devolve
+        ``None``; caso contrário devolve os registros para seguir a validação.
+        """
+
+        records = iter(records)
+        lines = collector.policy.precheck_lines
+        if not lines:
+            return records
+        head = list(islice(records, lines))
+        compiled = compile_layout(self.layout)
+        expected = compiled.width
+        widths = {len(values) for _, values in head}
+        if not widths or expected in widths:
+            return chain(head, records)
+        found = ", ".join(str(width) for width in sorted(widths))
+        reason = (
+            f"Estrutura incompatível com o layout: as primeiras {len(head)} linhas têm "
+            f"{found} {compiled.unit}, esperado {expected}."
+        )
+        collector.add(head[0][0], None, reason)
+        collector.abort(reason)
         return None
 
-    def validate(self, raw_content: str, run: ValidationRun) -> ValidationResult:
-        issues: list[ValidationIssue] = []
-        header = [field.name for field in self.layout.fields]
-        for line_number, values in iter_lines(raw_content):
-            if len(values) != len(header):
-                issues.append(
-                    ValidationIssue(
-                        validation_run_id=run.id,
-                        line_number=line_number,
-                        severity="error",
-                        message=f"Quantidade de colunas incorreta: esperado {len(header)}, recebido {len(values)}.",
-                    )
-                )
-                continue
-            for value, field in zip(values, self.layout.fields, strict=True):
-                if not value and field.required:
-                    issues.append(
-                        ValidationIssue(
-                            validation_run_id=run.id,
-                            line_number=line_number,
-                            column_name=field.name,
-                            severity="error",
-                            message="Campo obrigatório ausente.",
-                        )
-                    )
-                    continue
-                if not value and not field.required:
+    def collect(self, records: Iterable[Record], collector: IssueCollector) -> IssueCollector:
+        """Aplica as regras do layout acumulando as inconsistências em ``collector``.
+
+        Registros com células ``bytes`` (linhas ASCII vindas de ``MappedRecords``)
+        usam o verificador equivalente para bytes. Em layouts posicionais cada
+        registro é a linha inteira, cujo tamanho é comparado com o do layout. A
+        política do coletor decide quando parar: a checagem só acontece em linhas
+        com inconsistências, de modo que linhas válidas não pagam nada a mais.
+        Registros com a quantidade certa de colunas também alimentam as regras
+        entre registros do layout (``rules_for``).
+        """
+
+        records = self.precheck(records, collector)
+        if records is None:
+            return collector
+        return self.collect_rows(records, collector)
+
+    def collect_rows(
+        self,
+        records: Iterable[Record],
+        collector: IssueCollector,
+        accumulate: bool = True,
+    ) -> IssueCollector:
+        """Laço de ``collect`` sem a pré-checagem, reaproveitado pelo motor vetorizado.
+
+        Com ``accumulate=False`` as regras agregadas não recebem os registros
+        (o motor vetorizado já as alimentou); as comparações entre campos de um
+        mesmo registro são sempre aplicadas.
+        """
+
+        compiled = compile_layout(self.layout)
+        check_text_row = compiled.check_row
+        check_ascii_row = compiled.check_ascii_row
+        expected = compiled.width
+        add = collector.add
+        rules = self.rules_for(collector)
+        project = rules.project if rules is not None else None
+        check_rules = rules.check if rules is not None and rules.row_rules else None
+        add_to_rules = rules.accumulate if rules is not None and rules.accumulators and accumulate else None
+        line_number = collector.lines
+        for line_number, values in records:
+            if len(values) != expected:
+                add(line_number, None, compiled.mismatch_message(len(values)))
+            else:
+                # ``values[0]`` é ``str`` em células de texto e em linhas posicionais de texto;
+                # células ``bytes`` e linhas posicionais ``bytes`` (item ``int``) usam o ASCII.
+                check_row = check_text_row if type(values[0]) is str else check_ascii_row
+                problems = check_row(values)
+                if project is not None:
+                    cells = project(values)
+                    if add_to_rules is not None:
+                        add_to_rules(line_number, cells)
+                    if check_rules is not None:
+                        problems += check_rules(cells)
+                if not problems:
                     continue
-                problem = self._parse_value(value, field)
-                if problem:
-                    issues.append(
-                        ValidationIssue(
-                            validation_run_id=run.id,
-                            line_number=line_number,
-                            column_name=field.name,
-                            severity="error",
-                            message=problem,
-                        )
-                    )
+                for column_name, message in problems:
+                    add(line_number, column_name, message)
+            if collector.abort_reason is not None:
+                break
+        collector.lines = max(collector.lines, line_number)
+        return collector
+
+    def finish(
+        self,
+        run: ValidationRun,
+        issues: list[ValidationIssue],
+        total: int | None = None,
+        abort_reason: str | None = None,
+    ) -> ValidationResult:
+        """Encerra a execução com status e resumo derivados das inconsistências.
+
+        ``total`` é a quantidade real de inconsistências quando ``issues`` traz só
+        parte delas; com ``abort_reason`` a execução termina como ``aborted``.
+        """
+
+        total = len(issues) if total is None else total
+        listed = sum(1 for issue in issues if issue.severity != "info")
         run.finished_at = datetime.utcnow()
-        run.status = "completed" if not issues else "completed_with_issues"
-        run.summary = (
-            "Arquivo validado sem inconsistências."
-            if not issues
-            else f"Foram encontradas {len(issues)} inconsistências."
-        )
-        return ValidationResult(run=run, issues=issues)
+        if abort_reason is not None:
+            run.status = "aborted"
+            run.summary = (
+                f"Validação interrompida. {abort_reason} "
+                f"Foram encontradas {total} inconsistências até a interrupção."
+            )
+        elif not total:
+            run.status = "completed"
+            run.summary = "Arquivo validado sem inconsistências."
+        else:
+            run.status = "completed_with_issues"
+            run.summary = f"Foram encontradas {total} inconsistências."
+            if listed < total:
+                run.summary += f" {listed} listadas individualmente."
+        return ValidationResult(run=run, issues=issues, issue_total=total)
 
+    def finish_collected(self, run: ValidationRun, collector: IssueCollector) -> ValidationResult:
+        collector.finish_rules()
+        result = self.finish(run, collector.materialize(), collector.total, collector.abort_reason)
+        result.line_count = collector.lines
+        return result
 
 __all__ = [
     "LayoutValidator",
@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 from .base import LayoutValidator
-from .layout import FieldDefinition, LayoutDefinition
+from .layout import CNPJ_PATTERN, DATE_PATTERN, FieldDefinition, LayoutDefinition
+from .rules import UniqueKey
 
 
 CADOC_3040_LAYOUT = LayoutDefinition(
@@ -11,12 +12,13 @@ CADOC_3040_LAYOUT = LayoutDefinition(
     version="1.0",
     fields=(
         FieldDefinition("tipo_registro", int),
-        FieldDefinition("cnpj_instituicao", str, max_length=18),
+        FieldDefinition("cnpj_instituicao", str, max_length=18, pattern=CNPJ_PATTERN),
         FieldDefinition("codigo_produto", str, max_length=5),
         FieldDefinition("saldo_ativo", float),
         FieldDefinition("saldo_passivo", float),
-        FieldDefinition("data_base", str, max_length=8),
+        FieldDefinition("data_base", str, max_length=8, pattern=DATE_PATTERN),
     ),
+    rules=(UniqueKey(("cnpj_instituicao", "codigo_produto")),),
 )
 
 
@@ -25,7 +27,7 @@ CADOC_3050_LAYOUT = LayoutDefinition(
     version="1.0",
     fields=(
         FieldDefinition("tipo_registro", int),
-        FieldDefinition("cnpj_instituicao", str, max_length=18),
+        FieldDefinition("cnpj_instituicao", str, max_length=18, pattern=CNPJ_PATTERN),
         FieldDefinition("codigo_modalidade", str, max_length=5),
         FieldDefinition("valor_exposicao", float),
         FieldDefinition("prazo_medio_dias", int),
@@ -39,12 +41,12 @@ CADOC_6334_LAYOUT = LayoutDefinition(
     version="1.0",
     fields=(
         FieldDefinition("tipo_registro", int),
-        FieldDefinition("cnpj_participante", str, max_length=18),
+        FieldDefinition("cnpj_participante", str, max_length=18, pattern=CNPJ_PATTERN),
         FieldDefinition("codigo_servico", str, max_length=6),
         FieldDefinition("quantidade_operacoes", int),
         FieldDefinition("valor_total", float),
         FieldDefinition("canal_atendimento", str, max_length=20, required=False),
-        FieldDefinition("data_referencia", str, max_length=8),
+        FieldDefinition("data_referencia", str, max_length=8, pattern=DATE_PATTERN),
     ),
 )
 
@@ -55,6 +57,7 @@ class Cadoc3040Validator(LayoutValidator):
     key = "cadoc_3040"
     regulator = "CADOC 3040"
     layout = CADOC_3040_LAYOUT
+    engine = "numpy"
 
 
 class Cadoc3050Validator(LayoutValidator):
@@ -63,6 +66,7 @@ class Cadoc3050Validator(LayoutValidator):
     key = "cadoc_3050"
     regulator = "CADOC 3050"
     layout = CADOC_3050_LAYOUT
+    engine = "numpy"
 
 
 class Cadoc6334Validator(LayoutValidator):
@@ -0,0 +1,187 @@
+"""Compilação de layouts em verificadores de linha especializados."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable
+
+from .layout import PATTERN_LABELS, FieldDefinition, LayoutDefinition
+
+MISSING_MESSAGE = "Campo obrigatório ausente."
+
+COMPILED_LAYOUT_CACHE = 256
+"""Layouts compilados mantidos em memória; os validadores ativos ficam no LRU do registro
+(``VALIDATOR_LAYOUT_CACHE_SIZE``), então este limite só precisa ser maior que ele."""
+
+RowProblems = list[tuple[str, str]]
+RowChecker = Callable[[list[str]], RowProblems]
+BytesRowChecker = Callable[[list[bytes]], RowProblems]
+
+_FLOAT_PATTERN = r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+_FLOAT_RE = re.compile(_FLOAT_PATTERN)
+_FLOAT_BYTES_RE = re.compile(_FLOAT_PATTERN.encode("ascii"))
+
+
+def _converter(type_: Callable[[str], Any]) -> Callable[[str], str | None]:
+    """Conversão de referência, usada quando o caminho rápido não decide o valor."""
+
+    def convert(value: str) -> str | None:
+        try:
+            type_(value)
+        except Exception as exc:  # noqa: BLE001 - queremos mensagem raiz
+            return f"Valor inválido ({exc})."
+        return None
+
+    return convert
+
+
+def _ascii_converter(convert: Callable[[str], str | None]) -> Callable[[bytes], str | None]:
+    """Adapta a conversão para células em bytes, decodificadas só quando o caminho rápido falha."""
+
+    return lambda value: convert(value.decode("ascii"))
+
+
+def _fast_path(field: FieldDefinition, value: str) -> str:
+    """Expressão que, quando verdadeira, garante que a conversão terá sucesso."""
+
+    if field.type_ is int:
+        return f"({value}.isascii() and {value}.isdigit())"
+    if field.type_ is float:
+        return f"_float_match({value})"
+    return "False"
+
+
+def pattern_message(field: FieldDefinition) -> str:
+    label = PATTERN_LABELS.get(field.pattern or "", f"o padrão {field.pattern}")
+    return f"Formato inválido (esperado {label})."
+
+
+@lru_cache(maxsize=None)
+def pattern_matchers(pattern: str) -> tuple[Callable[[str], Any], Callable[[bytes], Any]]:
+    """``fullmatch`` de ``pattern`` compilado uma única vez, para células de texto e de bytes ASCII.
+
+    Em texto ASCII as classes ``\\d``/``\\w``/``\\s`` coincidem nas duas versões;
+    padrões com caracteres não ASCII decodificam a célula e usam a versão de texto.
+    """
+
+    text_match = re.compile(pattern).fullmatch
+    if not pattern.isascii():
+        return text_match, lambda value: text_match(value.decode("ascii"))
+    return text_match, re.compile(pattern.encode("ascii")).fullmatch
+
+
+def _field_source(index: int, field: FieldDefinition, positional: bool = False) -> list[str]:
+    value = f"v{index}"
+    source = f"values[{field.start}:{field.end}].strip()" if positional else f"values[{index}]"
+    lines = [f"    {value} = {source}", f"    if {value}:"]
+    checks: list[tuple[str, str]] = []
+    if field.max_length:
+        checks.append(
+            (
+                f"len({value}) > {field.max_length}",
+                f"f'Tamanho máximo excedido ({{len({value})}}/{field.max_length}).'",
+            )
+        )
+    if field.type_ is not str:
+        converted = f"(message := _convert{index}({value})) is not None"
+        checks.append((f"not {_fast_path(field, value)} and {converted}", "message"))
+    if field.pattern is not None:
+        checks.append((f"_pattern{index}({value}) is None", f"_pattern_message{index}"))
+    for position, (condition, message) in enumerate(checks):
+        branch = "if" if position == 0 else "elif"
+        lines += [f"        {branch} {condition}:", f"            problems.append((_name{index}, {message}))"]
+    if not checks:
+        lines.append("        pass")
+    if field.required:
+        lines += ["    else:", f"        problems.append((_name{index}, _MISSING))"]
+    return lines
+
+
+@dataclass(frozen=True)
+class CompiledLayout:
+    """Verificador de linhas gerado uma única vez para um layout."""
+
+    layout: LayoutDefinition
+    check_row: RowChecker
+    check_ascii_row: BytesRowChecker
+    source: str
+
+    @property
+    def width(self) -> int:
+        """Tamanho esperado de um registro: colunas, ou posições em layouts posicionais."""
+
+        return self.layout.record_length if self.layout.positional else len(self.layout.fields)
+
+    @property
+    def unit(self) -> str:
+        return "posição(ões)" if self.layout.positional else "coluna(s)"
+
+    def mismatch_message(self, received: int) -> str:
+        if self.layout.positional:
+            return f"Tamanho de registro incorreto: esperado {self.width} posições, recebido {received}."
+        return f"Quantidade de colunas incorreta: esperado {self.width}, recebido {received}."
+
+
+@lru_cache(maxsize=COMPILED_LAYOUT_CACHE)
+def compile_layout(layout: LayoutDefinition) -> CompiledLayout:
+    """Gera o código de um verificador de linha especializado para ``layout``.
+
+    Cada campo vira um bloco inline com a checagem de obrigatoriedade, de tamanho
+    e um caminho rápido (``str.isdigit``/regex) para colunas ``int``/``float``;
+    a conversão via ``field.type_`` só ocorre quando o caminho rápido não decide.
+    Por fim, ``field.pattern`` (compilado uma vez) precisa casar com a célula
+    inteira. Cada célula gera no máximo uma inconsistência, na ordem tamanho,
+    tipo e formato. A linha deve ter exatamente ``len(layout.fields)`` valores.
+
+    Em layouts posicionais o verificador recebe o registro inteiro e recorta
+    cada campo com fatias de posições fixas, geradas no código: não há
+    ``split`` nem lista intermediária, e ``strip`` devolve o próprio objeto
+    quando o campo não tem espaços de preenchimento.
+
+    O mesmo código é instanciado uma segunda vez como ``check_ascii_row``, que
+    recebe células ``bytes`` de linhas puramente ASCII: comprimento, ``isdigit``
+    e a regex têm o mesmo resultado em bytes, e a célula só é decodificada
+    quando precisa passar pela conversão de referência.
+    """
+
+    lines = ["def check_row(values):", "    problems = []"]
+    text_namespace: dict[str, Any] = {"_MISSING": MISSING_MESSAGE, "_float_match": _FLOAT_RE.fullmatch}
+    ascii_namespace: dict[str, Any] = {"_MISSING": MISSING_MESSAGE, "_float_match": _FLOAT_BYTES_RE.fullmatch}
+    for index, field in enumerate(layout.fields):
+        convert = _converter(field.type_)
+        text_namespace[f"_name{index}"] = ascii_namespace[f"_name{index}"] = field.name
+        text_namespace[f"_convert{index}"] = convert
+        ascii_namespace[f"_convert{index}"] = _ascii_converter(convert)
+        if field.pattern is not None:
+            text_match, ascii_match = pattern_matchers(field.pattern)
+            text_namespace[f"_pattern{index}"], ascii_namespace[f"_pattern{index}"] = text_match, ascii_match
+            text_namespace[f"_pattern_message{index}"] = ascii_namespace[f"_pattern_message{index}"] = (
+                pattern_message(field)
+            )
+        lines += _field_source(index, field, layout.positional)
+    lines.append("    return problems")
+    source = "\n".join(lines) + "\n"
+    code = compile(source, f"<layout {layout.name} {layout.version}>", "exec")
+    exec(code, text_namespace)  # noqa: S102
+    exec(code, ascii_namespace)  # noqa: S102
+    return CompiledLayout(
+        layout=layout,
+        check_row=text_namespace["check_row"],
+        check_ascii_row=ascii_namespace["check_row"],
+        source=source,
+    )
+
+
+__all__ = [
+    "BytesRowChecker",
+    "COMPILED_LAYOUT_CACHE",
+    "CompiledLayout",
+    "MISSING_MESSAGE",
+    "RowChecker",
+    "RowProblems",
+    "compile_layout",
+    "pattern_matchers",
+    "pattern_message",
+]
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from .base import LayoutValidator
-from .layout import FieldDefinition, LayoutDefinition
+from .layout import CNPJ_PATTERN, DATE_PATTERN, FieldDefinition, LayoutDefinition
 
 
 DIMP_LAYOUT = LayoutDefinition(
@@ -11,11 +11,11 @@ DIMP_LAYOUT = LayoutDefinition(
     version="1.0",
     fields=(
         FieldDefinition("codigo_registro", int),
-        FieldDefinition("cnpj_participante", str, max_length=18),
+        FieldDefinition("cnpj_participante", str, max_length=18, pattern=CNPJ_PATTERN),
         FieldDefinition("modalidade", str, max_length=4),
         FieldDefinition("valor_total", float),
         FieldDefinition("quantidade_operacoes", int),
-        FieldDefinition("data_referencia", str, max_length=8),
+        FieldDefinition("data_referencia", str, max_length=8, pattern=DATE_PATTERN),
     ),
 )
 
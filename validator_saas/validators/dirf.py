@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 from .base import LayoutValidator
-from .layout import FieldDefinition, LayoutDefinition
+from .layout import CNPJ_PATTERN, CPF_PATTERN, FieldDefinition, LayoutDefinition
+from .rules import FieldComparison
 
 
 DIRF_LAYOUT = LayoutDefinition(
@@ -11,13 +12,14 @@ DIRF_LAYOUT = LayoutDefinition(
     version="1.0",
     fields=(
         FieldDefinition("tipo_registro", int),
-        FieldDefinition("cnpj_fonte_pagadora", str, max_length=18),
-        FieldDefinition("cpf_beneficiario", str, max_length=14, required=False),
-        FieldDefinition("cnpj_beneficiario", str, max_length=18, required=False),
+        FieldDefinition("cnpj_fonte_pagadora", str, max_length=18, pattern=CNPJ_PATTERN),
+        FieldDefinition("cpf_beneficiario", str, max_length=14, required=False, pattern=CPF_PATTERN),
+        FieldDefinition("cnpj_beneficiario", str, max_length=18, required=False, pattern=CNPJ_PATTERN),
         FieldDefinition("valor_rendimento", float),
         FieldDefinition("imposto_retido", float),
         FieldDefinition("ano_calendario", int),
     ),
+    rules=(FieldComparison("imposto_retido", "<=", "valor_rendimento"),),
 )
 
 
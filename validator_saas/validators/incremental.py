@@ -0,0 +1,247 @@
+"""Revalidação incremental de reenvios corrigidos, bloco a bloco.
+
+O conteúdo (um buffer ou um fluxo lido uma vez) é dividido em blocos de
+``block_lines`` linhas e cada bloco é identificado pelo hash dos seus bytes. O
+``BlockManifest`` de uma validação guarda, por bloco, o hash, as linhas
+consumidas e as inconsistências com número de linha relativo ao bloco. No
+reenvio, blocos com hash já conhecido reaproveitam essas inconsistências,
+renumeradas para a nova posição; só os demais são validados. Correções que não
+mudam a quantidade de linhas (o caso comum) mantêm todos os outros blocos
+idênticos.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field, replace
+from itertools import chain, islice
+from typing import IO, Any, NamedTuple, Union
+
+from ..models import ValidationRun
+from .base import LayoutValidator, ValidationResult
+from .layout import DEFAULT_CHUNK_SIZE, _read_chunks
+from .mapped import MappedRecords
+from .policy import UNLIMITED, IssueCollector, IssueRow, ValidationPolicy
+
+BLOCK_LINES = 4096
+
+BlockSource = Union[bytes, bytearray, mmap.mmap, IO[Any], Iterable[Union[bytes, str]]]
+"""Buffer relido sem custo ou fluxo (arquivo ou iterável de blocos) lido uma única vez."""
+
+_BLOCK_OVERHEAD_BYTES = 96
+_ISSUE_OVERHEAD_BYTES = 64
+"""Estimativas do custo fixo de um bloco e de uma inconsistência guardados no manifesto."""
+
+
+class BlockEntry(NamedTuple):
+    """Um bloco validado: hash dos bytes, linhas consumidas e inconsistências relativas ao bloco.
+
+    ``digest`` vazio marca um bloco que não pode ser reaproveitado (a validação
+    foi interrompida dentro dele e as inconsistências estão incompletas).
+    ``suppressed_at`` guarda, por coluna omitida, quantas inconsistências do
+    bloco a precedem, para que os avisos agregados saiam na ordem serial.
+    """
+
+    digest: bytes
+    line_count: int
+    issues: tuple[IssueRow, ...]
+    suppressed: tuple[tuple[str | None, int], ...]
+    suppressed_at: tuple[tuple[str | None, int], ...] = ()
+
+
+@dataclass(frozen=True)
+class BlockManifest:
+    """Blocos de uma validação, na ordem do arquivo.
+
+    ``key`` identifica validador, versão do layout, política e tamanho do bloco:
+    só manifestos com a mesma chave são reaproveitados.
+    """
+
+    key: str
+    blocks: tuple[BlockEntry, ...]
+    size: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        size = sum(
+            _BLOCK_OVERHEAD_BYTES + sum(_ISSUE_OVERHEAD_BYTES + len(row[3]) for row in block.issues)
+            for block in self.blocks
+        )
+        object.__setattr__(self, "size", size)
+
+    def by_digest(self) -> dict[bytes, BlockEntry]:
+        return {block.digest: block for block in self.blocks if block.digest}
+
+
+class IncrementalResult(NamedTuple):
+    """Resultado completo da validação, o manifesto para o próximo reenvio e os blocos reaproveitados."""
+
+    result: ValidationResult
+    manifest: BlockManifest
+    reused_blocks: int
+    validated_blocks: int
+
+
+def manifest_key(validator: LayoutValidator, policy: ValidationPolicy, block_lines: int) -> str:
+    return f"{validator.key}:{validator.layout.version}:{policy.cache_tag}:{block_lines}"
+
+
+def split_line_blocks(
+    buffer: bytes | mmap.mmap,
+    block_lines: int = BLOCK_LINES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> list[tuple[int, int]]:
+    """Divide ``buffer`` em faixas ``[início, fim)`` de ``block_lines`` linhas terminadas em ``\\n``.
+
+    As quebras de linha são contadas por trechos de ``chunk_size`` bytes; só no
+    trecho onde um bloco termina o ``split`` localiza a quebra exata.
+    """
+
+    size = len(buffer)
+    boundaries = [0]
+    position, pending = 0, block_lines
+    while position < size:
+        end = min(position + chunk_size, size)
+        chunk = buffer[position:end]
+        newlines = chunk.count(b"\n")
+        if newlines < pending:
+            pending -= newlines
+            position = end
+            continue
+        position = end - len(chunk.split(b"\n", pending)[-1])
+        boundaries.append(position)
+        pending = block_lines
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def iter_stream_blocks(
+    chunks: Iterable[bytes | str],
+    block_lines: int = BLOCK_LINES,
+) -> Iterator[bytes]:
+    """Agrupa ``chunks`` em blocos de ``block_lines`` linhas, com as fronteiras de ``split_line_blocks``.
+
+    Texto é codificado em UTF-8; só o bloco em formação fica em memória.
+    """
+
+    pending = bytearray()
+    lines = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        while (newlines := chunk.count(b"\n")) >= block_lines - lines:
+            cut = len(chunk) - len(chunk.split(b"\n", block_lines - lines)[-1])
+            pending += chunk[:cut]
+            yield bytes(pending)
+            pending.clear()
+            lines = 0
+            chunk = chunk[cut:]
+        pending += chunk
+        lines += newlines
+    if pending:
+        yield bytes(pending)
+
+
+def _blocks(content: BlockSource, block_lines: int) -> Iterator[tuple[Any, int, int]]:
+    if isinstance(content, (bytes, bytearray, mmap.mmap)):
+        return ((content, start, stop) for start, stop in split_line_blocks(content, block_lines))
+    chunks = _read_chunks(content, DEFAULT_CHUNK_SIZE) if hasattr(content, "read") else content
+    return ((block, 0, len(block)) for block in iter_stream_blocks(chunks, block_lines))
+
+
+def validate_incremental(
+    validator: LayoutValidator,
+    content: BlockSource,
+    run: ValidationRun,
+    policy: ValidationPolicy = UNLIMITED,
+    previous: BlockManifest | None = None,
+    block_lines: int = BLOCK_LINES,
+) -> IncrementalResult:
+    """Valida ``content`` por blocos, reaproveitando os blocos inalterados de ``previous``.
+
+    Buffers são fatiados no lugar; fluxos são lidos uma vez, bloco a bloco.
+
+    Como na validação paralela, cada bloco é validado com os limites de
+    ``policy`` e o coletor da execução os reaplica ao juntar os blocos na ordem
+    do arquivo, produzindo o mesmo resultado da validação serial. As regras
+    agregadas entre registros precisam ver o arquivo inteiro: os blocos
+    reaproveitados ainda alimentam essas regras (só com as células que elas
+    usam), cujas inconsistências são recalculadas ao final.
+    """
+
+    key = manifest_key(validator, policy, block_lines)
+    known = previous.by_digest() if previous is not None and previous.key == key else {}
+    collector = IssueCollector(run.id, policy)
+    blocks: list[BlockEntry] = []
+    reused = 0
+    pieces = _blocks(content, block_lines)
+    if policy.precheck_lines:
+        if isinstance(content, (bytes, bytearray, mmap.mmap)):
+            head = content
+        else:
+            first = list(islice(pieces, -(-policy.precheck_lines // block_lines)))
+            pieces = chain(first, pieces)
+            head = b"".join(block for block, _, _ in first)
+        records = MappedRecords(head, delimiter=validator.layout.delimiter)
+        if validator.precheck(records, collector) is None:
+            manifest = BlockManifest(key, ())
+            return IncrementalResult(validator.finish_collected(run, collector), manifest, 0, 0)
+
+    block_policy = replace(policy, precheck_lines=None)
+    rules = validator.rules_for(collector)
+    feed_rules = rules is not None and bool(rules.accumulators)
+    line_offset = 0
+    for buffer, start, stop in pieces:
+        digest = hashlib.sha256(buffer[start:stop]).digest()
+        block = known.get(digest)
+        if block is not None:
+            reused += 1
+            if feed_rules:
+                validator.feed_rules(buffer, rules, start, stop, line_offset)
+            collector.merge(
+                block.issues,
+                dict(block.suppressed),
+                line_offset=line_offset,
+                line_count=block.line_count,
+                suppressed_at=dict(block.suppressed_at),
+            )
+        else:
+            block_collector = IssueCollector(policy=block_policy)
+            line_count = validator.collect_buffer(buffer, block_collector, start, stop)
+            block = BlockEntry(
+                digest if block_collector.abort_reason is None else b"",
+                line_count,
+                tuple(block_collector.rows()),
+                tuple(block_collector.suppressed.items()),
+                tuple(block_collector.suppressed_at.items()),
+            )
+            collector.merge(
+                block.issues,
+                block_collector.suppressed,
+                block_collector.abort_reason,
+                line_offset,
+                block_collector.rules,
+                line_count,
+                block_collector.suppressed_at,
+            )
+        blocks.append(block)
+        line_offset += block.line_count
+        if collector.stopped:
+            break
+
+    manifest = BlockManifest(key, tuple(blocks))
+    return IncrementalResult(validator.finish_collected(run, collector), manifest, reused, len(blocks) - reused)
+
+
+__all__ = [
+    "BLOCK_LINES",
+    "BlockEntry",
+    "BlockManifest",
+    "IncrementalResult",
+    "iter_stream_blocks",
+    "manifest_key",
+    "split_line_blocks",
+    "validate_incremental",
+]
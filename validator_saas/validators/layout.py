@@ -2,38 +2,204 @@
 
 from __future__ import annotations
 
+import codecs
+import os
+import re
 from dataclasses import dataclass
-from typing import Any, Callable, Iterable
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, Iterator, Union
+
+if TYPE_CHECKING:
+    from .rules import RecordRule
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+"""Tamanho (em bytes) dos blocos lidos de fluxos binários."""
+
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_LINE_BREAK_RE = re.compile(f"[{_LINE_BREAKS}]")
+
+ContentSource = Union[
+    str, bytes, bytearray, memoryview, os.PathLike, IO[bytes], Iterable[bytes], Iterable[str]
+]
+"""Conteúdo aceito pelos validadores: texto, bytes, caminho, arquivo binário ou iterável de blocos."""
+
+
+CNPJ_PATTERN = r"[0-9]{14}|[0-9]{2}\.[0-9]{3}\.[0-9]{3}/[0-9]{4}-[0-9]{2}"
+CPF_PATTERN = r"[0-9]{11}|[0-9]{3}\.[0-9]{3}\.[0-9]{3}-[0-9]{2}"
+DATE_PATTERN = r"[0-9]{4}(?:0[1-9]|1[0-2])(?:0[1-9]|[12][0-9]|3[01])"
+
+PATTERN_LABELS = {
+    CNPJ_PATTERN: "CNPJ com 14 dígitos, com ou sem máscara",
+    CPF_PATTERN: "CPF com 11 dígitos, com ou sem máscara",
+    DATE_PATTERN: "data no formato AAAAMMDD",
+}
+"""Descrições usadas nas mensagens dos padrões mais comuns; os demais aparecem literalmente."""
 
 
 @dataclass(frozen=True)
 class FieldDefinition:
-    """Define propriedades mínimas esperadas em uma coluna."""
+    """Define propriedades mínimas esperadas em uma coluna.
+
+    ``pattern`` é uma expressão regular que precisa casar com a célula inteira
+    (``re.fullmatch``), verificada na mesma passada das demais regras. Em
+    layouts posicionais, ``start`` (a partir de 0) e ``length`` localizam o
+    campo dentro do registro.
+    """
 
     name: str
     type_: Callable[[str], Any]
     required: bool = True
     max_length: int | None = None
     pattern: str | None = None
+    start: int | None = None
+    length: int | None = None
+
+    @property
+    def end(self) -> int:
+        return (self.start or 0) + (self.length or 0)
 
 
 @dataclass(frozen=True)
 class LayoutDefinition:
-    """Coleção de campos que descreve um layout regulatório."""
+    """Coleção de campos que descreve um layout regulatório.
+
+    ``delimiter`` separa as colunas de cada linha. Com ``delimiter=None`` o
+    layout é posicional (largura fixa): cada campo declara ``start``/``length``
+    e cada registro precisa ter exatamente ``record_length`` posições. O valor
+    de cada campo é aparado de espaços como nas colunas delimitadas.
+
+    ``rules`` são regras entre registros (ver ``validators.rules``), aplicadas
+    na mesma passada das regras de cada célula.
+    """
 
     name: str
     version: str
     fields: tuple[FieldDefinition, ...]
-    delimiter: str = ","
+    delimiter: str | None = ","
+    rules: tuple[RecordRule, ...] = ()
+
+    def __post_init__(self) -> None:
+        if self.delimiter is None:
+            missing = [field.name for field in self.fields if field.start is None or not field.length]
+            if missing:
+                raise ValueError(f"Layout posicional sem start/length nos campos: {', '.join(missing)}.")
+        names = {field.name for field in self.fields}
+        unknown = sorted({name for rule in self.rules for name in rule.fields} - names)
+        if unknown:
+            raise ValueError(f"Regras com campos inexistentes no layout: {', '.join(unknown)}.")
+
+    @property
+    def positional(self) -> bool:
+        return self.delimiter is None
+
+    @property
+    def record_length(self) -> int | None:
+        """Posições de um registro posicional (``None`` em layouts delimitados)."""
+
+        return max((field.end for field in self.fields), default=0) if self.positional else None
+
 
+def _read_chunks(stream: IO[Any], chunk_size: int) -> Iterator[bytes | str]:
+    while chunk := stream.read(chunk_size):
+        yield chunk
 
-def iter_lines(raw_content: str) -> Iterable[tuple[int, list[str]]]:
-    """Itera sobre linhas de conteúdo CSV com enumeração de linhas."""
 
-    for line_number, line in enumerate(raw_content.splitlines(), start=1):
+def iter_text_chunks(content: ContentSource, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Converte a origem do conteúdo em blocos de texto com decodificação UTF-8 incremental.
+
+    Bytes, caminhos (``os.PathLike``) e arquivos binários são consumidos em blocos
+    de ``chunk_size``, de modo que o consumo de memória não depende do tamanho
+    total do arquivo.
+    """
+
+    if isinstance(content, str):
+        yield content
+        return
+    if isinstance(content, os.PathLike):
+        with open(content, "rb") as stream:
+            yield from iter_text_chunks(stream, chunk_size)
+        return
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        view = memoryview(content)
+        chunks: Iterable[bytes | str] = (
+            view[start : start + chunk_size] for start in range(0, len(view), chunk_size)
+        )
+    elif hasattr(content, "read"):
+        chunks = _read_chunks(content, chunk_size)
+    else:
+        chunks = content
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            yield chunk
+        elif chunk:
+            yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def iter_text_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Reagrupa blocos de texto em linhas, com a mesma semântica de ``str.splitlines``."""
+
+    parts: list[str] = []
+    for text in chunks:
+        if not text:
+            continue
+        parts.append(text)
+        if _LINE_BREAK_RE.search(text) is None:
+            continue
+        pending = "".join(parts)
+        lines = pending.splitlines()
+        last_char = pending[-1]
+        if last_char == "\r":
+            # Pode ser a primeira metade de um ``\r\n`` dividido entre blocos.
+            pending = lines.pop() + "\r"
+        elif last_char in _LINE_BREAKS:
+            pending = ""
+        else:
+            pending = lines.pop()
+        parts = [pending] if pending else []
+        yield from lines
+    if parts:
+        yield from "".join(parts).splitlines()
+
+
+def iter_records(lines: Iterable[str], delimiter: str | None = ",") -> Iterator[tuple[int, Any]]:
+    """Divide linhas de texto em colunas, numerando-as e ignorando linhas em branco.
+
+    Sem ``delimiter`` (layouts posicionais) a linha segue inteira: o
+    verificador compilado recorta os campos por posição.
+    """
+
+    for line_number, line in enumerate(lines, start=1):
         if not line.strip():
             continue
-        yield line_number, [value.strip() for value in line.split(",")]
+        if delimiter is None:
+            yield line_number, line
+        else:
+            yield line_number, [value.strip() for value in line.split(delimiter)]
+
+
+def iter_lines(
+    raw_content: ContentSource,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    delimiter: str | None = ",",
+) -> Iterable[tuple[int, Any]]:
+    """Itera sobre as linhas numeradas, divididas por ``delimiter`` (``None``: linhas inteiras)."""
+
+    return iter_records(iter_text_lines(iter_text_chunks(raw_content, chunk_size)), delimiter)
 
 
-__all__ = ["FieldDefinition", "LayoutDefinition", "iter_lines"]
+__all__ = [
+    "CNPJ_PATTERN",
+    "CPF_PATTERN",
+    "ContentSource",
+    "DATE_PATTERN",
+    "DEFAULT_CHUNK_SIZE",
+    "FieldDefinition",
+    "LayoutDefinition",
+    "PATTERN_LABELS",
+    "iter_lines",
+    "iter_records",
+    "iter_text_chunks",
+    "iter_text_lines",
+]
@@ -0,0 +1,101 @@
+"""Leitura de arquivos locais via ``mmap``, sem copiar o arquivo para o heap do Python."""
+
+from __future__ import annotations
+
+import mmap
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from .layout import DEFAULT_CHUNK_SIZE
+
+MAPPED_BLOCK_SIZE = DEFAULT_CHUNK_SIZE
+"""Bytes percorridos por vez; cada bloco termina em ``\\n`` (ou no fim da faixa)."""
+
+_PLAIN_BYTES = bytes([0x09, 0x0A, 0x0D, *range(0x20, 0x7F)])
+"""ASCII imprimível, tabulação e ``\\r``/``\\n``: o resto exige a semântica completa de texto."""
+
+MappedRecord = tuple[int, "list[bytes] | list[str] | bytes | str"]
+
+
+@contextmanager
+def map_file(path: str | os.PathLike) -> Iterator[mmap.mmap | bytes]:
+    """Mapeia ``path`` somente para leitura; arquivos vazios viram ``b""`` (``mmap`` os rejeita)."""
+
+    with open(path, "rb") as stream:
+        if os.fstat(stream.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if hasattr(buffer, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                buffer.madvise(mmap.MADV_SEQUENTIAL)
+            yield buffer
+
+
+def iter_line_blocks(
+    buffer: mmap.mmap | bytes,
+    start: int = 0,
+    stop: int | None = None,
+    block_size: int = MAPPED_BLOCK_SIZE,
+) -> Iterator[bytes]:
+    """Fatias de ``buffer[start:stop]`` com cerca de ``block_size`` bytes, cada uma terminada em ``\\n``."""
+
+    position, stop = start, len(buffer) if stop is None else stop
+    while position < stop:
+        newline = buffer.find(b"\n", min(position + block_size, stop) - 1, stop)
+        end = stop if newline == -1 else newline + 1
+        yield buffer[position:end]
+        position = end
+
+
+class MappedRecords:
+    """Registros de ``buffer[start:stop]`` com a mesma numeração e divisão de ``iter_lines``.
+
+    O buffer é percorrido em blocos alinhados por linha. Blocos compostos só por
+    ASCII imprimível, tabulação e ``\\r``/``\\n`` (o caso comum) são divididos e
+    aparados diretamente em ``bytes`` e verificados por ``check_ascii_row``; os
+    demais são decodificados em UTF-8 e seguem o caminho de texto, preservando a
+    semântica de ``str.splitlines``/``str.strip``. Sem ``delimiter`` (layouts
+    posicionais) cada registro é a própria linha. ``line_count`` informa quantas
+    linhas foram consumidas, incluindo as em branco.
+    """
+
+    def __init__(
+        self,
+        buffer: mmap.mmap | bytes,
+        start: int = 0,
+        stop: int | None = None,
+        block_size: int = MAPPED_BLOCK_SIZE,
+        delimiter: str | None = ",",
+    ) -> None:
+        self._buffer = buffer
+        self._start = start
+        self._stop = len(buffer) if stop is None else stop
+        self._block_size = block_size
+        self._delimiter = delimiter
+        self.line_count = 0
+
+    def __iter__(self) -> Iterator[MappedRecord]:
+        line_number = self.line_count
+        delimiter = self._delimiter
+        ascii_delimiter = delimiter.encode("utf-8") if delimiter is not None else None
+        try:
+            for block in iter_line_blocks(self._buffer, self._start, self._stop, self._block_size):
+                # ``translate`` removendo os bytes comuns é bem mais rápido que uma regex.
+                if not block.translate(None, _PLAIN_BYTES):
+                    lines, separator = block.splitlines(), ascii_delimiter
+                else:
+                    lines, separator = block.decode("utf-8").splitlines(), delimiter
+                for line in lines:
+                    line_number += 1
+                    if not line.strip():
+                        continue
+                    if separator is None:
+                        yield line_number, line
+                    else:
+                        yield line_number, [value.strip() for value in line.split(separator)]
+        finally:
+            self.line_count = line_number
+
+
+__all__ = ["MAPPED_BLOCK_SIZE", "MappedRecords", "iter_line_blocks", "map_file"]
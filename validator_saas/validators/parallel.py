@@ -0,0 +1,181 @@
+"""Validação de um único arquivo grande em vários processos."""
+
+from __future__ import annotations
+
+import mmap
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import replace
+from typing import NamedTuple, Union
+
+from ..models import ValidationRun
+from .base import LayoutValidator, ValidationResult
+from .layout import iter_lines, iter_records, iter_text_chunks, iter_text_lines
+from .mapped import MappedRecords, map_file
+from .policy import UNLIMITED, IssueCollector, IssueRow, ValidationPolicy
+from .rules import RuleSet
+
+ParallelSource = Union[bytes, bytearray, os.PathLike]
+
+MIN_RANGE_BYTES = 1 << 20
+"""Faixas menores que isso não compensam o custo de despachar para outro processo."""
+
+RANGES_PER_WORKER = 4
+
+
+def split_line_aligned_ranges(buffer: bytes | mmap.mmap, parts: int) -> list[tuple[int, int]]:
+    """Divide ``buffer`` em até ``parts`` faixas ``[início, fim)`` terminadas em ``\\n``."""
+
+    size = len(buffer)
+    boundaries = [0]
+    for index in range(1, parts):
+        target = max(size * index // parts, boundaries[-1])
+        newline = buffer.find(b"\n", target)
+        if newline == -1:
+            break
+        if newline + 1 > boundaries[-1]:
+            boundaries.append(newline + 1)
+    boundaries.append(size)
+    return [(start, stop) for start, stop in zip(boundaries, boundaries[1:]) if stop > start]
+
+
+class _LineCounter:
+    """Conta as linhas consumidas, inclusive as em branco descartadas adiante."""
+
+    def __init__(self, lines: Iterable[str]) -> None:
+        self._lines = lines
+        self.count = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self._lines:
+            self.count += 1
+            yield line
+
+
+class RangeResult(NamedTuple):
+    """Resultado de uma faixa, serializado de volta para o processo pai.
+
+    ``rules`` traz o estado das regras entre registros da faixa, ainda não
+    concluídas: o pai as combina com as demais faixas antes de emiti-las;
+    ``suppressed_at`` posiciona as omissões por coluna entre as inconsistências.
+    """
+
+    line_count: int
+    issues: list[IssueRow]
+    suppressed: dict[str | None, int]
+    abort_reason: str | None
+    rules: RuleSet | None = None
+    suppressed_at: dict[str | None, int] | None = None
+
+
+def validate_range(
+    validator: LayoutValidator,
+    source: str | bytes,
+    start: int = 0,
+    stop: int | None = None,
+    policy: ValidationPolicy = UNLIMITED,
+) -> RangeResult:
+    """Executada no processo filho: valida uma faixa e devolve linhas e inconsistências.
+
+    ``source`` é o caminho do arquivo (mapeado em memória e lido entre ``start``
+    e ``stop``) ou os próprios bytes da faixa. Os números de linha são relativos
+    ao início da faixa e as inconsistências voltam como tuplas, mais baratas de
+    serializar; ``policy`` limita o que a faixa guarda.
+    """
+
+    collector = IssueCollector(policy=policy)
+    if isinstance(source, str):
+        with map_file(source) as buffer:
+            line_count = validator.collect_buffer(buffer, collector, start, stop)
+    elif validator.vectorized:
+        line_count = validator.collect_buffer(source, collector)
+    else:
+        lines = _LineCounter(iter_text_lines(iter_text_chunks(source)))
+        validator.collect(iter_records(lines, validator.layout.delimiter), collector)
+        line_count = lines.count
+    rows = collector.rows()
+    return RangeResult(
+        line_count, rows, collector.suppressed, collector.abort_reason, collector.rules, collector.suppressed_at
+    )
+
+
+def validate_parallel(
+    validator: LayoutValidator,
+    source: ParallelSource,
+    run: ValidationRun,
+    workers: int,
+    executor: Executor | None = None,
+    min_range_bytes: int = MIN_RANGE_BYTES,
+    policy: ValidationPolicy = UNLIMITED,
+) -> ValidationResult:
+    """Valida ``source`` em faixas alinhadas por linha distribuídas entre ``workers`` processos.
+
+    As inconsistências são reunidas na ordem do arquivo e renumeradas para o
+    número absoluto da linha, produzindo o mesmo resultado da validação serial.
+    A pré-checagem estrutural de ``policy`` roda no processo pai, antes de
+    qualquer despacho; as faixas aplicam os limites localmente e o pai os
+    reaplica ao juntar, parando de esperar faixas assim que o limite de erros
+    é atingido.
+    """
+
+    collector = IssueCollector(run.id, policy)
+    delimiter = validator.layout.delimiter
+    if isinstance(source, os.PathLike):
+        path = os.fspath(source)
+        with map_file(path) as buffer:
+            records = MappedRecords(buffer, delimiter=delimiter)
+            if policy.precheck_lines and validator.precheck(records, collector) is None:
+                return validator.finish_collected(run, collector)
+            ranges = split_line_aligned_ranges(buffer, _parts(len(buffer), workers, min_range_bytes))
+        tasks = [(path, start, stop) for start, stop in ranges]
+    else:
+        data = bytes(source)
+        records = iter_lines(data, delimiter=delimiter)
+        if policy.precheck_lines and validator.precheck(records, collector) is None:
+            return validator.finish_collected(run, collector)
+        ranges = split_line_aligned_ranges(data, _parts(len(data), workers, min_range_bytes))
+        tasks = [(data[start:stop],) for start, stop in ranges]
+
+    range_policy = replace(policy, precheck_lines=None)
+    own_executor = executor is None
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    futures = []
+    try:
+        for task in tasks:
+            futures.append(pool.submit(validate_range, validator, *task, policy=range_policy))
+        line_offset = 0
+        for future in futures:
+            result = future.result()
+            collector.merge(
+                result.issues,
+                result.suppressed,
+                result.abort_reason,
+                line_offset,
+                result.rules,
+                result.line_count,
+                result.suppressed_at,
+            )
+            line_offset += result.line_count
+            if collector.stopped:
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+        if own_executor:
+            pool.shutdown()
+    return validator.finish_collected(run, collector)
+
+
+def _parts(size: int, workers: int, min_range_bytes: int) -> int:
+    return max(1, min(workers * RANGES_PER_WORKER, size // max(min_range_bytes, 1)))
+
+
+__all__ = [
+    "MIN_RANGE_BYTES",
+    "ParallelSource",
+    "RangeResult",
+    "split_line_aligned_ranges",
+    "validate_parallel",
+    "validate_range",
+]
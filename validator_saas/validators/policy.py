@@ -0,0 +1,208 @@
+"""Políticas de interrupção antecipada e limite de inconsistências."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from ..config import Settings, get_settings
+from ..models import ValidationIssue
+
+if TYPE_CHECKING:
+    from .rules import RuleSet
+
+IssueRow = tuple[int | None, str | None, str, str]
+"""Inconsistência serializada: (linha, coluna, severidade, mensagem)."""
+
+
+@dataclass(frozen=True)
+class ValidationPolicy:
+    """Limites aplicados enquanto um arquivo é validado.
+
+    - ``max_errors``: interrompe a validação depois de N inconsistências.
+    - ``max_issues_per_column``: guarda só as N primeiras inconsistências de cada
+      coluna (as de estrutura contam como uma coluna à parte) e apenas conta as
+      demais, registrando ao final um aviso agregado por coluna.
+    - ``precheck_lines``: se as K primeiras linhas não vazias tiverem todas a
+      quantidade de colunas errada, o arquivo é recusado sem ser percorrido.
+
+    ``None`` (ou ``0`` nas configurações) desativa o limite correspondente.
+    """
+
+    max_errors: int | None = None
+    max_issues_per_column: int | None = None
+    precheck_lines: int | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> "ValidationPolicy":
+        settings = settings or get_settings()
+        return cls(
+            max_errors=settings.max_errors,
+            max_issues_per_column=settings.max_issues_per_column,
+            precheck_lines=settings.precheck_lines,
+        )
+
+    @property
+    def cache_tag(self) -> str:
+        """Identifica a política na chave do cache: limites diferentes, resultados diferentes."""
+
+        return f"e{self.max_errors or 0}c{self.max_issues_per_column or 0}p{self.precheck_lines or 0}"
+
+
+UNLIMITED = ValidationPolicy()
+
+
+@dataclass
+class IssueCollector:
+    """Acumula as inconsistências de uma execução aplicando uma ``ValidationPolicy``.
+
+    ``total`` conta todas as inconsistências encontradas, inclusive as omitidas
+    pelo limite por coluna, e ``suppressed_at`` guarda, por coluna, quantas
+    inconsistências já estavam em ``issues`` na primeira omissão (a ordem dos
+    avisos agregados); ``stopped`` indica que a validação deve parar.
+    ``rules`` guarda o estado das regras entre registros até ``finish_rules``;
+    ``lines`` é a quantidade de linhas percorridas, exportada nas métricas.
+    """
+
+    run_id: int = 0
+    policy: ValidationPolicy = UNLIMITED
+    issues: list[ValidationIssue] = field(default_factory=list)
+    total: int = 0
+    suppressed: dict[str | None, int] = field(default_factory=dict)
+    suppressed_at: dict[str | None, int] = field(default_factory=dict)
+    abort_reason: str | None = None
+    rules: RuleSet | None = field(default=None, repr=False)
+    lines: int = 0
+    _kept_by_column: dict[str | None, int] = field(default_factory=dict, repr=False)
+
+    @property
+    def stopped(self) -> bool:
+        return self.abort_reason is not None
+
+    def add(self, line_number: int | None, column_name: str | None, message: str, severity: str = "error") -> None:
+        if self.abort_reason is not None:
+            return
+        self.total += 1
+        cap = self.policy.max_issues_per_column
+        if cap is not None:
+            kept = self._kept_by_column.get(column_name, 0)
+            if kept >= cap:
+                if column_name not in self.suppressed:
+                    self.suppressed_at[column_name] = len(self.issues)
+                self.suppressed[column_name] = self.suppressed.get(column_name, 0) + 1
+                self._check_max_errors()
+                return
+            self._kept_by_column[column_name] = kept + 1
+        self.issues.append(
+            ValidationIssue(
+                validation_run_id=self.run_id,
+                line_number=line_number,
+                column_name=column_name,
+                severity=severity,
+                message=message,
+            )
+        )
+        self._check_max_errors()
+
+    def _check_max_errors(self) -> None:
+        limit = self.policy.max_errors
+        if limit is not None and self.total >= limit and self.abort_reason is None:
+            self.abort_reason = f"Limite de {limit} inconsistências atingido."
+
+    def abort(self, reason: str) -> None:
+        if self.abort_reason is None:
+            self.abort_reason = reason
+
+    def _add_suppressed(self, column_name: str | None, count: int) -> None:
+        if self.abort_reason is not None:
+            return
+        if column_name not in self.suppressed:
+            self.suppressed_at[column_name] = len(self.issues)
+        self.total += count
+        self.suppressed[column_name] = self.suppressed.get(column_name, 0) + count
+        self._check_max_errors()
+
+    def merge(
+        self,
+        rows: Iterable[IssueRow],
+        suppressed: Mapping[str | None, int] | None = None,
+        abort_reason: str | None = None,
+        line_offset: int = 0,
+        rules: RuleSet | None = None,
+        line_count: int = 0,
+        suppressed_at: Mapping[str | None, int] | None = None,
+    ) -> None:
+        """Incorpora o resultado de outro coletor (ex.: uma faixa validada em outro processo).
+
+        As linhas são renumeradas com ``line_offset`` e passam novamente pelos
+        limites; como cada faixa guarda suas primeiras inconsistências, o
+        resultado é o mesmo da validação serial (com ``max_errors`` e limite por
+        coluna combinados, o ponto de parada pode avançar um pouco). As omissões
+        da faixa entram na posição indicada por ``suppressed_at`` (o
+        ``suppressed_at`` do outro coletor; sem ele, depois das linhas), de modo
+        que os avisos agregados saem na ordem da validação serial. O estado das
+        regras entre registros da faixa, ``rules``, é combinado ao deste
+        coletor; ``line_count`` são as linhas percorridas na faixa.
+        """
+
+        self.lines = max(self.lines, line_offset + line_count)
+        if rules is not None:
+            if self.rules is None:
+                self.rules = type(rules)(rules.layout)
+            self.rules.merge(rules, line_offset)
+
+        positions = suppressed_at or {}
+        omitted = [(positions.get(column, -1), column, count) for column, count in (suppressed or {}).items()]
+        pending = iter(omitted)
+        upcoming = next(pending, None)
+        for index, (line_number, column_name, severity, message) in enumerate(rows):
+            while upcoming is not None and 0 <= upcoming[0] <= index:
+                self._add_suppressed(upcoming[1], upcoming[2])
+                upcoming = next(pending, None)
+            self.add(line_number + line_offset if line_number else line_number, column_name, message, severity)
+        while upcoming is not None:
+            self._add_suppressed(upcoming[1], upcoming[2])
+            upcoming = next(pending, None)
+        if abort_reason is not None:
+            self.abort(abort_reason)
+
+    def finish_rules(self) -> None:
+        """Emite as inconsistências das regras entre registros e libera o estado delas.
+
+        Numa validação interrompida as regras não viram o arquivo inteiro e
+        nada é emitido.
+        """
+
+        rules, self.rules = self.rules, None
+        if rules is None:
+            return
+        try:
+            if not self.stopped:
+                rules.finish(self.add)
+        finally:
+            rules.close()
+
+    def rows(self) -> list[IssueRow]:
+        return [(issue.line_number, issue.column_name, issue.severity, issue.message) for issue in self.issues]
+
+    def materialize(self) -> list[ValidationIssue]:
+        """Inconsistências guardadas seguidas de um aviso agregado por coluna com omissões."""
+
+        notes = [
+            ValidationIssue(
+                validation_run_id=self.run_id,
+                column_name=column_name,
+                severity="info",
+                message=(
+                    f"… e mais {count} inconsistências em {column_name}."
+                    if column_name is not None
+                    else f"… e mais {count} inconsistências de estrutura."
+                ),
+            )
+            for column_name, count in self.suppressed.items()
+        ]
+        return self.issues + notes
+
+
+__all__ = ["IssueCollector", "IssueRow", "UNLIMITED", "ValidationPolicy"]
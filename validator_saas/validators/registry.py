@@ -0,0 +1,319 @@
+"""Registro de layouts: validadores por (validador, versão de layout), carregados sob demanda.
+
+Além dos layouts embutidos neste pacote, cada diretório de
+``VALIDATOR_LAYOUTS_PATH`` pode trazer layouts declarativos em JSON, um por
+arquivo, em ``<diretório>/<validador>/<versão>.json``::
+
+    {
+        "regulator": "DIMP",
+        "name": "DIMP TED/TEF",
+        "engine": "python",
+        "delimiter": ",",
+        "fields": [
+            {"name": "codigo_registro", "type": "int"},
+            {"name": "cnpj_participante", "type": "str", "max_length": 18, "pattern": "cnpj"}
+        ],
+        "rules": [{"type": "unique_key", "fields": ["cnpj_participante"]}]
+    }
+
+Na primeira consulta só os nomes dos diretórios e arquivos são indexados; cada
+layout é lido, validado e compilado quando uma remessa da sua versão chega, e
+os validadores prontos ficam em um LRU de ``VALIDATOR_LAYOUT_CACHE_SIZE``
+entradas. Assim, o tempo de inicialização e a memória do processo não dependem
+da quantidade de layouts instalados. Um arquivo com o mesmo validador e versão
+de um layout embutido o substitui.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Union
+
+from ..config import get_settings
+from .base import LayoutValidator
+from .checkers import compile_layout
+from .layout import CNPJ_PATTERN, CPF_PATTERN, DATE_PATTERN, FieldDefinition, LayoutDefinition
+from .rules import FieldComparison, TrailerTotal, UniqueKey
+
+BUILTIN_LAYOUTS: dict[tuple[str, str], tuple[str, str]] = {
+    ("bacen", "1.0"): (".bacen", "BacenValidator"),
+    ("cadoc_3040", "1.0"): (".cadoc", "Cadoc3040Validator"),
+    ("cadoc_3050", "1.0"): (".cadoc", "Cadoc3050Validator"),
+    ("cadoc_6334", "1.0"): (".cadoc", "Cadoc6334Validator"),
+    ("dimp", "1.0"): (".dimp", "DimpValidator"),
+    ("dirf", "1.0"): (".dirf", "DirfValidator"),
+}
+"""Layouts embutidos: (validador, versão) -> (módulo, classe), importados só quando usados."""
+
+FIELD_TYPES = {"int": int, "float": float, "str": str}
+
+PATTERN_ALIASES = {"cnpj": CNPJ_PATTERN, "cpf": CPF_PATTERN, "date": DATE_PATTERN}
+"""Nomes aceitos em ``pattern`` no lugar da expressão regular dos padrões mais comuns."""
+
+RULE_TYPES = {"unique_key": UniqueKey, "field_comparison": FieldComparison, "trailer_total": TrailerTotal}
+
+LAYOUT_SUFFIX = ".json"
+
+LayoutSource = Union[tuple[str, str], Path]
+
+
+class LayoutNotFoundError(ValueError):
+    """Validador ou versão de layout não registrados."""
+
+
+class DeclaredValidator(LayoutValidator):
+    """Validador de um layout lido de arquivo declarativo."""
+
+    def __init__(self, key: str, regulator: str, layout: LayoutDefinition, engine: str = "python") -> None:
+        self.key = key
+        self.regulator = regulator
+        self.layout = layout
+        self.engine = engine
+
+
+# Formato declarativo ----------------------------------------------------------
+
+
+def version_key(version: str) -> tuple[tuple[int, int | str], ...]:
+    """Ordena versões numericamente por partes (``1.10`` depois de ``1.9``)."""
+
+    return tuple((0, int(part)) if part.isdigit() else (1, part) for part in re.split(r"[.\-_]", version))
+
+
+def layout_from_dict(key: str, version: str, data: Mapping[str, Any]) -> DeclaredValidator:
+    """Monta o validador descrito por ``data`` (o conteúdo de um arquivo de layout)."""
+
+    declared = data.get("version", version)
+    if declared != version:
+        raise ValueError(f"Versão {declared} declarada no arquivo difere da versão {version} do nome.")
+    fields = []
+    for spec in data["fields"]:
+        type_name = spec.get("type", "str")
+        if type_name not in FIELD_TYPES:
+            raise ValueError(f"Tipo desconhecido no campo {spec.get('name')}: {type_name}.")
+        pattern = spec.get("pattern")
+        fields.append(
+            FieldDefinition(
+                spec["name"],
+                FIELD_TYPES[type_name],
+                required=spec.get("required", True),
+                max_length=spec.get("max_length"),
+                pattern=PATTERN_ALIASES.get(pattern, pattern),
+                start=spec.get("start"),
+                length=spec.get("length"),
+            )
+        )
+    rules = []
+    for spec in data.get("rules", ()):
+        params = dict(spec)
+        rule_type = RULE_TYPES.get(params.pop("type", None))
+        if rule_type is None:
+            raise ValueError(f"Regra desconhecida: {spec.get('type')}.")
+        # Listas do JSON viram tuplas: as regras são imutáveis e entram no hash do layout.
+        params = {name: tuple(value) if isinstance(value, list) else value for name, value in params.items()}
+        rules.append(rule_type(**params))
+    layout = LayoutDefinition(
+        name=data.get("name", key),
+        version=version,
+        fields=tuple(fields),
+        delimiter=data.get("delimiter", ","),
+        rules=tuple(rules),
+    )
+    return DeclaredValidator(key, data.get("regulator", key), layout, data.get("engine", "python"))
+
+
+def layout_to_dict(validator: LayoutValidator) -> dict[str, Any]:
+    """Descrição declarativa de um validador, no formato lido por ``layout_from_dict``.
+
+    Serve de ponto de partida para uma nova versão de um layout embutido.
+    """
+
+    layout = validator.layout
+    aliases = {pattern: name for name, pattern in PATTERN_ALIASES.items()}
+    type_names = {type_: name for name, type_ in FIELD_TYPES.items()}
+    fields = []
+    for field in layout.fields:
+        if field.type_ not in type_names:
+            raise ValueError(f"Tipo do campo {field.name} não tem representação declarativa.")
+        spec: dict[str, Any] = {"name": field.name, "type": type_names[field.type_]}
+        if not field.required:
+            spec["required"] = False
+        for name in ("max_length", "start", "length"):
+            if getattr(field, name) is not None:
+                spec[name] = getattr(field, name)
+        if field.pattern is not None:
+            spec["pattern"] = aliases.get(field.pattern, field.pattern)
+        fields.append(spec)
+    rule_names = {rule_type: name for name, rule_type in RULE_TYPES.items()}
+    return {
+        "regulator": validator.regulator,
+        "name": layout.name,
+        "version": layout.version,
+        "engine": validator.engine,
+        "delimiter": layout.delimiter,
+        "fields": fields,
+        "rules": [{"type": rule_names[type(rule)], **dataclasses.asdict(rule)} for rule in layout.rules],
+    }
+
+
+def load_layout_file(path: str | os.PathLike, key: str | None = None) -> DeclaredValidator:
+    """Lê um arquivo ``<validador>/<versão>.json``; erros de conteúdo citam o arquivo."""
+
+    path = Path(path)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return layout_from_dict(key or path.parent.name, path.name[: -len(LAYOUT_SUFFIX)], data)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"Layout inválido em {path}: {exc}") from exc
+
+
+# Registro ---------------------------------------------------------------------
+
+
+class LayoutRegistry(Mapping[str, LayoutValidator]):
+    """Validadores por chave e versão de layout, carregados na primeira consulta.
+
+    Como ``Mapping`` (``VALIDATORS[chave]``), devolve a versão mais recente de
+    cada validador; ``resolve`` escolhe uma versão específica. ``paths`` e
+    ``cache_size`` ausentes vêm de ``VALIDATOR_LAYOUTS_PATH`` e
+    ``VALIDATOR_LAYOUT_CACHE_SIZE``, lidos quando o índice é montado.
+    """
+
+    def __init__(
+        self,
+        paths: tuple[str | os.PathLike, ...] | None = None,
+        cache_size: int | None = None,
+        builtins: Mapping[tuple[str, str], tuple[str, str]] = BUILTIN_LAYOUTS,
+    ) -> None:
+        self.paths = paths
+        self.cache_size = cache_size
+        self._builtins = dict(builtins)
+        self._index: dict[str, dict[str, LayoutSource]] | None = None
+        self._cache: OrderedDict[tuple[str, str], LayoutValidator] = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrementada por ``refresh``: identifica o conjunto de layouts instalado (ex.: em caches).
+        self.generation = 0
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def _sources(self) -> dict[str, dict[str, LayoutSource]]:
+        index = self._index
+        if index is not None:
+            return index
+        settings = get_settings()
+        paths = self.paths
+        if paths is None:
+            paths = tuple(path for path in settings.layouts_path.split(os.pathsep) if path)
+        if self.cache_size is None:
+            self.cache_size = settings.layout_cache_size
+        index = {}
+        for key_version, target in self._builtins.items():
+            key, version = key_version
+            index.setdefault(key, {})[version] = target
+        for root in paths:
+            # Só os nomes são lidos aqui; o conteúdo de cada layout espera pela primeira remessa.
+            for key_dir in sorted(Path(root).iterdir()) if Path(root).is_dir() else ():
+                if not key_dir.is_dir():
+                    continue
+                for path in key_dir.glob(f"*{LAYOUT_SUFFIX}"):
+                    index.setdefault(key_dir.name, {})[path.name[: -len(LAYOUT_SUFFIX)]] = path
+        self._index = index
+        return index
+
+    def versions(self, key: str) -> list[str]:
+        """Versões instaladas de ``key``, da mais antiga para a mais recente."""
+
+        return sorted(self._sources().get(key, ()), key=version_key)
+
+    def resolve(self, key: str, version: str | None = None) -> LayoutValidator:
+        """Validador de ``key`` na ``version`` pedida (a mais recente quando ausente).
+
+        Levanta ``LayoutNotFoundError`` para validador ou versão não instalados.
+        """
+
+        sources = self._sources().get(key)
+        if not sources:
+            raise LayoutNotFoundError(f"Validador não encontrado para {key}.")
+        if version is None:
+            version = max(sources, key=version_key)
+        elif version not in sources:
+            available = ", ".join(self.versions(key))
+            raise LayoutNotFoundError(
+                f"Versão de layout {version} não encontrada para {key} (disponíveis: {available})."
+            )
+        with self._lock:
+            validator = self._cache.get((key, version))
+            if validator is not None:
+                self._cache.move_to_end((key, version))
+                self.hits += 1
+                return validator
+        # Carregado fora da trava: duas primeiras consultas simultâneas só repetem trabalho.
+        loaded = self._load(key, sources[version])
+        with self._lock:
+            validator = self._cache.setdefault((key, version), loaded)
+            self._cache.move_to_end((key, version))
+            self.loads += 1
+            while len(self._cache) > max(self.cache_size or 0, 1):
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return validator
+
+    def _load(self, key: str, source: LayoutSource) -> LayoutValidator:
+        if isinstance(source, Path):
+            validator: LayoutValidator = load_layout_file(source, key)
+        else:
+            module, name = source
+            validator = getattr(import_module(module, __package__), name)()
+        compile_layout(validator.layout)
+        return validator
+
+    def refresh(self) -> None:
+        """Descarta o índice e os validadores carregados (ex.: após instalar novos layouts)."""
+
+        with self._lock:
+            self._index = None
+            self._cache.clear()
+            self.generation += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "entries": len(self._cache),
+        }
+
+    def __getitem__(self, key: str) -> LayoutValidator:
+        if key not in self._sources():
+            raise KeyError(key)
+        return self.resolve(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self._sources()))
+
+    def __len__(self) -> int:
+        return len(self._sources())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._sources()
+
+
+__all__ = [
+    "BUILTIN_LAYOUTS",
+    "DeclaredValidator",
+    "LayoutNotFoundError",
+    "LayoutRegistry",
+    "layout_from_dict",
+    "layout_to_dict",
+    "load_layout_file",
+    "version_key",
+]
@@ -0,0 +1,507 @@
+"""Regras entre registros (totais, unicidade e comparações entre campos).
+
+As regras de ``LayoutDefinition.rules`` rodam na mesma passada do verificador
+de células: cada registro alimenta acumuladores de memória limitada e as
+inconsistências agregadas são emitidas ao final, em ordem de linha. Células
+vazias ou que não são números são ignoradas pelas regras, pois o verificador
+de células já as reporta.
+"""
+
+from __future__ import annotations
+
+import operator
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Protocol, Sequence
+
+from ..config import get_settings
+
+if TYPE_CHECKING:
+    from .layout import LayoutDefinition
+
+Cells = Sequence[Any]
+"""Células (``str`` ou ``bytes``, já aparadas) dos campos usados por uma regra, na ordem de ``fields``."""
+
+Report = Callable[[int | None, str | None, str], None]
+"""Recebe ``(linha, coluna, mensagem)`` de cada inconsistência encontrada por uma regra."""
+
+SPILL_PARTITIONS = 64
+"""Partições em disco usadas quando a checagem de unicidade excede o limite de chaves em memória."""
+
+_OPERATORS: dict[str, tuple[Callable[[Any, Any], bool], str]] = {
+    "<": (operator.lt, "menor que"),
+    "<=": (operator.le, "menor ou igual a"),
+    ">": (operator.gt, "maior que"),
+    ">=": (operator.ge, "maior ou igual a"),
+    "==": (operator.eq, "igual a"),
+    "!=": (operator.ne, "diferente de"),
+}
+
+
+def _text(cell: Any) -> str:
+    return cell if type(cell) is str else cell.decode("utf-8", "replace")
+
+
+def _decimal(cell: Any) -> Decimal | None:
+    """Valor exato da célula, ou ``None`` quando ela não é um número finito."""
+
+    try:
+        value = Decimal(_text(cell))
+    except InvalidOperation:
+        return None
+    return value if value.is_finite() else None
+
+
+def _sum(cells: Sequence[Any]) -> Decimal:
+    """Soma exata das células numéricas de um lote, ignorando as vazias e as inválidas.
+
+    O caminho rápido decodifica o lote de uma vez e soma com ``map(Decimal)``;
+    só um lote com alguma célula inválida ou não finita é somado célula a célula.
+    """
+
+    present = [cell for cell in cells if cell]
+    if not present:
+        return Decimal(0)
+    try:
+        if type(present[0]) is str:
+            texts = "\n".join(present).split("\n")
+        else:
+            texts = b"\n".join(present).decode("utf-8", "replace").split("\n")
+    except TypeError:
+        texts = [_text(cell) for cell in present]
+    try:
+        total = sum(map(Decimal, texts), Decimal(0))
+    except InvalidOperation:
+        total = Decimal("NaN")
+    if total.is_finite():
+        return total
+    return sum(filter(None, map(_decimal, present)), Decimal(0))
+
+
+def _as_bytes(cells: Sequence[Any]) -> list[bytes]:
+    """Células como ``bytes``; colunas homogêneas são convertidas de uma vez (células não têm ``\\n``)."""
+
+    try:
+        if cells and type(cells[0]) is str:
+            return "\n".join(cells).encode().split(b"\n")
+        b"".join(cells)  # só confirma que todas já são ``bytes``
+        return list(cells)
+    except TypeError:
+        return [cell if type(cell) is bytes else cell.encode() for cell in cells]
+
+
+class RecordRule(Protocol):
+    """Regra declarada em um layout; ``fields`` são os campos que ela lê de cada registro."""
+
+    @property
+    def fields(self) -> tuple[str, ...]: ...
+
+    @property
+    def description(self) -> str: ...
+
+
+class RuleState(Protocol):
+    """Acumulador de uma regra agregada durante uma execução (serializável entre processos).
+
+    ``add_columns`` recebe um lote de registros em colunas: os números de linha
+    e, para cada campo de ``fields``, a lista das células do lote.
+    """
+
+    def add_columns(self, line_numbers: Sequence[int], columns: Sequence[Sequence[Any]]) -> None: ...
+
+    def merge(self, other: Any, line_offset: int) -> None: ...
+
+    def finish(self, report: Report) -> None: ...
+
+    def close(self) -> None: ...
+
+
+# Regras ----------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class FieldComparison:
+    """Compara dois campos numéricos do mesmo registro, ex.: ``imposto_retido <= valor_rendimento``."""
+
+    left: str
+    operator: str
+    right: str
+
+    def __post_init__(self) -> None:
+        if self.operator not in _OPERATORS:
+            raise ValueError(f"Operador de comparação desconhecido: {self.operator}.")
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return (self.left, self.right)
+
+    @property
+    def description(self) -> str:
+        return f"{self.left} {_OPERATORS[self.operator][1]} {self.right}"
+
+    def check(self, cells: Cells) -> str | None:
+        left, right = cells
+        if not left or not right:
+            return None
+        left_value, right_value = _decimal(left), _decimal(right)
+        if left_value is None or right_value is None:
+            return None
+        compare, label = _OPERATORS[self.operator]
+        if compare(left_value, right_value):
+            return None
+        return f"{self.left} ({_text(left)}) deve ser {label} {self.right} ({_text(right)})."
+
+
+@dataclass(frozen=True)
+class TrailerTotal:
+    """A soma de ``field`` nos registros de detalhe precisa bater com o valor do registro trailer.
+
+    O trailer é o registro cujo ``record_field`` é exatamente ``trailer_code``;
+    os demais registros são somados. Com ``required`` a ausência do trailer
+    também é uma inconsistência.
+    """
+
+    field: str
+    record_field: str
+    trailer_code: str
+    required: bool = False
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return (self.record_field, self.field)
+
+    @property
+    def description(self) -> str:
+        return f"soma de {self.field} igual ao trailer ({self.record_field}={self.trailer_code})"
+
+    def state(self, max_keys: int) -> "_TrailerTotalState":
+        return _TrailerTotalState(self)
+
+
+@dataclass(frozen=True)
+class UniqueKey:
+    """Cada combinação dos ``fields`` só pode aparecer em um registro do arquivo.
+
+    As chaves são comparadas literalmente (um CNPJ com e outro sem máscara são
+    chaves diferentes). Acima de ``VALIDATOR_RULE_MAX_KEYS`` chaves em memória,
+    as ocorrências passam a ser gravadas em partições no disco, conferidas uma
+    a uma ao final.
+    """
+
+    fields: tuple[str, ...]
+
+    @property
+    def column(self) -> str:
+        return "+".join(self.fields)
+
+    @property
+    def description(self) -> str:
+        return f"chave única ({', '.join(self.fields)})"
+
+    def state(self, max_keys: int) -> "_UniqueKeyState":
+        return _UniqueKeyState(self, max_keys)
+
+
+# Acumuladores ----------------------------------------------------------------
+
+
+class _TrailerTotalState:
+    def __init__(self, rule: TrailerTotal) -> None:
+        self.rule = rule
+        self.codes = (rule.trailer_code, rule.trailer_code.encode())
+        self.total = Decimal(0)
+        self.trailers: list[tuple[int, Decimal]] = []
+
+    def add_columns(self, line_numbers: Sequence[int], columns: Sequence[Sequence[Any]]) -> None:
+        codes, cells = columns
+        text_code, bytes_code = self.codes
+        if text_code not in codes and bytes_code not in codes:
+            self.total += _sum(cells)
+            return
+        details = []
+        for line_number, code, cell in zip(line_numbers, codes, cells):
+            if code != text_code and code != bytes_code:
+                details.append(cell)
+            elif cell and (value := _decimal(cell)) is not None:
+                self.trailers.append((line_number, value))
+        self.total += _sum(details)
+
+    def merge(self, other: "_TrailerTotalState", line_offset: int) -> None:
+        self.total += other.total
+        self.trailers += [(line_number + line_offset, value) for line_number, value in other.trailers]
+
+    def finish(self, report: Report) -> None:
+        rule = self.rule
+        if not self.trailers and rule.required:
+            report(None, rule.record_field, f"Registro trailer ({rule.record_field}={rule.trailer_code}) ausente.")
+        for line_number, expected in self.trailers:
+            if expected != self.total:
+                report(
+                    line_number,
+                    rule.field,
+                    f"Soma de {rule.field} nos registros ({self.total}) difere do total do trailer ({expected}).",
+                )
+
+    def close(self) -> None:
+        pass
+
+
+_SPILL_HEADER = struct.Struct("<QI")
+
+
+def _encode_key(key: tuple[bytes, ...]) -> bytes:
+    return b"".join(len(part).to_bytes(4, "little") + part for part in key)
+
+
+class _SpillFiles:
+    """Pares ``(linha, chave)`` gravados em partições no disco, escolhidas pelo CRC32 da chave."""
+
+    def __init__(self, partitions: int = SPILL_PARTITIONS) -> None:
+        self.directory = tempfile.mkdtemp(prefix="validador-regras-")
+        self.partitions = partitions
+        self._streams: dict[int, Any] = {}
+
+    def write_many(self, line_numbers: Sequence[int], keys: Sequence[bytes]) -> None:
+        parts: dict[int, list[bytes]] = {}
+        pack, partitions = _SPILL_HEADER.pack, self.partitions
+        for line_number, key in zip(line_numbers, keys):
+            parts.setdefault(zlib.crc32(key) % partitions, []).append(pack(line_number, len(key)) + key)
+        for index, records in parts.items():
+            stream = self._streams.get(index)
+            if stream is None:
+                stream = self._streams[index] = open(os.path.join(self.directory, str(index)), "ab")
+            stream.write(b"".join(records))
+
+    def read(self, index: int) -> Iterator[tuple[int, bytes]]:
+        self.flush()
+        path = os.path.join(self.directory, str(index))
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as stream:
+            while header := stream.read(_SPILL_HEADER.size):
+                line_number, size = _SPILL_HEADER.unpack(header)
+                yield line_number, stream.read(size)
+
+    def flush(self) -> None:
+        for stream in self._streams.values():
+            stream.close()
+        self._streams.clear()
+
+    def remove(self) -> None:
+        self.flush()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __getstate__(self) -> dict[str, Any]:
+        self.flush()
+        return {"directory": self.directory, "partitions": self.partitions}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state, _streams={})
+
+
+class _UniqueKeyState:
+    def __init__(self, rule: UniqueKey, max_keys: int) -> None:
+        self.rule = rule
+        self.max_keys = max_keys
+        self.first: dict[tuple[bytes, ...], int] = {}
+        self.duplicates: list[tuple[int, tuple[bytes, ...]]] = []
+        self.spill: _SpillFiles | None = None
+
+    def add_columns(self, line_numbers: Sequence[int], columns: Sequence[Sequence[Any]]) -> None:
+        columns = [_as_bytes(column) for column in columns]
+        keys = list(zip(*columns))
+        if not all(map(all, columns)):
+            kept = [(line_number, key) for line_number, key in zip(line_numbers, keys) if all(key)]
+            line_numbers, keys = [line_number for line_number, _ in kept], [key for _, key in kept]
+        if self.spill is None:
+            # Caso comum, sem repetição no lote nem com os lotes anteriores: tudo em operações de ``dict``.
+            batch = dict(zip(reversed(keys), reversed(line_numbers)))
+            if len(batch) == len(keys) and self.first.keys().isdisjoint(batch):
+                self.first.update(batch)
+                if len(self.first) > self.max_keys:
+                    self._spill()
+                return
+        for position, (line_number, key) in enumerate(zip(line_numbers, keys)):
+            if self.spill is not None:
+                self.spill.write_many(line_numbers[position:], list(map(_encode_key, keys[position:])))
+                return
+            if self.first.setdefault(key, line_number) != line_number:
+                self.duplicates.append((line_number, key))
+                self._check_budget()
+            elif len(self.first) > self.max_keys:
+                self._spill()
+
+    def _check_budget(self) -> None:
+        if len(self.first) + len(self.duplicates) > self.max_keys:
+            self._spill()
+
+    def _spill(self) -> _SpillFiles:
+        """Passa a gravar as ocorrências em disco, começando pelas que estavam em memória."""
+
+        if self.spill is None:
+            self.spill = _SpillFiles()
+            self._write(self.spill, self, 0)
+            self.first, self.duplicates = {}, []
+        return self.spill
+
+    @staticmethod
+    def _write(spill: _SpillFiles, state: "_UniqueKeyState", line_offset: int) -> None:
+        pairs = [(line_number, key) for key, line_number in state.first.items()] + state.duplicates
+        spill.write_many([line_number + line_offset for line_number, _ in pairs], [_encode_key(key) for _, key in pairs])
+
+    def merge(self, other: "_UniqueKeyState", line_offset: int) -> None:
+        if self.spill is None and other.spill is None:
+            for key, line_number in other.first.items():
+                line_number += line_offset
+                if self.first.setdefault(key, line_number) != line_number:
+                    self.duplicates.append((line_number, key))
+            self.duplicates += [(line_number + line_offset, key) for line_number, key in other.duplicates]
+            self._check_budget()
+            return
+        spill = self._spill()
+        self._write(spill, other, line_offset)
+        if other.spill is not None:
+            for index in range(other.spill.partitions):
+                pairs = list(other.spill.read(index))
+                spill.write_many([line_number + line_offset for line_number, _ in pairs], [key for _, key in pairs])
+            other.spill.remove()
+
+    def _found(self) -> list[tuple[int, int]]:
+        """Pares ``(linha duplicada, primeira linha da chave)`` em ordem de linha."""
+
+        if self.spill is None:
+            return sorted((line_number, self.first[key]) for line_number, key in self.duplicates)
+        found = []
+        for index in range(self.spill.partitions):
+            first: dict[bytes, int] = {}
+            for line_number, key in sorted(self.spill.read(index)):
+                if (first_line := first.setdefault(key, line_number)) != line_number:
+                    found.append((line_number, first_line))
+        return sorted(found)
+
+    def finish(self, report: Report) -> None:
+        column = self.rule.column
+        fields = ", ".join(self.rule.fields)
+        for line_number, first_line in self._found():
+            report(line_number, column, f"Chave duplicada ({fields}): já informada na linha {first_line}.")
+
+    def close(self) -> None:
+        if self.spill is not None:
+            self.spill.remove()
+            self.spill = None
+
+
+# Execução --------------------------------------------------------------------
+
+
+def _getter(positions: Sequence[int]) -> Callable[[Sequence[Any]], Sequence[Any]]:
+    if len(positions) == 1:
+        position = positions[0]
+        return lambda values: (values[position],)
+    return itemgetter(*positions)
+
+
+class RuleSet:
+    """Estado das regras de ``layout.rules`` em uma execução.
+
+    Os registros são reduzidos às células usadas pelas regras (``columns``,
+    índices dos campos no layout) com ``project``; ``check`` aplica as
+    comparações entre campos de um registro e ``accumulate`` alimenta as regras
+    agregadas em lotes de ``BATCH_ROWS`` registros, cujas inconsistências saem
+    em ``finish``. Estados de faixas validadas em outros processos são
+    combinados com ``merge``.
+    """
+
+    BATCH_ROWS = 4096
+
+    def __init__(self, layout: LayoutDefinition, states: list[Any] | None = None) -> None:
+        self.layout = layout
+        index = {field.name: position for position, field in enumerate(layout.fields)}
+        self.columns = tuple(sorted({index[name] for rule in layout.rules for name in rule.fields}))
+        slot = {field_index: position for position, field_index in enumerate(self.columns)}
+        if layout.positional:
+            bounds = [(layout.fields[column].start, layout.fields[column].end) for column in self.columns]
+            self.project = lambda line: tuple(line[start:end].strip() for start, end in bounds)
+        else:
+            self.project = _getter(self.columns)
+        row_rules = [rule for rule in layout.rules if isinstance(rule, FieldComparison)]
+        aggregates = [rule for rule in layout.rules if not isinstance(rule, FieldComparison)]
+        self.row_rules = [(rule, _getter([slot[index[name]] for name in rule.fields])) for rule in row_rules]
+        if states is None:
+            max_keys = get_settings().rule_max_keys
+            states = [rule.state(max_keys) for rule in aggregates]
+        self.states = states
+        self.accumulators = [
+            (state, [slot[index[name]] for name in rule.fields]) for rule, state in zip(aggregates, states)
+        ]
+        self._pending: list[tuple[int, Cells]] = []
+
+    def check(self, cells: Cells) -> list[tuple[str, str]]:
+        """Inconsistências das comparações entre campos de um registro, como ``(coluna, mensagem)``."""
+
+        problems = []
+        for rule, get in self.row_rules:
+            message = rule.check(get(cells))
+            if message is not None:
+                problems.append((rule.left, message))
+        return problems
+
+    def accumulate(self, line_number: int, cells: Cells) -> None:
+        pending = self._pending
+        pending.append((line_number, cells))
+        if len(pending) >= self.BATCH_ROWS:
+            self.flush()
+
+    def accumulate_columns(self, line_numbers: Sequence[int], columns: Sequence[Sequence[Any]]) -> None:
+        """Alimenta as regras agregadas com um lote já em colunas (uma lista por item de ``columns``)."""
+
+        self.flush()
+        for state, positions in self.accumulators:
+            state.add_columns(line_numbers, [columns[position] for position in positions])
+
+    def flush(self) -> None:
+        if self._pending:
+            pending, self._pending = self._pending, []
+            lines = [line_number for line_number, _ in pending]
+            rows = [cells for _, cells in pending]
+            self.accumulate_columns(lines, [list(map(itemgetter(slot), rows)) for slot in range(len(self.columns))])
+
+    def merge(self, other: "RuleSet", line_offset: int = 0) -> None:
+        self.flush()
+        other.flush()
+        for state, other_state in zip(self.states, other.states):
+            state.merge(other_state, line_offset)
+
+    def finish(self, report: Report) -> None:
+        self.flush()
+        for state in self.states:
+            state.finish(report)
+
+    def close(self) -> None:
+        self._pending = []
+        for state in self.states:
+            state.close()
+
+    def __getstate__(self) -> dict[str, Any]:
+        self.flush()
+        return {"layout": self.layout, "states": self.states}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["layout"], state["states"])  # type: ignore[misc]
+
+
+__all__ = [
+    "FieldComparison",
+    "RecordRule",
+    "RuleSet",
+    "RuleState",
+    "SPILL_PARTITIONS",
+    "TrailerTotal",
+    "UniqueKey",
+]
@@ -0,0 +1,452 @@
+"""Motor vetorizado (NumPy) para layouts dominados por colunas numéricas.
+
+O conteúdo é percorrido em blocos de bytes alinhados por linha. Em cada bloco
+ASCII, as posições de quebras de linha e delimitadores viram vetores de
+índices e as regras do layout (obrigatoriedade, tamanho máximo e formato de
+``int``/``float``) são avaliadas coluna a coluna com operações vetorizadas;
+``FieldDefinition.pattern`` é aplicado uma vez por valor distinto do bloco.
+A vetorização só *aprova* linhas: qualquer linha suspeita (regra violada,
+quantidade de colunas diferente, formato que exige a conversão de referência)
+volta ao verificador compilado do layout, que gera as mensagens. Por isso as
+inconsistências são idênticas às do motor Python. As regras entre registros
+do layout recebem as células de todas as linhas com a quantidade certa de
+colunas, recortadas dos limites já calculados.
+
+NumPy é uma dependência opcional (``pip install validator-saas[numpy]``);
+sem ela, os validadores configurados com este motor usam o motor Python. O
+import acontece no primeiro uso do motor, não ao carregar os validadores.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, Callable, NamedTuple, Protocol
+
+from ..config import get_settings
+from .checkers import COMPILED_LAYOUT_CACHE, pattern_matchers
+from .layout import ContentSource, LayoutDefinition, _read_chunks
+from .mapped import MappedRecords, iter_line_blocks
+from .policy import IssueCollector
+from .rules import RuleSet
+
+np: Any = None
+"""Módulo NumPy, carregado por ``_load_numpy`` no primeiro uso vetorizado."""
+
+ENGINES = ("python", "numpy")
+
+VECTOR_BLOCK_SIZE = 1 << 20
+"""Bytes por bloco vetorizado: blocos maiores diluem o custo fixo das operações NumPy."""
+
+_VECTOR_BYTES = bytes([0x09, 0x0A, 0x0D, *range(0x20, 0x7F)])
+"""Blocos com qualquer outro byte seguem inteiros pelo caminho de texto."""
+
+_TAB, _LF, _CR, _SPACE, _PLUS, _MINUS, _DOT = 0x09, 0x0A, 0x0D, 0x20, 0x2B, 0x2D, 0x2E
+
+
+@lru_cache(maxsize=None)
+def numpy_available() -> bool:
+    """Indica se NumPy está instalado, sem importá-lo."""
+
+    return importlib.util.find_spec("numpy") is not None
+
+
+def _load_numpy() -> Any:
+    global np
+    if np is None:
+        import numpy
+
+        np = numpy
+    return np
+
+
+@lru_cache(maxsize=8)
+def _engine_overrides(spec: str) -> dict[str, str]:
+    # Chaveado pelo valor de ``VALIDATOR_ENGINES``: ``validator.vectorized`` é consultado a cada validação.
+    return dict(item.strip().split("=", 1) for item in spec.split(",") if "=" in item)
+
+
+def engine_for(key: str, default: str = "python") -> str:
+    """Motor efetivo de um validador: ``VALIDATOR_ENGINES`` sobrepõe o padrão do layout.
+
+    ``VALIDATOR_ENGINES`` aceita pares ``validador=motor`` separados por vírgula
+    (ex.: ``bacen=python,dimp=numpy``). Sem NumPy instalado o motor é sempre ``python``.
+    """
+
+    engine = _engine_overrides(get_settings().validator_engines).get(key, default).strip()
+    if engine not in ENGINES:
+        raise ValueError(f"Motor de validação desconhecido para {key}: {engine}.")
+    return engine if numpy_available() else "python"
+
+
+class RowCollector(Protocol):
+    """Parte de ``LayoutValidator`` usada pelo motor vetorizado."""
+
+    layout: LayoutDefinition
+
+    def precheck(self, records: Iterable[Any], collector: IssueCollector) -> Iterator[Any] | None: ...
+
+    def collect_rows(
+        self, records: Iterable[Any], collector: IssueCollector, accumulate: bool = True
+    ) -> IssueCollector: ...
+
+    def rules_for(self, collector: IssueCollector) -> RuleSet | None: ...
+
+
+# Blocos ----------------------------------------------------------------------
+
+
+def iter_byte_blocks(content: ContentSource, block_size: int = VECTOR_BLOCK_SIZE) -> Iterator[bytes]:
+    """Converte qualquer origem aceita pelos validadores em blocos de bytes terminados em ``\\n``."""
+
+    if isinstance(content, os.PathLike):
+        with open(content, "rb") as stream:
+            yield from iter_byte_blocks(stream, block_size)
+        return
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        yield from iter_line_blocks(bytes(content), block_size=block_size)
+        return
+    chunks = _read_chunks(content, block_size) if hasattr(content, "read") else content
+
+    parts: list[bytes] = []
+    size = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if not chunk:
+            continue
+        parts.append(bytes(chunk))
+        size += len(chunk)
+        if size < block_size:
+            continue
+        pending = b"".join(parts)
+        cut = pending.rfind(b"\n") + 1
+        if cut:
+            yield pending[:cut]
+            pending = pending[cut:]
+        parts, size = ([pending], len(pending)) if pending else ([], 0)
+    if parts:
+        yield b"".join(parts)
+
+
+# Verificação vetorizada ------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class _ColumnRule:
+    index: int
+    required: bool
+    max_length: int | None
+    kind: str
+    pattern: Callable[[bytes], Any] | None = None
+
+
+class BlockScan(NamedTuple):
+    """Resultado da verificação vetorizada de um bloco.
+
+    ``starts``/``ends`` delimitam cada linha sem a quebra (``\\n`` ou
+    ``\\r\\n``); ``rows`` são as linhas com a quantidade certa de colunas e
+    ``cell_starts``/``cell_ends`` os limites (já aparados) das células delas.
+    """
+
+    line_count: int
+    suspects: Any
+    starts: Any
+    ends: Any
+    rows: Any
+    cell_starts: Any
+    cell_ends: Any
+
+
+@dataclass(frozen=True)
+class BlockPlan:
+    """Regras de um layout preparadas para a verificação vetorizada de blocos.
+
+    ``delimiter`` é ``None`` em layouts posicionais; nesse caso ``offsets``
+    traz o início e o fim de cada campo dentro do registro.
+    """
+
+    width: int
+    rules: tuple[_ColumnRule, ...]
+    delimiter: bytes | None = b","
+    offsets: tuple[tuple[int, int], ...] = ()
+
+    @property
+    def needs_digits(self) -> bool:
+        return any(rule.kind in ("int", "float") for rule in self.rules)
+
+    def suspect_lines(self, block: bytes) -> BlockScan:
+        """Linhas do bloco que precisam do verificador compilado (``BlockScan.suspects``)."""
+
+        data = np.frombuffer(block, dtype=np.uint8)
+        size = data.size
+        newlines = np.flatnonzero(data == _LF)
+        ends = newlines if block.endswith(b"\n") else np.append(newlines, size)
+        starts = np.concatenate(([0], newlines + 1))[: ends.size]
+        if _CR in block:
+            ends = ends - ((ends > starts) & (data[ends - 1] == _CR))
+        blank = ends == starts
+
+        if self.delimiter is None:
+            clean = (ends - starts == max((end for _, end in self.offsets), default=0)) & ~blank
+            rows = np.flatnonzero(clean)
+            field_starts, field_ends = np.array(self.offsets, dtype=np.int64).T.reshape(2, 1, -1)
+            cell_starts, cell_ends = starts[rows][:, None] + field_starts, starts[rows][:, None] + field_ends
+        else:
+            delimiters = np.flatnonzero(data == self.delimiter[0])
+            first_delimiter = np.searchsorted(delimiters, starts)
+            delimiter_count = np.searchsorted(delimiters, ends) - first_delimiter
+            clean = (delimiter_count == self.width - 1) & ~blank
+            rows = np.flatnonzero(clean)
+            if self.width > 1:
+                bounds = delimiters[first_delimiter[rows][:, None] + np.arange(self.width - 1)]
+                cell_starts = np.column_stack((starts[rows], bounds + 1))
+                cell_ends = np.column_stack((bounds, ends[rows]))
+            else:
+                cell_starts, cell_ends = starts[rows][:, None], ends[rows][:, None]
+
+        suspect = ~clean & ~blank
+        if rows.size:
+            cell_starts, cell_ends = _strip_cells(data, cell_starts, cell_ends)
+            suspect[rows[self._failing_cells(data, cell_starts, cell_ends)]] = True
+        return BlockScan(int(ends.size), np.flatnonzero(suspect), starts, ends, rows, cell_starts, cell_ends)
+
+    def _failing_cells(self, data: Any, cell_starts: Any, cell_ends: Any) -> Any:
+        lengths = cell_ends - cell_starts
+        failing = np.zeros(lengths.shape[0], dtype=bool)
+        if self.needs_digits:
+            # Posições esparsas + ``searchsorted`` saem mais baratas que somas acumuladas do bloco inteiro.
+            non_digits = np.flatnonzero((data < 0x30) | (data > 0x39))
+            dots = np.flatnonzero(data == _DOT)
+        last = max(data.size - 1, 0)
+        for rule in self.rules:
+            length = lengths[:, rule.index]
+            present = length > 0
+            if rule.required:
+                failing |= ~present
+            if rule.max_length:
+                failing |= length > rule.max_length
+            start, end = cell_starts[:, rule.index], cell_ends[:, rule.index]
+            if rule.kind == "str":
+                pass
+            elif rule.kind == "int":
+                failing |= present & (_count_between(non_digits, start, end) != 0)
+            elif rule.kind == "float":
+                # Só aprova ``[+-]dígitos[.dígitos]``; o resto fica com a conversão de referência.
+                first = data[np.minimum(start, last)]
+                sign = (first == _PLUS) | (first == _MINUS)
+                others = _count_between(non_digits, start, end)
+                dot_count = _count_between(dots, start, end)
+                malformed = (others != dot_count + sign) | (dot_count > 1) | (others == length)
+                failing |= present & malformed
+            else:
+                failing |= present
+            if rule.pattern is not None:
+                failing |= present & ~_pattern_matches(rule, data, start, length)
+        return failing
+
+
+def _pattern_matches(rule: _ColumnRule, data: Any, start: Any, length: Any) -> Any:
+    """Aplica o padrão da coluna só aos valores distintos do bloco (CNPJs e datas se repetem muito).
+
+    As células são copiadas para linhas de largura fixa, completadas com NUL
+    (blocos ASCII não têm NUL), e agrupadas por um hash das palavras de 64 bits.
+    Uma colisão de hash só faz a linha voltar ao verificador compilado.
+    """
+
+    longest = int(length.max(initial=0))
+    width = min(rule.max_length or longest, longest)
+    if not width:
+        return np.ones(length.shape[0], dtype=bool)
+    offsets = np.arange(-(-width // 8) * 8)
+    positions = np.minimum(start[:, None] + offsets, data.size - 1)
+    cells = np.where(offsets < np.minimum(length, width)[:, None], data[positions], 0).astype(np.uint8)
+    words = cells.view(np.uint64)
+    hashed = words[:, 0].copy()
+    for column in range(1, words.shape[1]):
+        hashed = hashed * np.uint64(0x9E3779B97F4A7C15) ^ words[:, column]
+    _, first, inverse = np.unique(hashed, return_index=True, return_inverse=True)
+    same = (words == words[first[inverse]]).all(axis=1)
+    values = cells[first].view(f"S{offsets.size}").ravel().tolist()
+    matched = np.fromiter((rule.pattern(value) is not None for value in values), bool, len(values))
+    return matched[inverse] & same
+
+
+def _strip_cells(data: Any, cell_starts: Any, cell_ends: Any) -> tuple[Any, Any]:
+    """Limites das células sem os espaços e tabulações das pontas, como ``bytes.strip``.
+
+    Usa o índice do último byte não branco até cada posição (e do primeiro a
+    partir dela); blocos sem brancos voltam intactos. Células só com brancos
+    ficam vazias.
+    """
+
+    blank = (data == _SPACE) | (data == _TAB)
+    if not blank.any():
+        return cell_starts, cell_ends
+    size = data.size
+    index = np.arange(size)
+    last_solid = np.maximum.accumulate(np.where(blank, -1, index))
+    next_solid = np.append(np.minimum.accumulate(np.where(blank, size, index)[::-1])[::-1], size)
+    stripped_starts = next_solid[cell_starts]
+    stripped_ends = last_solid[np.maximum(cell_ends - 1, 0)] + 1
+    empty = (cell_ends <= cell_starts) | (stripped_ends <= stripped_starts)
+    return np.where(empty, cell_starts, stripped_starts), np.where(empty, cell_starts, stripped_ends)
+
+
+def _count_between(positions: Any, starts: Any, ends: Any) -> Any:
+    """Quantas ``positions`` (ordenadas) caem em cada faixa ``[início, fim)``."""
+
+    return np.searchsorted(positions, ends) - np.searchsorted(positions, starts)
+
+
+def supports_layout(layout: LayoutDefinition) -> bool:
+    """O motor vetorizado atende layouts posicionais e delimitados por um único byte ASCII."""
+
+    delimiter = layout.delimiter
+    return delimiter is None or (len(delimiter) == 1 and delimiter.isascii() and delimiter not in "\r\n")
+
+
+@lru_cache(maxsize=COMPILED_LAYOUT_CACHE)
+def block_plan(layout: LayoutDefinition) -> BlockPlan:
+    _load_numpy()
+    kinds = {int: "int", float: "float", str: "str"}
+    return BlockPlan(
+        width=len(layout.fields),
+        rules=tuple(
+            _ColumnRule(
+                index,
+                field.required,
+                field.max_length,
+                kinds.get(field.type_, "other"),
+                pattern_matchers(field.pattern)[1] if field.pattern is not None else None,
+            )
+            for index, field in enumerate(layout.fields)
+        ),
+        delimiter=layout.delimiter.encode("ascii") if layout.delimiter is not None else None,
+        offsets=tuple((field.start, field.end) for field in layout.fields) if layout.positional else (),
+    )
+
+
+# Coleta ----------------------------------------------------------------------
+
+
+def _vectorizable(block: bytes) -> bool:
+    # Texto não ASCII ou ``\r`` isolado exigem a semântica completa de ``str.splitlines``.
+    if block.translate(None, _VECTOR_BYTES):
+        return False
+    return b"\r" not in block or block.count(b"\r") == block.count(b"\r\n")
+
+
+def _cells(data: Any, starts: Any, ends: Any) -> list[bytes]:
+    """Recorta as células ``data[start:end]`` de uma coluna de uma vez.
+
+    As células são copiadas para um único buffer separadas por ``\\n`` (que não
+    ocorre dentro de uma linha) e divididas com ``bytes.split``, o que sai mais
+    barato que fatiar o bloco célula a célula.
+    """
+
+    lengths = ends - starts
+    widths = lengths + 1
+    offsets = np.cumsum(widths) - widths
+    sources = np.repeat(starts - offsets, widths) + np.arange(int(widths.sum()))
+    joined = data[np.minimum(sources, data.size - 1)]
+    joined[offsets + lengths] = _LF
+    return joined.tobytes().split(b"\n")[:-1]
+
+
+def _apply_rules(rules: RuleSet, block: bytes, scan: BlockScan, line_offset: int) -> Any:
+    """Alimenta as regras entre registros com as linhas de ``scan.rows``, na ordem do arquivo.
+
+    Devolve as linhas que violam alguma comparação entre campos: elas passam
+    a ser suspeitas para que o verificador compilado gere as mensagens.
+    """
+
+    data = np.frombuffer(block, dtype=np.uint8)
+    columns = [_cells(data, scan.cell_starts[:, column], scan.cell_ends[:, column]) for column in rules.columns]
+    rows = scan.rows.tolist()
+    if rules.accumulators:
+        rules.accumulate_columns((scan.rows + (line_offset + 1)).tolist(), columns)
+    if not rules.row_rules:
+        return np.empty(0, dtype=np.int64)
+    check = rules.check
+    return np.array([row for row, cells in zip(rows, zip(*columns)) if check(cells)], dtype=np.int64)
+
+
+def _suspect_records(
+    plan: BlockPlan, block: bytes, line_offset: int, rules: RuleSet | None = None
+) -> tuple[int, Iterator[Any]]:
+    line_count, suspects, starts, ends, rows, _, _ = scan = plan.suspect_lines(block)
+    if rules is not None and rows.size:
+        suspects = np.union1d(suspects, _apply_rules(rules, block, scan, line_offset))
+    delimiter = plan.delimiter
+    records = (
+        (line_offset + index + 1, line if delimiter is None else [value.strip() for value in line.split(delimiter)])
+        for index, start, end in zip(suspects.tolist(), starts[suspects].tolist(), ends[suspects].tolist())
+        if (line := block[start:end]).strip()
+    )
+    return line_count, records
+
+
+def _shifted(records: Iterable[Any], line_offset: int) -> Iterator[Any]:
+    for line_number, values in records:
+        yield line_number + line_offset, values
+
+
+def collect_blocks(validator: RowCollector, blocks: Iterable[bytes], collector: IssueCollector) -> int:
+    """Valida blocos de bytes alinhados por linha; devolve a quantidade de linhas consumidas.
+
+    Aplica a política de ``collector`` como ``LayoutValidator.collect``: a
+    pré-checagem roda sobre as primeiras linhas e o laço para assim que o
+    coletor é interrompido.
+    """
+
+    _load_numpy()
+    plan = block_plan(validator.layout)
+    delimiter = validator.layout.delimiter
+    rules = validator.rules_for(collector)
+    blocks = iter(blocks)
+    lines = collector.policy.precheck_lines
+    if lines:
+        head: list[bytes] = []
+        for block in blocks:
+            head.append(block)
+            if sum(1 for _ in islice(MappedRecords(b"".join(head), delimiter=delimiter), lines)) >= lines:
+                break
+        if validator.precheck(MappedRecords(b"".join(head), delimiter=delimiter), collector) is None:
+            return 0
+        blocks = chain(head, blocks)
+
+    line_offset = 0
+    for block in blocks:
+        if _vectorizable(block):
+            line_count, records = _suspect_records(plan, block, line_offset, rules)
+            validator.collect_rows(records, collector, accumulate=False)
+        else:
+            mapped = MappedRecords(block, delimiter=delimiter)
+            validator.collect_rows(_shifted(mapped, line_offset), collector)
+            line_count = mapped.line_count
+        line_offset += line_count
+        if collector.stopped:
+            break
+    collector.lines = max(collector.lines, line_offset)
+    return line_offset
+
+
+__all__ = [
+    "BlockPlan",
+    "BlockScan",
+    "ENGINES",
+    "VECTOR_BLOCK_SIZE",
+    "block_plan",
+    "collect_blocks",
+    "engine_for",
+    "iter_byte_blocks",
+    "numpy_available",
+    "supports_layout",
+]